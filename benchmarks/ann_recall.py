@@ -0,0 +1,76 @@
+"""IVF index recall-vs-latency benchmark
+
+Builds an :class:`IVFIndex` over synthetic clustered embeddings (the shape real
+tool-result embeddings tend to have) and sweeps ``nprobe``, reporting recall@k
+against the exact scorer (the vectorized ``SemanticMemory`` path: one
+matrix-vector product + argpartition) and mean query latency for both.
+
+Requires NumPy; no network.
+
+Run:
+    PYTHONPATH=. python benchmarks/ann_recall.py
+    PYTHONPATH=. python benchmarks/ann_recall.py --size 500000 --dim 64 --nprobe 1,2,4,8,16,32
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from loom.memory.ann import IVFIndex
+from loom.memory.semantic import _top_positions
+
+
+def _dataset(size: int, dim: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim))
+    labels = rng.integers(0, clusters, size)
+    return (centers[labels] + 0.35 * rng.standard_normal((size, dim))).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32,64")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = _dataset(args.size, args.dim, args.clusters, rng)
+    queries = _dataset(args.queries, args.dim, args.clusters, np.random.default_rng(1))
+
+    start = time.perf_counter()
+    index = IVFIndex()
+    for offset in range(0, args.size, 50_000):
+        index.add_many(range(offset, min(offset + 50_000, args.size)), data[offset:][:50_000])
+    build_s = time.perf_counter() - start
+
+    normed = data / np.linalg.norm(data, axis=1, keepdims=True)
+    truth = []
+    start = time.perf_counter()
+    for query in queries:
+        scores = normed @ (query / np.linalg.norm(query))
+        truth.append(set(_top_positions(scores, args.top_k)))
+    exact_ms = (time.perf_counter() - start) / args.queries * 1000
+
+    print(
+        f"\nIVF over {args.size} x {args.dim} vectors, nlist={len(index._sizes)}, "
+        f"build {build_s:.1f}s\n"
+    )
+    print(f"{'nprobe':>8} {'recall@' + str(args.top_k):>10} {'ms/query':>10} {'speedup':>8}")
+    print(f"{'exact':>8} {1.0:>10.3f} {exact_ms:>10.3f} {1.0:>7.1f}x")
+    for nprobe in (int(value) for value in args.nprobe.split(",")):
+        hits = 0
+        start = time.perf_counter()
+        results = [index.search(query, args.top_k, nprobe=nprobe) for query in queries]
+        ann_ms = (time.perf_counter() - start) / args.queries * 1000
+        for found, expected in zip(results, truth, strict=True):
+            hits += len({item_id for item_id, _ in found} & expected)
+        recall = hits / (args.queries * args.top_k)
+        print(f"{nprobe:>8} {recall:>10.3f} {ann_ms:>10.3f} {exact_ms / ann_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
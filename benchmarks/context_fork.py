@@ -0,0 +1,103 @@
+"""Child-context memory benchmark: deep copy vs structural fork
+
+Builds a parent agent whose runtime context holds a large history, a busy
+dashboard and an inline knowledge source, then spawns ``--children`` child
+agents the way ``SubAgentManager`` does with ``inherit_context=True``:
+
+* the previous path, ``Agent(config=deepcopy(parent.config))`` with the
+  context partitions deep-copied into a fresh manager (a plain deepcopy of a
+  config carrying a ``ContextPolicy`` raises ``TypeError`` on its locks), and
+* ``Agent(config=parent.config.fork())``, which shares messages, dashboard
+  entries, tool specs and knowledge with the parent.
+
+Reports the memory retained by all children (tracemalloc) and the spawn time.
+
+No network, stdlib only.
+
+Run:
+    PYTHONPATH=. python benchmarks/context_fork.py
+    PYTHONPATH=. python benchmarks/context_fork.py --children 50 --messages 5000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from copy import deepcopy
+
+from loom import Agent, KnowledgeSource, Model, Runtime
+from loom.config import AgentConfig
+from loom.context import ContextManager
+from loom.runtime import ContextPolicy
+from loom.types import Message
+
+
+def _parent(messages: int, documents: int) -> Agent:
+    context = ContextPolicy.manager(max_tokens=10_000_000)
+    partitions = context.partitions
+    partitions.system = [Message(role="system", content="Follow the rules. " * 200)]
+    partitions.history = [
+        Message(role="user" if i % 2 else "assistant", content=f"turn {i} " + "detail " * 150)
+        for i in range(messages)
+    ]
+    for i in range(50):
+        context.dashboard.add_evidence(
+            {"source": "docs", "title": f"pack {i}", "content": "evidence " * 200}
+        )
+    _ = context.token_count  # 预热计数缓存，与真实父级一致
+    knowledge = KnowledgeSource.inline(
+        "docs", [f"document {i} " + "body " * 300 for i in range(documents)]
+    )
+    return Agent(
+        model=Model.openai("gpt-test"),
+        instructions="Coordinate the sub-agents.",
+        knowledge=[knowledge],
+        runtime=Runtime(context=context),
+    )
+
+
+def _deepcopy_config(parent: Agent) -> AgentConfig:
+    context = parent.config.runtime.context
+    manager = ContextManager(max_tokens=context.manager.max_tokens)
+    manager.partitions = deepcopy(context.manager.partitions)
+    manager.dashboard.bind(manager.partitions.working)
+    return deepcopy(parent.config, {id(context): ContextPolicy.from_manager(manager)})
+
+
+def _spawn(parent: Agent, children: int, fork: bool) -> tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    spawned = [
+        Agent(config=parent.config.fork() if fork else _deepcopy_config(parent))
+        for _ in range(children)
+    ]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del spawned
+    return retained / 1e6, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--children", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--documents", type=int, default=500)
+    args = parser.parse_args()
+
+    parent = _parent(args.messages, args.documents)
+    print(
+        f"\nparent: {args.messages} history messages, {args.documents} knowledge documents; "
+        f"{args.children} children\n"
+    )
+    print(f"{'strategy':>10} {'retained MB':>12} {'MB/child':>9} {'spawn s':>8}")
+    for name, fork in (("deepcopy", False), ("fork", True)):
+        retained, elapsed = _spawn(parent, args.children, fork)
+        print(f"{name:>10} {retained:>12.1f} {retained / args.children:>9.2f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
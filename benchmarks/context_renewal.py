@@ -0,0 +1,105 @@
+"""Context renewal latency benchmark: synchronous JSON files vs async snapshot store
+
+Renews a context with a busy dashboard (evidence packs, events, plan) and a
+long history ``--renewals`` times and reports mean ``renew`` latency for
+
+* the previous persistence path: four pretty-printed ``PersistentMemory.save``
+  calls on the caller's thread (emulated around the current renewer), and
+* ``SnapshotStore``: one queued snapshot per renewal, written atomically by a
+  background thread with per-namespace coalescing.
+
+``--write-delay`` adds a sleep to every file write to simulate a slow or
+contended disk; the async path's latency should not move.
+
+No network, stdlib only.
+
+Run:
+    PYTHONPATH=. python benchmarks/context_renewal.py
+    PYTHONPATH=. python benchmarks/context_renewal.py --write-delay 0.02
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from loom.context.partitions import ContextPartitions
+from loom.context.renewal import ContextRenewer
+from loom.memory import PersistentMemory, SnapshotStore
+from loom.types import Message
+
+
+def _partitions() -> ContextPartitions:
+    partitions = ContextPartitions()
+    working = partitions.working
+    working.plan = [f"step {i}: " + "do things " * 10 for i in range(30)]
+    working.event_surface.pending_events = [
+        {"summary": f"event {i}", "urgency": "normal", "payload": "x" * 500} for i in range(100)
+    ]
+    working.knowledge_surface.evidence_packs = [
+        {"source": "docs", "title": f"pack {i}", "content": "evidence " * 250} for i in range(200)
+    ]
+    partitions.history = [Message(role="user", content="turn " * 50) for _ in range(200)]
+    return partitions
+
+
+class _SyncPersistent(PersistentMemory):
+    """The pre-change behaviour: one pretty-printed file per snapshot section."""
+
+    def __init__(self, root: Path, delay: float) -> None:
+        super().__init__(str(root))
+        self.delay = delay
+
+    def save(self, key, data):  # type: ignore[override]
+        super().save(key, data)
+        time.sleep(self.delay)
+
+
+def _sync_renew(renewer: ContextRenewer, files: _SyncPersistent, partitions, goal: str) -> None:
+    renewer.renew(partitions, goal)
+    snapshot = renewer.persistent.load(renewer.namespace)
+    for key in ("working_state", "plan_state", "event_state", "knowledge_state"):
+        files.save(key, snapshot[key])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renewals", type=int, default=50)
+    parser.add_argument("--write-delay", type=float, default=0.005)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(Path(tmp) / "async")
+        original = store._write
+
+        def delayed_write(namespace, snapshot):
+            original(namespace, snapshot)
+            time.sleep(args.write_delay)
+
+        store._write = delayed_write  # type: ignore[method-assign]
+
+        # 旧路径：renew 本身 + 调用线程上的四次格式化写文件
+        files = _SyncPersistent(Path(tmp) / "sync", args.write_delay)
+        renewer = ContextRenewer(SnapshotStore(Path(tmp) / "scratch"), namespace="bench")
+        start = time.perf_counter()
+        for i in range(args.renewals):
+            _sync_renew(renewer, files, _partitions(), f"goal {i}")
+        sync_ms = (time.perf_counter() - start) / args.renewals * 1000
+
+        renewer = ContextRenewer(store, namespace="bench")
+        start = time.perf_counter()
+        for i in range(args.renewals):
+            renewer.renew(_partitions(), f"goal {i}")
+        async_ms = (time.perf_counter() - start) / args.renewals * 1000
+        start = time.perf_counter()
+        store.flush()
+        drain_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n{args.renewals} renewals, {args.write_delay * 1000:.0f} ms per file write\n")
+        print(f"{'path':>8} {'ms/renew':>9} {'file writes':>12}")
+        print(f"{'sync':>8} {sync_ms:>9.2f} {args.renewals * 4:>12}")
+        print(f"{'async':>8} {async_ms:>9.2f} {store.writes:>12}   (final drain {drain_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
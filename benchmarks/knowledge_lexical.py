@@ -0,0 +1,103 @@
+"""Lexical knowledge retrieval benchmark: Jaccard scan vs BM25 index
+
+Builds a synthetic corpus of topic documents (Zipf-distributed vocabulary with a
+shared pool of common words) and issues known-item queries: each query is a few
+words drawn from one target document, with a distractor common word mixed in.
+Reports mean query latency plus hit@1 / MRR@10 for
+
+* the previous lexical path (Jaccard overlap of question and goal against every
+  chunk, re-tokenizing the corpus on each query), and
+* ``KnowledgePipeline`` with its BM25 inverted index.
+
+No network, no optional dependencies.
+
+Run:
+    PYTHONPATH=. python benchmarks/knowledge_lexical.py
+    PYTHONPATH=. python benchmarks/knowledge_lexical.py --docs 50000 --queries 100
+"""
+
+import argparse
+import random
+import time
+
+from loom.tools.knowledge import KnowledgePipeline
+
+
+def _corpus(docs: int, topics: int, rng: random.Random) -> list[str]:
+    common = [f"common{i}" for i in range(200)]
+    vocab = [[f"t{t}w{i}" for i in range(400)] for t in range(topics)]
+    weights = [1 / (rank + 1) for rank in range(400)]
+    corpus = []
+    for _ in range(docs):
+        words = rng.choices(vocab[rng.randrange(topics)], weights, k=rng.randint(20, 60))
+        words += rng.choices(common, k=rng.randint(10, 30))
+        rng.shuffle(words)
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def _queries(corpus: list[str], count: int, rng: random.Random) -> list[tuple[int, str]]:
+    queries = []
+    for target in rng.sample(range(len(corpus)), count):
+        words = [w for w in corpus[target].split() if not w.startswith("common")]
+        picked = rng.sample(words, min(3, len(words))) + [f"common{rng.randrange(200)}"]
+        queries.append((target, " ".join(picked)))
+    return queries
+
+
+def _jaccard_rank(pipeline: KnowledgePipeline, corpus: list[str], question: str) -> list[int]:
+    # 旧路径：召回与重排各对全部片段算一次 Jaccard（目标 = 问题）
+    scored = []
+    for i, content in enumerate(corpus):
+        score = pipeline._lexical_similarity(question, content)
+        if score > 0:
+            goal_score = pipeline._lexical_similarity(question, content)
+            scored.append((score * 0.7 + goal_score * 0.3, i))
+    scored.sort(reverse=True)
+    return [i for _, i in scored[:10]]
+
+
+def _report(name: str, ranks: list[list[int]], targets: list[int], ms: float) -> None:
+    hit1 = sum(r[:1] == [t] for r, t in zip(ranks, targets, strict=True)) / len(targets)
+    mrr = sum(
+        1 / (r.index(t) + 1) if t in r else 0.0 for r, t in zip(ranks, targets, strict=True)
+    ) / len(targets)
+    print(f"{name:>10} {ms:>10.2f} {hit1:>8.3f} {mrr:>8.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10_000)
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    corpus = _corpus(args.docs, args.topics, rng)
+    queries = _queries(corpus, args.queries, rng)
+    targets = [target for target, _ in queries]
+    position = {content: i for i, content in enumerate(corpus)}
+
+    pipeline = KnowledgePipeline(source_cache_max=0)
+    pipeline.register_source("corpus", corpus)
+    start = time.perf_counter()
+    pipeline._sync_lexical_index()
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jaccard = [_jaccard_rank(pipeline, corpus, question) for _, question in queries]
+    jaccard_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    start = time.perf_counter()
+    packs = [pipeline.retrieve(question, question, top_k=10) for _, question in queries]
+    bm25_ms = (time.perf_counter() - start) / len(queries) * 1000
+    bm25 = [[position[chunk["content"]] for chunk in pack.chunks] for pack in packs]
+
+    print(f"\n{args.docs} docs, {args.topics} topics, BM25 index build {build_s:.2f}s\n")
+    print(f"{'engine':>10} {'ms/query':>10} {'hit@1':>8} {'MRR@10':>8}")
+    _report("jaccard", jaccard, targets, jaccard_ms)
+    _report("bm25", bm25, targets, bm25_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Prompt-cache benchmark: simulated Anthropic prefix cache over an agent loop
+
+Drives ``--iterations`` iterations of a synthetic agent loop (system prompt,
+C_memory, skill catalog, ``--tools`` tool schemas, a dashboard whose ρ changes
+every iteration, and a history that grows by an assistant turn plus a tool
+result per iteration) through ``ProviderRuntime`` and
+``AnthropicProvider._build_request``, with prompt caching off, with caching
+in the default ``priority`` layout (dashboard right after C_system) and with
+caching in the ``cache_stable`` layout (dashboard last).
+
+Each payload is replayed against a simulated prefix cache with Anthropic's
+rules: the request is hashed segment by segment in prompt order (tools,
+system, messages); a prefix written by an earlier request that ends at a
+breakpoint or up to 20 blocks before one is a read, every breakpoint is
+then written.  Reports prompt tokens, cache
+reads/writes, uncached tokens and the context's stable prefix per
+iteration.  Uncached tokens are what the provider has to prefill, so they
+drive time to first token.
+
+No network, no provider SDK.
+
+Run:
+    PYTHONPATH=. python benchmarks/prompt_cache.py
+    PYTHONPATH=. python benchmarks/prompt_cache.py --iterations 20 --tools 40
+"""
+
+import argparse
+import hashlib
+import json
+from types import SimpleNamespace
+
+from loom.context import ContextManager
+from loom.providers import AnthropicProvider, ProviderToolParameter, ProviderToolSpec
+from loom.runtime.provider_runtime import ProviderRuntime
+from loom.types import Message
+from loom.utils.tokens import get_tokenizer
+
+_COUNTER = get_tokenizer("claude")
+_LOOKBACK = 20
+
+
+def _segments(payload: dict) -> list[tuple[str, bool]]:
+    """Prompt segments in cache order, each flagged when it carries a breakpoint.
+
+    ``cache_control`` is not part of the cached content, and a string is the
+    same content as a single text block, so both are normalised away.
+    """
+    segments = [_segment(tool) for tool in payload.get("tools", [])]
+    system = payload.get("system")
+    if isinstance(system, str):
+        segments.append((system, False))
+    elif system:
+        segments.extend((block["text"], "cache_control" in block) for block in system)
+    for message in payload["messages"]:
+        content = message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        segments.extend(_segment(block, message["role"]) for block in content)
+    return segments
+
+
+def _segment(block: dict, prefix: str = "") -> tuple[str, bool]:
+    body = {key: value for key, value in block.items() if key != "cache_control"}
+    return prefix + json.dumps(body, sort_keys=True), "cache_control" in block
+
+
+def _replay(payload: dict, cache: set[bytes]) -> tuple[int, int, int]:
+    digest = hashlib.blake2b(digest_size=16)
+    total = read = write = 0
+    prefixes: list[tuple[bytes, int]] = []
+    breakpoints: list[tuple[bytes, int]] = []
+    for text, breakpoint in _segments(payload):
+        digest.update(text.encode())
+        total += _COUNTER.count_content(text)
+        prefixes.append((digest.copy().digest(), total))
+        if breakpoint:
+            breakpoints.append(prefixes[-1])
+            # 与服务端一致：断点处向前回看 20 个块寻找已缓存的前缀
+            hits = [tokens for key, tokens in prefixes[-_LOOKBACK:] if key in cache]
+            read = max(read, *hits) if hits else read
+    for key, tokens in breakpoints:
+        if key not in cache and tokens > read:
+            write = max(write, tokens - read)
+        cache.add(key)
+    return total, read, write
+
+
+def _loop(
+    iterations: int, tool_count: int, caching: bool, layout: str
+) -> list[tuple[int, int, int, int]]:
+    words = " ".join(f"w{i}" for i in range(600))
+    manager = ContextManager(max_tokens=200_000, layout=layout)  # type: ignore[arg-type]
+    manager.current_goal = "fix the failing build"
+    manager.partitions.system = [Message(role="system", content="You are Loom. " + words * 3)]
+    manager.partitions.memory = [Message(role="system", content="AGENTS.md: " + words * 2)]
+    manager.partitions.skill = [f"### Skill {i}: " + words[:400] for i in range(10)]
+    tools = [
+        ProviderToolSpec(
+            name=f"tool_{i}",
+            description="Does a thing. " + words[:300],
+            parameters=(ProviderToolParameter(name="query", required=True),),
+        ).to_dict()
+        for i in range(tool_count)
+    ]
+    runtime = ProviderRuntime(
+        provider=None,
+        config=SimpleNamespace(
+            model="claude-test", completion_max_tokens=1024, temperature=0.0, extensions={}
+        ),
+        context_manager=manager,
+        emit=lambda *_args, **_kwargs: 0,
+        current_iteration=lambda: 0,
+        build_provider_tools=lambda: tools,
+    )
+    provider = AnthropicProvider(api_key="bench", client=SimpleNamespace(), prompt_caching=caching)
+    manager.partitions.history.append(Message(role="user", content=manager.current_goal))
+
+    cache: set[bytes] = set()
+    rows = []
+    for i in range(iterations):
+        manager.dashboard.update_rho(manager.rho)
+        messages = manager.partitions.get_all_messages()
+        request = runtime.build_completion_request(messages)
+        rows.append(
+            (*_replay(provider._build_request_for(request), cache), manager.stable_prefix_tokens)
+        )
+        manager.partitions.history.append(
+            Message(role="assistant", content=f"step {i} " + words[:800])
+        )
+        manager.partitions.history.append(
+            Message(role="user", content=f"result {i} " + words[:1600])
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=12)
+    parser.add_argument("--tools", type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"\n{args.iterations} iterations, {args.tools} tools\n")
+    for caching, layout in ((False, "priority"), (True, "priority"), (True, "cache_stable")):
+        rows = _loop(args.iterations, args.tools, caching, layout)
+        print(f"prompt_caching={caching} layout={layout}")
+        print(f"{'iter':>5} {'prompt':>8} {'read':>8} {'write':>8} {'uncached':>9} {'stable':>8}")
+        for i, (total, read, write, stable) in enumerate(rows, 1):
+            print(f"{i:>5} {total:>8} {read:>8} {write:>8} {total - read:>9} {stable:>8}")
+        later = rows[1:]
+        uncached = sum(row[0] - row[1] for row in later) / max(1, len(later))
+        hit = sum(row[1] for row in later) / max(1, sum(row[0] for row in later))
+        print(f"iterations 2+: mean uncached {uncached:.0f} tokens, hit rate {hit:.0%}\n")
+
+
+if __name__ == "__main__":
+    main()
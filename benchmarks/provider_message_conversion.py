@@ -0,0 +1,124 @@
+"""Provider message conversion benchmark
+
+Simulates a long tool-using run: every iteration appends an assistant message
+with a tool call plus the tool result, then converts the whole history to the
+provider-native request shape (runtime Message -> generic dict -> provider
+format), exactly as ``ProviderRuntime.build_completion_request`` and the
+provider's ``_convert_messages`` do.
+
+Compares the per-message caches against a full re-conversion every iteration.
+With the caches the number of message conversions per iteration stays flat
+(only the newly appended messages); the remaining linear term is an identity
+lookup per message while assembling the request list.  No network access is
+needed.
+
+Run:
+    PYTHONPATH=. python benchmarks/provider_message_conversion.py
+    PYTHONPATH=. python benchmarks/provider_message_conversion.py --iterations 2000 --provider openai
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+from loom.providers import AnthropicProvider, GeminiProvider, OpenAIProvider
+from loom.runtime.provider_runtime import ProviderRuntime
+from loom.types import Message, ToolCall
+
+PROVIDERS = {
+    "anthropic": AnthropicProvider,
+    "openai": OpenAIProvider,
+    "gemini": GeminiProvider,
+}
+
+
+def _runtime() -> ProviderRuntime:
+    return ProviderRuntime(
+        provider=None,
+        config=None,
+        context_manager=None,
+        emit=lambda *_args, **_kwargs: 0,
+        current_iteration=lambda: 0,
+        build_provider_tools=lambda: [],
+    )
+
+
+def _append_turn(history: list[Message], i: int) -> None:
+    call = ToolCall(
+        id=f"call_{i}", name="Grep", arguments={"pattern": f"def step_{i}", "path": "."}
+    )
+    history.append(Message(role="assistant", content=f"Searching step {i}.", tool_calls=[call]))
+    history.append(
+        Message(
+            role="tool",
+            content=f"loom/step_{i}.py:12: def step_{i}(x):\n" * 20,
+            tool_call_id=call.id,
+        )
+    )
+
+
+def run(provider_name: str, iterations: int, cached: bool) -> tuple[list[float], list[int]]:
+    runtime = _runtime()
+    provider = PROVIDERS[provider_name](api_key="bench", client=SimpleNamespace())
+    if not cached:
+        provider.message_cache_size = 0
+
+    conversions = 0
+    convert_message = provider._convert_message
+
+    def _counting(message):
+        nonlocal conversions
+        conversions += 1
+        return convert_message(message)
+
+    provider._convert_message = _counting
+    history = [
+        Message(role="system", content="You are a coding agent."),
+        Message(role="user", content="Find every step function."),
+    ]
+    timings: list[float] = []
+    counts: list[int] = []
+    for i in range(iterations):
+        _append_turn(history, i)
+        conversions = 0
+        start = time.perf_counter()
+        if cached:
+            generic = runtime.to_provider_messages(history)
+        else:
+            generic = [runtime._to_provider_message(msg) for msg in history]
+        provider._convert_messages(generic)
+        timings.append(time.perf_counter() - start)
+        counts.append(conversions)
+    return timings, counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="anthropic")
+    args = parser.parse_args()
+
+    baseline, baseline_counts = run(args.provider, args.iterations, cached=False)
+    cached, cached_counts = run(args.provider, args.iterations, cached=True)
+
+    print(f"\n{args.provider}: per-iteration conversion cost (µs)\n")
+    print(
+        f"{'iteration':>10} {'messages':>9} {'full':>10} {'cached':>10} {'speedup':>8} "
+        f"{'converted full/cached':>22}"
+    )
+    checkpoints = sorted({1, *(args.iterations * k // 4 for k in range(1, 5))})
+    for n in checkpoints:
+        # 取检查点附近的均值，降低单次抖动
+        window = slice(max(0, n - 10), n)
+        full = sum(baseline[window]) / len(baseline[window]) * 1e6
+        fast = sum(cached[window]) / len(cached[window]) * 1e6
+        converted = f"{baseline_counts[n - 1]}/{cached_counts[n - 1]}"
+        print(
+            f"{n:>10} {2 + 2 * n:>9} {full:>10.1f} {fast:>10.1f} {full / fast:>7.1f}x "
+            f"{converted:>22}"
+        )
+    print(f"\ntotal: full={sum(baseline) * 1000:.1f} ms  cached={sum(cached) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Provider rate-limit benchmark: 429 storms with and without the AIMD limiter
+
+Simulates an endpoint that serves ``--capacity`` concurrent requests and
+answers 429 to anything above that, and ``--sessions`` agent sessions in one
+process that each fire ``--requests`` completions at once through providers
+sharing one pooled client.  Runs the workload
+
+* with the plain retry/backoff path (``RetryConfig``), and
+* with ``use_rate_limits(RateLimitConfig(max_concurrency=...))``, whose AIMD
+  limiter is shared by every provider on the endpoint,
+
+and reports upstream attempts, 429 responses, failed requests (retries
+exhausted), wall time and the limiter's queue-wait metric.
+
+No network, no provider SDK.
+
+Run:
+    PYTHONPATH=. python benchmarks/rate_limit.py
+    PYTHONPATH=. python benchmarks/rate_limit.py --sessions 8 --capacity 6
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from loom.providers import (
+    CompletionParams,
+    CompletionRequest,
+    CompletionResponse,
+    LLMProvider,
+    RateLimitConfig,
+)
+from loom.providers.base import RetryConfig
+from loom.providers.rate_limit import clear_shared_rate_limiters
+from loom.utils.errors import RateLimitError
+
+
+class _Endpoint:
+    def __init__(self, capacity: int, latency: float) -> None:
+        self.capacity = capacity
+        self.latency = latency
+        self.active = 0
+        self.attempts = 0
+        self.rejected = 0
+
+
+class _Provider(LLMProvider):
+    def __init__(self, endpoint: _Endpoint) -> None:
+        super().__init__(RetryConfig(max_retries=4, base_delay=0.05, circuit_open_after=10_000))
+        self.endpoint = endpoint
+        self.base_url = "https://bench.invalid"
+
+    async def _complete_request(self, request: CompletionRequest) -> CompletionResponse:
+        endpoint = self.endpoint
+        endpoint.attempts += 1
+        if endpoint.active >= endpoint.capacity:
+            endpoint.rejected += 1
+            await asyncio.sleep(0.005)
+            raise RateLimitError("429 Too Many Requests")
+        endpoint.active += 1
+        try:
+            await asyncio.sleep(endpoint.latency)
+        finally:
+            endpoint.active -= 1
+        return CompletionResponse(content="ok")
+
+
+async def _run(args: argparse.Namespace, limited: bool) -> None:
+    clear_shared_rate_limiters()
+    endpoint = _Endpoint(args.capacity, args.latency)
+    providers = [_Provider(endpoint) for _ in range(args.sessions)]
+    limiter = None
+    for provider in providers:
+        if limited:
+            limiter = provider.use_rate_limits(
+                RateLimitConfig(max_concurrency=args.max_concurrency)
+            )
+    request = CompletionRequest.create([{"role": "user", "content": "go"}], CompletionParams())
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            provider.complete_request(request)
+            for provider in providers
+            for _ in range(args.requests)
+        ),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+    failed = sum(isinstance(result, Exception) for result in results)
+    wait = f"{limiter.stats.mean_queue_wait * 1000:>8.0f}" if limiter else f"{'-':>8}"
+    limit = f"{limiter.limit:>6.1f}" if limiter else f"{'-':>6}"
+    print(
+        f"{'aimd' if limited else 'backoff':>8} {endpoint.attempts:>9} {endpoint.rejected:>6} "
+        f"{failed:>7} {elapsed:>7.2f} {wait} {limit}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+    logging.getLogger("loom.providers.base").setLevel(logging.ERROR)  # 重试日志太多
+
+    print(
+        f"\n{args.sessions} sessions x {args.requests} concurrent requests, endpoint capacity "
+        f"{args.capacity}, {args.latency * 1000:.0f} ms latency\n"
+    )
+    print(
+        f"{'mode':>8} {'attempts':>9} {'429s':>6} {'failed':>7} {'wall s':>7} {'wait ms':>8} {'limit':>6}"
+    )
+    await _run(args, limited=False)
+    await _run(args, limited=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Provider response cache benchmark: duplicate requests with and without coalescing
+
+Simulates ``--sessions`` sessions (or best-of-N harness candidates at
+temperature 0) that each send the same ``--rounds`` completion requests to a
+provider with ``--latency`` seconds of upstream latency.  Sessions run in
+lockstep, so duplicates are in flight at the same time.  Runs the workload
+
+* without a response cache,
+* with ``ResponseCache`` (single-flight coalescing + in-memory TTL cache),
+  then again on the warm cache (the next scheduled run), and
+* with ``DiskResponseStore``, then on a fresh ``ResponseCache`` over the warm
+  store (a second process),
+
+and reports upstream calls, wall time and cache counters.
+
+No network, no provider SDK.
+
+Run:
+    PYTHONPATH=. python benchmarks/response_cache.py
+    PYTHONPATH=. python benchmarks/response_cache.py --sessions 16 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from loom.providers import (
+    CompletionParams,
+    CompletionRequest,
+    CompletionResponse,
+    DiskResponseStore,
+    LLMProvider,
+    ResponseCache,
+)
+
+
+class _SlowProvider(LLMProvider):
+    def __init__(self, latency: float) -> None:
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    async def _complete_request(self, request: CompletionRequest) -> CompletionResponse:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return CompletionResponse(content="summary of " + request.messages[-1]["content"])
+
+
+async def _session(provider: LLMProvider, session: int, rounds: int) -> None:
+    for i in range(rounds):
+        request = CompletionRequest.create(
+            [
+                {"role": "system", "content": "Summarize the nightly report."},
+                {"role": "user", "content": f"report section {i}"},
+            ],
+            CompletionParams(model="bench", temperature=0.0),
+            metadata={"session": session},
+        )
+        await provider.complete_request(request)
+
+
+async def _run(args: argparse.Namespace, cache: ResponseCache | None) -> tuple[int, float]:
+    provider = _SlowProvider(args.latency)
+    if cache is not None:
+        provider.use_response_cache(cache)
+    start = time.perf_counter()
+    await asyncio.gather(*(_session(provider, s, args.rounds) for s in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    if cache is not None:
+        await cache.flush()
+    return provider.calls, elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(
+        f"\n{args.sessions} sessions x {args.rounds} identical requests, "
+        f"{args.latency * 1000:.0f} ms upstream latency\n"
+    )
+    print(f"{'mode':>12} {'upstream':>9} {'wall s':>7} {'hits':>5} {'coalesced':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = ResponseCache()
+        modes = (
+            ("none", None),
+            ("memory", memory),
+            ("memory-warm", memory),
+            ("disk", ResponseCache(store=DiskResponseStore(tmp))),
+            ("disk-warm", ResponseCache(store=DiskResponseStore(tmp))),
+        )
+        for name, cache in modes:
+            before = (cache.stats.hits, cache.stats.coalesced) if cache else (0, 0)
+            calls, elapsed = await _run(args, cache)
+            hits = cache.stats.hits - before[0] if cache else 0
+            coalesced = cache.stats.coalesced - before[1] if cache else 0
+            print(f"{name:>12} {calls:>9} {elapsed:>7.2f} {hits:>5} {coalesced:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
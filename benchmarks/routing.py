@@ -0,0 +1,136 @@
+"""Provider routing benchmark: pinned vs latency-aware routing vs hedged requests
+
+Simulates three provider backends with heavy-tailed latency:
+
+* ``primary``  — 80 ms median, ``--stall`` of requests stall for 10x longer,
+  and it fails ``--error-rate`` of requests,
+* ``mirror``   — 120 ms median, occasional 3x slow responses,
+* ``fallback`` — 250 ms median, steady,
+
+then sends ``--requests`` completions (``--concurrency`` at a time)
+
+* pinned to ``primary`` (its own retries only),
+* through ``RoutingProvider`` (fastest healthy backend + failover), and
+* through ``RoutingProvider(hedge=True)`` (duplicate to the runner-up after
+  the primary's p95),
+
+and reports p50/p95/p99 latency, failed requests and upstream calls (the
+extra cost of hedging).
+
+No network, no provider SDK.
+
+Run:
+    PYTHONPATH=. python benchmarks/routing.py
+    PYTHONPATH=. python benchmarks/routing.py --stall 0.1 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from loom.providers import (
+    CompletionParams,
+    CompletionRequest,
+    CompletionResponse,
+    LLMProvider,
+    RoutingProvider,
+)
+from loom.providers.base import RetryConfig
+from loom.utils.errors import ProviderUnavailableError
+
+
+class _Backend(LLMProvider):
+    def __init__(
+        self,
+        rng: random.Random,
+        median: float,
+        *,
+        stall: float = 0.0,
+        stall_factor: float = 10.0,
+        error_rate: float = 0.0,
+    ) -> None:
+        super().__init__(RetryConfig(max_retries=2, base_delay=0.05, circuit_open_after=10_000))
+        self.rng = rng
+        self.median = median
+        self.stall = stall
+        self.stall_factor = stall_factor
+        self.error_rate = error_rate
+        self.calls = 0
+
+    async def _complete_request(self, request: CompletionRequest) -> CompletionResponse:
+        self.calls += 1
+        latency = self.median * self.rng.lognormvariate(0, 0.25)
+        if self.rng.random() < self.stall:
+            latency *= self.stall_factor
+        if self.rng.random() < self.error_rate:
+            await asyncio.sleep(latency / 4)
+            raise ProviderUnavailableError("503 Service Unavailable")
+        await asyncio.sleep(latency)
+        return CompletionResponse(content="ok")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _run(args: argparse.Namespace, mode: str) -> None:
+    rng = random.Random(args.seed)
+    backends = {
+        "primary": _Backend(rng, 0.08, stall=args.stall, error_rate=args.error_rate),
+        "mirror": _Backend(rng, 0.12, stall=args.stall / 2, stall_factor=3.0),
+        "fallback": _Backend(rng, 0.25),
+    }
+    if mode == "pinned":
+        provider: LLMProvider = backends["primary"]
+    else:
+        provider = RoutingProvider(backends, hedge=mode == "hedged", hedge_min_delay=0.02)
+    request = CompletionRequest.create([{"role": "user", "content": "go"}], CompletionParams())
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    failed = 0
+
+    async def one() -> None:
+        nonlocal failed
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await provider.complete_request(request)
+            except Exception:
+                failed += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(args.requests)))
+    calls = sum(backend.calls for backend in backends.values())
+    print(
+        f"{mode:>8} {_percentile(latencies, 0.5) * 1000:>7.0f} "
+        f"{_percentile(latencies, 0.95) * 1000:>7.0f} {_percentile(latencies, 0.99) * 1000:>7.0f} "
+        f"{failed:>7} {calls:>7}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stall", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    # 重试 / 故障转移日志太多
+    logging.getLogger("loom.providers").setLevel(logging.ERROR)
+
+    print(
+        f"\n{args.requests} requests, {args.concurrency} concurrent, primary stalls "
+        f"{args.stall:.0%} and fails {args.error_rate:.0%}\n"
+    )
+    print(f"{'mode':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'failed':>7} {'calls':>7}")
+    for mode in ("pinned", "routed", "hedged"):
+        await _run(args, mode)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
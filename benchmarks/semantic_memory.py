@@ -0,0 +1,148 @@
+"""SemanticMemory search and persistence benchmark
+
+Fills ``SemanticMemory`` with synthetic tool-result entries (random words plus
+an embedding) at 10k, 100k and 1M entries and reports:
+
+* vector search: NumPy matrix-vector scoring + argpartition top-k, versus the
+  previous per-entry pure-Python cosine loop;
+* lexical search: inverted token index, versus per-entry Jaccard scoring;
+* persistence: one ``add`` appended to the binary log, versus the previous full
+  JSON rewrite of every entry on each ``add``; plus the cost of a compaction.
+
+The pure-Python baselines are only run up to ``--baseline-max`` entries since
+they take seconds per query at larger sizes.  Requires NumPy; no network.
+
+Run:
+    PYTHONPATH=. python benchmarks/semantic_memory.py
+    PYTHONPATH=. python benchmarks/semantic_memory.py --sizes 10000,100000 --dim 64
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from loom.memory.semantic import MemoryEntry, SemanticMemory
+
+
+def _vocabulary(size: int, rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(size)]
+
+
+def _build(size: int, dim: int, words: list[str], rng: random.Random) -> SemanticMemory:
+    vectors = np.random.default_rng(0).standard_normal((size, dim), dtype=np.float32)
+    memory = SemanticMemory(max_size=size)
+    for i in range(size):
+        memory.add(MemoryEntry(content=" ".join(rng.choices(words, k=8)), embedding=vectors[i]))
+    return memory
+
+
+def _legacy_search(memory: SemanticMemory, query: str, top_k: int, query_embedding) -> list:
+    # 旧实现：逐条打分后整体排序
+    query_tokens = memory._tokenize(query)
+
+    def _score(entry: MemoryEntry) -> float:
+        if query_embedding is not None and entry.embedding is not None:
+            return memory._cosine_similarity(query_embedding, entry.embedding)
+        content_tokens = memory._tokenize(entry.content)
+        union = len(query_tokens | content_tokens)
+        return len(query_tokens & content_tokens) / union if union else 0.0
+
+    scored = [(_score(entry), i, entry) for i, entry in enumerate(memory.entries)]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [entry for _, _, entry in scored[:top_k]]
+
+
+def _mean_ms(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def run(size: int, dim: int, queries: int, baseline: bool, rng: random.Random) -> dict:
+    words = _vocabulary(20_000, rng)
+    start = time.perf_counter()
+    memory = _build(size, dim, words, rng)
+    build_s = time.perf_counter() - start
+    query_vectors = [[rng.uniform(-1, 1) for _ in range(dim)] for _ in range(queries)]
+    query_texts = [" ".join(rng.choices(words, k=3)) for _ in range(queries)]
+    it_vec, it_lex = iter(query_vectors * 3), iter(query_texts * 3)
+
+    row = {
+        "size": size,
+        "build_s": build_s,
+        "vector_ms": _mean_ms(lambda: memory.search("", 5, next(it_vec)), queries),
+        "lexical_ms": _mean_ms(lambda: memory.search(next(it_lex), 5), queries),
+    }
+    if baseline:
+        runs = max(1, queries // 5)
+        row["legacy_vector_ms"] = _mean_ms(
+            lambda: _legacy_search(memory, "", 5, next(it_vec)), runs
+        )
+        row["legacy_lexical_ms"] = _mean_ms(
+            lambda: _legacy_search(memory, next(it_lex), 5, None), runs
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "memory.bin"
+        memory.max_size = size + 1_000
+        memory.persist_path = str(path)
+        start = time.perf_counter()
+        memory.compact()
+        row["compact_s"] = time.perf_counter() - start
+        row["append_ms"] = _mean_ms(
+            lambda: memory.add(MemoryEntry(content="new tool result", embedding=query_vectors[0])),
+            200,
+        )
+        if baseline:
+            legacy = Path(tmp) / "memory.json"
+            data = [
+                {"content": e.content, "embedding": [float(x) for x in e.embedding]}
+                for e in memory.entries
+            ]
+
+            def _rewrite() -> None:
+                with open(legacy, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+
+            row["legacy_append_ms"] = _mean_ms(_rewrite, 1)
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--baseline-max", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    rows = [run(size, args.dim, args.queries, size <= args.baseline_max, rng) for size in sizes]
+
+    def _fmt(row: dict, key: str) -> str:
+        return f"{row[key]:>10.2f}" if key in row else f"{'-':>10}"
+
+    print(f"\nSemanticMemory, dim={args.dim} (ms per operation)\n")
+    print(
+        f"{'entries':>9} {'vector':>10} {'legacy':>10} {'lexical':>10} {'legacy':>10} "
+        f"{'append':>10} {'legacy':>10} {'compact s':>10} {'build s':>8}"
+    )
+    for row in rows:
+        print(
+            f"{row['size']:>9} {_fmt(row, 'vector_ms')} {_fmt(row, 'legacy_vector_ms')} "
+            f"{_fmt(row, 'lexical_ms')} {_fmt(row, 'legacy_lexical_ms')} "
+            f"{_fmt(row, 'append_ms')} {_fmt(row, 'legacy_append_ms')} "
+            f"{row['compact_s']:>10.2f} {row['build_s']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
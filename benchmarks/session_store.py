@@ -0,0 +1,134 @@
+"""Session store throughput benchmark: JSON file vs SQLite (WAL)
+
+Pre-fills each backend with ``--runs`` runs and transcripts (spread over
+``--sessions`` sessions, transcripts carrying ``--messages`` messages), then
+measures
+
+* ``save_run`` + ``save_transcript`` latency once the store is full,
+* ``list_runs(session_id)`` and paged ``list_runs(limit=50)`` latency,
+* session-restore reads: the old full ``list_transcripts(session_id)`` + sort
+  vs the ``iter_transcripts`` window the default restore policy asks for, and
+* the one-off :func:`migrate_file_session_store` time.
+
+No network, stdlib only.
+
+Run:
+    PYTHONPATH=. python benchmarks/session_store.py
+    PYTHONPATH=. python benchmarks/session_store.py --runs 20000 --messages 40
+    PYTHONPATH=. python benchmarks/session_store.py --sessions 1  # one long-lived chat
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from loom.runtime.session_restore import SessionRestorePolicy
+from loom.runtime.session_store import (
+    FileSessionStore,
+    RunRecord,
+    SQLiteSessionStore,
+    TranscriptRecord,
+    _run_record_to_json,
+    _transcript_record_to_json,
+    migrate_file_session_store,
+)
+
+
+def _records(i: int, sessions: int, messages: int) -> tuple[RunRecord, TranscriptRecord]:
+    session_id = f"session-{i % sessions}"
+    run = RunRecord(id=f"run-{i}", session_id=session_id, state="completed", output="ok " * 20)
+    transcript = TranscriptRecord(
+        id=f"run-{i}",
+        session_id=session_id,
+        prompt=f"task {i}",
+        messages=[
+            {"role": "user" if m % 2 == 0 else "assistant", "content": f"message {m} " * 30}
+            for m in range(messages)
+        ],
+    )
+    return run, transcript
+
+
+def _prefill_json(path: Path, count: int, sessions: int, messages: int) -> None:
+    # 直接一次性写入，避免预填充本身耗时 O(n²)
+    store = FileSessionStore(path)
+    data = store._empty_data()
+    for i in range(count):
+        run, transcript = _records(i, sessions, messages)
+        data["runs"][run.id] = _run_record_to_json(run)
+        data["transcripts"][transcript.id] = _transcript_record_to_json(transcript)
+    store._write_data(data)
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5_000)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "sessions.json"
+        _prefill_json(json_path, args.runs, args.sessions, args.messages)
+        size_mb = json_path.stat().st_size / 1e6
+
+        start = time.perf_counter()
+        migrate_file_session_store(json_path, Path(tmp) / "sessions.db")
+        migrate_s = time.perf_counter() - start
+
+        results = {}
+        for name, store in (
+            ("json", FileSessionStore(json_path)),
+            ("sqlite", SQLiteSessionStore(Path(tmp) / "sessions.db")),
+        ):
+
+            def save(i: int, store=store) -> None:
+                run, transcript = _records(args.runs + i, args.sessions, args.messages)
+                store.save_run(run)
+                store.save_transcript(transcript)
+
+            results[name] = (
+                _time(save, args.repeat),
+                _time(lambda i, store=store: store.list_runs(f"session-{i}"), args.repeat),
+                _time(lambda i, store=store: store.list_runs(limit=50, offset=i * 50), args.repeat),
+                _time(
+                    lambda i, store=store: sorted(
+                        store.list_transcripts(f"session-{i % args.sessions}"),
+                        key=lambda t: t.created_at,
+                    ),
+                    args.repeat,
+                ),
+                _time(
+                    lambda i, store=store: list(
+                        store.iter_transcripts(
+                            f"session-{i % args.sessions}",
+                            **SessionRestorePolicy.transcript_only().transcript_window(),
+                        )
+                    ),
+                    args.repeat,
+                ),
+            )
+
+    print(f"\n{args.runs} runs + transcripts, {size_mb:.0f} MB JSON, migration {migrate_s:.1f}s\n")
+    print(
+        f"{'backend':>8} {'save ms':>10} {'list(session) ms':>17} {'page(50) ms':>12} "
+        f"{'restore: all ms':>16} {'restore: window ms':>19}"
+    )
+    for name, (save_ms, list_ms, page_ms, full_ms, window_ms) in results.items():
+        print(
+            f"{name:>8} {save_ms:>10.2f} {list_ms:>17.2f} {page_ms:>12.2f} "
+            f"{full_ms:>16.2f} {window_ms:>19.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
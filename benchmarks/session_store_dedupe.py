@@ -0,0 +1,112 @@
+"""Transcript storage footprint benchmark: inline JSON vs content-addressed blobs
+
+Simulates long-lived chats where every run's transcript repeats the same system
+prompt, a context block that changes every few runs, retrieved evidence drawn
+from a shared pool, and the whole conversation history so far.  Writes the same
+transcripts to
+
+* ``FileSessionStore`` (one JSON document),
+* ``SQLiteSessionStore`` with inline transcript JSON, and
+* ``SQLiteSessionStore(dedupe_messages=True)`` (hash -> zlib blob + references),
+
+then reports on-disk size, write time, full ``list_transcripts`` read time and
+the windowed ``iter_transcripts`` read the default restore policy uses.
+
+No network, stdlib only.
+
+Run:
+    PYTHONPATH=. python benchmarks/session_store_dedupe.py
+    PYTHONPATH=. python benchmarks/session_store_dedupe.py --sessions 4 --runs 200
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from loom.runtime.session_restore import SessionRestorePolicy
+from loom.runtime.session_store import FileSessionStore, SQLiteSessionStore, TranscriptRecord
+
+
+def _transcripts(sessions: int, runs: int, rng: random.Random) -> list[TranscriptRecord]:
+    words = [f"w{i}" for i in range(2000)]
+    system = "You are a careful engineering agent. " + " ".join(rng.choices(words, k=800))
+    evidence = [" ".join(rng.choices(words, k=300)) for _ in range(40)]
+    records = []
+    for s in range(sessions):
+        history: list[dict] = []
+        context = ""
+        for i in range(runs):
+            if i % 5 == 0:
+                context = " ".join(rng.choices(words, k=400))
+            question = {"role": "user", "content": " ".join(rng.choices(words, k=30))}
+            answer = {"role": "assistant", "content": " ".join(rng.choices(words, k=120))}
+            tool = {"role": "tool", "content": rng.choice(evidence)}
+            messages = [
+                {"role": "system", "content": system},
+                {"role": "system", "content": context},
+                *history,
+                question,
+                tool,
+                answer,
+            ]
+            history += [question, answer]
+            records.append(
+                TranscriptRecord(
+                    id=f"s{s}-run-{i}",
+                    session_id=f"session-{s}",
+                    prompt=question["content"],
+                    messages=messages,
+                )
+            )
+    return records
+
+
+def _size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.parent.glob(path.name + "*"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=100)
+    args = parser.parse_args()
+
+    records = _transcripts(args.sessions, args.runs, random.Random(0))
+    window = SessionRestorePolicy.transcript_only().transcript_window()
+
+    print(f"\n{args.sessions} sessions x {args.runs} runs\n")
+    print(f"{'backend':>14} {'disk MB':>9} {'write s':>9} {'list ms':>9} {'restore ms':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = None
+        for name in ("file", "sqlite", "sqlite-dedupe"):
+            path = Path(tmp) / f"{name}.{'json' if name == 'file' else 'db'}"
+            if name == "file":
+                store = FileSessionStore(path)
+            else:
+                store = SQLiteSessionStore(path, dedupe_messages=name == "sqlite-dedupe")
+            start = time.perf_counter()
+            for record in records:
+                store.save_transcript(record)
+            write_s = time.perf_counter() - start
+            if isinstance(store, SQLiteSessionStore):
+                store._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            start = time.perf_counter()
+            store.list_transcripts("session-0")
+            list_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            list(store.iter_transcripts("session-0", **window))
+            restore_ms = (time.perf_counter() - start) * 1000
+
+            size = _size(path)
+            baseline = baseline or size
+            print(
+                f"{name:>14} {size / 1e6:>9.2f} {write_s:>9.2f} {list_ms:>9.1f} "
+                f"{restore_ms:>11.1f}   ({baseline / size:.1f}x smaller than file)"
+            )
+
+
+if __name__ == "__main__":
+    main()
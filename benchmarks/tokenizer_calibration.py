@@ -0,0 +1,117 @@
+"""Tokenizer calibration benchmark
+
+Compares the offline token estimators (and the legacy len/4 heuristic) against
+the ``TokenUsage.input_tokens`` that a real provider reports for the same
+payloads.
+
+Two sample sources:
+
+  --samples FILE   JSONL with {"text": ...} or {"messages": [...]} plus
+                   {"input_tokens": N} recorded from earlier provider calls
+  --live           send a built-in corpus (English, CJK, code, mixed) to the
+                   provider resolved from the Model and read back usage
+
+Run:
+    python benchmarks/tokenizer_calibration.py --samples usage.jsonl
+    python benchmarks/tokenizer_calibration.py --live --provider openai --model gpt-4o-mini
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from loom.types import Message
+from loom.utils import calibrate_tokenizers
+
+CORPUS = {
+    "english": "The agent keeps its working state in a dashboard that is never compressed. " * 40,
+    "cjk": "上下文压力达到阈值时，运行时会依次触发裁剪、微压缩、折叠和全量压缩。" * 40,
+    "code": (
+        "async def execute_tools(self, tool_calls):\n"
+        "    results = []\n"
+        "    for call in tool_calls:\n"
+        "        results.append(await self._run(call.name, **call.arguments))\n"
+        "    return results\n"
+    )
+    * 30,
+    "mixed": "Step 3: 调用 `Grep` 搜索 `def renew(` → found 2 matches in loom/context/*.py\n" * 40,
+}
+
+
+def load_samples(path: str) -> list[tuple[object, int]]:
+    samples: list[tuple[object, int]] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "messages" in record:
+                payload: object = [
+                    Message(role=m.get("role", "user"), content=m.get("content", ""))
+                    for m in record["messages"]
+                ]
+            else:
+                payload = record.get("text", "")
+            samples.append((payload, int(record["input_tokens"])))
+    return samples
+
+
+async def live_samples(provider_name: str, model_name: str) -> list[tuple[object, int]]:
+    from loom.agent import _resolve_provider
+    from loom.config import Model
+    from loom.providers.base import CompletionParams, CompletionRequest
+
+    model = Model(provider=provider_name, name=model_name)
+    provider = _resolve_provider(model)
+    if provider is None:
+        raise SystemExit(f"Could not resolve provider {model.identifier}")
+
+    # 先测空负载的固定开销（角色标记等），再从每个样本中扣除
+    async def input_tokens(text: str) -> int:
+        request = CompletionRequest.create(
+            [{"role": "user", "content": text}],
+            CompletionParams(model=model_name, max_tokens=1, temperature=0.0),
+        )
+        response = await provider.complete_request(request)
+        return response.usage.input_tokens if response.usage else 0
+
+    overhead = await input_tokens(".") - 1
+    samples: list[tuple[object, int]] = []
+    for name, text in CORPUS.items():
+        reported = await input_tokens(text) - overhead
+        print(f"  {name:<8} reported={reported}")
+        samples.append((text, reported))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples")
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--provider", default="anthropic")
+    parser.add_argument("--model", default="claude-3-5-sonnet-20241022")
+    args = parser.parse_args()
+
+    if args.samples:
+        samples = load_samples(args.samples)
+    elif args.live:
+        samples = asyncio.run(live_samples(args.provider, args.model))
+    else:
+        parser.error("pass --samples FILE or --live")
+
+    start = time.perf_counter()
+    report = calibrate_tokenizers(samples)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{len(samples)} samples, calibrated in {elapsed * 1000:.1f} ms\n")
+    print(f"{'tokenizer':<12} {'ratio':>7} {'mean |err|%':>12} {'max |err|%':>11}")
+    for result in sorted(report.values(), key=lambda r: r.mean_abs_pct_error):
+        print(
+            f"{result.tokenizer:<12} {result.mean_ratio:>7.3f} "
+            f"{result.mean_abs_pct_error:>12.1f} {result.max_abs_pct_error:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
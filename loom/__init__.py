@@ -68,6 +68,7 @@ from .runtime import (
     SignalAdapter,
     SignalDecision,
     SkillInjection,
+    SQLiteSessionStore,
     TranscriptRecord,
 )
 
@@ -107,6 +108,7 @@ __all__ = [
     "SessionConfig",
     "SessionStore",
     "FileSessionStore",
+    "SQLiteSessionStore",
     "InMemorySessionStore",
     "TranscriptRecord",
     "RunContext",
@@ -49,8 +49,29 @@ class EngineBuilderMixin:
                     else 200000
                 ),
                 model=self.config.model.name,
+                tokenizer=self.config.model.extensions.get("tokenizer") or self.config.model,
                 temperature=self.config.generation.temperature,
                 completion_max_tokens=self.config.generation.max_output_tokens or 4096,
+                max_tool_concurrency=(
+                    self.config.runtime.limits.max_tool_concurrency if self.config.runtime else 1
+                ),
+                speculative_tools=bool(
+                    self.config.runtime and self.config.runtime.features.speculative_tools
+                ),
+                pipelined_prefetch=bool(
+                    self.config.runtime and self.config.runtime.features.pipelined_prefetch
+                ),
+                prefetch_timeout=(
+                    self.config.runtime.limits.prefetch_timeout if self.config.runtime else 2.0
+                ),
+                prefetch_source_timeouts=(
+                    dict(self.config.runtime.limits.prefetch_source_timeouts)
+                    if self.config.runtime
+                    else {}
+                ),
+                retrieval_deadline=(
+                    self.config.runtime.limits.retrieval_deadline if self.config.runtime else None
+                ),
                 compression_policy=_resolve_compression_policy(self.config.runtime),
                 enable_heartbeat=self.config.heartbeat is not None,
                 enable_safety=self.config.runtime.features.enable_safety
@@ -123,7 +144,7 @@ class EngineBuilderMixin:
             for source in sources:
                 if not isinstance(source, KnowledgeSource):
                     continue
-                evidence = source.resolve(query)
+                evidence = await source.aresolve(query)
                 for item in evidence.items:
                     engine.context_manager.dashboard.add_evidence(
                         {
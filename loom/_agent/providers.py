@@ -28,6 +28,8 @@ class ProviderMixin:
             public_agent_module = sys.modules.get("loom.agent")
             resolver = getattr(public_agent_module, "_resolve_provider", _resolve_provider)
             self._provider = resolver(self.config.model)
+            _attach_response_cache(self._provider, self.config.model)
+            _attach_rate_limits(self._provider, self.config.model)
             self._provider_resolved = True
             self._provider_from_resolver = self._provider is not None
             self._provider_validated = False
@@ -51,6 +53,8 @@ class ProviderMixin:
                         max_tokens=1,
                         temperature=0.0,
                     ),
+                    # 健康检查必须真正访问上游
+                    metadata={"response_cache": False},
                 )
             )
         except Exception as exc:
@@ -161,12 +165,53 @@ def _resolve_provider(model: Model) -> LLMProvider | None:
                 **provider_options,
             )
 
+        if provider_name == "routing":
+            from ..providers.routing import RouteBackend, RoutingProvider
+
+            backends = []
+            for backend_model in model.extensions.get("backends", []):
+                backend = _resolve_provider(backend_model)
+                if backend is None:
+                    continue
+                _attach_response_cache(backend, backend_model)
+                _attach_rate_limits(backend, backend_model)
+                backends.append(
+                    RouteBackend(backend_model.identifier, backend, model=backend_model.name)
+                )
+            if not backends:
+                raise ValueError("no routing backend could be initialized")
+            return RoutingProvider(backends, hedge=bool(model.extensions.get("hedge")))
+
         raise ValueError(f"Unknown provider: {provider_name}")
     except Exception as exc:
         logger.warning("Failed to initialize provider %s: %s", provider_name, exc)
         return None
 
 
+def _attach_response_cache(provider: LLMProvider | None, model: Model) -> None:
+    """Honour ``Model.extensions["response_cache"]`` (True or a ``ResponseCache``)."""
+    option = model.extensions.get("response_cache")
+    if not option or not isinstance(provider, LLMProvider) or provider.response_cache is not None:
+        return
+    from ..providers.response_cache import ResponseCache, default_response_cache
+
+    provider.use_response_cache(
+        option if isinstance(option, ResponseCache) else default_response_cache()
+    )
+
+
+def _attach_rate_limits(provider: LLMProvider | None, model: Model) -> None:
+    """Honour ``Model.extensions["rate_limits"]`` (True, a dict or a ``RateLimitConfig``)."""
+    option = model.extensions.get("rate_limits")
+    if not option or not isinstance(provider, LLMProvider) or provider.rate_limiter is not None:
+        return
+    from ..providers.rate_limit import RateLimitConfig
+
+    if isinstance(option, dict):
+        option = RateLimitConfig(**option)
+    provider.use_rate_limits(option if isinstance(option, RateLimitConfig) else None)
+
+
 def _provider_options(model: Model) -> dict[str, float | int]:
     options: dict[str, float | int] = {}
     if "timeout" in model.extensions and model.extensions["timeout"] is not None:
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from copy import deepcopy
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -36,3 +37,20 @@ class AgentConfig:
     safety_rules: list[SafetyRule] | None = None
     knowledge: list[KnowledgeSource] = field(default_factory=list)
     gateways: list[Any] = field(default_factory=list)
+
+    def fork(self) -> AgentConfig:
+        """Copy this config for a child agent.
+
+        The model, tool specs and knowledge sources are shared rather than
+        copied (they are read-only and may hold handlers, indexes or locks).
+        A runtime context policy that implements ``fork()`` is forked so the
+        child shares unchanged partitions without writing into the parent's.
+        Everything else is deep-copied.
+        """
+        memo: dict[int, Any] = {id(self.model): self.model}
+        for item in (*self.tools, *self.knowledge):
+            memo[id(item)] = item
+        context = self.runtime.context if self.runtime is not None else None
+        if context is not None and callable(getattr(context, "fork", None)):
+            memo[id(context)] = context.fork()
+        return deepcopy(self, memo)
@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import inspect
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from ..utils.aio import call_maybe_async, run_sync
+
 
 @dataclass(slots=True)
 class KnowledgeDocument:
@@ -164,15 +167,17 @@ class KnowledgeBundle:
 class KnowledgeResolver:
     """Adapter for dynamic knowledge access."""
 
-    handler: Callable[[KnowledgeQuery], KnowledgeEvidence]
+    handler: Callable[[KnowledgeQuery], KnowledgeEvidence | Awaitable[KnowledgeEvidence]]
     mode: str = "callable"
     description: str = ""
     extensions: dict[str, Any] = field(default_factory=dict)
+    # 持有资源的后端（如 from_directory 的 DirectoryIndex），由 close() 释放
+    index: Any = field(default=None, repr=False, compare=False)
 
     @classmethod
     def callable(
         cls,
-        handler: Callable[[KnowledgeQuery], KnowledgeEvidence],
+        handler: Callable[[KnowledgeQuery], KnowledgeEvidence | Awaitable[KnowledgeEvidence]],
         *,
         description: str = "",
         extensions: dict[str, Any] | None = None,
@@ -238,37 +243,55 @@ class KnowledgeResolver:
         *,
         description: str = "",
         encoding: str = "utf-8",
+        index_path: str | Path | None = None,
+        chunk_chars: int = 1500,
+        embedding_fn: Callable[[str], list[float]] | None = None,
+        watch_interval: float | None = None,
         extensions: dict[str, Any] | None = None,
     ) -> KnowledgeResolver:
+        """Ranked chunk retrieval over ``path``, backed by an incremental index.
+
+        Files are chunked and indexed once; each query only re-reads files whose
+        mtime or size changed.  ``index_path`` persists the index across
+        processes and ``watch_interval`` refreshes it in the background; call
+        :meth:`close` to stop the watcher thread.
+        """
+        from ..memory.directory import DirectoryIndex
+
         root = Path(path)
+        index = DirectoryIndex(
+            root,
+            glob,
+            encoding=encoding,
+            chunk_chars=chunk_chars,
+            index_path=index_path,
+            embedding_fn=embedding_fn,
+            watch_interval=watch_interval,
+        )
 
         def _handler(query: KnowledgeQuery) -> KnowledgeEvidence:
             source_name = query.source_names[0] if query.source_names else root.name or "directory"
             items: list[KnowledgeEvidenceItem] = []
-            if not root.exists():
-                return KnowledgeEvidence(query=query, relevance_score=0.0)
-            for file_path in sorted(root.glob(glob)):
-                if not file_path.is_file():
-                    continue
-                try:
-                    content = file_path.read_text(encoding=encoding)
-                except UnicodeDecodeError:
-                    continue
+            for chunk, score in index.search(query.text or query.goal, query.top_k):
+                metadata: dict[str, Any] = {"path": chunk.path, "chunk": chunk.ordinal}
+                if chunk.heading:
+                    metadata["heading"] = chunk.heading
                 items.append(
                     KnowledgeEvidenceItem(
                         source_name=source_name,
-                        content=content,
-                        title=file_path.name,
-                        uri=str(file_path),
+                        content=chunk.content,
+                        title=Path(chunk.path).name,
+                        uri=str(root / chunk.path),
+                        score=score,
+                        metadata=metadata,
                     )
                 )
-                if len(items) >= query.top_k:
-                    break
             citations = [
                 KnowledgeCitation(
                     source_name=source_name,
                     title=item.title,
                     uri=item.uri,
+                    snippet=item.metadata.get("heading", ""),
                 )
                 for item in items
             ]
@@ -276,7 +299,7 @@ class KnowledgeResolver:
                 query=query,
                 items=items,
                 citations=citations,
-                relevance_score=1.0 if items else 0.0,
+                relevance_score=max((item.score or 0.0 for item in items), default=0.0),
             )
 
         return cls(
@@ -284,10 +307,26 @@ class KnowledgeResolver:
             mode="directory",
             description=description or f"Files from {root}",
             extensions={"path": str(root), "glob": glob, **dict(extensions or {})},
+            index=index,
         )
 
     def resolve(self, query: KnowledgeQuery) -> KnowledgeEvidence:
         evidence = self.handler(query)
+        if inspect.isawaitable(evidence):
+            evidence = run_sync(evidence)
+        return self._check(evidence)
+
+    async def aresolve(self, query: KnowledgeQuery) -> KnowledgeEvidence:
+        """Async resolve: awaits async handlers, runs sync ones in a worker thread."""
+        return self._check(await call_maybe_async(self.handler, query))
+
+    def close(self) -> None:
+        """Release the backing index (stops a ``from_directory`` watcher thread)."""
+        close = getattr(self.index, "close", None)
+        if callable(close):
+            close()
+
+    def _check(self, evidence: Any) -> KnowledgeEvidence:
         if not isinstance(evidence, KnowledgeEvidence):
             raise TypeError(
                 f"knowledge resolver must return KnowledgeEvidence, got {type(evidence).__name__}"
@@ -359,12 +398,20 @@ class KnowledgeSource:
         glob: str = "**/*.md",
         *,
         description: str = "",
+        index_path: str | Path | None = None,
+        watch_interval: float | None = None,
         metadata: dict[str, Any] | None = None,
         extensions: dict[str, Any] | None = None,
     ) -> KnowledgeSource:
         return cls.dynamic(
             name,
-            KnowledgeResolver.from_directory(path, glob, description=description),
+            KnowledgeResolver.from_directory(
+                path,
+                glob,
+                description=description,
+                index_path=index_path,
+                watch_interval=watch_interval,
+            ),
             description=description,
             metadata=metadata,
             extensions=extensions,
@@ -375,17 +422,7 @@ class KnowledgeSource:
             return KnowledgeEvidence(query=query)
 
         if self.resolver is not None:
-            scoped_query = query
-            if not query.source_names:
-                scoped_query = KnowledgeQuery(
-                    text=query.text,
-                    goal=query.goal,
-                    top_k=query.top_k,
-                    source_names=[self.name],
-                    metadata=dict(query.metadata),
-                    extensions=dict(query.extensions),
-                )
-            evidence = self.resolver.resolve(scoped_query)
+            evidence = self.resolver.resolve(self._scoped_query(query))
             return _with_source_name(evidence, self.name, query)
 
         items = [
@@ -416,6 +453,33 @@ class KnowledgeSource:
             relevance_score=1.0 if items else 0.0,
         )
 
+    async def aresolve(self, query: KnowledgeQuery) -> KnowledgeEvidence:
+        """Async variant of :meth:`resolve`; inline documents resolve in place."""
+        if type(self).resolve is not KnowledgeSource.resolve:
+            resolved: KnowledgeEvidence = await call_maybe_async(self.resolve, query)
+            return resolved
+        if self.resolver is None or (query.source_names and self.name not in query.source_names):
+            return self.resolve(query)
+        evidence = await self.resolver.aresolve(self._scoped_query(query))
+        return _with_source_name(evidence, self.name, query)
+
+    def close(self) -> None:
+        """Release resources held by the resolver, if any."""
+        if self.resolver is not None:
+            self.resolver.close()
+
+    def _scoped_query(self, query: KnowledgeQuery) -> KnowledgeQuery:
+        if query.source_names:
+            return query
+        return KnowledgeQuery(
+            text=query.text,
+            goal=query.goal,
+            top_k=query.top_k,
+            source_names=[self.name],
+            metadata=dict(query.metadata),
+            extensions=dict(query.extensions),
+        )
+
     def to_context_payload(self) -> dict[str, Any]:
         """Serialize a knowledge source for prompt/runtime context."""
         payload: dict[str, Any] = {
@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+import inspect
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from typing import Any
 
+from ..utils.aio import call_maybe_async, run_sync
+
 
 @dataclass(slots=True)
 class MemoryBackend:
@@ -83,11 +86,14 @@ class MemoryStore(ABC):
         """Persist or update one extracted memory record."""
 
 
+MemoryRecallResult = MemoryRecall | list[MemoryRecord]
+
+
 @dataclass(slots=True)
 class MemoryResolver:
     """Adapter for long-term memory retrieval."""
 
-    handler: Callable[[MemoryQuery], MemoryRecall | list[MemoryRecord]]
+    handler: Callable[[MemoryQuery], MemoryRecallResult | Awaitable[MemoryRecallResult]]
     mode: str = "callable"
     description: str = ""
     extensions: dict[str, Any] = field(default_factory=dict)
@@ -95,7 +101,7 @@ class MemoryResolver:
     @classmethod
     def callable(
         cls,
-        handler: Callable[[MemoryQuery], MemoryRecall | list[MemoryRecord]],
+        handler: Callable[[MemoryQuery], MemoryRecallResult | Awaitable[MemoryRecallResult]],
         *,
         description: str = "",
         extensions: dict[str, Any] | None = None,
@@ -147,6 +153,15 @@ class MemoryResolver:
 
     def retrieve(self, query: MemoryQuery) -> MemoryRecall:
         recall = self.handler(query)
+        if inspect.isawaitable(recall):
+            recall = run_sync(recall)
+        return self._normalize(query, recall)
+
+    async def aretrieve(self, query: MemoryQuery) -> MemoryRecall:
+        """Async retrieve: awaits async handlers, runs sync ones in a worker thread."""
+        return self._normalize(query, await call_maybe_async(self.handler, query))
+
+    def _normalize(self, query: MemoryQuery, recall: Any) -> MemoryRecall:
         if isinstance(recall, MemoryRecall):
             return recall
         if isinstance(recall, list) and all(isinstance(item, MemoryRecord) for item in recall):
@@ -277,16 +292,25 @@ class MemorySource:
         return True
 
     def prefetch(self, query: str, *, session_id: str | None = None) -> str:
-        recall = self.resolver.retrieve(
-            MemoryQuery(
-                text=query,
-                session_id=session_id,
-                top_k=self.top_k,
-                metadata=dict(self.metadata),
-            )
-        )
+        recall = self.resolver.retrieve(self._query(query, session_id))
         return "\n".join(record.content for record in recall.records if record.content)
 
+    async def aprefetch(self, query: str, *, session_id: str | None = None) -> str:
+        # 子类只覆写了同步 prefetch 时沿用它（放到线程池执行）
+        if type(self).prefetch is not MemorySource.prefetch:
+            recalled: str = await call_maybe_async(self.prefetch, query, session_id=session_id)
+            return recalled
+        recall = await self.resolver.aretrieve(self._query(query, session_id))
+        return "\n".join(record.content for record in recall.records if record.content)
+
+    def _query(self, query: str, session_id: str | None) -> MemoryQuery:
+        return MemoryQuery(
+            text=query,
+            session_id=session_id,
+            top_k=self.top_k,
+            metadata=dict(self.metadata),
+        )
+
     def sync_turn(
         self,
         user_content: str,
@@ -204,6 +204,25 @@ class Model:
             ),
         )
 
+    @classmethod
+    def routed(
+        cls,
+        *backends: Model,
+        hedge: bool = False,
+        extensions: dict[str, Any] | None = None,
+    ) -> Model:
+        """Route each request to the fastest healthy of ``backends``.
+
+        Resolves to a ``RoutingProvider``; ``hedge=True`` sends a duplicate
+        request to the runner-up once the primary exceeds its p95 latency.
+        """
+        if not backends:
+            raise ValueError("Model.routed() needs at least one backend model")
+        result = dict(extensions or {})
+        result["backends"] = list(backends)
+        result["hedge"] = hedge
+        return cls(provider="routing", name=backends[0].name, extensions=result)
+
     @property
     def identifier(self) -> str:
         return f"{self.provider}:{self.name}"
@@ -22,6 +22,10 @@ class RuntimeLimits:
 
     max_iterations: int = 100
     max_context_tokens: int | None = None
+    max_tool_concurrency: int = 1  # >1 时并发执行只读 / 并发安全的工具调用
+    prefetch_timeout: float = 2.0  # 流水线预取的单数据源超时（秒）
+    prefetch_source_timeouts: dict[str, float] = field(default_factory=dict)
+    retrieval_deadline: float | None = None  # 运行开始时知识/记忆并发检索的总时限（秒）
     extensions: dict[str, Any] = field(default_factory=dict)
 
 
@@ -30,6 +34,8 @@ class RuntimeFeatures:
     """Stable runtime feature flags."""
 
     enable_safety: bool = True
+    speculative_tools: bool = False  # 流式输出期间提前执行只读工具调用
+    pipelined_prefetch: bool = False  # 记忆/知识检索与工具执行并发，结果进入下一轮渲染
     fallback: RuntimeFallback = field(default_factory=RuntimeFallback)
     extensions: dict[str, Any] = field(default_factory=dict)
 
@@ -1,16 +1,19 @@
 """Context management system"""
 
+from .accounting import TokenLedger
 from .compression import CompressionPolicy, ContextCompressor
 from .dashboard import DashboardManager
 from .manager import ContextManager
-from .partitions import ContextPartitions
+from .partitions import ContextPartitions, PartitionLayout
 from .renewal import ContextRenewer
 
 __all__ = [
     "ContextManager",
     "ContextPartitions",
+    "PartitionLayout",
     "DashboardManager",
     "ContextCompressor",
     "CompressionPolicy",
     "ContextRenewer",
+    "TokenLedger",
 ]
@@ -0,0 +1,145 @@
+"""Incremental token accounting for context partitions
+
+ρ 在每轮循环中被读取多次（should_renew / should_compress / update_rho / DELTA），
+全量重新计数 C_history 的代价随历史长度线性增长。TokenLedger 为每个分区维护
+running total，并缓存每条消息的 token 数：
+
+- append：只计数新增的尾部消息
+- compress / renew：分区列表被替换，复用仍然存在的消息的缓存计数
+- debug：每次访问都与全量重新计数对比
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..types import Message
+from ..utils.errors import ContextError
+from ..utils.tokens import TokenCounter, get_tokenizer
+from .partitions import ContextPartitions
+
+_LIST_PARTITIONS = ("system", "memory", "history")
+
+
+@dataclass
+class _PartitionTally:
+    """Running total for one list partition."""
+
+    messages: list[Message] | None = None
+    length: int = 0
+    last: Message | None = None
+    total: int = 0
+    # id(message) -> (message, content, tokens)；持有引用保证 id 不被复用
+    cache: dict[int, tuple[Message, Any, int]] = field(default_factory=dict)
+
+
+class TokenLedger:
+    """Maintain per-partition token totals so ρ costs O(1) in history length.
+
+    Messages are treated as immutable once appended, and list partitions are
+    assumed to grow by ``append`` between reads. The fast path only checks the
+    list object, its length and the identity of the last counted message, so
+    it detects a replaced list (compression, renewal), a shrunk list and a
+    replaced tail message; each triggers a recount of that partition only,
+    reusing cached per-message counts. Replacing an earlier element of the same
+    list in place is *not* detected — callers that do so must call
+    ``invalidate()``. Rendered dashboard and skill messages are recounted only
+    when ``ContextPartitions`` re-renders them.
+    """
+
+    def __init__(self, verify: bool = False, model: Any = None):
+        self.verify = verify
+        self.counter: TokenCounter = get_tokenizer(model)
+        self._tallies: dict[str, _PartitionTally] = {
+            name: _PartitionTally() for name in _LIST_PARTITIONS
+        }
+        self._rendered: dict[str, tuple[Message, int]] = {}
+
+    def count(self, partitions: ContextPartitions) -> int:
+        """Return the token count of ``partitions.get_all_messages()``."""
+        total = sum(
+            self._sync(self._tallies[name], getattr(partitions, name)) for name in _LIST_PARTITIONS
+        )
+        total += self._count_rendered("dashboard", partitions._format_dashboard())
+        total += self._count_rendered("skill", partitions._format_skills())
+
+        if self.verify:
+            expected = self.counter.count_messages(partitions.get_all_messages())
+            if expected != total:
+                raise ContextError(
+                    f"Token ledger drift: running total {total} != full recount {expected}"
+                )
+        return total
+
+    def stable_prefix(self, partitions: ContextPartitions) -> int:
+        """Token count of the first ``partitions.stable_prefix_length()`` messages."""
+        self.count(partitions)
+        total = self._tallies["system"].total
+        if partitions.layout == "cache_stable":
+            total += self._tallies["memory"].total + self._tallies["history"].total
+            total += self._count_rendered("skill", partitions._format_skills())
+        return total
+
+    def fork(self) -> "TokenLedger":
+        """Ledger for forked partitions that reuses this ledger's message counts."""
+        forked = TokenLedger(verify=self.verify, model=self.counter)
+        # 只共享缓存：分叉后的列表是新对象，首次计数会按身份复用已有条目
+        forked._tallies = {
+            name: _PartitionTally(cache=tally.cache) for name, tally in self._tallies.items()
+        }
+        forked._rendered = dict(self._rendered)
+        return forked
+
+    def invalidate(self) -> None:
+        """Drop all running totals; the next count recomputes every partition."""
+        self._tallies = {name: _PartitionTally() for name in _LIST_PARTITIONS}
+        self._rendered = {}
+
+    def _sync(self, tally: _PartitionTally, messages: list[Message]) -> int:
+        length = len(messages)
+        if (
+            tally.messages is messages
+            and length >= tally.length
+            and (tally.length == 0 or messages[tally.length - 1] is tally.last)
+        ):
+            if length > tally.length:
+                for msg in messages[tally.length :]:
+                    tally.total += self._count_message(tally.cache, tally.cache, msg)
+                tally.length = length
+                tally.last = messages[-1]
+            return tally.total
+
+        # 列表被替换或非追加式修改：重建该分区，复用已缓存的消息计数
+        cache: dict[int, tuple[Message, Any, int]] = {}
+        total = 0
+        for msg in messages:
+            total += self._count_message(tally.cache, cache, msg)
+        tally.messages = messages
+        tally.length = length
+        tally.last = messages[-1] if messages else None
+        tally.total = total
+        tally.cache = cache
+        return total
+
+    def _count_message(
+        self,
+        previous: dict[int, tuple[Message, Any, int]],
+        cache: dict[int, tuple[Message, Any, int]],
+        msg: Message,
+    ) -> int:
+        entry = previous.get(id(msg))
+        if entry is not None and entry[0] is msg and entry[1] is msg.content:
+            tokens = entry[2]
+        else:
+            tokens = self.counter.count_message(msg)
+        cache[id(msg)] = (msg, msg.content, tokens)
+        return tokens
+
+    def _count_rendered(self, key: str, message: Message | None) -> int:
+        if message is None:
+            return 0
+        cached = self._rendered.get(key)
+        if cached is not None and cached[0] is message:
+            return cached[1]
+        tokens = self.counter.count_message(message)
+        self._rendered[key] = (message, tokens)
+        return tokens
@@ -13,7 +13,11 @@ _PENDING_EVENTS_AGGREGATE_THRESHOLD = 10
 
 
 class DashboardManager:
-    """Manage Dashboard state"""
+    """Manage Dashboard state
+
+    Mutators bump ``Dashboard.version`` so ``ContextPartitions`` can reuse the
+    rendered dashboard message while nothing has changed.
+    """
 
     def __init__(
         self,
@@ -33,7 +37,8 @@ class DashboardManager:
     def update_rho(self, rho: float):
         """Update context pressure"""
         with self._lock:
-            self.dashboard.rho = rho
+            if self.dashboard.rho != rho:
+                self.dashboard.rho = rho
 
     def update_token_budget(self, token_budget: int):
         """Update remaining token budget."""
@@ -72,6 +77,7 @@ class DashboardManager:
                 self.dashboard.event_surface.pending_events = self._aggregator.aggregate(
                     self.dashboard.event_surface.pending_events
                 )
+            self.dashboard.touch()
 
     def acknowledge_event(self, event_id: str, decision: dict):
         """Acknowledge event and move to recent_event_decisions"""
@@ -90,11 +96,13 @@ class DashboardManager:
                 decision = {**decision, "event_id": event_id}
             self.dashboard.event_surface.recent_event_decisions.append(decision)
             self.dashboard.interrupt_requested = False
+            self.dashboard.touch()
 
     def add_active_risk(self, risk: dict):
         """Add active risk"""
         with self._lock:
             self.dashboard.event_surface.active_risks.append(risk)
+            self.dashboard.touch()
 
     def add_question(self, question: str):
         """Add active question to knowledge_surface"""
@@ -102,6 +110,7 @@ class DashboardManager:
             if question in self.dashboard.knowledge_surface.active_questions:
                 return
             self.dashboard.knowledge_surface.active_questions.append(question)
+            self.dashboard.touch()
 
     def add_evidence(self, evidence: dict):
         """Add evidence pack to knowledge_surface"""
@@ -125,6 +134,7 @@ class DashboardManager:
             citation = evidence.get("citation") or evidence.get("source")
             if citation and citation not in self.dashboard.knowledge_surface.citations:
                 self.dashboard.knowledge_surface.citations.append(str(citation))
+            self.dashboard.touch()
 
     def increment_errors(self):
         """Increment error count"""
@@ -181,6 +191,7 @@ class DashboardManager:
                 self.dashboard.event_surface.recent_event_decisions.append(
                     decision.to_event(signal)
                 )
+                self.dashboard.touch()
 
             if signal.urgency in {"high", "critical"} or (
                 decision is not None and decision.action in {"interrupt", "interrupt_now"}
@@ -7,10 +7,10 @@ import threading
 from typing import TYPE_CHECKING, Any
 
 from ..types.handoff import HandoffArtifact
-from ..utils import count_messages_tokens
+from .accounting import TokenLedger
 from .compression import CompressionPolicy, ContextCompressor
 from .dashboard import DashboardManager
-from .partitions import ContextPartitions
+from .partitions import ContextPartitions, PartitionLayout
 from .renewal import ContextRenewer
 
 if TYPE_CHECKING:
@@ -25,13 +25,17 @@ class ContextManager:
         max_tokens: int = 200000,
         compression_policy: CompressionPolicy | None = None,
         continuity_policy: Any | None = None,
+        debug_token_accounting: bool = False,
+        model: Any = None,
+        layout: PartitionLayout = "priority",
     ):
         self.max_tokens = max_tokens
         self._lock = threading.RLock()
-        self.partitions = ContextPartitions()
+        self.partitions = ContextPartitions(layout=layout)
         self.dashboard = DashboardManager(self.partitions.working, lock=self._lock)
         self.compressor = ContextCompressor(policy=compression_policy)
         self.renewer = ContextRenewer()
+        self.ledger = TokenLedger(verify=debug_token_accounting, model=model)
         self.continuity_policy = continuity_policy
         self.current_goal = ""
         self._last_handoff: HandoffArtifact | None = None
@@ -42,12 +46,23 @@ class ContextManager:
         """Return the HandoffArtifact from the most recent renewal, or None."""
         return self._last_handoff
 
+    @property
+    def token_count(self) -> int:
+        """Token count of the rendered context, maintained incrementally."""
+        with self._lock:
+            return self.ledger.count(self.partitions)
+
+    @property
+    def stable_prefix_tokens(self) -> int:
+        """Tokens in the rendered prefix that stays stable across iterations."""
+        with self._lock:
+            return self.ledger.stable_prefix(self.partitions)
+
     @property
     def rho(self) -> float:
         """Calculate context pressure ρ = token_count / max_tokens."""
         with self._lock:
-            token_count = count_messages_tokens(self.partitions.get_all_messages())
-            return token_count / self.max_tokens
+            return self.token_count / self.max_tokens
 
     def should_renew(self) -> bool:
         """Check if context needs renewal (ρ >= 1.0)."""
@@ -58,6 +73,7 @@ class ContextManager:
         """Renew context while keeping dashboard bound to live working state."""
         with self._lock:
             self._sprint += 1
+            layout = self.partitions.layout
             if self.continuity_policy is None:
                 self.partitions, self._last_handoff = self.renewer.renew(
                     self.partitions, self.current_goal, sprint=self._sprint
@@ -67,12 +83,34 @@ class ContextManager:
                     self.partitions,
                     self.current_goal,
                     sprint=self._sprint,
+                    renewer=self.renewer,
                 )
                 self.partitions = result.context
                 self._last_handoff = result.artifact
+            # 外部续期策略返回的新分区沿用原有布局
+            self.partitions.layout = layout
             self.dashboard.bind(self.partitions.working)
             self.dashboard.update_rho(self.rho)
 
+    def fork(self) -> "ContextManager":
+        """Independent manager whose partitions share structure with this one."""
+        with self._lock:
+            forked = ContextManager(
+                max_tokens=self.max_tokens,
+                compression_policy=self.compressor.policy,
+                continuity_policy=self.continuity_policy,
+                debug_token_accounting=self.ledger.verify,
+                model=self.ledger.counter,
+                layout=self.partitions.layout,
+            )
+            forked.partitions = self.partitions.fork()
+            forked.dashboard.bind(forked.partitions.working)
+            forked.ledger = self.ledger.fork()
+            forked.current_goal = self.current_goal
+            forked._last_handoff = self._last_handoff
+            forked._sprint = self._sprint
+            return forked
+
     def should_compress(self) -> str | None:
         """Check if compression is needed."""
         with self._lock:
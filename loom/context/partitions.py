@@ -4,9 +4,14 @@
 """
 
 from dataclasses import dataclass, field
+from typing import Any, Literal, cast
 
 from ..types import Dashboard, Message
 
+# priority: 按保护优先级渲染；cache_stable: 稳定分区在前，Dashboard 作为末尾消息
+PartitionLayout = Literal["priority", "cache_stable"]
+_LAYOUTS = ("priority", "cache_stable")
+
 
 @dataclass
 class ContextPartitions:
@@ -17,6 +22,14 @@ class ContextPartitions:
     C_memory: AGENTS.md等，间接可写
     C_skill: 工具声明，动态换入/换出
     C_history: 执行历史，可压缩，优先级最低
+
+    渲染缓存：C_working 与 C_skill 的格式化消息按版本号缓存，
+    Dashboard.version / skill_version 不变时直接复用同一个 Message。
+
+    ``layout="cache_stable"`` renders C_system, C_memory, C_skill and
+    C_history first and the dashboard (ρ, error count, events) last, so the
+    prompt prefix only grows between iterations and provider prefix caches
+    keep hitting.
     """
 
     system: list[Message] = field(default_factory=list)
@@ -24,12 +37,62 @@ class ContextPartitions:
     memory: list[Message] = field(default_factory=list)
     skill: list[str] = field(default_factory=list)
     history: list[Message] = field(default_factory=list)
+    skill_version: int = field(default=0, compare=False, repr=False)
+    layout: PartitionLayout = field(default="priority", compare=False)
+    _render_cache: dict[str, tuple[Any, ...]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.layout not in _LAYOUTS:
+            raise ValueError(
+                f"Unknown partition layout {self.layout!r}; expected one of {_LAYOUTS}"
+            )
+
+    def touch_skills(self) -> int:
+        """Mark C_skill as changed after in-place edits of ``skill`` entries."""
+        self.skill_version += 1
+        return self.skill_version
+
+    def fork(self) -> "ContextPartitions":
+        """Structural copy for snapshots, renewals and child contexts.
+
+        Each partition gets its own list so the copies can diverge, but the
+        ``Message`` objects are shared (messages are immutable once appended),
+        as are the cached dashboard/skill renders.  Cost is one pointer per
+        message instead of a deep copy of every content block.
+        """
+        forked = ContextPartitions(
+            system=list(self.system),
+            working=self.working.fork(),
+            memory=list(self.memory),
+            skill=list(self.skill),
+            history=list(self.history),
+            skill_version=self.skill_version,
+            layout=self.layout,
+        )
+        # 渲染结果按新对象重新登记，复制品首次渲染直接命中
+        if self._format_dashboard() is not None:
+            forked._render_cache["dashboard"] = (
+                forked.working,
+                forked.working.version,
+                self._render_cache["dashboard"][2],
+            )
+        if self._format_skills() is not None:
+            cached = self._render_cache["skill"]
+            forked._render_cache["skill"] = (forked.skill, *cached[1:])
+        return forked
 
     def get_all_messages(self) -> list[Message]:
         """Get all messages for LLM (按优先级排序)
 
         Priority order: C_system > C_working > C_memory > C_skill > C_history
+
+        In the ``cache_stable`` layout the order is C_system, C_memory,
+        C_skill, C_history, C_working.
         """
+        if self.layout == "cache_stable":
+            return self._stable_messages()
         messages = []
 
         # 1. C_system: 永不压缩，最高优先级
@@ -53,11 +116,55 @@ class ContextPartitions:
 
         return messages
 
+    def stable_prefix_length(self) -> int:
+        """Number of leading ``get_all_messages()`` entries that are stable.
+
+        Stable messages do not change from one iteration to the next (they
+        are only appended to), so a provider prefix cache covering them stays
+        valid.  In the ``priority`` layout the dashboard right after C_system
+        ends the stable prefix.
+        """
+        if self.layout != "cache_stable":
+            return len(self.system)
+        skill = 1 if self.skill else 0
+        return len(self.system) + len(self.memory) + skill + len(self.history)
+
+    def stable_system_messages(self) -> list[Message]:
+        """Leading system messages of the stable prefix, as rendered.
+
+        C_system alone in the ``priority`` layout; C_system, C_memory and the
+        C_skill message in the ``cache_stable`` layout.
+        """
+        if self.layout != "cache_stable":
+            return list(self.system)
+        messages = [*self.system, *self.memory]
+        skill_msg = self._format_skills()
+        if skill_msg:
+            messages.append(skill_msg)
+        return messages
+
+    def _stable_messages(self) -> list[Message]:
+        messages = self.stable_system_messages()
+        messages.extend(self.history)
+        # 易变的 ρ / 错误数 / 事件放在末尾，不破坏前面的缓存前缀
+        dashboard_msg = self._format_dashboard()
+        if dashboard_msg:
+            messages.append(dashboard_msg)
+        return messages
+
     def _format_dashboard(self) -> Message | None:
-        """Format Dashboard into a system message for LLM"""
+        """Format Dashboard into a system message for LLM (cached by version)"""
         if not self.working:
             return None
 
+        cached = self._render_cache.get("dashboard")
+        if cached is not None and cached[0] is self.working and cached[1] == self.working.version:
+            return cast("Message | None", cached[2])
+        message = self._render_dashboard()
+        self._render_cache["dashboard"] = (self.working, self.working.version, message)
+        return message
+
+    def _render_dashboard(self) -> Message:
         sections = []
 
         # 核心指标
@@ -127,10 +234,23 @@ class ContextPartitions:
         return Message(role="system", content=content)
 
     def _format_skills(self) -> Message | None:
-        """Format skills into a system message for LLM"""
+        """Format skills into a system message for LLM (cached by version)"""
         if not self.skill:
             return None
 
+        cached = self._render_cache.get("skill")
+        if (
+            cached is not None
+            and cached[0] is self.skill
+            and cached[1] == len(self.skill)
+            and cached[2] == self.skill_version
+        ):
+            return cast("Message | None", cached[3])
+        message = self._render_skills()
+        self._render_cache["skill"] = (self.skill, len(self.skill), self.skill_version, message)
+        return message
+
+    def _render_skills(self) -> Message:
         sections = []
         sections.append("## Available Skills/Tools")
         sections.append("\nYou have access to the following capabilities:")
@@ -9,14 +9,13 @@ Renewal 流程：
 2. snapshot(C_working.plan) → M_f['plan_state']
 3. snapshot(C_working.event_surface) → M_f['event_state']
 4. snapshot(C_working.knowledge_surface) → M_f['knowledge_state']
+   （1-4 合并为一份快照，按会话命名空间异步原子写入 M_f）
 5. compress(C_history) - score(h) = K(h) · rel(h,goal) · e^(-λ·age(h))
 6. 重建 new_C = C_system ⊕ C_memory ⊕ C_skill ⊕ summary ⊕ working_state
 7. resume(new_C, original_goal) - goal 永远随 renew 传递
 """
 
-from copy import deepcopy
-
-from ..memory import PersistentMemory
+from ..memory import SnapshotStore, default_snapshot_store
 from ..types import Dashboard, EventSurface, KnowledgeSurface
 from ..types.handoff import HandoffArtifact
 from .compression import ContextCompressor
@@ -26,9 +25,14 @@ from .partitions import ContextPartitions
 class ContextRenewer:
     """Handle context renewal when overflow"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        snapshot_store: SnapshotStore | None = None,
+        namespace: str = "default",
+    ):
         self.compressor = ContextCompressor()
-        self.persistent = PersistentMemory()
+        self.persistent = snapshot_store or default_snapshot_store()
+        self.namespace = namespace
 
     def renew(
         self,
@@ -49,11 +53,9 @@ class ContextRenewer:
             "interrupt_requested": partitions.working.interrupt_requested,
             "scratchpad": partitions.working.scratchpad,
         }
-        self.persistent.save("working_state", working_state)
 
         # 2. Snapshot plan
         plan_state = {"plan": partitions.working.plan, "goal": goal}
-        self.persistent.save("plan_state", plan_state)
 
         # 3. Snapshot event_surface (必须跨 renew 保留)
         event_state = {
@@ -63,21 +65,33 @@ class ContextRenewer:
                 -5:
             ],  # 只保留最近5条
         }
-        self.persistent.save("event_state", event_state)
 
         # 4. Snapshot knowledge_surface
-        knowledge_state = {
+        knowledge_state: dict[str, list] = {
             "active_questions": partitions.working.knowledge_surface.active_questions,
             "evidence_packs": partitions.working.knowledge_surface.evidence_packs,
             "citations": partitions.working.knowledge_surface.citations,
         }
-        self.persistent.save("knowledge_state", knowledge_state)
+
+        # 1-4 合并成一次写入，由后台线程序列化落盘，renew 不等待磁盘；
+        # 列表先浅拷贝，后台序列化时不受 live 列表后续修改影响
+        self.persistent.save(
+            self.namespace,
+            {
+                "goal": goal,
+                "sprint": sprint,
+                "working_state": working_state,
+                "plan_state": {"plan": list(partitions.working.plan), "goal": goal},
+                "event_state": {key: list(value) for key, value in event_state.items()},
+                "knowledge_state": {key: list(value) for key, value in knowledge_state.items()},
+            },
+        )
 
         # 5. Compress history
         compressed_history = self.compressor.auto_compact(partitions.history, goal)
 
         # 6. Rebuild new context
-        new_partitions = ContextPartitions()
+        new_partitions = ContextPartitions(layout=partitions.layout)
         new_partitions.system = list(partitions.system)  # 永不压缩
         new_partitions.working = self._restore_dashboard(
             working_state,
@@ -114,7 +128,11 @@ class ContextRenewer:
         event_state: dict,
         knowledge_state: dict,
     ) -> Dashboard:
-        """Rebuild dashboard from snapshots so renew returns a clean working state."""
+        """Rebuild dashboard from snapshots so renew returns a clean working state.
+
+        Lists are copied shallowly: entries are shared with the snapshot since
+        the dashboard replaces them rather than editing them in place.
+        """
         return Dashboard(
             rho=working_state.get("rho", 0.0),
             token_budget=working_state.get("token_budget", 0),
@@ -124,16 +142,16 @@ class ContextRenewer:
             last_signal_ts=working_state.get("last_signal_ts", ""),
             last_hb_ts=working_state.get("last_hb_ts", ""),
             interrupt_requested=working_state.get("interrupt_requested", False),
-            plan=deepcopy(plan_state.get("plan", [])),
+            plan=list(plan_state.get("plan", [])),
             event_surface=EventSurface(
-                pending_events=deepcopy(event_state.get("pending_events", [])),
-                active_risks=deepcopy(event_state.get("active_risks", [])),
-                recent_event_decisions=deepcopy(event_state.get("recent_event_decisions", [])),
+                pending_events=list(event_state.get("pending_events", [])),
+                active_risks=list(event_state.get("active_risks", [])),
+                recent_event_decisions=list(event_state.get("recent_event_decisions", [])),
             ),
             knowledge_surface=KnowledgeSurface(
-                active_questions=deepcopy(knowledge_state.get("active_questions", [])),
-                evidence_packs=deepcopy(knowledge_state.get("evidence_packs", [])),
-                citations=deepcopy(knowledge_state.get("citations", [])),
+                active_questions=list(knowledge_state.get("active_questions", [])),
+                evidence_packs=list(knowledge_state.get("evidence_packs", [])),
+                citations=list(knowledge_state.get("citations", [])),
             ),
             scratchpad=working_state.get("scratchpad", ""),
         )
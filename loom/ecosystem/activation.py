@@ -77,6 +77,7 @@ class CapabilityRegistry:
             skill_desc = self._format_skill_description(capability)
             if skill_desc and skill_desc not in context.skill:
                 context.skill.append(skill_desc)
+                context.touch_skills()
 
         return True
 
@@ -104,6 +105,7 @@ class CapabilityRegistry:
             skill_desc = self._format_skill_description(capability)
             if skill_desc in context.skill:
                 context.skill.remove(skill_desc)
+                context.touch_skills()
 
         return True
 
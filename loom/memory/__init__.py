@@ -1,6 +1,10 @@
 """Memory system"""
 
-from .persistent import PersistentMemory
+from .ann import IVFIndex
+from .bm25 import BM25Index
+from .directory import DirectoryIndex
+from .embedding_cache import EmbeddingCache
+from .persistent import PersistentMemory, SnapshotStore, default_snapshot_store
 from .semantic import MemoryEntry, SemanticMemory
 from .session import SessionMemory
 from .store import InMemoryStore, MemoryStore
@@ -9,9 +13,15 @@ from .working import WorkingMemory
 __all__ = [
     "SessionMemory",
     "PersistentMemory",
+    "SnapshotStore",
+    "default_snapshot_store",
     "WorkingMemory",
     "SemanticMemory",
     "MemoryEntry",
+    "IVFIndex",
+    "BM25Index",
+    "DirectoryIndex",
+    "EmbeddingCache",
     "MemoryStore",
     "InMemoryStore",
 ]
@@ -0,0 +1,296 @@
+"""Approximate nearest-neighbour index (IVF, cosine similarity)"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+_ASSIGN_CHUNK = 16_384
+
+
+class IVFIndex:
+    """Inverted-file index over unit-normalized vectors keyed by integer ids.
+
+    Vectors are bucketed by their nearest k-means centroid; a query scores only
+    the ``nprobe`` closest buckets.  Below ``exact_threshold`` vectors, every
+    vector is scored (exact search).  The index trains itself on the first
+    crossing of the threshold and retrains once it has grown ``retrain_factor``
+    times, so inserts and deletes never need an explicit rebuild.
+
+    Tuning: raise ``nprobe`` for recall, lower it for latency; ``nlist`` defaults
+    to ``sqrt(n)`` buckets at training time.
+    """
+
+    def __init__(
+        self,
+        *,
+        nlist: int | None = None,
+        nprobe: int = 8,
+        exact_threshold: int = 10_000,
+        retrain_factor: float = 4.0,
+        train_iterations: int = 10,
+        seed: int = 0,
+    ) -> None:
+        if np is None:
+            raise ImportError(
+                "numpy is required to use IVFIndex. Install numpy to enable ANN search."
+            )
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.exact_threshold = exact_threshold
+        self.retrain_factor = retrain_factor
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self.dim: int | None = None
+        self.centroids: Any = None
+        self.metadata: dict[str, Any] = {}
+        self._trained_size = 0
+        self._rows: dict[int, int] = {}
+        self._free: list[int] = []
+        self._used = 0
+        self._vectors: Any = None
+        self._row_ids: Any = None
+        self._row_cluster: Any = None
+        self._row_slot: Any = None
+        self._members: list[Any] = [np.zeros(0, dtype=np.int64)]
+        self._sizes: list[int] = [0]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._rows
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def add(self, item_id: int, vector: Sequence[float]) -> None:
+        """Insert or replace one vector."""
+        self.add_many([item_id], [vector])
+
+    def add_many(self, ids: Iterable[int], vectors: Any) -> None:
+        ids = list(ids)
+        if not ids:
+            return
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+        if len(set(ids)) != len(ids):
+            # 同一批次内重复的 id 以最后一次为准
+            last = {item_id: i for i, item_id in enumerate(ids)}
+            keep = sorted(last.values())
+            ids, matrix = [ids[i] for i in keep], matrix[keep]
+        if self.dim is None:
+            self.dim = int(matrix.shape[1])
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-dimensional vectors, got {matrix.shape[1]}")
+        for item_id in ids:
+            if item_id in self._rows:
+                self._remove(item_id)
+        rows = self._allocate(len(ids))
+        self._vectors[rows] = matrix
+        self._row_ids[rows] = ids
+        for item_id, row in zip(ids, rows.tolist(), strict=True):
+            self._rows[item_id] = row
+        self._assign(rows, matrix)
+        self._maybe_train()
+
+    def remove(self, item_id: int) -> bool:
+        if item_id not in self._rows:
+            return False
+        self._remove(item_id)
+        return True
+
+    def search(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        *,
+        nprobe: int | None = None,
+    ) -> list[tuple[int, float]]:
+        """Return up to ``top_k`` ``(id, cosine)`` pairs, best first."""
+        if top_k <= 0 or not self._rows or self.dim is None or len(vector) != self.dim:
+            return []
+        query = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        if not query.any():
+            return []
+        if self.trained and len(self) >= self.exact_threshold:
+            probes = min(nprobe or self.nprobe, len(self._sizes))
+            centroid_scores = self.centroids @ query
+            clusters = np.argpartition(-centroid_scores, probes - 1)[:probes]
+        else:
+            clusters = np.arange(len(self._sizes))
+        rows = np.concatenate([self._members[c][: self._sizes[c]] for c in clusters])
+        if not len(rows):
+            return []
+        scores = self._vectors[rows] @ query
+        if top_k < len(rows):
+            keep = np.argpartition(-scores, top_k - 1)[:top_k]
+            rows, scores = rows[keep], scores[keep]
+        ids = self._row_ids[rows]
+        order = np.lexsort((ids, -scores))
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def train(self) -> None:
+        """(Re)build the coarse quantizer from the current vectors."""
+        live = self._live_rows()
+        if not len(live):
+            return
+        nlist = self.nlist or max(1, int(len(live) ** 0.5))
+        nlist = min(nlist, len(live))
+        rng = np.random.default_rng(self.seed)
+        sample = live if len(live) <= nlist * 64 else rng.choice(live, nlist * 64, replace=False)
+        data = self._vectors[sample]
+        centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            labels = _nearest(data, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            empty = ~sums.any(axis=1)
+            # 空簇重新取样，避免桶数塌缩
+            sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+            centroids = _normalize(sums)
+        self.centroids = centroids
+        self._trained_size = len(live)
+        self._members = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._sizes = [0] * nlist
+        self._assign(live, self._vectors[live])
+
+    def config(self) -> dict[str, Any]:
+        """Tuning knobs, as accepted by the constructor."""
+        return {
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "exact_threshold": self.exact_threshold,
+            "retrain_factor": self.retrain_factor,
+            "train_iterations": self.train_iterations,
+            "seed": self.seed,
+        }
+
+    def save(
+        self,
+        path: str | Path,
+        *,
+        id_offset: int = 0,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """Persist vectors, ids (shifted by ``id_offset``) and centroids to an ``.npz`` file."""
+        live = self._live_rows()
+        config = {
+            **self.config(),
+            "trained_size": self._trained_size,
+            "metadata": metadata or {},
+        }
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                config=np.frombuffer(json.dumps(config).encode("utf-8"), dtype=np.uint8),
+                ids=self._row_ids[live] + id_offset if len(live) else np.zeros(0, dtype=np.int64),
+                vectors=self._vectors[live] if len(live) else np.zeros((0, self.dim or 0)),
+                centroids=self.centroids if self.trained else np.zeros((0, self.dim or 0)),
+            )
+
+    @classmethod
+    def load(cls, path: str | Path, **overrides: Any) -> IVFIndex:
+        """Load an index written by :meth:`save`; keyword overrides adjust tuning knobs."""
+        with np.load(path) as data:
+            config = json.loads(data["config"].tobytes().decode("utf-8"))
+            trained_size = config.pop("trained_size", 0)
+            metadata = config.pop("metadata", {})
+            config.update(overrides)
+            index = cls(**config)
+            index.metadata = metadata
+            ids = data["ids"].tolist()
+            vectors = data["vectors"]
+            centroids = data["centroids"]
+            if len(centroids):
+                index.dim = int(centroids.shape[1])
+                index.centroids = centroids.astype(np.float32)
+                index._trained_size = trained_size
+                index._members = [np.zeros(0, dtype=np.int64) for _ in range(len(centroids))]
+                index._sizes = [0] * len(centroids)
+            if ids:
+                index.add_many(ids, vectors)
+        return index
+
+    # ── 内部实现 ──
+
+    def _maybe_train(self) -> None:
+        size = len(self)
+        if size < self.exact_threshold:
+            return
+        if not self.trained or size >= self._trained_size * self.retrain_factor:
+            self.train()
+
+    def _allocate(self, count: int) -> Any:
+        reused = [self._free.pop() for _ in range(min(count, len(self._free)))]
+        start = self._used
+        fresh = count - len(reused)
+        capacity = 0 if self._row_ids is None else len(self._row_ids)
+        needed = self._used = start + fresh
+        if needed > capacity:
+            new_capacity = max(needed, capacity * 2, 1024)
+            vectors = np.zeros((new_capacity, self.dim or 0), dtype=np.float32)
+            row_ids = np.zeros(new_capacity, dtype=np.int64)
+            row_cluster = np.zeros(new_capacity, dtype=np.int64)
+            row_slot = np.zeros(new_capacity, dtype=np.int64)
+            if capacity:
+                vectors[:capacity] = self._vectors
+                row_ids[:capacity] = self._row_ids
+                row_cluster[:capacity] = self._row_cluster
+                row_slot[:capacity] = self._row_slot
+            self._vectors, self._row_ids = vectors, row_ids
+            self._row_cluster, self._row_slot = row_cluster, row_slot
+        return np.array(reused + list(range(start, start + fresh)), dtype=np.int64)
+
+    def _assign(self, rows: Any, matrix: Any) -> None:
+        labels = _nearest(matrix, self.centroids) if self.trained else np.zeros(len(rows), int)
+        for cluster in np.unique(labels).tolist():
+            members = rows[labels == cluster]
+            size = self._sizes[cluster]
+            bucket = self._members[cluster]
+            if size + len(members) > len(bucket):
+                grown = np.zeros(max(size + len(members), len(bucket) * 2, 16), dtype=np.int64)
+                grown[:size] = bucket[:size]
+                self._members[cluster] = bucket = grown
+            bucket[size : size + len(members)] = members
+            self._row_cluster[members] = cluster
+            self._row_slot[members] = np.arange(size, size + len(members))
+            self._sizes[cluster] = size + len(members)
+
+    def _remove(self, item_id: int) -> None:
+        row = self._rows.pop(item_id)
+        cluster = int(self._row_cluster[row])
+        slot = int(self._row_slot[row])
+        last = self._sizes[cluster] - 1
+        bucket = self._members[cluster]
+        # 与桶末尾交换后删除，O(1)
+        moved = int(bucket[last])
+        bucket[slot] = moved
+        self._row_slot[moved] = slot
+        self._sizes[cluster] = last
+        self._free.append(row)
+
+    def _live_rows(self) -> Any:
+        if not self._rows:
+            return np.zeros(0, dtype=np.int64)
+        return np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+
+
+def _normalize(matrix: Any) -> Any:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _nearest(matrix: Any, centroids: Any) -> Any:
+    labels = np.empty(len(matrix), dtype=np.int64)
+    for start in range(0, len(matrix), _ASSIGN_CHUNK):
+        chunk = matrix[start : start + _ASSIGN_CHUNK]
+        labels[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return labels
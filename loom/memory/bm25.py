@@ -0,0 +1,189 @@
+"""BM25 inverted index with CJK-aware tokenization"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Callable, Hashable, Iterable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+_WORD = re.compile(r"[^\W_]+")
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalize (NFKC + casefold) and split text into index terms.
+
+    Runs of CJK characters have no word boundaries, so they are indexed as
+    overlapping character bigrams (a lone character stays a unigram).
+    """
+    words = _WORD.findall(unicodedata.normalize("NFKC", text).casefold())
+    if not any(_CJK.search(word) for word in words if not word.isascii()):
+        return words
+    tokens: list[str] = []
+    for word in words:
+        position = 0
+        for match in _CJK.finditer(word):
+            if match.start() > position:
+                tokens.append(word[position : match.start()])
+            run = match.group()
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+            position = match.end()
+        if position < len(word):
+            tokens.append(word[position:])
+    return tokens
+
+
+class BM25Index(Generic[K]):
+    """Incremental Okapi BM25 index over documents keyed by hashable ids.
+
+    Document frequencies and lengths are maintained on every ``add``/``remove``
+    so queries only touch the postings of their own terms.  Scores can be
+    normalized to ``[0, 1)`` by the query's upper bound (every term saturated),
+    which makes them comparable with other similarity scores.
+    """
+
+    def __init__(
+        self,
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+        tokenizer: Callable[[str], list[str]] = tokenize,
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self._postings: dict[str, dict[K, int]] = {}
+        self._lengths: dict[K, int] = {}
+        self._terms: dict[K, frozenset[str]] = {}
+        self._pairs: dict[K, frozenset[int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: K) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: K, text: str) -> None:
+        """Index ``text`` under ``doc_id``, replacing any previous version."""
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+        tokens = self.tokenizer(text)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._lengths[doc_id] = len(tokens)
+        self._terms[doc_id] = frozenset(counts)
+        # 相邻词对只存哈希：int 不受 GC 追踪，百万级词对也不会拖慢分代回收
+        self._pairs[doc_id] = frozenset(map(hash, zip(tokens, tokens[1:], strict=False)))
+        self._total_length += len(tokens)
+
+    def add_many(self, docs: Iterable[tuple[K, str]]) -> None:
+        for doc_id, text in docs:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: K) -> bool:
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return False
+        self._pairs.pop(doc_id)
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= length
+        return True
+
+    def search(
+        self,
+        query: str,
+        top_k: int | None = None,
+        *,
+        phrase_boost: float = 0.0,
+        normalize: bool = True,
+    ) -> list[tuple[K, float]]:
+        """Score every document sharing a term with ``query``; best first."""
+        terms = self.tokenizer(query)
+        scores = self._score_terms(set(terms), None)
+        self._finish(scores, terms, phrase_boost, normalize)
+        ranked = scores.items()
+        if top_k is not None:
+            return heapq.nlargest(top_k, ranked, key=lambda item: item[1])
+        return sorted(ranked, key=lambda item: item[1], reverse=True)
+
+    def score(
+        self,
+        query: str,
+        doc_ids: Iterable[K],
+        *,
+        phrase_boost: float = 0.0,
+        normalize: bool = True,
+    ) -> dict[K, float]:
+        """Score only ``doc_ids`` (documents without a shared term score 0)."""
+        terms = self.tokenizer(query)
+        wanted = set(doc_ids)
+        scores = self._score_terms(set(terms), wanted)
+        self._finish(scores, terms, phrase_boost, normalize)
+        return {doc_id: scores.get(doc_id, 0.0) for doc_id in wanted}
+
+    def idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1.0 + (len(self._lengths) - df + 0.5) / (df + 0.5))
+
+    def _score_terms(
+        self,
+        terms: set[str],
+        wanted: set[K] | None,
+    ) -> dict[K, float]:
+        scores: dict[K, float] = {}
+        if not self._lengths:
+            return scores
+        avg_length = self._total_length / len(self._lengths) or 1.0
+        k1, b = self.k1, self.b
+        lengths = self._lengths
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            items = (
+                postings.items()
+                if wanted is None or len(wanted) > len(postings)
+                else ((d, postings[d]) for d in wanted if d in postings)
+            )
+            for doc_id, tf in items:
+                if wanted is not None and doc_id not in wanted:
+                    continue
+                norm = k1 * (1.0 - b + b * lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+    def _finish(
+        self,
+        scores: dict[K, float],
+        terms: list[str],
+        phrase_boost: float,
+        normalize: bool,
+    ) -> None:
+        if phrase_boost and len(terms) > 1 and scores:
+            pairs = set(map(hash, zip(terms, terms[1:], strict=False)))
+            for doc_id in scores:
+                matched = len(pairs & self._pairs[doc_id])
+                if matched:
+                    scores[doc_id] *= 1.0 + phrase_boost * matched / len(pairs)
+        if normalize and scores:
+            bound = sum(self.idf(term) for term in set(terms)) * (self.k1 + 1.0)
+            if phrase_boost and len(terms) > 1:
+                bound *= 1.0 + phrase_boost
+            for doc_id in scores:
+                scores[doc_id] /= bound
@@ -0,0 +1,364 @@
+"""Incremental, persistent chunk index over a directory of text files"""
+
+from __future__ import annotations
+
+import glob
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from stat import S_ISREG
+from typing import Any
+
+from .bm25 import BM25Index
+from .embedding_cache import EmbeddingCache
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$")
+
+
+@dataclass(slots=True)
+class DirectoryChunk:
+    """One indexed slice of a file."""
+
+    path: str  # 相对 root 的 posix 路径
+    ordinal: int
+    content: str
+    heading: str = ""
+
+    @property
+    def id(self) -> str:
+        return f"{self.path}#{self.ordinal}"
+
+
+@dataclass(slots=True)
+class _FileState:
+    mtime_ns: int
+    size: int
+    chunks: list[DirectoryChunk] = field(default_factory=list)
+
+
+def chunk_text(text: str, max_chars: int = 1500) -> list[tuple[str, str]]:
+    """Split text into ``(heading, content)`` chunks of at most ``max_chars``.
+
+    Paragraphs are packed greedily; a Markdown heading always starts a new
+    chunk and is remembered as the chunk's heading.  Paragraphs longer than
+    ``max_chars`` are cut into fixed windows.
+    """
+    chunks: list[tuple[str, str]] = []
+    heading = ""
+    buffer: list[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal buffer, size
+        if buffer:
+            chunks.append((heading, "\n\n".join(buffer)))
+        buffer, size = [], 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        match = _HEADING.match(paragraph.splitlines()[0])
+        if match:
+            flush()
+            heading = match.group(1)
+        for start in range(0, len(paragraph), max_chars):
+            piece = paragraph[start : start + max_chars]
+            if size and size + len(piece) + 2 > max_chars:
+                flush()
+            buffer.append(piece)
+            size += len(piece) + 2
+    flush()
+    return chunks
+
+
+class DirectoryIndex:
+    """Chunked BM25 (plus optional embedding) index over ``root.glob(pattern)``.
+
+    ``refresh`` stats every matching file and only re-reads files whose mtime
+    or size changed, so a query against an unchanged tree costs one ``stat``
+    per file instead of one read.  With ``index_path`` the chunk table is saved
+    as JSON after each change and reloaded on start; embeddings persist through
+    ``embedding_cache``.  ``watch_interval`` refreshes from a daemon thread so
+    queries never wait on the scan.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        pattern: str = "**/*.md",
+        *,
+        encoding: str = "utf-8",
+        chunk_chars: int = 1500,
+        index_path: str | Path | None = None,
+        embedding_fn: Callable[[str], list[float]] | None = None,
+        embed_batch_fn: Callable[[list[str]], list[list[float]]] | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        semantic_weight: float = 0.5,
+        watch_interval: float | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.pattern = pattern
+        self.encoding = encoding
+        self.chunk_chars = chunk_chars
+        self.index_path = Path(index_path) if index_path is not None else None
+        self.embedding_fn = embedding_fn
+        self.embed_batch_fn = embed_batch_fn or getattr(embedding_fn, "embed_batch", None)
+        self.embedding_cache = embedding_cache
+        self.semantic_weight = semantic_weight
+        self._lock = threading.RLock()
+        self._files: dict[str, _FileState] = {}
+        self._chunks: dict[str, DirectoryChunk] = {}
+        self._lexical: BM25Index[str] = BM25Index()
+        self._vectors: dict[str, list[float]] = {}
+        self._matrix: tuple[list[str], Any] | None = None
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        if self.index_path is not None and self.index_path.exists():
+            self._load()
+        if watch_interval is not None:
+            self.refresh()
+            self._watcher = threading.Thread(
+                target=self._watch_loop, args=(watch_interval,), daemon=True
+            )
+            self._watcher.start()
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def refresh(self) -> dict[str, int]:
+        """Re-index new or modified files and drop deleted ones."""
+        with self._lock:
+            seen: dict[str, os.stat_result] = {}
+            # glob.glob(root_dir=...) 直接给出相对路径，比 pathlib 逐个构造 Path 快得多
+            for rel in glob.glob(self.pattern, root_dir=self.root, recursive=True):
+                try:
+                    stat = os.stat(os.path.join(self.root, rel))
+                except OSError:
+                    continue
+                if S_ISREG(stat.st_mode):
+                    seen[Path(rel).as_posix() if os.sep != "/" else rel] = stat
+            stats = {"added": 0, "updated": 0, "removed": 0}
+            for rel in [rel for rel in self._files if rel not in seen]:
+                self._drop_file(rel)
+                stats["removed"] += 1
+            fresh: list[DirectoryChunk] = []
+            for rel, stat in sorted(seen.items()):
+                state = self._files.get(rel)
+                if state is not None and (state.mtime_ns, state.size) == (
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                ):
+                    continue
+                try:
+                    text = (self.root / rel).read_text(encoding=self.encoding)
+                except (OSError, UnicodeDecodeError):
+                    text = None
+                stats["updated" if state is not None else "added"] += 1
+                if state is not None:
+                    self._drop_file(rel)
+                new_state = _FileState(stat.st_mtime_ns, stat.st_size)
+                if text is not None:
+                    new_state.chunks = [
+                        DirectoryChunk(rel, ordinal, content, heading)
+                        for ordinal, (heading, content) in enumerate(
+                            chunk_text(text, self.chunk_chars)
+                        )
+                    ]
+                self._files[rel] = new_state
+                for chunk in new_state.chunks:
+                    self._add_chunk(chunk)
+                fresh.extend(new_state.chunks)
+            if fresh:
+                self._embed_chunks(fresh)
+            if any(stats.values()) and self.index_path is not None:
+                self.save()
+            return stats
+
+    def search(self, query: str, top_k: int = 5) -> list[tuple[DirectoryChunk, float]]:
+        """Rank chunks against ``query``; ``refresh`` first unless watching."""
+        if not self.watching:
+            self.refresh()
+        with self._lock:
+            if not query.strip():
+                # 空查询没有打分依据，按路径顺序返回
+                ordered = sorted(self._chunks.values(), key=lambda c: (c.path, c.ordinal))
+                return [(chunk, 0.0) for chunk in ordered[:top_k]]
+            pool = max(top_k * 10, 50)
+            scores = dict(self._lexical.search(query, pool, phrase_boost=0.5))
+            query_vector = self._embed([query])[0] if self._vectors else None
+            if query_vector:
+                # 混合打分：BM25 候选 ∪ 向量 top-pool，两路分数按 semantic_weight 加权
+                cosine = self._cosine_scores(query_vector)
+                top = heapq.nlargest(pool, cosine.items(), key=lambda item: item[1])
+                candidates = scores.keys() | {cid for cid, _ in top}
+                missing = [cid for cid in candidates if cid not in scores]
+                scores.update(self._lexical.score(query, missing, phrase_boost=0.5))
+                lexical_weight = 1.0 - self.semantic_weight
+                scores = {
+                    cid: lexical_weight * scores[cid] + self.semantic_weight * cosine.get(cid, 0.0)
+                    for cid in candidates
+                }
+            ranked = sorted(
+                ((cid, score) for cid, score in scores.items() if score > 0),
+                key=lambda item: (-item[1], item[0]),
+            )
+            return [(self._chunks[cid], score) for cid, score in ranked[:top_k]]
+
+    def save(self) -> None:
+        if self.index_path is None:
+            return
+        with self._lock:
+            payload = {
+                "version": INDEX_VERSION,
+                "pattern": self.pattern,
+                "chunk_chars": self.chunk_chars,
+                "files": {
+                    rel: {
+                        "mtime_ns": state.mtime_ns,
+                        "size": state.size,
+                        "chunks": [[c.heading, c.content] for c in state.chunks],
+                    }
+                    for rel, state in self._files.items()
+                },
+            }
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_name(f"{self.index_path.name}.tmp")
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
+
+    def close(self) -> None:
+        """Stop the watcher thread (if any)."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    # ── 内部实现 ──
+
+    @property
+    def _embeds(self) -> bool:
+        return self.embedding_fn is not None or self.embed_batch_fn is not None
+
+    def _watch_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as exc:  # pragma: no cover - defensive path
+                logger.warning("Refreshing directory index %s failed: %s", self.root, exc)
+
+    def _load(self) -> None:
+        assert self.index_path is not None
+        try:
+            payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable directory index %s: %s", self.index_path, exc)
+            return
+        if (
+            payload.get("version") != INDEX_VERSION
+            or payload.get("pattern") != self.pattern
+            or payload.get("chunk_chars") != self.chunk_chars
+        ):
+            return  # 配置变化，全部重建
+        restored: list[DirectoryChunk] = []
+        for rel, entry in payload.get("files", {}).items():
+            state = _FileState(entry["mtime_ns"], entry["size"])
+            state.chunks = [
+                DirectoryChunk(rel, ordinal, content, heading)
+                for ordinal, (heading, content) in enumerate(entry["chunks"])
+            ]
+            self._files[rel] = state
+            for chunk in state.chunks:
+                self._add_chunk(chunk)
+            restored.extend(state.chunks)
+        if restored and self._embeds:
+            self._embed_chunks(restored)
+
+    def _add_chunk(self, chunk: DirectoryChunk) -> None:
+        self._chunks[chunk.id] = chunk
+        self._lexical.add(chunk.id, f"{chunk.path} {chunk.heading}\n{chunk.content}")
+
+    def _drop_file(self, rel: str) -> None:
+        state = self._files.pop(rel)
+        for chunk in state.chunks:
+            self._chunks.pop(chunk.id, None)
+            self._lexical.remove(chunk.id)
+            if self._vectors.pop(chunk.id, None) is not None:
+                self._matrix = None
+
+    def _embed_chunks(self, chunks: list[DirectoryChunk]) -> None:
+        if not self._embeds:
+            return
+        vectors = self._embed([chunk.content for chunk in chunks])
+        for chunk, vector in zip(chunks, vectors, strict=True):
+            if vector:
+                self._vectors[chunk.id] = list(vector)
+        self._matrix = None
+
+    def _embed(self, texts: list[str]) -> list[list[float] | None]:
+        results: list[list[float] | None] = [None] * len(texts)
+        if self.embedding_cache is not None:
+            results = list(self.embedding_cache.get_many(texts))
+        missing = [i for i, vector in enumerate(results) if vector is None]
+        if not missing:
+            return results
+        pending = [texts[i] for i in missing]
+        try:
+            if self.embed_batch_fn is not None:
+                computed = list(self.embed_batch_fn(pending))
+            else:
+                assert self.embedding_fn is not None
+                computed = [self.embedding_fn(text) for text in pending]
+        except Exception as exc:
+            logger.warning("Embedding directory chunks failed: %s", exc)
+            return results
+        fresh = [(pending[j], v) for j, v in enumerate(computed) if v]
+        for i, vector in zip(missing, computed, strict=True):
+            results[i] = vector or None
+        if fresh and self.embedding_cache is not None:
+            self.embedding_cache.put_many([t for t, _ in fresh], [v for _, v in fresh])
+        return results
+
+    def _cosine_scores(self, query_vector: list[float]) -> dict[str, float]:
+        """Cosine of every embedded chunk against the query, mapped to ``[0, 1]``."""
+        if np is not None:
+            if self._matrix is None:
+                keys = list(self._vectors)
+                stacked = np.asarray([self._vectors[k] for k in keys], dtype=np.float32)
+                norms = np.linalg.norm(stacked, axis=1, keepdims=True)
+                self._matrix = (keys, stacked / np.where(norms == 0, 1, norms))
+            keys, matrix = self._matrix
+            q = np.asarray(query_vector, dtype=np.float32)
+            if len(q) != matrix.shape[1]:
+                return {}
+            q /= np.linalg.norm(q) or 1.0
+            return dict(zip(keys, ((matrix @ q + 1) / 2).tolist(), strict=True))
+        q_norm = sum(v * v for v in query_vector) ** 0.5 or 1.0
+        scores: dict[str, float] = {}
+        for cid, vector in self._vectors.items():
+            if len(vector) != len(query_vector):
+                continue
+            norm = sum(v * v for v in vector) ** 0.5 or 1.0
+            dot = sum(a * b for a, b in zip(query_vector, vector, strict=True))
+            scores[cid] = (dot / (norm * q_norm) + 1) / 2
+        return scores
@@ -0,0 +1,185 @@
+"""Persistent embedding cache keyed by content hash and model id"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import cast
+
+_MAGIC = b"LOOMEMB1"
+_HEADER = struct.Struct("<8sII")  # magic, dim, capacity
+_SLOT = struct.Struct("<16sQ")  # content digest, last-used tick
+_EMPTY = bytes(16)
+
+
+class EmbeddingCache:
+    """Disk-backed LRU cache of embedding vectors.
+
+    Vectors are stored as float32 in a memory-mapped file, one fixed-size slot
+    per text, so a restart only maps the file instead of re-embedding the
+    corpus.  Keys are ``blake2b(model_id, text)``; each model id gets its own
+    pair of files under ``directory``.  Once ``max_entries`` slots are in use
+    the least recently used slot is overwritten.
+    """
+
+    def __init__(self, directory: str | Path, model_id: str, max_entries: int = 100_000) -> None:
+        self.directory = Path(directory)
+        self.model_id = model_id
+        self.max_entries = max_entries
+        slug = hashlib.blake2b(model_id.encode("utf-8"), digest_size=8).hexdigest()
+        self._keys_path = self.directory / f"{slug}.keys"
+        self._vectors_path = self.directory / f"{slug}.vectors"
+        self._lock = threading.RLock()
+        self._slots: OrderedDict[bytes, int] = OrderedDict()  # LRU 顺序：最旧在前
+        self._free: list[int] = []
+        self._tick = 0
+        self.dim: int | None = None
+        self._capacity = 0
+        self._keys: mmap.mmap | None = None
+        self._vectors: mmap.mmap | None = None
+        self._view: memoryview[float] | None = None
+        if self._keys_path.exists() and self._vectors_path.exists():
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, text: str) -> bool:
+        return self._digest(text) in self._slots
+
+    def get(self, text: str) -> list[float] | None:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> list[list[float] | None]:
+        with self._lock:
+            results: list[list[float] | None] = []
+            for text in texts:
+                slot = self._slots.get(self._digest(text))
+                if slot is None or self._view is None or self.dim is None:
+                    results.append(None)
+                    continue
+                self._touch(self._digest(text), slot)
+                vector = self._view[slot * self.dim : (slot + 1) * self.dim]
+                # typeshed 把 memoryview.tolist() 标为 list[int]，"f" 视图实际返回 float
+                results.append(cast("list[float]", vector.tolist()))
+            return results
+
+    def put(self, text: str, vector: Sequence[float]) -> None:
+        self.put_many([text], [vector])
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        with self._lock:
+            for text, vector in zip(texts, vectors, strict=True):
+                if self.dim is None:
+                    self._create(len(vector))
+                if len(vector) != self.dim:
+                    raise ValueError(
+                        f"embedding cache for {self.model_id!r} holds {self.dim}-dimensional "
+                        f"vectors, got {len(vector)}"
+                    )
+                digest = self._digest(text)
+                slot = self._slots.get(digest)
+                if slot is None:
+                    slot = self._claim_slot()
+                assert self._keys is not None and self._vectors is not None
+                struct.pack_into(f"<{self.dim}f", self._vectors, slot * self.dim * 4, *vector)
+                self._touch(digest, slot)
+
+    def flush(self) -> None:
+        with self._lock:
+            for mapped in (self._keys, self._vectors):
+                if mapped is not None:
+                    mapped.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._unmap()
+
+    # ── 内部实现 ──
+
+    def _digest(self, text: str) -> bytes:
+        key = f"{self.model_id}\0{text}".encode()
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    def _touch(self, digest: bytes, slot: int) -> None:
+        self._tick += 1
+        assert self._keys is not None
+        _SLOT.pack_into(self._keys, _HEADER.size + slot * _SLOT.size, digest, self._tick)
+        self._slots[digest] = slot
+        self._slots.move_to_end(digest)
+
+    def _claim_slot(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if len(self._slots) >= self.max_entries:
+            # 覆盖最久未使用的槽位
+            _, slot = self._slots.popitem(last=False)
+            return slot
+        self._resize(min(self.max_entries, max(self._capacity * 2, 1024)))
+        return self._free.pop()
+
+    def _create(self, dim: int) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        with open(self._keys_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, dim, 0))
+        with open(self._vectors_path, "wb"):
+            pass
+        self._map()
+
+    def _open(self) -> None:
+        with open(self._keys_path, "rb") as f:
+            magic, dim, capacity = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{self._keys_path} is not an embedding cache file")
+        self.dim, self._capacity = dim, capacity
+        self._map()
+        assert self._keys is not None
+        used: list[tuple[int, bytes, int]] = []
+        for slot in range(capacity):
+            digest, tick = _SLOT.unpack_from(self._keys, _HEADER.size + slot * _SLOT.size)
+            if digest == _EMPTY:
+                self._free.append(slot)
+            else:
+                used.append((tick, digest, slot))
+        for tick, digest, slot in sorted(used):
+            self._slots[digest] = slot
+            self._tick = max(self._tick, tick)
+        self._free.reverse()
+
+    def _resize(self, capacity: int) -> None:
+        assert self.dim is not None
+        self._unmap()
+        with open(self._keys_path, "r+b") as f:
+            f.truncate(_HEADER.size + capacity * _SLOT.size)
+            f.seek(0)
+            f.write(_HEADER.pack(_MAGIC, self.dim, capacity))
+        with open(self._vectors_path, "r+b") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._free.extend(range(capacity - 1, self._capacity - 1, -1))
+        self._capacity = capacity
+        self._map()
+
+    def _map(self) -> None:
+        if not self._capacity:
+            return
+        with open(self._keys_path, "r+b") as f:
+            self._keys = mmap.mmap(f.fileno(), 0)
+        with open(self._vectors_path, "r+b") as f:
+            self._vectors = mmap.mmap(f.fileno(), 0)
+        self._view = memoryview(self._vectors).cast("f")
+
+    def _unmap(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        for mapped in (self._keys, self._vectors):
+            if mapped is not None:
+                mapped.close()
+        self._keys = self._vectors = None
@@ -1,7 +1,16 @@
 """Persistent memory (M_f)"""
 
+import atexit
+import hashlib
 import json
+import logging
+import os
+import re
+import threading
 from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
 
 
 class PersistentMemory:
@@ -34,3 +43,129 @@ class PersistentMemory:
         file_path = self.storage_path / f"{key}.json"
         if file_path.exists():
             file_path.unlink()
+
+
+class SnapshotStore:
+    """Namespaced M_f snapshots written off the caller's thread.
+
+    Each namespace (one per session) keeps a single JSON document,
+    ``<root>/<namespace>/snapshot.json``, replaced atomically on every write.
+    ``save`` only queues the snapshot; a background writer serializes and
+    writes it.  A namespace saved again before the writer reaches it
+    overwrites the queued snapshot, so bursts of renewals coalesce into one
+    write.  ``load`` sees queued snapshots before they reach disk.
+    """
+
+    def __init__(self, root: str | os.PathLike[str] = ".loom/memory") -> None:
+        self.root = Path(root)
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._in_flight: dict[str, dict[str, Any]] = {}
+        self._cond = threading.Condition()
+        self._writer: threading.Thread | None = None
+        self._closed = False
+        self.writes = 0
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending) + len(self._in_flight)
+
+    def path_for(self, namespace: str) -> Path:
+        return self.root / _safe_namespace(namespace) / "snapshot.json"
+
+    def save(self, namespace: str, snapshot: dict[str, Any]) -> None:
+        """Queue ``snapshot`` as the latest state of ``namespace``."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("snapshot store is closed")
+            self._pending[namespace] = snapshot
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._run, name="loom-snapshot-writer", daemon=True
+                )
+                self._writer.start()
+                atexit.register(self.flush, 5.0)
+            self._cond.notify_all()
+
+    def load(self, namespace: str) -> dict[str, Any] | None:
+        with self._cond:
+            queued = self._pending.get(namespace) or self._in_flight.get(namespace)
+        if queued is not None:
+            return queued
+        path = self.path_for(namespace)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+
+    def delete(self, namespace: str) -> None:
+        with self._cond:
+            self._pending.pop(namespace, None)
+            # 等待进行中的写入，避免删除后又被写回
+            self._cond.wait_for(lambda: namespace not in self._in_flight)
+        self.path_for(namespace).unlink(missing_ok=True)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every queued snapshot is on disk; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._in_flight, timeout=timeout
+            )
+
+    def close(self) -> None:
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                self._in_flight, self._pending = self._pending, {}
+                batch = self._in_flight
+            for namespace, snapshot in batch.items():
+                try:
+                    self._write(namespace, snapshot)
+                except Exception:  # pragma: no cover - defensive path
+                    logger.exception("failed to write snapshot for %s", namespace)
+            with self._cond:
+                self._in_flight = {}
+                self._cond.notify_all()
+
+    def _write(self, namespace: str, snapshot: dict[str, Any]) -> None:
+        path = self.path_for(namespace)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":"), default=str)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self.writes += 1
+
+
+_default_stores: dict[Path, SnapshotStore] = {}
+_default_stores_lock = threading.Lock()
+
+
+def default_snapshot_store(root: str | os.PathLike[str] = ".loom/memory") -> SnapshotStore:
+    """Process-wide store for ``root`` so every session shares one writer thread."""
+    key = Path(root).resolve()
+    with _default_stores_lock:
+        store = _default_stores.get(key)
+        if store is None:
+            store = _default_stores[key] = SnapshotStore(key)
+        return store
+
+
+def _safe_namespace(namespace: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", namespace).strip(".") or "_"
+    if safe != namespace:
+        # 被替换过的名字追加哈希，避免 "a:b" 与 "a/b" 撞到同一目录
+        safe = f"{safe[:80]}-{hashlib.blake2b(namespace.encode(), digest_size=4).hexdigest()}"
+    return safe
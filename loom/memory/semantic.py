@@ -1,10 +1,31 @@
 """Semantic memory with embeddings"""
 
+import heapq
 import json
+import logging
 import math
 import os
+import shutil
+import struct
+import time
+from array import array
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
+
+from .ann import IVFIndex
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# 追加日志格式：魔数 + 若干条 [content_len, metadata_len, dim] 头 + 内容 + 元数据 JSON + float64 向量
+LOG_MAGIC = b"LOOMSEM\x01"
+_RECORD = struct.Struct("<IIi")
 
 
 @dataclass
@@ -12,99 +33,481 @@ class MemoryEntry:
     """Memory entry with embedding"""
 
     content: str
-    embedding: list[float] | None = None
+    embedding: Sequence[float] | None = None
     metadata: dict | None = None
 
 
 class SemanticMemory:
-    """Semantic memory with vector search, max-size eviction, and optional persistence."""
+    """Semantic memory with vector search, max-size eviction, and optional persistence.
 
-    def __init__(self, max_size: int = 10_000, persist_path: str | None = None):
+    Embeddings live in a contiguous NumPy matrix (when NumPy is installed) and
+    are scored with one matrix-vector product; lexical search goes through an
+    inverted token index.  ``persist_path`` is an append-only binary log that is
+    compacted once evicted records make up half of it; legacy JSON files are
+    migrated on load.
+
+    With ``ann_index`` the vector path queries an :class:`IVFIndex` instead of
+    scoring every row once the index is past its exact-search threshold; the
+    index is saved next to the log (``<persist_path>.ann.npz``) on compaction.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        persist_path: str | None = None,
+        ann_index: IVFIndex | None = None,
+    ):
         self.max_size = max_size
         self.persist_path = persist_path
-        self.entries: list[MemoryEntry] = []
+        self.ann_index = ann_index
+        self._reset()
         if persist_path and os.path.exists(persist_path):
             self._load(persist_path)
 
+    def _reset(self) -> None:
+        # 条目按递增序号 seq 编号；位置 = seq - _offset，前缀中已淘汰的槽位为 None
+        self._slots: list[MemoryEntry | None] = []
+        self._tokens: list[frozenset[str] | None] = []
+        self._offset = 0
+        self._first = 0
+        self._next = 0
+        self._postings: dict[str, set[int]] = {}
+        self._lexical_only = 0
+        self._dim: int | None = None
+        self._odd: dict[int, Sequence[float]] = {}  # 维度与矩阵不一致的向量
+        self._vectors: Any = None
+        self._vector_mask: Any = None
+        self._embedded: Any = None
+        self._log_records = 0
+        self._ann_covered = 0  # 已由持久化索引覆盖的日志记录数
+
+    @property
+    def entries(self) -> list[MemoryEntry]:
+        """Live entries, oldest first."""
+        return [entry for entry in self._slots[self._first - self._offset :] if entry is not None]
+
+    def __len__(self) -> int:
+        return self._next - self._first
+
     def add(self, entry: MemoryEntry):
         """Add memory entry, evicting oldest if over max_size."""
-        self.entries.append(entry)
-        if len(self.entries) > self.max_size:
-            self.entries = self.entries[-self.max_size :]
+        self._insert(entry)
         if self.persist_path:
-            self._save(self.persist_path)
+            self._append_log(self.persist_path, [entry])
 
     def search(
         self,
         query: str,
         top_k: int = 5,
-        query_embedding: list[float] | None = None,
+        query_embedding: Sequence[float] | None = None,
     ) -> list[MemoryEntry]:
         """Search similar memories using embeddings or lexical fallback."""
-        if top_k <= 0 or not self.entries:
+        if top_k <= 0 or not len(self):
             return []
+        if query_embedding is None:
+            return self._lexical_search(query, top_k)
+        if self._ann_active(query_embedding):
+            return self._ann_search(query, query_embedding, top_k)
+        if np is None:
+            scores = self._python_scores(query, query_embedding)
+            ranked = heapq.nsmallest(top_k, range(len(scores)), key=lambda i: (-scores[i], i))
+            return [self._entry_at(self._first + i) for i in ranked]
+        scores = self._vector_scores(query, query_embedding)
+        return [self._entry_at(self._first + int(i)) for i in _top_positions(scores, top_k)]
 
-        scored = [
-            (
-                self._score_entry(query, entry, query_embedding=query_embedding),
-                index,
-                entry,
+    def compact(self) -> None:
+        """Rewrite the persisted log so it holds only live entries."""
+        if not self.persist_path:
+            return
+        path = Path(self.persist_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(LOG_MAGIC)
+            for entry in self.entries:
+                f.write(_encode_record(entry))
+        os.replace(tmp, path)
+        self._log_records = len(self)
+        if self.ann_index is not None:
+            ann_tmp = path.with_name(path.name + ".ann.tmp")
+            # 索引 id 改写为日志中的记录序号，重新加载时与重放的 seq 对齐
+            self.ann_index.save(
+                ann_tmp,
+                id_offset=-self._first,
+                metadata={"records": len(self), "log_bytes": path.stat().st_size},
             )
-            for index, entry in enumerate(self.entries)
-        ]
-        scored.sort(key=lambda item: (-item[0], item[1]))
-        return [entry for _, _, entry in scored[:top_k]]
+            os.replace(ann_tmp, self._ann_path())
+
+    # ── 索引维护 ──
+
+    def _insert(self, entry: MemoryEntry) -> None:
+        seq = self._next
+        self._next += 1
+        tokens = frozenset(self._tokenize(entry.content))
+        self._slots.append(entry)
+        self._tokens.append(tokens)
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(seq)
+        if entry.embedding is None:
+            self._lexical_only += 1
+            if self._embedded is not None:
+                self._reserve(seq - self._offset + 1)
+        else:
+            self._index_embedding(seq, entry.embedding)
+        while len(self) > self.max_size:
+            self._evict_oldest()
+
+    def _index_embedding(self, seq: int, embedding: Sequence[float]) -> None:
+        if np is None:
+            return
+        if self._dim is None and len(embedding):
+            self._dim = len(embedding)
+        position = seq - self._offset
+        self._reserve(position + 1)
+        self._embedded[position] = True
+        if len(embedding) != self._dim:
+            self._odd[seq] = embedding
+            return
+        row = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(row))
+        self._vectors[position] = row / norm if norm else 0.0
+        self._vector_mask[position] = True
+        if self.ann_index is not None and seq >= self._ann_covered:
+            self.ann_index.add(seq, self._vectors[position])
+
+    def _reserve(self, rows: int) -> None:
+        capacity = 0 if self._embedded is None else len(self._embedded)
+        if rows <= capacity and self._vectors.shape[1] == (self._dim or 0):
+            return
+        new_capacity = max(rows, capacity * 2, 64)
+        embedded = np.zeros(new_capacity, dtype=bool)
+        mask = np.zeros(new_capacity, dtype=bool)
+        vectors = np.zeros((new_capacity, self._dim or 0), dtype=np.float32)
+        if capacity:
+            embedded[:capacity] = self._embedded
+            mask[:capacity] = self._vector_mask
+            if self._vectors is not None and self._vectors.shape[1] == vectors.shape[1]:
+                vectors[:capacity] = self._vectors
+        self._embedded, self._vector_mask, self._vectors = embedded, mask, vectors
 
-    def _score_entry(
+    def _evict_oldest(self) -> None:
+        seq = self._first
+        position = seq - self._offset
+        entry = self._slots[position]
+        for token in self._tokens[position] or ():
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.discard(seq)
+                if not postings:
+                    del self._postings[token]
+        if entry is not None and entry.embedding is None:
+            self._lexical_only -= 1
+        self._odd.pop(seq, None)
+        if self.ann_index is not None:
+            self.ann_index.remove(seq)
+        self._slots[position] = None
+        self._tokens[position] = None
+        if self._embedded is not None and position < len(self._embedded):
+            self._embedded[position] = False
+            self._vector_mask[position] = False
+        self._first += 1
+        dead = self._first - self._offset
+        # 已淘汰前缀超过存活条目数时整体左移，均摊 O(1)
+        if dead > max(len(self), 64):
+            self._slots = self._slots[dead:]
+            self._tokens = self._tokens[dead:]
+            if self._embedded is not None:
+                live = len(self)
+                self._embedded[:live] = self._embedded[dead : dead + live].copy()
+                self._embedded[live:] = False
+                self._vector_mask[:live] = self._vector_mask[dead : dead + live].copy()
+                self._vector_mask[live:] = False
+                self._vectors[:live] = self._vectors[dead : dead + live].copy()
+            self._offset = self._first
+
+    def _entry_at(self, seq: int) -> MemoryEntry:
+        entry = self._slots[seq - self._offset]
+        assert entry is not None
+        return entry
+
+    # ── 打分 ──
+
+    def _overlaps(self, query_tokens: set[str]) -> dict[int, int]:
+        counts: dict[int, int] = {}
+        for token in query_tokens:
+            for seq in self._postings.get(token, ()):
+                counts[seq] = counts.get(seq, 0) + 1
+        return counts
+
+    def _jaccard(self, query_size: int, seq: int, overlap: int) -> float:
+        tokens = self._tokens[seq - self._offset]
+        union = query_size + len(tokens or ()) - overlap
+        return overlap / union if union else 0.0
+
+    def _lexical_search(self, query: str, top_k: int) -> list[MemoryEntry]:
+        query_tokens = self._tokenize(query)
+        counts = self._overlaps(query_tokens)
+        scored = heapq.nsmallest(
+            top_k,
+            ((-self._jaccard(len(query_tokens), seq, n), seq) for seq, n in counts.items()),
+        )
+        ranked = [seq for _, seq in scored]
+        # 与逐条打分一致：不足 top_k 时按插入顺序补齐零分条目
+        seq = self._first
+        while len(ranked) < top_k and seq < self._next:
+            if seq not in counts:
+                ranked.append(seq)
+            seq += 1
+        return [self._entry_at(seq) for seq in ranked]
+
+    def _vector_scores(self, query: str, query_embedding: Sequence[float]) -> Any:
+        start, stop = self._first - self._offset, self._next - self._offset
+        scores = np.zeros(stop - start, dtype=np.float64)
+        if self._vectors is not None and len(query_embedding) == self._dim:
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(query_vector))
+            if norm:
+                mask = self._vector_mask[start:stop]
+                sims = self._vectors[start:stop] @ (query_vector / norm)
+                scores[mask] = sims[mask]
+        for seq, embedding in self._odd.items():
+            scores[seq - self._first] = self._cosine_similarity(query_embedding, embedding)
+        if self._lexical_only:
+            query_tokens = self._tokenize(query)
+            embedded = self._embedded
+            for seq, overlap in self._overlaps(query_tokens).items():
+                position = seq - self._offset
+                if embedded is None or position >= len(embedded) or not embedded[position]:
+                    scores[seq - self._first] = self._jaccard(len(query_tokens), seq, overlap)
+        return scores
+
+    def _ann_active(self, query_embedding: Sequence[float]) -> bool:
+        ann = self.ann_index
+        return (
+            ann is not None
+            and ann.trained
+            and len(ann) >= ann.exact_threshold
+            and len(query_embedding) == self._dim
+        )
+
+    def _ann_search(
         self,
         query: str,
-        entry: MemoryEntry,
-        query_embedding: list[float] | None = None,
-    ) -> float:
-        if query_embedding is not None and entry.embedding is not None:
-            return self._cosine_similarity(query_embedding, entry.embedding)
-        return self._lexical_similarity(query, entry.content)
-
-    def _cosine_similarity(self, left: list[float], right: list[float]) -> float:
-        if not left or not right or len(left) != len(right):
+        query_embedding: Sequence[float],
+        top_k: int,
+    ) -> list[MemoryEntry]:
+        assert self.ann_index is not None
+        # 近似召回向量候选，再与无向量条目的词法分、异维向量的余弦分合并排序
+        scores = dict(self.ann_index.search(query_embedding, top_k))
+        for seq, embedding in self._odd.items():
+            scores[seq] = self._cosine_similarity(query_embedding, embedding)
+        if self._lexical_only:
+            query_tokens = self._tokenize(query)
+            for seq, overlap in self._overlaps(query_tokens).items():
+                if self._entry_at(seq).embedding is None:
+                    scores[seq] = self._jaccard(len(query_tokens), seq, overlap)
+        ranked = [seq for seq, _ in sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))]
+        ranked = ranked[:top_k]
+        seq = self._first
+        while len(ranked) < top_k and seq < self._next:
+            if seq not in scores:
+                ranked.append(seq)
+            seq += 1
+        return [self._entry_at(seq) for seq in ranked]
+
+    def _python_scores(self, query: str, query_embedding: Sequence[float]) -> list[float]:
+        query_tokens = self._tokenize(query)
+        counts = self._overlaps(query_tokens) if self._lexical_only else {}
+        scores: list[float] = []
+        for seq in range(self._first, self._next):
+            entry = self._entry_at(seq)
+            if entry.embedding is not None:
+                scores.append(self._cosine_similarity(query_embedding, entry.embedding))
+            else:
+                overlap = counts.get(seq, 0)
+                scores.append(self._jaccard(len(query_tokens), seq, overlap) if overlap else 0.0)
+        return scores
+
+    def _cosine_similarity(self, left: Sequence[float], right: Sequence[float]) -> float:
+        if not len(left) or not len(right) or len(left) != len(right):
             return 0.0
         numerator = sum(a * b for a, b in zip(left, right, strict=False))
         left_norm = math.sqrt(sum(a * a for a in left))
         right_norm = math.sqrt(sum(b * b for b in right))
         if left_norm == 0 or right_norm == 0:
             return 0.0
-        return numerator / (left_norm * right_norm)
-
-    def _lexical_similarity(self, query: str, content: str) -> float:
-        query_tokens = self._tokenize(query)
-        content_tokens = self._tokenize(content)
-        if not query_tokens or not content_tokens:
-            return 0.0
-        overlap = len(query_tokens & content_tokens)
-        union = len(query_tokens | content_tokens)
-        return overlap / union if union else 0.0
+        return float(numerator / (left_norm * right_norm))
 
     def _tokenize(self, text: str) -> set[str]:
         return {token.strip(".,:;!?()[]{}\"'").lower() for token in text.split() if token.strip()}
 
+    # ── 持久化 ──
+
+    def _append_log(self, path: str, entries: Iterable[MemoryEntry]) -> None:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        records = [_encode_record(entry) for entry in entries]
+        with open(target, "ab") as f:
+            if f.tell() == 0:
+                f.write(LOG_MAGIC)
+            f.write(b"".join(records))
+        self._log_records += len(records)
+        if self._log_records > 2 * self.max_size:
+            self.compact()
+
+    def _ann_path(self) -> str:
+        return f"{self.persist_path}.ann.npz"
+
+    def _restore_ann(self, data: bytes) -> None:
+        if self.ann_index is None or not os.path.exists(self._ann_path()):
+            return
+        try:
+            loaded = IVFIndex.load(self._ann_path(), **self.ann_index.config())
+        except Exception:
+            return
+        meta = loaded.metadata
+        log_bytes = int(meta.get("log_bytes", -1))
+        # 只有索引与日志压缩点一致时才复用，否则按重放重新建索引
+        if 0 < log_bytes <= len(data) and _count_records(data, log_bytes) == meta.get("records"):
+            self.ann_index = loaded
+            self._ann_covered = int(meta["records"])
+
     def _save(self, path: str) -> None:
-        Path(path).parent.mkdir(parents=True, exist_ok=True)
-        data = [
-            {"content": e.content, "embedding": e.embedding, "metadata": e.metadata}
-            for e in self.entries
-        ]
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f)
+        persist_path, self.persist_path = self.persist_path, path
+        try:
+            self.compact()
+        finally:
+            self.persist_path = persist_path
 
     def _load(self, path: str) -> None:
         try:
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
-            self.entries = [
-                MemoryEntry(
-                    content=d["content"], embedding=d.get("embedding"), metadata=d.get("metadata")
+            with open(path, "rb") as f:
+                data = f.read()
+            if not data.startswith(LOG_MAGIC):
+                # 旧版 JSON 快照：载入后迁移为追加日志
+                for d in json.loads(data.decode("utf-8")):
+                    self._insert(
+                        MemoryEntry(
+                            content=d["content"],
+                            embedding=d.get("embedding"),
+                            metadata=d.get("metadata"),
+                        )
+                    )
+                self._save(path)
+                return
+            records, good = _decode_records(data)
+            if good < len(data) and not _is_torn_tail(data, good):
+                # 中间记录损坏：保留原文件副本，只恢复损坏点之前的记录
+                aside = _move_aside(path, copy=True)
+                logger.warning(
+                    "Semantic memory log %s is corrupt at byte %d; recovered %d records, "
+                    "original kept at %s",
+                    path,
+                    good,
+                    len(records),
+                    aside,
                 )
-                for d in data
-            ]
-        except Exception:
-            self.entries = []
+            self._restore_ann(data[:good])
+            for entry in records:
+                self._insert(entry)
+            self._log_records = len(records)
+            if good < len(data):
+                # 截断写入中断留下的残缺尾记录或损坏部分
+                with open(path, "r+b") as f:
+                    f.truncate(good)
+        except Exception as exc:
+            self._reset()
+            if self.ann_index is not None:
+                self.ann_index = IVFIndex(**self.ann_index.config())
+            # 移走无法读取的文件，之后的追加写入从新日志开始，而不是继续写坏文件
+            aside = _move_aside(path, copy=False)
+            logger.warning(
+                "Semantic memory log %s could not be loaded (%s); moved to %s and starting empty",
+                path,
+                exc,
+                aside,
+            )
+
+
+def _move_aside(path: str, *, copy: bool) -> str | None:
+    """Keep a damaged log as ``<path>.corrupt-<timestamp>`` for inspection."""
+    aside = f"{path}.corrupt-{time.strftime('%Y%m%d%H%M%S')}"
+    try:
+        if copy:
+            shutil.copyfile(path, aside)
+        else:
+            os.replace(path, aside)
+    except OSError as exc:
+        logger.warning("Could not move damaged semantic memory log %s aside: %s", path, exc)
+        return None
+    return aside
+
+
+def _is_torn_tail(data: bytes, offset: int) -> bool:
+    """True when ``data[offset:]`` is an incomplete final record (interrupted write)."""
+    if offset + _RECORD.size > len(data):
+        return True
+    content_len, metadata_len, dim = _RECORD.unpack_from(data, offset)
+    end = offset + _RECORD.size + content_len + metadata_len + max(dim, 0) * 8
+    return bool(end > len(data))
+
+
+def _count_records(data: bytes, limit: int) -> int | None:
+    """Number of whole records in ``data[:limit]``, or None if ``limit`` splits one."""
+    count, offset = 0, len(LOG_MAGIC)
+    while offset < limit:
+        if offset + _RECORD.size > limit:
+            return None
+        content_len, metadata_len, dim = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size + content_len + metadata_len + max(dim, 0) * 8
+        count += 1
+    return count if offset == limit else None
+
+
+def _encode_record(entry: MemoryEntry) -> bytes:
+    content = entry.content.encode("utf-8")
+    metadata = b"" if entry.metadata is None else json.dumps(entry.metadata).encode("utf-8")
+    embedding = entry.embedding
+    dim = -1 if embedding is None else len(embedding)
+    vector = b"" if embedding is None else array("d", (float(x) for x in embedding)).tobytes()
+    return _RECORD.pack(len(content), len(metadata), dim) + content + metadata + vector
+
+
+def _decode_records(data: bytes) -> tuple[list[MemoryEntry], int]:
+    entries: list[MemoryEntry] = []
+    offset = good = len(LOG_MAGIC)
+    size = len(data)
+    while offset + _RECORD.size <= size:
+        content_len, metadata_len, dim = _RECORD.unpack_from(data, offset)
+        start = offset + _RECORD.size
+        end = start + content_len + metadata_len + max(dim, 0) * 8
+        if end > size:
+            break
+        try:
+            content = data[start : start + content_len].decode("utf-8")
+            meta_bytes = data[start + content_len : start + content_len + metadata_len]
+            metadata = json.loads(meta_bytes) if meta_bytes else None
+        except ValueError:
+            break  # 损坏记录：只保留它之前的部分
+        embedding = None
+        if dim >= 0:
+            vector = array("d")
+            vector.frombytes(data[start + content_len + metadata_len : end])
+            embedding = vector.tolist()
+        entries.append(MemoryEntry(content=content, embedding=embedding, metadata=metadata))
+        offset = good = end
+    return entries, good
+
+
+def _top_positions(scores: Any, top_k: int) -> list[int]:
+    """Indices of the ``top_k`` highest scores, ties broken by lower index."""
+    size = len(scores)
+    if top_k < size:
+        threshold = np.partition(scores, size - top_k)[size - top_k]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[: top_k - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(size)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return [int(i) for i in candidates[order]]
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-from copy import deepcopy
 from typing import Any
 
 from ..runtime.delegation import DelegationRequest, DelegationResult
@@ -85,8 +84,9 @@ class SubAgentManager:
     def _create_child(self, depth: int, inherit_context: bool) -> Any:
         """Create a child agent and optionally inherit selected context.
 
-        When *inherit_context* is True the child receives a deep copy of the
-        parent's full config (instructions, knowledge, model, tools).
+        When *inherit_context* is True the child receives ``AgentConfig.fork()``
+        of the parent's config: instructions and policies are copied, model,
+        tools and knowledge are shared, and the context policy is forked.
         When False the child starts with a minimal config: same model/tools/
         generation settings but no inherited instructions or knowledge sources,
         giving it a blank working context.
@@ -95,7 +95,7 @@ class SubAgentManager:
 
         if isinstance(self.parent, Agent):
             if inherit_context:
-                child = Agent(config=deepcopy(self.parent.config))
+                child = Agent(config=self.parent.config.fork())
             else:
                 from dataclasses import replace
 
@@ -16,6 +16,20 @@ from .minimax import MiniMaxProvider
 from .ollama import OllamaProvider
 from .openai import OpenAIProvider
 from .qwen import QwenProvider
+from .rate_limit import (
+    ProviderRateLimiter,
+    RateLimitConfig,
+    RateLimitStats,
+    TokenBucket,
+    shared_rate_limiter,
+)
+from .response_cache import (
+    DiskResponseStore,
+    ResponseCache,
+    ResponseCacheStats,
+    default_response_cache,
+)
+from .routing import BackendStats, RouteBackend, RoutingProvider, RoutingStats
 
 __all__ = [
     "LLMProvider",
@@ -25,6 +39,19 @@ __all__ = [
     "ProviderToolParameter",
     "ProviderToolSpec",
     "TokenUsage",
+    "ResponseCache",
+    "ResponseCacheStats",
+    "DiskResponseStore",
+    "default_response_cache",
+    "RateLimitConfig",
+    "RateLimitStats",
+    "ProviderRateLimiter",
+    "TokenBucket",
+    "shared_rate_limiter",
+    "RoutingProvider",
+    "RouteBackend",
+    "BackendStats",
+    "RoutingStats",
     "AnthropicProvider",
     "OpenAIProvider",
     "GeminiProvider",
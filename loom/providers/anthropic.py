@@ -3,7 +3,7 @@
 import inspect
 import threading
 from collections.abc import AsyncGenerator
-from typing import Any
+from typing import Any, cast
 
 from ..types import ToolCall
 from .base import (
@@ -16,9 +16,18 @@ from .base import (
     parse_tool_arguments,
 )
 
+_EPHEMERAL = {"type": "ephemeral"}
+
 
 class AnthropicProvider(LLMProvider):
-    """Anthropic messages API provider."""
+    """Anthropic messages API provider.
+
+    With ``prompt_caching`` (the default) requests that carry
+    ``cache_breakpoints`` metadata get ``cache_control`` breakpoints after
+    the tool definitions, after the stable system partition and after the
+    last stable history message.  The runtime fills that metadata from
+    ``ContextPartitions``.
+    """
 
     _shared_clients: dict[tuple[str, str | None, float | None, int | None], Any] = {}
     _pool_lock = threading.RLock()
@@ -31,8 +40,10 @@ class AnthropicProvider(LLMProvider):
         max_retries: int | None = None,
         client: Any | None = None,
         use_client_pool: bool = True,
+        prompt_caching: bool = True,
     ):
         super().__init__()
+        self.prompt_caching = prompt_caching
         self.api_key = api_key
         self.base_url = base_url
         self.timeout = timeout
@@ -87,19 +98,14 @@ class AnthropicProvider(LLMProvider):
         request: CompletionRequest,
     ) -> CompletionResponse:
         """Generate a completion through Anthropic messages API."""
-        payload = self._build_request(request.messages, request.params)
+        payload = self._build_request_for(request)
         response = await self.client.messages.create(**payload)
         usage = getattr(response, "usage", None)
         content_blocks = getattr(response, "content", [])
         return CompletionResponse(
             content=self._extract_text_blocks(content_blocks),
             tool_calls=self._extract_tool_calls(content_blocks),
-            usage=TokenUsage(
-                input_tokens=getattr(usage, "input_tokens", 0) or 0,
-                output_tokens=getattr(usage, "output_tokens", 0) or 0,
-            )
-            if usage is not None
-            else None,
+            usage=self._token_usage(usage) if usage is not None else None,
             raw=response,
         )
 
@@ -114,9 +120,10 @@ class AnthropicProvider(LLMProvider):
         separate content_block events.  We accumulate both in a single pass
         so no second API call is needed.
         """
-        payload = self._build_request(request.messages, request.params)
+        payload = self._build_request_for(request)
         stream = await self.client.messages.create(**payload, stream=True)
 
+        usage: TokenUsage | None = None
         text_parts: list[str] = []
         # tool_use blocks accumulated by index
         tool_blocks: dict[int, dict] = {}
@@ -125,7 +132,19 @@ class AnthropicProvider(LLMProvider):
         async for event in stream:
             event_type = getattr(event, "type", "")
 
-            if event_type == "content_block_start":
+            if event_type == "message_start":
+                # 输入侧用量（含缓存命中/写入）只在 message_start 中给出
+                start_usage = getattr(getattr(event, "message", None), "usage", None)
+                if start_usage is not None:
+                    usage = self._token_usage(start_usage)
+
+            elif event_type == "message_delta":
+                delta_usage = getattr(event, "usage", None)
+                output_tokens = getattr(delta_usage, "output_tokens", None)
+                if usage is not None and output_tokens is not None:
+                    usage.output_tokens = output_tokens
+
+            elif event_type == "content_block_start":
                 block = getattr(event, "content_block", None)
                 idx = getattr(event, "index", 0)
                 if block and getattr(block, "type", "") == "tool_use":
@@ -173,6 +192,7 @@ class AnthropicProvider(LLMProvider):
         return CompletionResponse(
             content="".join(text_parts),
             tool_calls=tool_calls,
+            usage=usage,
         )
 
     async def _stream_request_events(
@@ -188,7 +208,7 @@ class AnthropicProvider(LLMProvider):
         """
         from ..types.stream import TextDelta, ThinkingDelta, ToolCallEvent
 
-        payload = self._build_request(request.messages, request.params)
+        payload = self._build_request_for(request)
         stream = await self.client.messages.create(**payload, stream=True)
 
         # tool_use blocks accumulated by content-block index
@@ -246,14 +266,23 @@ class AnthropicProvider(LLMProvider):
                             arguments=tool_call.arguments,
                         )
 
+    def _build_request_for(self, request: CompletionRequest) -> dict[str, Any]:
+        return self._build_request(
+            request.messages,
+            request.params,
+            cache_breakpoints=request.metadata.get("cache_breakpoints"),
+        )
+
     def _build_request(
         self,
         messages: list,
         params: CompletionParams | None,
+        cache_breakpoints: dict[str, int] | None = None,
     ) -> dict[str, Any]:
         """Build an Anthropic messages request payload."""
         resolved = params or CompletionParams()
-        system, converted = self._convert_messages(messages)
+        breakpoints = cache_breakpoints if self.prompt_caching else None
+        system, converted = self._convert_messages(messages, breakpoints)
         request: dict[str, Any] = {
             "model": resolved.model,
             "messages": converted,
@@ -262,95 +291,163 @@ class AnthropicProvider(LLMProvider):
         }
         if system:
             request["system"] = system
-        tools = resolved.tool_dicts()
+        tools = self._cached_tool_payload(resolved, self._build_tools)
         if tools:
-            request["tools"] = [
-                {
-                    "name": tool["name"],
-                    "description": tool.get("description", ""),
-                    "input_schema": tool.get(
-                        "parameters", {"type": "object", "properties": {}, "required": []}
-                    ),
-                }
-                for tool in tools
-            ]
+            if breakpoints is not None:
+                # 工具定义位于前缀最前端；缓存的工具载荷只读，复制最后一项再加断点
+                tools = [*tools[:-1], {**tools[-1], "cache_control": _EPHEMERAL}]
+            request["tools"] = tools
             request["tool_choice"] = (
                 {"type": resolved.tool_choice} if resolved.tool_choice else {"type": "auto"}
             )
         return request
 
-    def _convert_messages(self, messages: list) -> tuple[str | None, list[dict]]:
-        """Convert generic chat messages to Anthropic format with multimodal support."""
+    def _build_tools(self, tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [
+            {
+                "name": tool["name"],
+                "description": tool.get("description", ""),
+                "input_schema": tool.get(
+                    "parameters", {"type": "object", "properties": {}, "required": []}
+                ),
+            }
+            for tool in tools
+        ]
+
+    def _convert_messages(
+        self,
+        messages: list,
+        cache_breakpoints: dict[str, int] | None = None,
+    ) -> tuple[str | list[dict[str, Any]] | None, list[dict]]:
+        """Convert generic chat messages to Anthropic format with multimodal support.
+
+        With ``cache_breakpoints`` the system prompt is split into a cached
+        stable block and a trailing volatile block, and the last stable
+        history message is marked as a cache breakpoint.  System messages
+        rendered after the history (the ``cache_stable`` dashboard) stay in
+        place as user text so they do not invalidate the cached prefix.
+        """
         system_parts: list[str] = []
+        volatile_parts: list[str] = []
         converted: list[dict] = []
+        system_end = cache_breakpoints.get("system", 0) if cache_breakpoints else 0
+        history_end = cache_breakpoints.get("history") if cache_breakpoints else None
+        history_index: int | None = None
 
-        for message in messages:
-            role = message.get("role", "user")
-            content = message.get("content", "")
-            tool_calls = message.get("tool_calls", [])
-
-            if role == "system":
+        for index, message in enumerate(messages):
+            if message.get("role", "user") == "system":
                 # System messages must be text only
-                if isinstance(content, list):
-                    # Extract text from content blocks
-                    text_parts = []
-                    for block in content:
-                        if isinstance(block, dict) and block.get("type") == "text":
-                            text_parts.append(block.get("text", ""))
-                        elif hasattr(block, "type") and block.type == "text":
-                            text_parts.append(getattr(block, "text", ""))
-                    system_parts.append("".join(text_parts))
+                text = self._system_text(message.get("content", ""))
+                if history_end is not None and index >= history_end:
+                    # 历史之后的易变内容留在消息末尾，缓存前缀保持不变
+                    if text:
+                        converted.append({"role": "user", "content": text})
+                elif cache_breakpoints is not None and index >= system_end:
+                    volatile_parts.append(text)
                 else:
-                    system_parts.append(content)
+                    system_parts.append(text)
                 continue
+            converted.append(self._cached_message(message, self._convert_message))
+            if history_end is not None and index < history_end:
+                history_index = len(converted) - 1
 
-            if role == "assistant" and tool_calls:
-                content_blocks: list[dict[str, Any]] = []
-                if isinstance(content, str) and content:
-                    content_blocks.append({"type": "text", "text": content})
-                elif isinstance(content, list):
-                    content_blocks.extend(self._convert_content_blocks(content))
+        system = "\n\n".join(part for part in system_parts if part).strip() or None
+        if cache_breakpoints is None:
+            return system, converted
 
-                content_blocks.extend(
-                    {
-                        "type": "tool_use",
-                        "id": tool_call["id"],
-                        "name": tool_call["name"],
-                        "input": tool_call.get("arguments", {}),
-                    }
-                    for tool_call in tool_calls
-                )
-                converted.append({"role": "assistant", "content": content_blocks})
-                continue
+        volatile = "\n\n".join(part for part in volatile_parts if part).strip() or None
+        blocks: list[dict[str, Any]] = []
+        if system:
+            blocks.append({"type": "text", "text": system, "cache_control": _EPHEMERAL})
+        if volatile:
+            blocks.append({"type": "text", "text": volatile})
+        # 前缀里有易变的 system 内容时，历史断点每轮都会失效，只会多付写入费用
+        if history_index is not None and volatile is None:
+            converted[history_index] = self._with_cache_control(converted[history_index])
+        return (blocks if system else volatile), converted
+
+    @staticmethod
+    def _with_cache_control(message: dict[str, Any]) -> dict[str, Any]:
+        """Copy of a converted message with a breakpoint on its last content block."""
+        content = message.get("content")
+        if isinstance(content, str):
+            blocks: list[dict[str, Any]] = [{"type": "text", "text": content}] if content else []
+        else:
+            blocks = list(content or [])
+        if not blocks:
+            return message
+        blocks[-1] = {**blocks[-1], "cache_control": _EPHEMERAL}
+        return {**message, "content": blocks}
+
+    @staticmethod
+    def _token_usage(usage: Any) -> TokenUsage:
+        # Anthropic 的 input_tokens 不含缓存部分；统一为全部提示 token
+        cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        return TokenUsage(
+            input_tokens=(getattr(usage, "input_tokens", 0) or 0) + cache_read + cache_write,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            cache_read_tokens=cache_read,
+            cache_write_tokens=cache_write,
+        )
+
+    def _system_text(self, content: Any) -> str:
+        if not isinstance(content, list):
+            return cast("str", content)
+        # Extract text from content blocks
+        text_parts = []
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "text":
+                text_parts.append(block.get("text", ""))
+            elif hasattr(block, "type") and block.type == "text":
+                text_parts.append(getattr(block, "text", ""))
+        return "".join(text_parts)
+
+    def _convert_message(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Convert one non-system message to Anthropic format."""
+        role = message.get("role", "user")
+        content = message.get("content", "")
+        tool_calls = message.get("tool_calls", [])
+
+        if role == "assistant" and tool_calls:
+            content_blocks: list[dict[str, Any]] = []
+            if isinstance(content, str) and content:
+                content_blocks.append({"type": "text", "text": content})
+            elif isinstance(content, list):
+                content_blocks.extend(self._convert_content_blocks(content))
+
+            content_blocks.extend(
+                {
+                    "type": "tool_use",
+                    "id": tool_call["id"],
+                    "name": tool_call["name"],
+                    "input": tool_call.get("arguments", {}),
+                }
+                for tool_call in tool_calls
+            )
+            return {"role": "assistant", "content": content_blocks}
 
-            if role == "tool":
-                converted.append(
+        if role == "tool":
+            return {
+                "role": "user",
+                "content": [
                     {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": message.get("tool_call_id"),
-                                "content": content if isinstance(content, str) else str(content),
-                            }
-                        ],
+                        "type": "tool_result",
+                        "tool_use_id": message.get("tool_call_id"),
+                        "content": content if isinstance(content, str) else str(content),
                     }
-                )
-                continue
-
-            # Convert content to Anthropic format
-            if isinstance(content, str):
-                # Plain text content.
-                converted.append({"role": role, "content": content})
-            elif isinstance(content, list):
-                # Multimodal content with ContentBlocks
-                converted.append({"role": role, "content": self._convert_content_blocks(content)})
-            else:
-                # Fallback to string conversion
-                converted.append({"role": role, "content": str(content)})
+                ],
+            }
 
-        system = "\n\n".join(part for part in system_parts if part).strip() or None
-        return system, converted
+        # Convert content to Anthropic format
+        if isinstance(content, str):
+            # Plain text content.
+            return {"role": role, "content": content}
+        if isinstance(content, list):
+            # Multimodal content with ContentBlocks
+            return {"role": role, "content": self._convert_content_blocks(content)}
+        # Fallback to string conversion
+        return {"role": role, "content": str(content)}
 
     def _extract_text_blocks(self, blocks: list[Any]) -> str:
         """Extract concatenated text from Anthropic content blocks."""
@@ -3,12 +3,16 @@
 import asyncio
 import json
 import logging
+from collections import OrderedDict
 from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, TypeVar
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 
 if TYPE_CHECKING:
     from ..types.stream import StreamEvent
+    from .rate_limit import ProviderRateLimiter, RateLimitConfig
+    from .response_cache import ResponseCache
 
 from ..types import ToolCall
 from ..utils.errors import ProviderError, ProviderUnavailableError, RateLimitError
@@ -167,15 +171,31 @@ class CompletionRequest:
 
 @dataclass
 class TokenUsage:
-    """Token usage statistics"""
+    """Token usage statistics
+
+    ``input_tokens`` counts every prompt token.  Providers with prompt
+    caching also report which part of it was read from the cache (a hit) and
+    which part was written to it (a miss at a cache breakpoint).
+    """
 
     input_tokens: int = 0
     output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
 
     @property
     def total_tokens(self) -> int:
         return self.input_tokens + self.output_tokens
 
+    @property
+    def uncached_input_tokens(self) -> int:
+        return max(0, self.input_tokens - self.cache_read_tokens)
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens served from the provider cache."""
+        return self.cache_read_tokens / self.input_tokens if self.input_tokens else 0.0
+
 
 @dataclass
 class CompletionResponse:
@@ -231,9 +251,82 @@ class CircuitBreaker:
 class LLMProvider:
     """Abstract LLM Provider with built-in retry + circuit breaker."""
 
+    message_cache_size = 4096
+    # 可选的请求合并 + 响应缓存层，见 use_response_cache()
+    response_cache: "ResponseCache | None" = None
+    # 可选的并发 / RPM / TPM 限流器，同一端点的 provider 共享，见 use_rate_limits()
+    rate_limiter: "ProviderRateLimiter | None" = None
+
     def __init__(self, retry_config: RetryConfig | None = None):
         self._retry = retry_config or RetryConfig()
         self._circuit = CircuitBreaker(self._retry)
+        self._tool_payload_cache: tuple[tuple[Any, ...], Any] | None = None
+        self._message_cache: OrderedDict[
+            int, tuple[dict[str, Any], tuple[tuple[str, Any], ...], Any]
+        ] = OrderedDict()
+
+    def _cached_tool_payload(
+        self,
+        params: CompletionParams,
+        convert: Callable[[list[dict[str, Any]]], T],
+    ) -> T | None:
+        """Return provider-shaped tools, memoized while the tool entries are unchanged.
+
+        Entries are compared by identity: ``ToolRuntime`` hands out the same
+        tool dicts until the registry generation changes, so steady-state
+        iterations skip both ``tool_dicts()`` and the provider conversion.
+        """
+        tools = params.tools
+        if not tools:
+            return None
+        cached = getattr(self, "_tool_payload_cache", None)
+        if (
+            cached is not None
+            and len(cached[0]) == len(tools)
+            and all(a is b for a, b in zip(cached[0], tools, strict=True))
+        ):
+            return cast("T", cached[1])
+        payload = convert(params.tool_dicts())
+        self._tool_payload_cache = (tuple(tools), payload)
+        return payload
+
+    def _cached_message(
+        self,
+        message: dict[str, Any],
+        convert: Callable[[dict[str, Any]], T],
+    ) -> T:
+        """Return the provider-native form of one message, memoized by identity.
+
+        ``ProviderRuntime`` reuses the same dict for a message across
+        iterations, so only newly appended messages are converted.  An entry
+        is reused only while the dict and each of its values are the same
+        objects, so callers that edit a dict in place get a fresh conversion.
+        Cached results are shared between requests and must not be mutated.
+        """
+        cache = getattr(self, "_message_cache", None)
+        if cache is None:
+            cache = self._message_cache = OrderedDict()
+        key = id(message)
+        entry = cache.get(key)
+        if (
+            entry is not None
+            and entry[0] is message
+            and len(entry[1]) == len(message)
+            and all(
+                name == field_name and value is field_value
+                for (name, value), (field_name, field_value) in zip(
+                    entry[1], message.items(), strict=True
+                )
+            )
+        ):
+            cache.move_to_end(key)
+            return cast("T", entry[2])
+        converted = convert(message)
+        # 持有原 dict 引用，保证 id 在条目存活期间不会被复用
+        cache[key] = (message, tuple(message.items()), converted)
+        if len(cache) > self.message_cache_size:
+            cache.popitem(last=False)
+        return converted
 
     async def _complete_request(self, request: CompletionRequest) -> CompletionResponse:
         """Provider-specific request-native completion (no retry logic)."""
@@ -273,8 +366,54 @@ class LLMProvider:
 
         New providers can override this method as their primary implementation.
         Providers implement ``_complete_request`` as the single subclass hook.
+        With a ``response_cache`` attached, identical requests share one
+        upstream call and repeated ones are answered from the cache.
+        """
+        cache = self.response_cache
+        if cache is None:
+            return await self._with_retry(lambda: self._complete_request(request), request)
+        return await cache.complete(
+            request,
+            lambda: self._with_retry(lambda: self._complete_request(request), request),
+            namespace=self._response_cache_namespace(),
+        )
+
+    def use_response_cache(self, cache: "ResponseCache | None" = None) -> "ResponseCache":
+        """Attach a response cache (a new private one by default) and return it.
+
+        Pass the same ``ResponseCache`` to several providers, or use
+        ``default_response_cache()``, to coalesce requests across sessions.
+        """
+        if cache is None:
+            from .response_cache import ResponseCache
+
+            cache = ResponseCache()
+        self.response_cache = cache
+        return cache
+
+    def use_rate_limits(self, config: "RateLimitConfig | None" = None) -> "ProviderRateLimiter":
+        """Attach the process-wide limiter of this provider's endpoint and return it.
+
+        Providers that share a pooled client (same API key, base URL and
+        client options) share one limiter, so the concurrency limit and the
+        RPM/TPM budget hold across every engine in the process.  The first
+        ``config`` registered for an endpoint wins.
         """
-        return await self._with_retry(lambda: self._complete_request(request))
+        from .rate_limit import shared_rate_limiter
+
+        self.rate_limiter = shared_rate_limiter(self._rate_limit_key(), config)
+        return self.rate_limiter
+
+    def _rate_limit_key(self) -> tuple[Any, ...]:
+        pool_key = getattr(self, "_pool_key", None)
+        if callable(pool_key):
+            return (type(self).__name__, *pool_key())
+        return (type(self).__name__, getattr(self, "base_url", None))
+
+    def _response_cache_namespace(self) -> str:
+        """Separates cache entries of different provider backends."""
+        base_url = getattr(self, "base_url", None)
+        return f"{type(self).__name__}:{base_url or ''}"
 
     async def complete_request_streaming(
         self,
@@ -282,7 +421,9 @@ class LLMProvider:
         on_token: "Any | None" = None,
     ) -> CompletionResponse:
         """Stream a structured request and return the final response."""
-        return await self._with_retry(lambda: self._complete_request_streaming(request, on_token))
+        return await self._with_retry(
+            lambda: self._complete_request_streaming(request, on_token), request
+        )
 
     async def stream_request_events(
         self,
@@ -292,26 +433,37 @@ class LLMProvider:
         if self._circuit.is_open():
             raise ProviderUnavailableError("Circuit breaker open: provider unavailable")
 
+        limiter = self.rate_limiter
         yielded = False
-        try:
-            async for event in self._stream_request_events(request):
-                yielded = True
-                yield event
-            self._circuit.record_success()
-        except Exception as exc:
-            self._circuit.record_failure()
-            if yielded:
+        # 流式请求在整个迭代期间占用一个并发槽位
+        async with limiter.slot(_estimate_tokens(request, limiter)) if limiter else nullcontext():
+            try:
+                async for event in self._stream_request_events(request):
+                    yielded = True
+                    yield event
+                self._circuit.record_success()
+            except Exception as exc:
+                self._circuit.record_failure()
+                if yielded:
+                    raise self._normalize_provider_exception(exc) from exc
                 raise self._normalize_provider_exception(exc) from exc
-            raise self._normalize_provider_exception(exc) from exc
 
-    async def _with_retry(self, operation: Callable[[], Awaitable[T]]) -> T:
+    async def _with_retry(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        request: CompletionRequest | None = None,
+    ) -> T:
         if self._circuit.is_open():
             raise ProviderUnavailableError("Circuit breaker open: provider unavailable")
 
         last_exc: Exception | None = None
         for attempt in range(self._retry.max_retries):
             try:
-                result = await operation()
+                limiter = self.rate_limiter
+                if limiter is None:
+                    result = await operation()
+                else:
+                    result = await self._limited(limiter, operation, request)
                 self._circuit.record_success()
                 return result
             except Exception as exc:
@@ -332,6 +484,20 @@ class LLMProvider:
             raise ProviderUnavailableError("Provider completion failed with no exception details")
         raise self._normalize_provider_exception(last_exc)
 
+    async def _limited(
+        self,
+        limiter: "ProviderRateLimiter",
+        operation: Callable[[], Awaitable[T]],
+        request: CompletionRequest | None,
+    ) -> T:
+        estimated = _estimate_tokens(request, limiter)
+        async with limiter.slot(estimated):
+            result = await operation()
+        usage = getattr(result, "usage", None)
+        if usage is not None:
+            limiter.charge(estimated, usage.total_tokens)
+        return result
+
     def _normalize_provider_exception(self, exc: Exception) -> ProviderError:
         if isinstance(exc, ProviderError):
             return exc
@@ -341,3 +507,17 @@ class LLMProvider:
         if "rate limit" in lowered or "429" in lowered:
             return RateLimitError(message)
         return ProviderUnavailableError(message)
+
+
+def _estimate_tokens(
+    request: CompletionRequest | None,
+    limiter: "ProviderRateLimiter",
+) -> int:
+    """Prompt tokens plus the completion budget, for TPM reservations."""
+    if request is None or limiter.tokens is None:
+        return 0
+    from ..utils.tokens import get_tokenizer
+
+    counter = get_tokenizer(request.params.model)
+    prompt = sum(counter.count_content(message.get("content")) for message in request.messages)
+    return prompt + request.params.max_tokens
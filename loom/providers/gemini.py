@@ -2,7 +2,7 @@
 
 import threading
 from collections.abc import AsyncGenerator
-from typing import Any
+from typing import Any, cast
 
 from ..types import ToolCall
 from .base import CompletionRequest, CompletionResponse, LLMProvider, normalize_tool_call
@@ -81,9 +81,9 @@ class GeminiProvider(LLMProvider):
                 "max_output_tokens": resolved.max_tokens,
             },
         }
-        tools = resolved.tool_dicts()
+        tools = self._cached_tool_payload(resolved, self._build_tools)
         if tools:
-            payload["tools"] = self._build_tools(tools)
+            payload["tools"] = tools
             if tool_config := self._build_tool_config(resolved.tool_choice):
                 payload["tool_config"] = tool_config
 
@@ -118,9 +118,9 @@ class GeminiProvider(LLMProvider):
             },
             "stream": True,
         }
-        tools = resolved.tool_dicts()
+        tools = self._cached_tool_payload(resolved, self._build_tools)
         if tools:
-            payload["tools"] = self._build_tools(tools)
+            payload["tools"] = tools
             if tool_config := self._build_tool_config(resolved.tool_choice):
                 payload["tool_config"] = tool_config
 
@@ -154,85 +154,80 @@ class GeminiProvider(LLMProvider):
         converted: list[dict[str, Any]] = []
 
         for message in messages:
-            role = message.get("role", "user")
-            content = message.get("content", "")
-            tool_calls = message.get("tool_calls", [])
-
             # Collect system messages
-            if role == "system":
-                if isinstance(content, list):
-                    # Extract text from content blocks
-                    text_parts = []
-                    for block in content:
-                        if isinstance(block, dict) and block.get("type") == "text":
-                            text_parts.append(block.get("text", ""))
-                        elif hasattr(block, "type") and block.type == "text":
-                            text_parts.append(getattr(block, "text", ""))
-                    system_parts.append("".join(text_parts))
-                else:
-                    system_parts.append(content)
-                continue
-
-            if role == "assistant" and tool_calls:
-                parts = self._to_gemini_parts(content)
-                parts.extend(
-                    {
-                        "function_call": {
-                            "name": tool_call["name"],
-                            "args": tool_call.get("arguments", {}),
-                        }
-                    }
-                    for tool_call in tool_calls
-                )
-                converted.append({"role": "model", "parts": parts})
+            if message.get("role", "user") == "system":
+                system_parts.append(self._system_text(message.get("content", "")))
                 continue
-
-            if role == "tool":
-                converted.append(
-                    {
-                        "role": "user",
-                        "parts": [
-                            {
-                                "function_response": {
-                                    "name": message.get("name")
-                                    or message.get("tool_call_id")
-                                    or "tool",
-                                    "response": {
-                                        "content": content
-                                        if isinstance(content, str)
-                                        else str(content)
-                                    },
-                                }
-                            }
-                        ],
-                    }
-                )
-                continue
-
-            # Convert role: "assistant" -> "model"
-            gemini_role = "model" if role == "assistant" else "user"
-
-            # Convert content to Gemini parts format
-            converted.append(
-                {
-                    "role": gemini_role,
-                    "parts": self._to_gemini_parts(content),
-                }
-            )
+            converted.append(self._cached_message(message, self._convert_message))
 
         # Prepend system messages to first user message if any
         if system_parts and converted:
             system_text = "\n\n".join(system_parts)
             first_msg = converted[0]
             if first_msg["role"] == "user":
-                # Prepend system context to first user message
-                first_msg["parts"] = [{"text": f"{system_text}\n\n{first_msg['parts'][0]['text']}"}]
+                # Prepend system context to first user message (copy: entries are cached)
+                converted[0] = {
+                    **first_msg,
+                    "parts": [{"text": f"{system_text}\n\n{first_msg['parts'][0]['text']}"}],
+                }
             else:
                 # Insert system as first user message
                 converted.insert(0, {"role": "user", "parts": [{"text": system_text}]})
 
         return converted
 
+    def _system_text(self, content: Any) -> str:
+        if not isinstance(content, list):
+            return cast("str", content)
+        # Extract text from content blocks
+        text_parts = []
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "text":
+                text_parts.append(block.get("text", ""))
+            elif hasattr(block, "type") and block.type == "text":
+                text_parts.append(getattr(block, "text", ""))
+        return "".join(text_parts)
+
+    def _convert_message(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Convert one non-system message to Gemini format."""
+        role = message.get("role", "user")
+        content = message.get("content", "")
+        tool_calls = message.get("tool_calls", [])
+
+        if role == "assistant" and tool_calls:
+            parts = self._to_gemini_parts(content)
+            parts.extend(
+                {
+                    "function_call": {
+                        "name": tool_call["name"],
+                        "args": tool_call.get("arguments", {}),
+                    }
+                }
+                for tool_call in tool_calls
+            )
+            return {"role": "model", "parts": parts}
+
+        if role == "tool":
+            return {
+                "role": "user",
+                "parts": [
+                    {
+                        "function_response": {
+                            "name": message.get("name") or message.get("tool_call_id") or "tool",
+                            "response": {
+                                "content": content if isinstance(content, str) else str(content)
+                            },
+                        }
+                    }
+                ],
+            }
+
+        # Convert role: "assistant" -> "model"
+        gemini_role = "model" if role == "assistant" else "user"
+
+        # Convert content to Gemini parts format
+        return {"role": gemini_role, "parts": self._to_gemini_parts(content)}
+
     def _extract_text(self, response: Any) -> str:
         """Extract text from Gemini response."""
         try:
@@ -275,111 +275,102 @@ class OpenAIProvider(LLMProvider):
             "temperature": resolved.temperature,
             "max_tokens": resolved.max_tokens,
         }
-        tools = resolved.tool_dicts()
+        tools = self._cached_tool_payload(resolved, self._build_tools)
         if tools:
-            request["tools"] = [
-                {
-                    "type": "function",
-                    "function": tool,
-                }
-                for tool in tools
-            ]
+            request["tools"] = tools
             request["tool_choice"] = resolved.tool_choice or "auto"
         return request
 
+    def _build_tools(self, tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [
+            {
+                "type": "function",
+                "function": tool,
+            }
+            for tool in tools
+        ]
+
     def _convert_messages(self, messages: list) -> list[dict]:
         """Convert generic chat messages to OpenAI format with multimodal support (GPT-4 Vision)."""
-        converted = []
-
-        for message in messages:
-            role = message.get("role", "user")
-            content = message.get("content", "")
-            tool_calls = message.get("tool_calls", [])
-
-            if role == "assistant" and tool_calls:
-                assistant_message: dict[str, Any] = {
-                    "role": role,
-                    "content": content or None,
-                    "tool_calls": [
-                        {
-                            "id": tool_call["id"],
-                            "type": "function",
-                            "function": {
-                                "name": tool_call["name"],
-                                "arguments": json.dumps(
-                                    tool_call.get("arguments", {}), ensure_ascii=False
-                                ),
-                            },
-                        }
-                        for tool_call in tool_calls
-                    ],
-                }
-                converted.append(assistant_message)
-                continue
-
-            if role == "tool":
-                converted.append(
+        return [self._cached_message(message, self._convert_message) for message in messages]
+
+    def _convert_message(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Convert one generic chat message to OpenAI format."""
+        role = message.get("role", "user")
+        content = message.get("content", "")
+        tool_calls = message.get("tool_calls", [])
+
+        if role == "assistant" and tool_calls:
+            assistant_message: dict[str, Any] = {
+                "role": role,
+                "content": content or None,
+                "tool_calls": [
                     {
-                        "role": "tool",
-                        "tool_call_id": message.get("tool_call_id"),
-                        "content": content if isinstance(content, str) else str(content),
+                        "id": tool_call["id"],
+                        "type": "function",
+                        "function": {
+                            "name": tool_call["name"],
+                            "arguments": json.dumps(
+                                tool_call.get("arguments", {}), ensure_ascii=False
+                            ),
+                        },
                     }
-                )
-                continue
+                    for tool_call in tool_calls
+                ],
+            }
+            return assistant_message
+
+        if role == "tool":
+            return {
+                "role": "tool",
+                "tool_call_id": message.get("tool_call_id"),
+                "content": content if isinstance(content, str) else str(content),
+            }
 
-            if isinstance(content, str):
-                # Plain text content.
-                converted.append({"role": role, "content": content})
-            elif isinstance(content, list):
-                # Multimodal content with ContentBlocks
-                content_parts = []
-                for block in content:
-                    if isinstance(block, dict):
-                        # Already in dict format
-                        block_type = block.get("type")
-                        if block_type == "text":
-                            content_parts.append({"type": "text", "text": block.get("text", "")})
-                        elif block_type == "image":
-                            # Convert to OpenAI image_url format
-                            source = block.get("source", {})
-                            if source.get("type") == "base64":
-                                # Convert base64 to data URL
-                                media_type = source.get("media_type", "image/png")
-                                data = source.get("data", "")
-                                image_url = f"data:{media_type};base64,{data}"
-                            else:
-                                # Use URL directly
-                                image_url = source.get("url", "")
-
-                            content_parts.append(
-                                {"type": "image_url", "image_url": {"url": image_url}}
-                            )
-                    elif hasattr(block, "type"):
-                        # ContentBlock dataclass
-                        if block.type == "text":
-                            content_parts.append(
-                                {"type": "text", "text": getattr(block, "text", "")}
-                            )
-                        elif block.type == "image":
-                            # Convert to OpenAI image_url format
-                            source = getattr(block, "source", {})
-                            if source.get("type") == "base64":
-                                media_type = source.get("media_type", "image/png")
-                                data = source.get("data", "")
-                                image_url = f"data:{media_type};base64,{data}"
-                            else:
-                                image_url = source.get("url", "")
-
-                            content_parts.append(
-                                {"type": "image_url", "image_url": {"url": image_url}}
-                            )
-
-                converted.append({"role": role, "content": content_parts})
-            else:
-                # Fallback to string conversion
-                converted.append({"role": role, "content": str(content)})
-
-        return converted
+        if isinstance(content, str):
+            # Plain text content.
+            return {"role": role, "content": content}
+        if isinstance(content, list):
+            # Multimodal content with ContentBlocks
+            content_parts = []
+            for block in content:
+                if isinstance(block, dict):
+                    # Already in dict format
+                    block_type = block.get("type")
+                    if block_type == "text":
+                        content_parts.append({"type": "text", "text": block.get("text", "")})
+                    elif block_type == "image":
+                        # Convert to OpenAI image_url format
+                        source = block.get("source", {})
+                        if source.get("type") == "base64":
+                            # Convert base64 to data URL
+                            media_type = source.get("media_type", "image/png")
+                            data = source.get("data", "")
+                            image_url = f"data:{media_type};base64,{data}"
+                        else:
+                            # Use URL directly
+                            image_url = source.get("url", "")
+
+                        content_parts.append({"type": "image_url", "image_url": {"url": image_url}})
+                elif hasattr(block, "type"):
+                    # ContentBlock dataclass
+                    if block.type == "text":
+                        content_parts.append({"type": "text", "text": getattr(block, "text", "")})
+                    elif block.type == "image":
+                        # Convert to OpenAI image_url format
+                        source = getattr(block, "source", {})
+                        if source.get("type") == "base64":
+                            media_type = source.get("media_type", "image/png")
+                            data = source.get("data", "")
+                            image_url = f"data:{media_type};base64,{data}"
+                        else:
+                            image_url = source.get("url", "")
+
+                        content_parts.append({"type": "image_url", "image_url": {"url": image_url}})
+
+            return {"role": role, "content": content_parts}
+        # Fallback to string conversion
+        return {"role": role, "content": str(content)}
 
     def _extract_text(self, content: Any) -> str:
         if isinstance(content, list):
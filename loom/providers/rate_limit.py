@@ -0,0 +1,256 @@
+"""Adaptive concurrency and RPM/TPM rate limiting shared per provider endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from ..utils.errors import RateLimitError
+
+
+@dataclass(slots=True)
+class RateLimitConfig:
+    """Limits for one provider endpoint (API key + base URL).
+
+    ``max_concurrency`` caps in-flight requests; the AIMD limiter starts at
+    ``initial_concurrency`` (``max_concurrency`` when unset), adds one slot
+    per window of successful requests and halves on 429/overload errors.
+    ``requests_per_minute`` / ``tokens_per_minute`` feed token buckets that
+    allow bursts up to one minute's budget; tokens are estimated from the
+    prompt plus ``max_tokens`` and corrected with the reported usage.
+    """
+
+    max_concurrency: int = 16
+    initial_concurrency: int | None = None
+    min_concurrency: int = 1
+    decrease_factor: float = 0.5
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.min_concurrency < 1 or self.max_concurrency < self.min_concurrency:
+            raise ValueError("Concurrency limits must satisfy 1 <= min <= max")
+        if not 0 < self.decrease_factor < 1:
+            raise ValueError("decrease_factor must be in (0, 1)")
+
+
+@dataclass(slots=True)
+class RateLimitStats:
+    """Counters exposed for tracing and tests."""
+
+    requests: int = 0
+    throttled: int = 0  # 收到 429 / 过载的次数
+    queued: int = 0  # 需要等待并发槽位或令牌的请求
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    limit: float = 0.0
+    in_flight: int = 0
+
+    @property
+    def mean_queue_wait(self) -> float:
+        return self.queue_wait_total / self.requests if self.requests else 0.0
+
+
+class TokenBucket:
+    """Reservation-style bucket refilled at ``per_minute / 60`` per second.
+
+    ``reserve`` always succeeds and returns how long the caller has to wait
+    before its reservation is covered, so the bucket needs no waiter queue and
+    can be shared across threads and event loops.
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take ``amount`` (capped at capacity) and return the delay in seconds."""
+        with self._lock:
+            self._refill()
+            self._tokens -= min(amount, self.capacity)
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) a correction after the fact."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class ProviderRateLimiter:
+    """AIMD concurrency limiter plus optional RPM/TPM buckets for one endpoint.
+
+    Waiters are served FIFO; a released slot is handed directly to the next
+    waiter.  Safe to share between event loops in different threads.
+    """
+
+    def __init__(self, config: RateLimitConfig | None = None) -> None:
+        self.config = config or RateLimitConfig()
+        initial = self.config.initial_concurrency or self.config.max_concurrency
+        self.limit = float(
+            min(max(initial, self.config.min_concurrency), self.config.max_concurrency)
+        )
+        self.stats = RateLimitStats(limit=self.limit)
+        self.requests = (
+            TokenBucket(self.config.requests_per_minute)
+            if self.config.requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(self.config.tokens_per_minute) if self.config.tokens_per_minute else None
+        )
+        self._in_flight = 0
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = deque()
+        self._lock = threading.Lock()
+        # 每次乘性减小后递增；只有在当前窗口内发出的请求收到 429 才会再次减小
+        self._epoch = 0
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold one concurrency slot (and ``tokens`` of TPM budget) for a request.
+
+        429/overload errors raised inside the block shrink the limit; other
+        outcomes grow it.
+        """
+        waited = await self.acquire(tokens)
+        self._record_wait(waited)
+        epoch = self._epoch
+        try:
+            yield
+        except BaseException as exc:
+            if is_overload_error(exc):
+                self.on_overload(epoch)
+            raise
+        else:
+            self.on_success()
+        finally:
+            self.release()
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Wait for a slot and bucket budget; return the seconds spent waiting."""
+        start = time.monotonic()
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self._in_flight < int(self.limit):
+                self._in_flight += 1
+                self.stats.in_flight = self._in_flight
+                return time.monotonic() - start
+            future: asyncio.Future[None] = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                    raise
+            # 槽位已经交给了本协程，取消时要归还
+            self.release()
+            raise
+        return time.monotonic() - start
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def charge(self, estimated: int, actual: int) -> None:
+        """Correct the TPM bucket once the real token usage is known."""
+        if self.tokens is not None and actual:
+            self.tokens.adjust(actual - estimated)
+
+    def on_success(self) -> None:
+        with self._lock:
+            # 加性增：每个 limit 大小的成功窗口加 1
+            self.limit = min(self.config.max_concurrency, self.limit + 1.0 / self.limit)
+            self.stats.limit = self.limit
+            self._dispatch()
+
+    def on_overload(self, epoch: int | None = None) -> None:
+        """Multiplicative decrease, once per window of requests.
+
+        ``epoch`` is the window the failed request was issued in; 429s for
+        requests sent before the last decrease do not shrink the limit again.
+        """
+        with self._lock:
+            self.stats.throttled += 1
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._epoch += 1
+            self.limit = max(
+                float(self.config.min_concurrency), self.limit * self.config.decrease_factor
+            )
+            self.stats.limit = self.limit
+
+    def _dispatch(self) -> None:
+        while self._waiters and self._in_flight < int(self.limit):
+            loop, future = self._waiters.popleft()
+            self._in_flight += 1
+            loop.call_soon_threadsafe(_wake, future)
+        self.stats.in_flight = self._in_flight
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self.stats.requests += 1
+            if waited > 0.001:
+                self.stats.queued += 1
+            self.stats.queue_wait_total += waited
+            self.stats.queue_wait_max = max(self.stats.queue_wait_max, waited)
+
+
+def _wake(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Whether ``exc`` is a 429 / overloaded response from a provider."""
+    if isinstance(exc, RateLimitError):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if status in (429, 529):
+        return True
+    lowered = str(exc).lower()
+    return "rate limit" in lowered or "429" in lowered or "overloaded" in lowered
+
+
+_shared_limiters: dict[Any, ProviderRateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def shared_rate_limiter(key: Any, config: RateLimitConfig | None = None) -> ProviderRateLimiter:
+    """Process-wide limiter for ``key``; the first caller's config wins."""
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = _shared_limiters[key] = ProviderRateLimiter(config)
+        return limiter
+
+
+def clear_shared_rate_limiters() -> None:
+    with _shared_limiters_lock:
+        _shared_limiters.clear()
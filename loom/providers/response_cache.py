@@ -0,0 +1,292 @@
+"""Single-flight request coalescing and TTL response cache for providers."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from copy import deepcopy
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, cast
+
+from ..types import ToolCall
+from .base import CompletionRequest, CompletionResponse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ResponseCacheStats:
+    """Counters exposed for tracing and tests."""
+
+    hits: int = 0  # 命中内存或磁盘缓存
+    disk_hits: int = 0
+    misses: int = 0  # 实际发往上游的请求
+    coalesced: int = 0  # 搭上同一个进行中请求的调用
+    bypassed: int = 0  # 采样请求 / 显式关闭缓存的请求
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of cacheable calls answered without a new upstream call."""
+        served = self.hits + self.coalesced
+        total = served + self.misses
+        return served / total if total else 0.0
+
+
+class DiskResponseStore:
+    """One JSON file per request key under ``root``, replaced atomically."""
+
+    def __init__(self, root: str | os.PathLike[str] = ".loom/response_cache") -> None:
+        self.root = Path(root)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Stored response payload, or None when missing, unreadable or expired."""
+        path = self.path_for(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return cast("dict[str, Any] | None", entry.get("response"))
+
+    def put(self, key: str, response: dict[str, Any], ttl: float | None) -> None:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        expires_at = time.time() + ttl if ttl is not None else None
+        data = json.dumps(
+            {"expires_at": expires_at, "response": response},
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        )
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def clear(self) -> None:
+        for path in self.root.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+
+class ResponseCache:
+    """Opt-in layer in front of ``LLMProvider.complete_request``.
+
+    Identical requests (same provider, model, messages and params; request
+    metadata is ignored) are coalesced while one is in flight, so only one
+    upstream call is made, and successful responses are kept for ``ttl``
+    seconds in a bounded LRU, optionally backed by a ``DiskResponseStore``.
+
+    Requests sampled with ``temperature > 0`` bypass the cache unless
+    ``cache_sampled=True``; a request can opt out with
+    ``metadata["response_cache"] = False``.  Responses served from the cache
+    or from another caller's upstream call carry ``usage=None`` so token
+    accounting is not doubled.  One instance can be shared by several
+    providers and sessions.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float | None = 300.0,
+        max_entries: int = 1024,
+        store: DiskResponseStore | None = None,
+        cache_sampled: bool = False,
+        coalesce: bool = True,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self.cache_sampled = cache_sampled
+        self.coalesce = coalesce
+        self.stats = ResponseCacheStats()
+        self._entries: OrderedDict[str, tuple[float | None, CompletionResponse]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[CompletionResponse]] = {}
+        self._writes: set[asyncio.Future[None]] = set()
+        # 同一实例可能被多个线程中的事件循环共享
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cacheable(self, request: CompletionRequest) -> bool:
+        if request.metadata.get("response_cache") is False:
+            return False
+        return self.cache_sampled or request.params.temperature <= 0
+
+    def key_for(self, request: CompletionRequest, namespace: str = "") -> str:
+        """Canonical hash of everything that determines the response."""
+        params = request.params
+        canonical = json.dumps(
+            [
+                namespace,
+                params.model,
+                params.max_tokens,
+                params.temperature,
+                params.tool_choice,
+                params.extensions,
+                params.tool_dicts(),
+                request.messages,
+            ],
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=20).hexdigest()
+
+    async def complete(
+        self,
+        request: CompletionRequest,
+        call: Callable[[], Awaitable[CompletionResponse]],
+        *,
+        namespace: str = "",
+    ) -> CompletionResponse:
+        """Answer ``request`` from the cache, an in-flight call, or ``call()``."""
+        if not self.cacheable(request):
+            with self._lock:
+                self.stats.bypassed += 1
+            return await call()
+
+        key = self.key_for(request, namespace)
+        cached = self._lookup(key)
+        from_disk = False
+        if cached is None and self.store is not None:
+            payload = await asyncio.to_thread(self.store.get, key)
+            if payload is not None:
+                cached = _from_payload(payload)
+                self._remember(key, cached)
+                from_disk = True
+        if cached is not None:
+            with self._lock:
+                self.stats.hits += 1
+                self.stats.disk_hits += int(from_disk)
+            return _shared(cached)
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._inflight.get(key) if self.coalesce else None
+            if task is not None and task.get_loop() is loop:
+                self.stats.coalesced += 1
+                leader = False
+            else:
+                self.stats.misses += 1
+                task = loop.create_task(self._fetch(key, call))
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._finished(key, done))
+                leader = True
+        # shield：某个调用方被取消时上游请求继续，其余调用方照常拿到结果
+        response = await asyncio.shield(task)
+        return response if leader else _shared(response)
+
+    async def flush(self) -> None:
+        """Wait for queued disk writes started from this event loop."""
+        loop = asyncio.get_running_loop()
+        pending = [write for write in list(self._writes) if write.get_loop() is loop]
+        if pending:
+            await asyncio.wait(pending)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    async def _fetch(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[CompletionResponse]],
+    ) -> CompletionResponse:
+        response = await call()
+        stored = _shared(response)
+        self._remember(key, stored)
+        if self.store is not None:
+            # 落盘不阻塞调用方，写失败只记日志
+            write = asyncio.get_running_loop().run_in_executor(
+                None, self.store.put, key, _to_payload(stored), self.ttl
+            )
+            self._writes.add(write)
+            write.add_done_callback(self._written)
+        return response
+
+    def _written(self, write: asyncio.Future[None]) -> None:
+        self._writes.discard(write)
+        if not write.cancelled() and write.exception() is not None:
+            logger.warning("Failed to persist cached response: %s", write.exception())
+
+    def _finished(self, key: str, task: asyncio.Task[CompletionResponse]) -> None:
+        with self._lock:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 标记异常已读取，无人等待时也不告警
+
+    def _lookup(self, key: str) -> CompletionResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def _remember(self, key: str, response: CompletionResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+
+_default_cache: ResponseCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def default_response_cache() -> ResponseCache:
+    """Process-wide cache so every session's providers coalesce together."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+def _shared(response: CompletionResponse) -> CompletionResponse:
+    """Independent copy of a response for a caller that did not pay for it."""
+    return replace(response, tool_calls=deepcopy(response.tool_calls), usage=None, raw=None)
+
+
+def _to_payload(response: CompletionResponse) -> dict[str, Any]:
+    return {
+        "content": response.content,
+        "tool_calls": [asdict(call) for call in response.tool_calls],
+    }
+
+
+def _from_payload(payload: dict[str, Any]) -> CompletionResponse:
+    return CompletionResponse(
+        content=payload.get("content", ""),
+        tool_calls=[ToolCall(**call) for call in payload.get("tool_calls", [])],
+    )
@@ -0,0 +1,306 @@
+"""Latency-aware routing and request hedging across provider backends."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any
+
+from .base import CompletionRequest, CompletionResponse, LLMProvider, RetryConfig
+
+if TYPE_CHECKING:
+    from ..types.stream import StreamEvent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class BackendStats:
+    """Rolling latency and outcome window for one backend."""
+
+    window: int = 100
+    latencies: deque[float] = field(init=False, repr=False)
+    outcomes: deque[bool] = field(init=False, repr=False)
+    requests: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    last_error_at: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.latencies = deque(maxlen=self.window)
+        self.outcomes = deque(maxlen=self.window)
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_errors = 0
+
+    def record_cancelled(self, elapsed: float) -> None:
+        """A cancelled request (e.g. a hedge loser) took at least ``elapsed``.
+
+        The lower bound joins the latency window so stalls that trigger
+        hedging still show up in p50/p95; the outcome window is untouched.
+        """
+        self.latencies.append(elapsed)
+
+    def record_error(self) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.outcomes.append(False)
+        self.consecutive_errors += 1
+        self.last_error_at = time.monotonic()
+
+    @property
+    def p50(self) -> float | None:
+        return self.quantile(0.5)
+
+    @property
+    def p95(self) -> float | None:
+        return self.quantile(0.95)
+
+    @property
+    def error_rate(self) -> float:
+        """Share of failures in the rolling window."""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass(slots=True)
+class RouteBackend:
+    """One routing target; ``model`` replaces ``params.model`` when set."""
+
+    name: str
+    provider: LLMProvider
+    model: str | None = None
+    stats: BackendStats = field(default_factory=BackendStats)
+
+
+@dataclass(slots=True)
+class RoutingStats:
+    """Counters exposed for tracing and tests."""
+
+    routed: dict[str, int] = field(default_factory=dict)
+    failovers: int = 0
+    hedged: int = 0  # 发出了对冲请求
+    hedge_wins: int = 0  # 对冲请求先返回
+
+
+class RoutingProvider(LLMProvider):
+    """Send each request to the fastest healthy backend.
+
+    Backends are ranked by rolling p50 latency; a backend with fewer than
+    ``min_samples`` measurements is tried first so every backend gets
+    measured.  A backend is unhealthy while its window error rate exceeds
+    ``max_error_rate`` (or it failed ``max_consecutive_errors`` times in a
+    row) and its last failure is more recent than ``cooldown`` seconds;
+    after the cooldown it is probed again.  A failed request falls over to
+    the next backend.
+
+    With ``hedge=True`` a duplicate of a non-streaming request is sent to the
+    runner-up once the primary has been outstanding for its p95 latency
+    (``hedge_min_delay`` at least); the first response wins and the other
+    request is cancelled.  Backends keep their own retries, rate limits and
+    caches; the router itself makes one attempt.
+    """
+
+    def __init__(
+        self,
+        backends: list[RouteBackend] | dict[str, LLMProvider],
+        *,
+        window: int = 100,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        max_consecutive_errors: int = 3,
+        cooldown: float = 30.0,
+        failover: bool = True,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.05,
+        retry_config: RetryConfig | None = None,
+    ) -> None:
+        super().__init__(retry_config or RetryConfig(max_retries=1))
+        if isinstance(backends, dict):
+            backends = [RouteBackend(name, provider) for name, provider in backends.items()]
+        if not backends:
+            raise ValueError("RoutingProvider needs at least one backend")
+        self.backends = list(backends)
+        for backend in self.backends:
+            if backend.stats.window != window:
+                backend.stats = BackendStats(window=window)
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.max_consecutive_errors = max_consecutive_errors
+        self.cooldown = cooldown
+        self.failover = failover
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.stats = RoutingStats()
+
+    def healthy(self, backend: RouteBackend) -> bool:
+        stats = backend.stats
+        if time.monotonic() - stats.last_error_at >= self.cooldown:
+            return True
+        if stats.consecutive_errors >= self.max_consecutive_errors:
+            return False
+        return len(stats.outcomes) < self.min_samples or stats.error_rate <= self.max_error_rate
+
+    def ranked(self) -> list[RouteBackend]:
+        """Backends in routing order: healthy and fastest first."""
+
+        def score(backend: RouteBackend) -> tuple[bool, float]:
+            stats = backend.stats
+            # 样本不足的后端先探测；错误率只通过 healthy() 影响排序
+            latency = stats.p50 if len(stats.latencies) >= self.min_samples else None
+            return (not self.healthy(backend), latency or 0.0)
+
+        return sorted(self.backends, key=score)
+
+    async def _complete_request(self, request: CompletionRequest) -> CompletionResponse:
+        candidates = self.ranked()
+        if self.hedge and len(candidates) > 1:
+            return await self._hedged(request, candidates)
+        return await self._with_failover(candidates, lambda backend: self._call(backend, request))
+
+    async def _complete_request_streaming(
+        self,
+        request: CompletionRequest,
+        on_token: Any | None = None,
+    ) -> CompletionResponse:
+        # 已推送的 token 无法撤回，流式请求不做对冲
+        return await self._with_failover(
+            self.ranked(),
+            lambda backend: self._call(backend, request, on_token=on_token, stream=True),
+        )
+
+    async def _stream_request_events(
+        self,
+        request: CompletionRequest,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        candidates = self.ranked()
+        for index, backend in enumerate(candidates if self.failover else candidates[:1]):
+            self._count(backend)
+            yielded = False
+            start = time.monotonic()
+            try:
+                async for event in backend.provider.stream_request_events(
+                    self._request_for(backend, request)
+                ):
+                    yielded = True
+                    yield event
+            except Exception as exc:
+                backend.stats.record_error()
+                # 已经输出过事件就不能再换后端
+                if yielded or index == len(candidates) - 1 or not self.failover:
+                    raise
+                self.stats.failovers += 1
+                logger.warning("Routing failover after stream error on %s: %s", backend.name, exc)
+                continue
+            backend.stats.record_success(time.monotonic() - start)
+            return
+
+    async def _with_failover(
+        self,
+        candidates: list[RouteBackend],
+        call: Callable[[RouteBackend], Awaitable[CompletionResponse]],
+    ) -> CompletionResponse:
+        last_exc: Exception | None = None
+        for index, backend in enumerate(candidates if self.failover else candidates[:1]):
+            if index:
+                self.stats.failovers += 1
+                logger.warning("Routing failover to %s after: %s", backend.name, last_exc)
+            try:
+                return await call(backend)
+            except Exception as exc:
+                last_exc = exc
+        assert last_exc is not None
+        raise last_exc
+
+    async def _hedged(
+        self,
+        request: CompletionRequest,
+        candidates: list[RouteBackend],
+    ) -> CompletionResponse:
+        primary, backup = candidates[0], candidates[1]
+        delay = max(self.hedge_min_delay, primary.stats.p95 or 0.0)
+        first = asyncio.ensure_future(self._call(primary, request))
+        first.add_done_callback(_consume)
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done or first.exception() is not None:
+                # 主请求超过 p95 仍未返回（或已失败），向次优后端发对冲请求
+                self.stats.hedged += 1
+                second = asyncio.ensure_future(self._call(backup, request))
+                second.add_done_callback(_consume)
+                tasks.append(second)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.stats.hedge_wins += 1
+                        return task.result()
+        finally:
+            # 取消落后的请求
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        # 对冲的两个后端都失败：其余后端按顺序兜底
+        rest = candidates[len(tasks) :]
+        if self.failover and rest:
+            self.stats.failovers += 1
+            return await self._with_failover(rest, lambda backend: self._call(backend, request))
+        raise tasks[-1].exception()  # type: ignore[misc]
+
+    async def _call(
+        self,
+        backend: RouteBackend,
+        request: CompletionRequest,
+        *,
+        on_token: Any | None = None,
+        stream: bool = False,
+    ) -> CompletionResponse:
+        self._count(backend)
+        routed = self._request_for(backend, request)
+        start = time.monotonic()
+        try:
+            if stream:
+                response = await backend.provider.complete_request_streaming(routed, on_token)
+            else:
+                response = await backend.provider.complete_request(routed)
+        except asyncio.CancelledError:
+            # 对冲落败被取消：不算失败，但已耗时作为延迟下界计入
+            backend.stats.record_cancelled(time.monotonic() - start)
+            raise
+        except Exception:
+            backend.stats.record_error()
+            raise
+        backend.stats.record_success(time.monotonic() - start)
+        return response
+
+    def _count(self, backend: RouteBackend) -> None:
+        self.stats.routed[backend.name] = self.stats.routed.get(backend.name, 0) + 1
+
+    @staticmethod
+    def _request_for(backend: RouteBackend, request: CompletionRequest) -> CompletionRequest:
+        if backend.model is None or backend.model == request.params.model:
+            return request
+        return replace(request, params=replace(request.params, model=backend.model))
+
+
+def _consume(task: asyncio.Future[Any]) -> None:
+    # 读取落败请求的异常，避免 "exception was never retrieved" 警告
+    if not task.cancelled():
+        task.exception()
@@ -72,7 +72,9 @@ from .session_store import (
     RunRecord,
     SessionRecord,
     SessionStore,
+    SQLiteSessionStore,
     TranscriptRecord,
+    migrate_file_session_store,
 )
 from .signals import (
     AttentionPolicy,
@@ -132,7 +134,9 @@ __all__ = [
     "Artifact",
     "SessionStore",
     "FileSessionStore",
+    "SQLiteSessionStore",
     "InMemorySessionStore",
+    "migrate_file_session_store",
     "SessionRecord",
     "RunRecord",
     "TranscriptRecord",
@@ -6,10 +6,9 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 from typing import Protocol as TypingProtocol
 
-from ..context import CompressionPolicy, ContextManager, ContextPartitions
+from ..context import CompressionPolicy, ContextManager, ContextPartitions, PartitionLayout
 from ..types import Message
 from ..types.handoff import HandoffArtifact
-from ..utils import count_messages_tokens
 from .task import RuntimeTask
 
 if TYPE_CHECKING:
@@ -26,6 +25,7 @@ class ContextMetrics:
     max_tokens: int
     should_renew: bool
     compression_strategy: str | None = None
+    stable_prefix_tokens: int = 0
 
 @dataclass(slots=True)
 class ContextSnapshot:
@@ -82,11 +82,17 @@ class ContextPolicy:
         continuity: Any | None = None,
         skill_injection: Any | None = None,
         knowledge_sources: list[Any] | None = None,
+        debug_token_accounting: bool = False,
+        model: Any = None,
+        layout: PartitionLayout = "priority",
     ) -> ManagedContextAdapter:
         manager = ContextManager(
             max_tokens=max_tokens,
             compression_policy=compression_policy,
             continuity_policy=continuity,
+            debug_token_accounting=debug_token_accounting,
+            model=model,
+            layout=layout,
         )
         adapter = ManagedContextAdapter(manager)
         if skill_injection is not None:
@@ -150,7 +156,7 @@ class ManagedContextAdapter:
         return messages
 
     def measure(self) -> ContextMetrics:
-        token_count = count_messages_tokens(self.manager.partitions.get_all_messages())
+        token_count = self.manager.token_count
         rho = token_count / self.manager.max_tokens
         return ContextMetrics(
             rho=rho,
@@ -158,6 +164,7 @@ class ManagedContextAdapter:
             max_tokens=self.manager.max_tokens,
             should_renew=rho >= 1.0,
             compression_strategy=self.manager.compressor.should_compress(rho),
+            stable_prefix_tokens=self.manager.stable_prefix_tokens,
         )
 
     def should_renew(self) -> bool:
@@ -179,14 +186,28 @@ class ManagedContextAdapter:
         self.manager.renew()
         return self.snapshot(metadata={"operation": "renew"})
 
-    def snapshot(self, *, metadata: dict[str, Any] | None = None) -> ContextSnapshot:
+    def snapshot(
+        self,
+        *,
+        metadata: dict[str, Any] | None = None,
+        fork: bool = False,
+    ) -> ContextSnapshot:
+        """Snapshot the live context; ``fork=True`` detaches it via a structural copy."""
+        partitions = self.manager.partitions
         return ContextSnapshot(
-            partitions=self.manager.partitions,
+            partitions=partitions.fork() if fork else partitions,
             metrics=self.measure(),
             handoff=self.manager.last_handoff,
             metadata=dict(metadata or {}),
         )
 
+    def fork(self) -> ManagedContextAdapter:
+        """Child context sharing unchanged partitions with this one."""
+        adapter = ManagedContextAdapter(self.manager.fork())
+        adapter._skill_injection = self._skill_injection
+        adapter._knowledge_sources = list(self._knowledge_sources)
+        return adapter
+
     def ingest_signal(
         self,
         signal: RuntimeSignal,
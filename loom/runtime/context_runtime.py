@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from typing import Any, cast
 
 from ..types import Message
+from ..utils import TokenCounter
+from .retrieval import RetrievalStats, gather_within_deadline, source_key
 
 MAX_EVIDENCE_PACKS = 10
 
@@ -20,13 +22,24 @@ class ContextRuntime:
         ecosystem_manager: Any,
         skill_injection_policy: Any,
         emit: Callable[..., None],
+        retrieval_stats: RetrievalStats | None = None,
+        token_counter: TokenCounter | None = None,
     ) -> None:
         self.context_manager = context_manager
         self.ecosystem_manager = ecosystem_manager
         self.skill_injection_policy = skill_injection_policy
         self.emit = emit
+        self.retrieval_stats = retrieval_stats or RetrievalStats()
+        self.token_counter = token_counter
 
-    def initialize_context(self, goal: str, instructions: str, context: dict[str, Any] | None) -> None:
+    def initialize_context(
+        self,
+        goal: str,
+        instructions: str,
+        context: dict[str, Any] | None,
+        *,
+        knowledge: bool = True,
+    ) -> None:
         partitions = self.context_manager.partitions
         if instructions:
             partitions.system.append(Message(role="system", content=instructions))
@@ -35,23 +48,66 @@ class ContextRuntime:
         if context:
             context_str = "\n".join(f"{k}: {v}" for k, v in context.items())
             partitions.memory.append(Message(role="system", content=f"Context:\n{context_str}"))
-        self.inject_knowledge(goal, context)
+        if knowledge:
+            self.inject_knowledge(goal, context)
         self.inject_runtime_skills(goal, context)
 
     def inject_knowledge(self, goal: str, _context: dict[str, Any] | None) -> None:
-        sources = getattr(self.context_manager, "_knowledge_sources", None)
+        sources = self.knowledge_sources()
         if not sources:
             return
 
-        from ..config import KnowledgeQuery, KnowledgeSource
+        from ..config import KnowledgeQuery
 
         query = KnowledgeQuery(text=goal, goal=goal)
+        self.apply_knowledge(goal, [(source, source.resolve(query)) for source in sources])
+
+    async def ainject_knowledge(
+        self,
+        goal: str,
+        _context: dict[str, Any] | None,
+        *,
+        deadline: float | None = None,
+    ) -> int:
+        """Resolve every knowledge source concurrently within ``deadline`` seconds."""
+        sources = self.knowledge_sources()
+        if not sources:
+            return 0
+
+        from ..config import KnowledgeQuery
+
+        query = KnowledgeQuery(text=goal, goal=goal)
+
+        def _resolve(source: Any) -> Callable[[], Awaitable[Any]]:
+            async def _call() -> Any:
+                return await source.aresolve(query)
+
+            return _call
+
+        results = await gather_within_deadline(
+            [(source_key("knowledge", source), _resolve(source)) for source in sources],
+            deadline=deadline,
+            stats=self.retrieval_stats,
+        )
+        # 超时或失败的数据源不阻塞其余来源的结果
+        resolved = [
+            (source, evidence)
+            for source, evidence in zip(sources, results, strict=True)
+            if evidence is not None
+        ]
+        return self.apply_knowledge(goal, resolved)
+
+    def knowledge_sources(self) -> list[Any]:
+        from ..config import KnowledgeSource
+
+        sources = getattr(self.context_manager, "_knowledge_sources", None) or []
+        return [source for source in sources if isinstance(source, KnowledgeSource)]
+
+    def apply_knowledge(self, goal: str, resolved: list[tuple[Any, Any]]) -> int:
+        """Merge resolved evidence into the dashboard knowledge surface."""
         total_items = 0
         self.context_manager.dashboard.add_question(goal)
-        for source in sources:
-            if not isinstance(source, KnowledgeSource):
-                continue
-            evidence = source.resolve(query)
+        for source, evidence in resolved:
             for item in evidence.items:
                 self.context_manager.dashboard.add_evidence(
                     {
@@ -76,7 +132,8 @@ class ContextRuntime:
                     )
         if total_items:
             self.evict_knowledge_overflow()
-            self.emit("knowledge_injected", sources=len(sources), items=total_items)
+            self.emit("knowledge_injected", sources=len(resolved), items=total_items)
+        return total_items
 
     def evict_knowledge_overflow(self, max_packs: int = MAX_EVIDENCE_PACKS) -> None:
         packs = self.context_manager.dashboard.dashboard.knowledge_surface.evidence_packs
@@ -85,6 +142,7 @@ class ContextRuntime:
         packs.sort(key=lambda pack: pack.get("score") or 0.0, reverse=True)
         evicted = packs[max_packs:]
         del packs[max_packs:]
+        self.context_manager.dashboard.dashboard.touch()
         self.emit("knowledge_evicted", count=len(evicted))
 
     def inject_runtime_skills(self, goal: str, context: dict[str, Any] | None) -> None:
@@ -101,8 +159,9 @@ class ContextRuntime:
             goal=goal,
             context=context,
         )
-        rendered = policy.render(selected)
+        rendered = policy.render(selected, counter=self.token_counter)
         self.context_manager.partitions.skill.extend(rendered)
+        self.context_manager.partitions.touch_skills()
         if rendered:
             self.emit(
                 "skills_injected",
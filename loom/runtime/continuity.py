@@ -8,7 +8,7 @@ from typing import TYPE_CHECKING, Any
 from .task import RuntimeTask
 
 if TYPE_CHECKING:
-    from ..context import ContextPartitions
+    from ..context import ContextPartitions, ContextRenewer
     from ..types.handoff import HandoffArtifact
 
 
@@ -35,7 +35,13 @@ class ContinuityPolicy:
         task: RuntimeTask | str,
         *,
         sprint: int = 0,
+        renewer: ContextRenewer | None = None,
     ) -> ContinuityResult:
+        """Renew ``context`` for ``task``.
+
+        ``renewer`` is the caller's session-scoped renewer; policies that
+        snapshot context should write through it.
+        """
         raise NotImplementedError
 
 
@@ -48,11 +54,12 @@ class HandoffContinuityPolicy(ContinuityPolicy):
         task: RuntimeTask | str,
         *,
         sprint: int = 0,
+        renewer: ContextRenewer | None = None,
     ) -> ContinuityResult:
         from ..context.renewal import ContextRenewer
 
         normalized = RuntimeTask.from_input(task)
-        renewed_context, artifact = ContextRenewer().renew(
+        renewed_context, artifact = (renewer or ContextRenewer()).renew(
             context,
             normalized.goal,
             sprint=sprint,
@@ -12,6 +12,7 @@
 import logging
 import threading
 from collections.abc import AsyncGenerator, Callable
+from contextlib import aclosing
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
@@ -29,7 +30,9 @@ from ..runtime.heartbeat import Heartbeat, HeartbeatConfig
 from ..runtime.loop_runner import LoopDone, LoopRunner, LoopStreamEvent, RuntimeServices
 from ..runtime.mcp_tool_registrar import MCPToolRegistrar
 from ..runtime.memory_runtime import MemoryRuntime
+from ..runtime.prefetch import PrefetchRuntime
 from ..runtime.provider_runtime import ProviderRuntime
+from ..runtime.retrieval import RetrievalStats
 from ..runtime.run_lifecycle import RunLifecycleRuntime
 from ..runtime.signal_runtime import SignalRuntime
 from ..runtime.signals import (
@@ -45,6 +48,7 @@ from ..tools.executor import ToolExecutor
 from ..tools.governance import ToolGovernance
 from ..tools.registry import ToolRegistry
 from ..tools.schema import Tool
+from ..utils import get_tokenizer
 
 if TYPE_CHECKING:
     from ..ecosystem.integration import EcosystemManager
@@ -59,8 +63,15 @@ class EngineConfig:
     max_iterations: int = 100
     max_tokens: int = 200000
     model: str = "claude-3-5-sonnet-20241022"
+    tokenizer: Any | None = None  # Tokenizer / family / Model；None 时按 model 解析
     temperature: float = 0.7
     completion_max_tokens: int = 4096
+    max_tool_concurrency: int = 1
+    speculative_tools: bool = False
+    pipelined_prefetch: bool = False
+    prefetch_timeout: float = 2.0
+    prefetch_source_timeouts: dict[str, float] = field(default_factory=dict)
+    retrieval_deadline: float | None = None
     compression_policy: CompressionPolicy | None = None
     enable_heartbeat: bool = False
     enable_safety: bool = True
@@ -97,6 +108,7 @@ class AgentEngine:
             max_tokens=self.config.max_tokens,
             compression_policy=self.config.compression_policy,
             continuity=self.config.continuity_policy,
+            model=self.config.tokenizer or self.config.model,
         )
         self.context_manager = self.context_protocol
         self.memory_store: MemoryStore = InMemoryStore()
@@ -135,6 +147,8 @@ class AgentEngine:
             tool_governance=self.tool_governance,
             permission_manager=self.permission_manager,
             veto_authority=self.veto_authority,
+            max_concurrency=self.config.max_tool_concurrency,
+            speculative=self.config.speculative_tools,
         )
         # Ecosystem: MCP + plugins
         self.ecosystem_manager: "EcosystemManager | None" = ecosystem_manager
@@ -150,17 +164,33 @@ class AgentEngine:
         )
         self.feedback_policy = self.config.feedback_policy or FeedbackPolicy.none()
         self.feedback_policy.attach(self)
+        self.retrieval_stats = RetrievalStats()
         self.context_runtime = ContextRuntime(
             context_manager=self.context_manager,
             ecosystem_manager=self.ecosystem_manager,
             skill_injection_policy=self.skill_injection_policy,
             emit=self.emit,
+            retrieval_stats=self.retrieval_stats,
+            token_counter=get_tokenizer(self.config.tokenizer or self.config.model),
         )
         self.memory_runtime = MemoryRuntime(
             context_manager=self.context_manager,
             memory_store=self.memory_store,
             memory_providers=self.memory_providers,
             semantic_memory=self.semantic_memory,
+            retrieval_stats=self.retrieval_stats,
+        )
+        self.prefetch_runtime: PrefetchRuntime | None = (
+            PrefetchRuntime(
+                memory_runtime=self.memory_runtime,
+                context_runtime=self.context_runtime,
+                emit=self.emit,
+                timeout=self.config.prefetch_timeout,
+                source_timeouts=self.config.prefetch_source_timeouts,
+                stats=self.retrieval_stats,
+            )
+            if self.config.pipelined_prefetch
+            else None
         )
         self.provider_runtime = ProviderRuntime(
             provider=self.provider,
@@ -240,7 +270,7 @@ class AgentEngine:
             Execution result with output, artifacts, events
         """
         self._refresh_runtime_wiring()
-        prepared = self.run_lifecycle.prepare(
+        prepared = await self.run_lifecycle.aprepare(
             goal=goal,
             instructions=instructions,
             context=context,
@@ -292,7 +322,7 @@ class AgentEngine:
         from ..types.stream import ErrorEvent
 
         self._refresh_runtime_wiring()
-        prepared = self.run_lifecycle.prepare(
+        prepared = await self.run_lifecycle.aprepare(
             goal=goal,
             instructions=instructions,
             context=context,
@@ -303,19 +333,20 @@ class AgentEngine:
             final_output = ""
             from ..types.stream import DoneEvent
 
-            async for item in self.loop_runner.run_loop_core(goal, stream=True):
-                if isinstance(item, LoopStreamEvent):
-                    event = item.event
-                    yield event
-                    if getattr(event, "type", "") == "done":
-                        final_output = str(getattr(event, "output", ""))
-                elif isinstance(item, LoopDone):
-                    final_output = item.output
-                    yield DoneEvent(
-                        output=item.output,
-                        iterations=item.iterations,
-                        status=item.status,
-                    )
+            async with aclosing(self.loop_runner.run_loop_core(goal, stream=True)) as items:
+                async for item in items:
+                    if isinstance(item, LoopStreamEvent):
+                        event = item.event
+                        yield event
+                        if getattr(event, "type", "") == "done":
+                            final_output = str(getattr(event, "output", ""))
+                    elif isinstance(item, LoopDone):
+                        final_output = item.output
+                        yield DoneEvent(
+                            output=item.output,
+                            iterations=item.iterations,
+                            status=item.status,
+                        )
 
             self._refresh_runtime_wiring()
             self.run_lifecycle.finalize_success(prepared, final_output)
@@ -376,6 +407,10 @@ class AgentEngine:
             parse_tool_calls=self.tool_runtime.parse_tool_calls,
             execute_tools=self.tool_runtime.execute_tools,
             emit=self.emit,
+            speculate_tool=self.tool_runtime.speculate,
+            discard_speculative_tools=self.tool_runtime.discard_speculative,
+            schedule_prefetch=self.prefetch_runtime.schedule if self.prefetch_runtime else None,
+            apply_prefetch=self.prefetch_runtime.apply_ready if self.prefetch_runtime else None,
         )
 
     def _build_run_lifecycle(self) -> RunLifecycleRuntime:
@@ -390,4 +425,6 @@ class AgentEngine:
             memory_enabled=lambda: self.config.enable_memory,
             drain_signals=self.signal_runtime.drain_signals,
             heartbeat_handler=self.signal_runtime.handle_heartbeat_event,
+            prefetch=self.prefetch_runtime,
+            retrieval_deadline=self.config.retrieval_deadline,
         )
@@ -2,11 +2,14 @@
 
 from collections.abc import Callable
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from ..context import ContextPartitions
 from ..types import LoopState
 
+if TYPE_CHECKING:
+    from ..context import ContextRenewer
+
 
 @dataclass
 class LoopConfig:
@@ -20,8 +23,9 @@ class LoopConfig:
 class AgentLoop:
     """L* main execution loop"""
 
-    def __init__(self, config: LoopConfig):
+    def __init__(self, config: LoopConfig, renewer: "ContextRenewer | None" = None):
         self.config = config
+        self.renewer = renewer
         self.state = LoopState.REASON
         self.iteration = 0
 
@@ -76,9 +80,11 @@ class AgentLoop:
 
             # Renew: 压缩重建 C
             elif self.state == LoopState.RENEW:
-                from ..context import ContextRenewer
+                renewer = self.renewer
+                if renewer is None:
+                    from ..context import ContextRenewer
 
-                renewer = ContextRenewer()
+                    renewer = ContextRenewer()
                 context, _ = renewer.renew(context, goal)
                 self.state = LoopState.REASON
 
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 from collections.abc import AsyncGenerator, Callable
+from contextlib import aclosing
 from dataclasses import dataclass
 from typing import Any
 
@@ -53,6 +54,10 @@ class RuntimeServices:
     parse_tool_calls: Callable[[dict[str, Any]], list[ToolCall]]
     execute_tools: Callable[[list[ToolCall]], Any]
     emit: Callable[..., int]
+    speculate_tool: Callable[[ToolCall], bool] | None = None
+    discard_speculative_tools: Callable[[], int] | None = None
+    schedule_prefetch: Callable[[str], int] | None = None
+    apply_prefetch: Callable[[], int] | None = None
 
 
 class LoopRunner:
@@ -101,12 +106,31 @@ class LoopRunner:
         *,
         stream: bool,
         token_callback: Callable[[str], Any] | None = None,
+    ) -> AsyncGenerator[Any, None]:
+        try:
+            async with aclosing(
+                self._iterate(goal, stream=stream, token_callback=token_callback)
+            ) as items:
+                async for item in items:
+                    yield item
+        finally:
+            # 运行被取消或生成器提前关闭（CancelledError / GeneratorExit）时，
+            # 仍在进行的投机工具调用不能遗留
+            self._discard_speculative_tools()
+
+    async def _iterate(
+        self,
+        goal: str,
+        *,
+        stream: bool,
+        token_callback: Callable[[str], Any] | None,
     ) -> AsyncGenerator[Any, None]:
         loop = AgentLoop(
             LoopConfig(
                 max_iterations=self.services.max_iterations(),
                 rho_threshold=1.0,
-            )
+            ),
+            renewer=self.services.context_manager.renewer,
         )
 
         iteration = 0
@@ -126,6 +150,10 @@ class LoopRunner:
                 messages = self.services.build_messages(goal)
                 yield LoopTrace({"type": "signals.ingested", "iteration": iteration})
 
+            if self.services.apply_prefetch is not None and self.services.apply_prefetch():
+                messages = self.services.build_messages(goal)
+                yield LoopTrace({"type": "prefetch.applied", "iteration": iteration})
+
             rho = self.services.context_manager.rho
             self.services.context_manager.dashboard.update_rho(rho)
 
@@ -176,14 +204,16 @@ class LoopRunner:
                             if isinstance(event, TextDelta):
                                 text_parts.append(event.delta)
                             elif isinstance(event, ToolCallEvent):
-                                tool_calls_seen.append(
-                                    ToolCall(
-                                        id=event.id,
-                                        name=event.name,
-                                        arguments=event.arguments,
-                                    )
+                                call = ToolCall(
+                                    id=event.id,
+                                    name=event.name,
+                                    arguments=event.arguments,
                                 )
+                                tool_calls_seen.append(call)
+                                if self.services.speculate_tool is not None:
+                                    self.services.speculate_tool(call)
                     except Exception as exc:
+                        self._discard_speculative_tools()
                         yield LoopStreamEvent(ErrorEvent(message=str(exc)))
                         self.services.emit(
                             "after_llm",
@@ -226,6 +256,7 @@ class LoopRunner:
                         }
                     )
                 else:
+                    self._discard_speculative_tools()
                     output = str(response.get("content", "")).strip()
                     _append(Message(role="assistant", content=output))
                     if output.lower().startswith("error:"):
@@ -236,6 +267,9 @@ class LoopRunner:
 
             elif loop.state == LoopState.ACT:
                 last_message = messages[-1]
+                if self.services.schedule_prefetch is not None:
+                    # 下一轮的记忆/知识检索与工具执行并发进行
+                    self.services.schedule_prefetch(_prefetch_query(goal, last_message))
                 tool_results: list[ToolResult] = await self.services.execute_tools(
                     last_message.tool_calls
                 )
@@ -305,3 +339,18 @@ class LoopRunner:
 
         output = str(messages[-1].content) if messages else "Max iterations reached"
         yield LoopDone("max_iterations", output, iteration)
+
+    def _discard_speculative_tools(self) -> None:
+        if self.services.discard_speculative_tools is not None:
+            self.services.discard_speculative_tools()
+
+
+def _prefetch_query(goal: str, message: Message) -> str:
+    """Goal plus what the model is about to do, so recall follows the task."""
+    parts = [goal]
+    if isinstance(message.content, str) and message.content.strip():
+        parts.append(message.content.strip())
+    for call in message.tool_calls:
+        args = " ".join(str(value) for value in call.arguments.values() if isinstance(value, str))
+        parts.append(f"{call.name} {args}".strip())
+    return "\n".join(parts)
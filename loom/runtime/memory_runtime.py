@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import inspect
 import logging
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from ..memory.semantic import MemoryEntry, SemanticMemory
 from ..types import Message
+from ..utils.aio import call_maybe_async, run_sync
+from .retrieval import RetrievalStats, gather_within_deadline, source_key
 
 logger = logging.getLogger(__name__)
 
@@ -21,11 +25,13 @@ class MemoryRuntime:
         memory_store: Any,
         memory_providers: list[Any],
         semantic_memory: SemanticMemory | None,
+        retrieval_stats: RetrievalStats | None = None,
     ) -> None:
         self.context_manager = context_manager
         self.memory_store = memory_store
         self.memory_providers = memory_providers
         self.semantic_memory = semantic_memory
+        self.retrieval_stats = retrieval_stats or RetrievalStats()
 
     def load_session_memory(self, session_id: str) -> None:
         memory_data = self.memory_store.load(session_id)
@@ -66,21 +72,96 @@ class MemoryRuntime:
         return "\n\n".join(blocks)
 
     def inject_provider_memories(self, goal: str, session_id: str | None) -> None:
-        for provider in self.memory_providers:
-            if not self._is_memory_provider_available(provider):
-                continue
-            try:
-                recalled = provider.prefetch(goal, session_id=session_id)
-            except Exception as exc:
-                self._log_memory_provider_error(provider, "prefetch", exc)
-                continue
-            if recalled.strip():
-                self.context_manager.partitions.memory.append(
-                    Message(
-                        role="system",
-                        content=f"[memory:{self._memory_provider_name(provider)}] {recalled}",
-                    )
-                )
+        for provider in self.available_memory_providers():
+            recalled = self.prefetch_provider_memory(provider, goal, session_id)
+            self.apply_provider_memory(provider, recalled)
+
+    async def ainject_provider_memories(
+        self,
+        goal: str,
+        session_id: str | None,
+        *,
+        deadline: float | None = None,
+    ) -> int:
+        """Prefetch from every provider concurrently; providers past ``deadline`` are skipped."""
+        providers = self.available_memory_providers()
+
+        def _recall(provider: Any) -> Callable[[], Awaitable[str]]:
+            async def _call() -> str:
+                return await self.aprefetch_provider_memory(provider, goal, session_id)
+
+            return _call
+
+        results = await gather_within_deadline(
+            [(source_key("memory", provider), _recall(provider)) for provider in providers],
+            deadline=deadline,
+            stats=self.retrieval_stats,
+        )
+        applied = 0
+        for provider, recalled in zip(providers, results, strict=True):
+            if recalled is not None:
+                applied += int(self.apply_provider_memory(provider, recalled))
+        return applied
+
+    def available_memory_providers(self) -> list[Any]:
+        return [p for p in self.memory_providers if self._is_memory_provider_available(p)]
+
+    def prefetch_provider_memory(self, provider: Any, goal: str, session_id: str | None) -> str:
+        """Fetch one provider's recall without touching the context (thread-safe)."""
+        try:
+            recalled = provider.prefetch(goal, session_id=session_id)
+            if inspect.isawaitable(recalled):
+                recalled = run_sync(recalled)
+            return str(recalled or "")
+        except Exception as exc:
+            self._log_memory_provider_error(provider, "prefetch", exc)
+            return ""
+
+    async def aprefetch_provider_memory(
+        self,
+        provider: Any,
+        goal: str,
+        session_id: str | None,
+    ) -> str:
+        """Async recall: prefers ``aprefetch``; sync ``prefetch`` runs in a worker thread."""
+        try:
+            fn = getattr(provider, "aprefetch", None) or provider.prefetch
+            recalled = await call_maybe_async(fn, goal, session_id=session_id)
+            return str(recalled or "")
+        except Exception as exc:
+            self._log_memory_provider_error(provider, "prefetch", exc)
+            return ""
+
+    def apply_provider_memory(self, provider: Any, recalled: str) -> bool:
+        """Set ``provider``'s recall message in C_memory.
+
+        Each provider owns one ``[memory:<name>]`` message that a new recall
+        replaces, so pipelined prefetch keeps C_memory bounded instead of
+        appending one message per iteration.  A recall with the same content
+        leaves the message (and the ``cache_stable`` prompt prefix) untouched.
+        """
+        recalled = recalled.strip()
+        if not recalled:
+            return False
+        tag = f"[memory:{self._memory_provider_name(provider)}] "
+        content = f"{tag}{recalled}"
+        partitions = self.context_manager.partitions
+        memory = partitions.memory
+        owned = [
+            index
+            for index, msg in enumerate(memory)
+            if isinstance(msg.content, str) and msg.content.startswith(tag)
+        ]
+        if not owned:
+            memory.append(Message(role="system", content=content))
+            return True
+        if len(owned) == 1 and memory[owned[0]].content == content:
+            return False
+        # 换成新列表：TokenLedger 通过列表身份识别非追加式修改
+        updated = [msg for index, msg in enumerate(memory) if index not in owned[1:]]
+        updated[owned[0]] = Message(role="system", content=content)
+        partitions.memory = updated
+        return True
 
     def sync_memory_providers(
         self,
@@ -0,0 +1,218 @@
+"""Pipelined memory/knowledge prefetch for the next loop iteration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass, field
+from typing import Any
+
+from .retrieval import RetrievalStats
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _PendingFetch:
+    kind: str  # "memory" | "knowledge"
+    name: str
+    source: Any
+    future: Future[Any]
+    started: float
+    deadline: float
+
+
+@dataclass(slots=True)
+class PrefetchStats:
+    """Counters exposed for tracing and tests."""
+
+    scheduled: int = 0
+    applied: int = 0
+    timeouts: dict[str, int] = field(default_factory=dict)
+
+
+class PrefetchRuntime:
+    """Runs provider-memory and knowledge retrieval off the critical path.
+
+    Every source is fetched in a worker thread with its own timeout.  Results
+    are only applied to the context on the loop thread via :meth:`apply_ready`,
+    so anything that finishes while the current iteration is rendering lands
+    in the next iteration's render instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory_runtime: Any,
+        context_runtime: Any,
+        emit: Callable[..., Any],
+        timeout: float = 2.0,
+        source_timeouts: dict[str, float] | None = None,
+        max_workers: int = 4,
+        stats: RetrievalStats | None = None,
+    ) -> None:
+        self.memory_runtime = memory_runtime
+        self.context_runtime = context_runtime
+        self.emit = emit
+        self.timeout = timeout
+        self.source_timeouts = dict(source_timeouts or {})
+        self.max_workers = max_workers
+        self.stats = PrefetchStats()
+        self.retrieval_stats = stats or RetrievalStats()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: list[_PendingFetch] = []
+        self._goal = ""
+        self._session_id: str | None = None
+
+    def start_run(self, goal: str, session_id: str | None) -> int:
+        """Reset per-run state and schedule the first round for ``goal``."""
+        self.cancel()
+        self._goal = goal
+        self._session_id = session_id
+        return self.schedule(goal)
+
+    def schedule(self, query: str) -> int:
+        """Start one fetch per source; sources still in flight are skipped."""
+        busy = {(item.kind, id(item.source)) for item in self._pending}
+        scheduled = 0
+        for provider in self.memory_runtime.available_memory_providers():
+            if ("memory", id(provider)) in busy:
+                continue
+            name = str(getattr(provider, "name", type(provider).__name__))
+            self._submit(
+                "memory",
+                name,
+                provider,
+                self.memory_runtime.prefetch_provider_memory,
+                provider,
+                query,
+                self._session_id,
+            )
+            scheduled += 1
+
+        sources = self.context_runtime.knowledge_sources()
+        if sources:
+            from ..config import KnowledgeQuery
+
+            knowledge_query = KnowledgeQuery(text=query, goal=self._goal or query)
+            for source in sources:
+                if ("knowledge", id(source)) in busy:
+                    continue
+                self._submit("knowledge", source.name, source, source.resolve, knowledge_query)
+                scheduled += 1
+        self.stats.scheduled += scheduled
+        return scheduled
+
+    def wait(self) -> int:
+        """Block until every pending fetch finishes or hits its timeout, then apply."""
+        for item in sorted(self._pending, key=lambda pending: pending.deadline):
+            remaining = item.deadline - time.monotonic()
+            wait_futures([item.future], timeout=max(remaining, 0.0))
+        return self.apply_ready()
+
+    async def await_ready(self, deadline: float | None = None) -> int:
+        """Async :meth:`wait`: yields to the event loop instead of blocking it.
+
+        ``deadline`` (seconds) caps the whole wait on top of each source's own
+        timeout; anything still running afterwards lands in a later apply.
+        """
+        if self._pending:
+            now = time.monotonic()
+            limit = max(item.deadline for item in self._pending) - now
+            if deadline is not None:
+                limit = min(limit, deadline)
+            waiters = [asyncio.wrap_future(item.future) for item in self._pending]
+            _, unfinished = await asyncio.wait(waiters, timeout=max(limit, 0.0))
+            for waiter in unfinished:
+                # 不取消包装 future（会连带取消线程池任务），只回收其结果
+                waiter.add_done_callback(_consume_result)
+        return self.apply_ready()
+
+    def apply_ready(self) -> int:
+        """Apply completed results to the context; drop fetches past their deadline."""
+        now = time.monotonic()
+        still_pending: list[_PendingFetch] = []
+        resolved: list[tuple[Any, Any]] = []
+        applied = 0
+        for item in self._pending:
+            key = f"{item.kind}:{item.name}"
+            if item.future.done():
+                # 延迟按应用时刻计，包含等待下一次 apply 的时间
+                latency = now - item.started
+                try:
+                    value = item.future.result()
+                except Exception as exc:
+                    logger.warning("Prefetch %s failed: %s", key, exc)
+                    self.retrieval_stats.record(key, latency, error=True)
+                    continue
+                self.retrieval_stats.record(key, latency)
+                if item.kind == "memory":
+                    applied += int(self.memory_runtime.apply_provider_memory(item.source, value))
+                else:
+                    resolved.append((item.source, value))
+            elif now >= item.deadline:
+                item.future.cancel()
+                self.stats.timeouts[key] = self.stats.timeouts.get(key, 0) + 1
+                self.retrieval_stats.record(key, 0.0, timed_out=True)
+                self.emit("prefetch_timeout", kind=item.kind, source=item.name)
+            else:
+                still_pending.append(item)
+        self._pending = still_pending
+        if resolved:
+            applied += int(self.context_runtime.apply_knowledge(self._goal, resolved) > 0)
+        if applied:
+            self.stats.applied += applied
+            self.emit("prefetch_applied", count=applied)
+        return applied
+
+    def cancel(self) -> None:
+        """Abandon in-flight fetches (threads already running finish in the background)."""
+        for item in self._pending:
+            item.future.cancel()
+        self._pending = []
+
+    def close(self) -> None:
+        """Cancel pending fetches and shut the worker pool down; it is rebuilt on demand."""
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _submit(
+        self,
+        kind: str,
+        name: str,
+        source: Any,
+        fn: Callable[..., Any],
+        *args: Any,
+    ) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="loom-prefetch",
+            )
+        timeout = self.source_timeouts.get(name, self.timeout)
+        started = time.monotonic()
+        self._pending.append(
+            _PendingFetch(
+                kind=kind,
+                name=name,
+                source=source,
+                future=self._executor.submit(fn, *args),
+                started=started,
+                deadline=started + timeout,
+            )
+        )
+
+
+def _consume_result(future: asyncio.Future[Any]) -> None:
+    if not future.cancelled():
+        future.exception()
@@ -31,25 +31,45 @@ class ProviderRuntime:
         self.emit = emit
         self.current_iteration = current_iteration
         self.build_provider_tools = build_provider_tools
+        self._message_cache: dict[int, tuple[Message, Any, dict[str, Any]]] = {}
 
     def to_provider_messages(self, messages: list[Message]) -> list[dict[str, Any]]:
-        return [
-            {
-                "role": msg.role,
-                "content": msg.content,
-                "tool_calls": [
-                    {
-                        "id": tc.id,
-                        "name": tc.name,
-                        "arguments": tc.arguments,
-                    }
-                    for tc in msg.tool_calls
-                ],
-                "tool_call_id": msg.tool_call_id,
-                "name": msg.name,
-            }
-            for msg in messages
-        ]
+        """Convert runtime messages, reusing the dict of every message already seen.
+
+        History messages are immutable once appended, so each iteration only
+        builds dicts for newly appended messages.  The returned dicts are
+        shared across requests and must be treated as read-only.
+        """
+        previous = self._message_cache
+        cache: dict[int, tuple[Message, Any, dict[str, Any]]] = {}
+        converted: list[dict[str, Any]] = []
+        for msg in messages:
+            key = id(msg)
+            entry = previous.get(key)
+            if entry is None or entry[0] is not msg or entry[1] is not msg.content:
+                entry = (msg, msg.content, self._to_provider_message(msg))
+            cache[key] = entry
+            converted.append(entry[2])
+        # 只保留本次请求仍在使用的消息，压缩/续期丢弃的消息随之释放
+        self._message_cache = cache
+        return converted
+
+    @staticmethod
+    def _to_provider_message(msg: Message) -> dict[str, Any]:
+        return {
+            "role": msg.role,
+            "content": msg.content,
+            "tool_calls": [
+                {
+                    "id": tc.id,
+                    "name": tc.name,
+                    "arguments": tc.arguments,
+                }
+                for tc in msg.tool_calls
+            ],
+            "tool_call_id": msg.tool_call_id,
+            "name": msg.name,
+        }
 
     async def call_llm(
         self,
@@ -137,12 +157,39 @@ class ProviderRuntime:
     def build_completion_request(self, messages: list[Message]) -> CompletionRequest:
         provider_messages = self.to_provider_messages(messages)
         params = self.build_completion_params()
-        return CompletionRequest.create(
-            provider_messages,
-            params,
-            metadata={
-                "goal": self.context_manager.current_goal,
-                "iteration": self.current_iteration(),
-                "tool_count": len(params.tools),
-            },
-        )
+        metadata: dict[str, Any] = {
+            "goal": self.context_manager.current_goal,
+            "iteration": self.current_iteration(),
+            "tool_count": len(params.tools),
+        }
+        breakpoints = self.cache_breakpoints(messages)
+        if breakpoints:
+            metadata["cache_breakpoints"] = breakpoints
+        return CompletionRequest.create(provider_messages, params, metadata=metadata)
+
+    def cache_breakpoints(self, messages: list[Message]) -> dict[str, int]:
+        """Stable prompt boundaries, as message counts, for provider prefix caching.
+
+        ``system`` is the number of leading stable system messages (C_system,
+        plus C_memory and C_skill in the ``cache_stable`` layout); ``history``
+        is the end of the last C_history message.  Both prefixes only grow by
+        appending between iterations, so providers can place cache
+        breakpoints there.
+        """
+        partitions = getattr(self.context_manager, "partitions", None)
+        if partitions is None:
+            return {}
+        boundaries: dict[str, int] = {}
+        system = partitions.stable_system_messages()
+        stable = 0
+        while stable < min(len(system), len(messages)) and messages[stable] is system[stable]:
+            stable += 1
+        boundaries["system"] = stable
+        if partitions.history:
+            last = partitions.history[-1]
+            # 末尾可能还有 render 追加的目标消息，从后往前找最后一条历史消息
+            for index in range(len(messages) - 1, stable - 1, -1):
+                if messages[index] is last:
+                    boundaries["history"] = index + 1
+                    break
+        return boundaries
@@ -0,0 +1,122 @@
+"""Deadline-bounded concurrent retrieval for knowledge sources and memory providers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class SourceStats:
+    """Latency and outcome counters for one retrieval source."""
+
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    last_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        completed = self.calls - self.timeouts
+        return self.total_latency / completed if completed > 0 else 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "mean_latency": self.mean_latency,
+            "last_latency": self.last_latency,
+            "max_latency": self.max_latency,
+        }
+
+
+@dataclass
+class RetrievalStats:
+    """Per-source retrieval metrics keyed as ``"<kind>:<name>"``."""
+
+    sources: dict[str, SourceStats] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(
+        self,
+        key: str,
+        latency: float,
+        *,
+        timed_out: bool = False,
+        error: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self.sources.setdefault(key, SourceStats())
+            stats.calls += 1
+            if timed_out:
+                stats.timeouts += 1
+                return
+            stats.errors += int(error)
+            stats.total_latency += latency
+            stats.last_latency = latency
+            stats.max_latency = max(stats.max_latency, latency)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {key: stats.to_dict() for key, stats in self.sources.items()}
+
+
+async def gather_within_deadline(
+    calls: list[tuple[str, Callable[[], Awaitable[T]]]],
+    *,
+    deadline: float | None,
+    stats: RetrievalStats | None = None,
+) -> list[T | None]:
+    """Run every call concurrently and return results in input order.
+
+    Calls that raise or are still running when ``deadline`` (seconds, total)
+    expires yield ``None``; unfinished calls are cancelled.  Sync handlers
+    wrapped with :func:`loom.utils.aio.call_maybe_async` keep running in their
+    worker thread, but their late results are ignored.
+    """
+    if not calls:
+        return []
+
+    started = time.monotonic()
+    latencies: dict[int, float] = {}
+
+    async def _timed(index: int, factory: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await factory()
+        finally:
+            latencies[index] = time.monotonic() - started
+
+    tasks = [asyncio.ensure_future(_timed(i, factory)) for i, (_key, factory) in enumerate(calls)]
+    await asyncio.wait(tasks, timeout=deadline)
+
+    results: list[T | None] = []
+    for index, ((key, _factory), task) in enumerate(zip(calls, tasks, strict=True)):
+        if not task.done():
+            task.cancel()
+            logger.warning("Retrieval source %s exceeded the %.2fs deadline", key, deadline)
+            if stats is not None:
+                stats.record(key, 0.0, timed_out=True)
+            results.append(None)
+            continue
+        error = task.exception()
+        if error is not None:
+            logger.warning("Retrieval source %s failed: %s", key, error)
+        if stats is not None:
+            stats.record(key, latencies.get(index, 0.0), error=error is not None)
+        results.append(None if error is not None else task.result())
+    return results
+
+
+def source_key(kind: str, source: Any) -> str:
+    return f"{kind}:{getattr(source, 'name', None) or type(source).__name__}"
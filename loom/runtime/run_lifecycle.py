@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
@@ -32,6 +33,8 @@ class RunLifecycleRuntime:
         memory_enabled: Callable[[], bool],
         drain_signals: Callable[[], Any],
         heartbeat_handler: Callable[[dict[str, Any], str], Any],
+        prefetch: Any | None = None,
+        retrieval_deadline: float | None = None,
     ) -> None:
         self.config = config
         self.context_manager = context_manager
@@ -42,6 +45,8 @@ class RunLifecycleRuntime:
         self.memory_enabled = memory_enabled
         self.drain_signals = drain_signals
         self.heartbeat_handler = heartbeat_handler
+        self.prefetch = prefetch
+        self.retrieval_deadline = retrieval_deadline
 
     def prepare(
         self,
@@ -51,11 +56,17 @@ class RunLifecycleRuntime:
         context: dict[str, Any] | None,
         session_id: str | None,
         history: list[dict[str, Any]] | None,
+        retrieval: bool = True,
     ) -> PreparedRun:
         instructions = self._merge_system_prompt_additions(instructions)
+        inline_retrieval = retrieval and self.prefetch is None
 
         self.context_manager.current_goal = goal
-        self.context_runtime.initialize_context(goal, instructions, context)
+        if inline_retrieval:
+            self.context_runtime.initialize_context(goal, instructions, context)
+        else:
+            # 知识检索交给预取阶段或 aprepare，与 provider 记忆并发执行
+            self.context_runtime.initialize_context(goal, instructions, context, knowledge=False)
         self.context_runtime.inject_session_history(history)
         self.drain_signals()
 
@@ -64,7 +75,14 @@ class RunLifecycleRuntime:
 
         if self.memory_runtime.semantic_memory is not None:
             self.memory_runtime.inject_semantic_memories(goal)
-        self.memory_runtime.inject_provider_memories(goal, session_id)
+        if inline_retrieval:
+            self.memory_runtime.inject_provider_memories(goal, session_id)
+        elif self.prefetch is not None:
+            # 首轮按各数据源的超时并发等待，超时未返回的结果落到后续迭代；
+            # aprepare 在事件循环上异步等待
+            self.prefetch.start_run(goal, session_id)
+            if retrieval:
+                self.prefetch.wait()
 
         if self.heartbeat:
             self.heartbeat.start(self.heartbeat_handler)
@@ -76,6 +94,43 @@ class RunLifecycleRuntime:
             session_id=session_id,
         )
 
+    async def aprepare(
+        self,
+        *,
+        goal: str,
+        instructions: str,
+        context: dict[str, Any] | None,
+        session_id: str | None,
+        history: list[dict[str, Any]] | None,
+    ) -> PreparedRun:
+        """Async :meth:`prepare`: knowledge and memory sources resolve concurrently.
+
+        Every source shares one ``retrieval_deadline``; sources that miss it are
+        skipped for this run instead of stalling it.  With pipelined prefetch
+        the first round is awaited without blocking the event loop, and late
+        results land in a later iteration.
+        """
+        prepared = self.prepare(
+            goal=goal,
+            instructions=instructions,
+            context=context,
+            session_id=session_id,
+            history=history,
+            retrieval=False,
+        )
+        if self.prefetch is None:
+            await asyncio.gather(
+                self.context_runtime.ainject_knowledge(
+                    goal, context, deadline=self.retrieval_deadline
+                ),
+                self.memory_runtime.ainject_provider_memories(
+                    goal, session_id, deadline=self.retrieval_deadline
+                ),
+            )
+        else:
+            await self.prefetch.await_ready(deadline=self.retrieval_deadline)
+        return prepared
+
     def finalize_success(self, prepared: PreparedRun, output: str) -> None:
         if prepared.session_id and self.memory_enabled():
             self.memory_runtime.save_session_memory(prepared.session_id)
@@ -84,6 +139,9 @@ class RunLifecycleRuntime:
     def stop(self) -> None:
         if self.heartbeat:
             self.heartbeat.stop()
+        if self.prefetch is not None:
+            # 关闭线程池；下一次运行按需重建
+            self.prefetch.close()
 
     def _merge_system_prompt_additions(self, instructions: str) -> str:
         if self.ecosystem_manager:
@@ -494,6 +494,7 @@ class Session:
             provider = self.agent._get_provider()
             if provider is not None:
                 self._engine = self.agent._build_engine(provider)
+                self._bind_snapshot_namespace()
                 self._attach_pending_signals()
                 restored_history = self._transcript_messages
             else:
@@ -553,11 +554,24 @@ class Session:
         if record is not None:
             self.metadata.update(record.metadata)
             self.created_at = record.created_at
-        transcripts = sorted(
+        self._transcript_messages = self._restore_transcripts(self._load_transcripts(store))
+
+    def _load_transcripts(self, store: Any) -> list[Any]:
+        """Read only the transcript window the restore policy will use."""
+        from .session_restore import SessionRestorePolicy
+
+        policy = self._restore_policy()
+        iter_transcripts = getattr(store, "iter_transcripts", None)
+        if isinstance(policy, SessionRestorePolicy) and callable(iter_transcripts):
+            if not policy.enabled:
+                return []
+            recent = list(iter_transcripts(self.id, **policy.transcript_window()))
+            recent.reverse()
+            return recent
+        return sorted(
             store.list_transcripts(self.id),
             key=lambda transcript: transcript.created_at,
         )
-        self._transcript_messages = self._restore_transcripts(transcripts)
 
     def _save_store_record(self) -> None:
         store = getattr(self.agent, "_session_store", None)
@@ -586,6 +600,7 @@ class Session:
             provider = self.agent._get_provider()
             if provider is not None:
                 self._engine = self.agent._build_engine(provider)
+                self._bind_snapshot_namespace()
                 self._attach_pending_signals()
                 restored_history = self._transcript_messages
             else:
@@ -617,13 +632,17 @@ class Session:
                 }
             )
 
-    def _restore_transcripts(self, transcripts: list[Any]) -> list[dict[str, Any]]:
+    def _restore_policy(self) -> Any:
         from .session_restore import SessionRestorePolicy
 
         runtime = getattr(self.agent.config, "runtime", None)
         policy = getattr(runtime, "session_restore", None) if runtime is not None else None
-        if policy is None:
-            policy = SessionRestorePolicy.transcript_only()
+        return SessionRestorePolicy.transcript_only() if policy is None else policy
+
+    def _restore_transcripts(self, transcripts: list[Any]) -> list[dict[str, Any]]:
+        from .session_restore import SessionRestorePolicy
+
+        policy = self._restore_policy()
         build_history = getattr(policy, "build_history", None)
         if not callable(build_history):
             return SessionRestorePolicy.transcript_only().build_history(transcripts)
@@ -632,6 +651,12 @@ class Session:
             return []
         return [entry for entry in restored if isinstance(entry, dict)]
 
+    def _bind_snapshot_namespace(self) -> None:
+        # renew 快照按会话隔离，并发会话不再互相覆盖
+        renewer = getattr(getattr(self._engine, "context_manager", None), "renewer", None)
+        if renewer is not None and hasattr(renewer, "namespace"):
+            renewer.namespace = f"session-{self.id}"
+
     def _attach_pending_signals(self) -> None:
         if self._engine is None:
             return
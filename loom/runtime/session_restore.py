@@ -10,6 +10,9 @@ if TYPE_CHECKING:
     from .session_store import TranscriptRecord
 
 
+_RESTORED_ROLES = frozenset({"user", "assistant"})
+
+
 @dataclass(frozen=True, slots=True)
 class SessionRestorePolicy:
     """Decides what persisted session state enters the next run context."""
@@ -87,6 +90,15 @@ class SessionRestorePolicy:
             max_chars=max_chars,
         )
 
+    def transcript_window(self) -> dict[str, Any]:
+        """``SessionStore.iter_transcripts`` arguments covering what ``build_history`` reads."""
+        return {
+            "newest_first": True,
+            "limit": max(0, self.max_transcripts),
+            "max_messages": max(0, self.max_messages) if self.include_transcript else 0,
+            "roles": _RESTORED_ROLES,
+        }
+
     def build_history(self, transcripts: list[TranscriptRecord]) -> list[dict[str, Any]]:
         """Render persisted transcripts into provider-safe history messages."""
         if not self.enabled:
@@ -109,7 +121,7 @@ class SessionRestorePolicy:
         restored: list[dict[str, Any]] = []
         for message in messages:
             role = message.get("role")
-            if role not in {"user", "assistant"}:
+            if role not in _RESTORED_ROLES:
                 continue
             content = message.get("content", "")
             restored.append(
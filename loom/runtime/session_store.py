@@ -2,15 +2,21 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
+import sqlite3
 import threading
+import zlib
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, cast
 
 logger = logging.getLogger(__name__)
 
@@ -76,9 +82,15 @@ class SessionStore(ABC):
         _ = run_id
         return None
 
-    def list_runs(self, session_id: str | None = None) -> list[RunRecord]:
-        """Return completed-run snapshots if supported."""
-        _ = session_id
+    def list_runs(
+        self,
+        session_id: str | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[RunRecord]:
+        """Return completed-run snapshots (oldest first, paged) if supported."""
+        _ = session_id, limit, offset
         return []
 
     def save_transcript(self, record: TranscriptRecord) -> None:
@@ -90,11 +102,40 @@ class SessionStore(ABC):
         _ = run_id
         return None
 
-    def list_transcripts(self, session_id: str | None = None) -> list[TranscriptRecord]:
-        """Return execution transcripts if supported."""
-        _ = session_id
+    def list_transcripts(
+        self,
+        session_id: str | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TranscriptRecord]:
+        """Return execution transcripts (oldest first, paged) if supported."""
+        _ = session_id, limit, offset
         return []
 
+    def iter_transcripts(
+        self,
+        session_id: str,
+        *,
+        newest_first: bool = False,
+        limit: int | None = None,
+        max_messages: int | None = None,
+        roles: Collection[str] | None = None,
+    ) -> Iterator[TranscriptRecord]:
+        """Yield a session's transcripts in creation order (or newest first).
+
+        ``limit`` caps the number of transcripts.  ``max_messages`` keeps only
+        the last N messages of each transcript, counted after filtering by
+        ``roles``, so restore paths read only the window they need.  Backends
+        with an index override this to page lazily; the default sorts
+        :meth:`list_transcripts`.
+        """
+        transcripts = sorted(self.list_transcripts(session_id), key=lambda r: r.created_at)
+        if newest_first:
+            transcripts.reverse()
+        for transcript in transcripts if limit is None else transcripts[: max(0, limit)]:
+            yield _window_messages(transcript, max_messages, roles)
+
     def delete_session(self, session_id: str) -> None:
         """Delete a session snapshot if supported."""
         _ = session_id
@@ -120,11 +161,17 @@ class InMemorySessionStore(SessionStore):
     def load_run(self, run_id: str) -> RunRecord | None:
         return self.runs.get(run_id)
 
-    def list_runs(self, session_id: str | None = None) -> list[RunRecord]:
+    def list_runs(
+        self,
+        session_id: str | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[RunRecord]:
         runs = list(self.runs.values())
-        if session_id is None:
-            return runs
-        return [run for run in runs if run.session_id == session_id]
+        if session_id is not None:
+            runs = [run for run in runs if run.session_id == session_id]
+        return _page(runs, limit, offset)
 
     def save_transcript(self, record: TranscriptRecord) -> None:
         self.transcripts[record.id] = record
@@ -132,11 +179,17 @@ class InMemorySessionStore(SessionStore):
     def load_transcript(self, run_id: str) -> TranscriptRecord | None:
         return self.transcripts.get(run_id)
 
-    def list_transcripts(self, session_id: str | None = None) -> list[TranscriptRecord]:
+    def list_transcripts(
+        self,
+        session_id: str | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TranscriptRecord]:
         transcripts = list(self.transcripts.values())
-        if session_id is None:
-            return transcripts
-        return [record for record in transcripts if record.session_id == session_id]
+        if session_id is not None:
+            transcripts = [record for record in transcripts if record.session_id == session_id]
+        return _page(transcripts, limit, offset)
 
     def delete_session(self, session_id: str) -> None:
         self.sessions.pop(session_id, None)
@@ -197,13 +250,19 @@ class FileSessionStore(SessionStore):
             return None
         return _run_record_from_json(raw)
 
-    def list_runs(self, session_id: str | None = None) -> list[RunRecord]:
+    def list_runs(
+        self,
+        session_id: str | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[RunRecord]:
         with self._lock:
             raw_runs = list(self._read_data()["runs"].values())
         runs = [_run_record_from_json(raw) for raw in raw_runs]
-        if session_id is None:
-            return runs
-        return [run for run in runs if run.session_id == session_id]
+        if session_id is not None:
+            runs = [run for run in runs if run.session_id == session_id]
+        return _page(runs, limit, offset)
 
     def save_transcript(self, record: TranscriptRecord) -> None:
         with self._lock:
@@ -218,13 +277,19 @@ class FileSessionStore(SessionStore):
             return None
         return _transcript_record_from_json(raw)
 
-    def list_transcripts(self, session_id: str | None = None) -> list[TranscriptRecord]:
+    def list_transcripts(
+        self,
+        session_id: str | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TranscriptRecord]:
         with self._lock:
             raw_transcripts = list(self._read_data()["transcripts"].values())
         transcripts = [_transcript_record_from_json(raw) for raw in raw_transcripts]
-        if session_id is None:
-            return transcripts
-        return [record for record in transcripts if record.session_id == session_id]
+        if session_id is not None:
+            transcripts = [record for record in transcripts if record.session_id == session_id]
+        return _page(transcripts, limit, offset)
 
     def delete_session(self, session_id: str) -> None:
         with self._lock:
@@ -271,6 +336,440 @@ class FileSessionStore(SessionStore):
         return {"sessions": {}, "runs": {}, "transcripts": {}}
 
 
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_session ON runs (session_id, created_at);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (created_at);
+CREATE TABLE IF NOT EXISTS transcripts (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_by_session ON transcripts (session_id, created_at);
+CREATE INDEX IF NOT EXISTS transcripts_by_time ON transcripts (created_at);
+CREATE TABLE IF NOT EXISTS message_blobs (
+    hash BLOB PRIMARY KEY,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS transcript_messages (
+    transcript_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT,
+    hash BLOB NOT NULL,
+    PRIMARY KEY (transcript_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transcript_messages_by_hash ON transcript_messages (hash);
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite (WAL mode) session store for large, long-lived histories.
+
+    Every save is a single-row upsert, so write cost does not grow with the
+    store.  Runs and transcripts are indexed by ``(session_id, created_at)``
+    and by ``created_at``; ``list_runs``/``list_transcripts`` page through
+    them with ``limit``/``offset`` without touching other sessions.  Use
+    :func:`migrate_file_session_store` to import an existing
+    :class:`FileSessionStore` JSON file.
+
+    With ``dedupe_messages=True`` transcript messages are stored
+    content-addressed: each distinct message body is one zlib-compressed blob
+    keyed by its hash, and a transcript keeps only the ordered references.
+    System prompts, context blocks and history repeated across runs are
+    stored once.  Reads are transparent; windowed restores read only the
+    referenced tail.  Rows written in either mode stay readable in the other.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        create_dirs: bool = True,
+        synchronous: str = "NORMAL",
+        dedupe_messages: bool = False,
+        compression_level: int = 6,
+    ) -> None:
+        self.path = Path(path)
+        self.dedupe_messages = dedupe_messages
+        self.compression_level = compression_level
+        self._lock = threading.RLock()
+        self._blob_cache: OrderedDict[bytes, str] = OrderedDict()
+        if create_dirs:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # WAL：读不阻塞写；NORMAL 同步级别下每次提交不必 fsync 主库文件
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(_SQLITE_SCHEMA)
+
+    def load_session(self, session_id: str) -> SessionRecord | None:
+        raw = self._fetch_one("SELECT data FROM sessions WHERE id = ?", (session_id,))
+        return None if raw is None else _session_record_from_json(raw)
+
+    def save_session(self, record: SessionRecord) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO sessions (id, created_at, data) VALUES (?, ?, ?)",
+            (record.id, _timestamp(record.created_at), _dumps(_session_record_to_json(record))),
+        )
+
+    def save_run(self, record: RunRecord) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO runs (id, session_id, created_at, data) VALUES (?, ?, ?, ?)",
+            _row(record, _run_record_to_json(record)),
+        )
+
+    def load_run(self, run_id: str) -> RunRecord | None:
+        raw = self._fetch_one("SELECT data FROM runs WHERE id = ?", (run_id,))
+        return None if raw is None else _run_record_from_json(raw)
+
+    def list_runs(
+        self,
+        session_id: str | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[RunRecord]:
+        return [
+            _run_record_from_json(raw)
+            for raw in self._fetch_page("runs", session_id, limit, offset)
+        ]
+
+    def save_transcript(self, record: TranscriptRecord) -> None:
+        with self._lock, self._transaction():
+            self._write_transcripts([record])
+
+    def load_transcript(self, run_id: str) -> TranscriptRecord | None:
+        raw = self._fetch_one("SELECT data FROM transcripts WHERE id = ?", (run_id,))
+        return None if raw is None else self._transcript_from_row(raw)
+
+    def list_transcripts(
+        self,
+        session_id: str | None = None,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TranscriptRecord]:
+        return [
+            self._transcript_from_row(raw)
+            for raw in self._fetch_page("transcripts", session_id, limit, offset)
+        ]
+
+    def iter_transcripts(
+        self,
+        session_id: str,
+        *,
+        newest_first: bool = False,
+        limit: int | None = None,
+        max_messages: int | None = None,
+        roles: Collection[str] | None = None,
+        page_size: int = 64,
+    ) -> Iterator[TranscriptRecord]:
+        # 键集分页：以 (created_at, rowid) 为游标，每页一次索引范围扫描，与会话总量无关
+        remaining = limit
+        cursor: tuple[float, int] | None = None
+        op, direction = ("<", "DESC") if newest_first else (">", "ASC")
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            where = "session_id = ?"
+            params: list[Any] = [session_id]
+            if cursor is not None:
+                where += f" AND (created_at, rowid) {op} (?, ?)"
+                params.extend(cursor)
+            sql = (
+                f"SELECT created_at, rowid, data FROM transcripts WHERE {where} "
+                f"ORDER BY created_at {direction}, rowid {direction} LIMIT ?"
+            )
+            with self._lock:
+                rows = self._conn.execute(sql, (*params, size)).fetchall()
+            for _, _, data in rows:
+                record = self._transcript_from_row(_loads(data), max_messages, roles)
+                yield _window_messages(record, max_messages, roles)
+            if len(rows) < size:
+                return
+            cursor = (rows[-1][0], rows[-1][1])
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def count_runs(self, session_id: str | None = None) -> int:
+        return self._count("runs", session_id)
+
+    def count_transcripts(self, session_id: str | None = None) -> int:
+        return self._count("transcripts", session_id)
+
+    def delete_session(self, session_id: str) -> None:
+        with self._lock, self._transaction():
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._conn.execute("DELETE FROM runs WHERE session_id = ?", (session_id,))
+            self._conn.execute(
+                "DELETE FROM transcript_messages WHERE transcript_id IN "
+                "(SELECT id FROM transcripts WHERE session_id = ?)",
+                (session_id,),
+            )
+            self._conn.execute("DELETE FROM transcripts WHERE session_id = ?", (session_id,))
+            self.prune_message_blobs()
+
+    def prune_message_blobs(self) -> int:
+        """Drop message blobs no transcript references any more."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM message_blobs WHERE NOT EXISTS "
+                "(SELECT 1 FROM transcript_messages m WHERE m.hash = message_blobs.hash)"
+            )
+            self._blob_cache.clear()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple[Any, ...]) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def _write_transcripts(self, records: list[TranscriptRecord]) -> None:
+        """Upsert transcripts; caller holds the lock inside a transaction."""
+        rows = []
+        for record in records:
+            payload = _transcript_record_to_json(record)
+            # 覆盖写时清掉旧引用；孤立 blob 由 prune_message_blobs 回收
+            self._conn.execute(
+                "DELETE FROM transcript_messages WHERE transcript_id = ?", (record.id,)
+            )
+            if self.dedupe_messages:
+                self._write_messages(record.id, payload.pop("messages"))
+                payload["message_refs"] = True
+                data: str | bytes = zlib.compress(
+                    _dumps(payload).encode("utf-8"), self.compression_level
+                )
+            else:
+                data = _dumps(payload)
+            rows.append((record.id, record.session_id, _timestamp(record.created_at), data))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO transcripts (id, session_id, created_at, data) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+    def _write_messages(self, transcript_id: str, messages: list[dict[str, Any]]) -> None:
+        encoded = [_canonical(message) for message in messages]
+        hashes = [hashlib.blake2b(body, digest_size=16).digest() for body in encoded]
+        unique = dict(zip(hashes, encoded, strict=True))
+        existing: set[bytes] = set()
+        keys = list(unique)
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            existing.update(
+                digest
+                for (digest,) in self._conn.execute(
+                    f"SELECT hash FROM message_blobs WHERE hash IN ({placeholders})", batch
+                )
+            )
+        # 只压缩新出现的消息体
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO message_blobs (hash, data) VALUES (?, ?)",
+            [
+                (digest, zlib.compress(body, self.compression_level))
+                for digest, body in unique.items()
+                if digest not in existing
+            ],
+        )
+        self._conn.executemany(
+            "INSERT INTO transcript_messages (transcript_id, seq, role, hash) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    transcript_id,
+                    seq,
+                    message.get("role") if isinstance(message.get("role"), str) else None,
+                    digest,
+                )
+                for seq, (message, digest) in enumerate(zip(messages, hashes, strict=True))
+            ],
+        )
+
+    def _transcript_from_row(
+        self,
+        raw: dict[str, Any],
+        max_messages: int | None = None,
+        roles: Collection[str] | None = None,
+    ) -> TranscriptRecord:
+        if raw.pop("message_refs", False):
+            raw["messages"] = self._read_messages(str(raw["id"]), max_messages, roles)
+        return _transcript_record_from_json(raw)
+
+    def _read_messages(
+        self,
+        transcript_id: str,
+        max_messages: int | None,
+        roles: Collection[str] | None,
+    ) -> list[dict[str, Any]]:
+        sql = (
+            "SELECT m.hash, b.data FROM transcript_messages m "
+            "JOIN message_blobs b ON b.hash = m.hash WHERE m.transcript_id = ?"
+        )
+        params: list[Any] = [transcript_id]
+        if roles is not None:
+            roles = list(roles)
+            sql += f" AND m.role IN ({','.join('?' * len(roles))})"
+            params.extend(roles)
+        if max_messages is not None:
+            # 只读窗口内的尾部引用
+            sql += " ORDER BY m.seq DESC LIMIT ?"
+            params.append(max(0, max_messages))
+        else:
+            sql += " ORDER BY m.seq"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            bodies = [self._blob_text(digest, data) for digest, data in rows]
+        if max_messages is not None:
+            bodies.reverse()
+        # 拼成一个 JSON 数组一次解析，比逐条 json.loads 快
+        return cast("list[dict[str, Any]]", json.loads("[" + ",".join(bodies) + "]"))
+
+    def _blob_text(self, digest: bytes, data: bytes) -> str:
+        cached = self._blob_cache.get(digest)
+        if cached is not None:
+            self._blob_cache.move_to_end(digest)
+            return cached
+        text = zlib.decompress(data).decode("utf-8")
+        self._blob_cache[digest] = text
+        if len(self._blob_cache) > 1024:
+            self._blob_cache.popitem(last=False)
+        return text
+
+    def _fetch_one(self, sql: str, params: tuple[Any, ...]) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return None if row is None else _loads(row[0])
+
+    def _fetch_page(
+        self,
+        table: str,
+        session_id: str | None,
+        limit: int | None,
+        offset: int,
+    ) -> list[dict[str, Any]]:
+        where, params = (
+            ("WHERE session_id = ?", [session_id]) if session_id is not None else ("", [])
+        )
+        sql = f"SELECT data FROM {table} {where} ORDER BY created_at, rowid LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, -1 if limit is None else limit, offset))
+            return [_loads(data) for (data,) in rows.fetchall()]
+
+    def _count(self, table: str, session_id: str | None) -> int:
+        with self._lock:
+            if session_id is None:
+                row = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE session_id = ?", (session_id,)
+                ).fetchone()
+        return int(row[0])
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+
+def migrate_file_session_store(
+    source: str | os.PathLike[str],
+    target: str | os.PathLike[str] | SQLiteSessionStore,
+) -> dict[str, int]:
+    """Copy a :class:`FileSessionStore` JSON file into a :class:`SQLiteSessionStore`.
+
+    Records are validated through the same decoders the JSON store uses and
+    written in one transaction; re-running the migration is idempotent.
+    Returns the number of sessions, runs and transcripts copied.
+    """
+    if not Path(source).exists():
+        raise FileNotFoundError(f"session store JSON not found at {source}")
+    data = FileSessionStore(source, create_dirs=False)._read_data()
+    store = target if isinstance(target, SQLiteSessionStore) else SQLiteSessionStore(target)
+    sessions = [_session_record_from_json(raw) for raw in data["sessions"].values()]
+    runs = [_run_record_from_json(raw) for raw in data["runs"].values()]
+    transcripts = [_transcript_record_from_json(raw) for raw in data["transcripts"].values()]
+    with store._lock, store._transaction():
+        store._conn.executemany(
+            "INSERT OR REPLACE INTO sessions (id, created_at, data) VALUES (?, ?, ?)",
+            [
+                (r.id, _timestamp(r.created_at), _dumps(_session_record_to_json(r)))
+                for r in sessions
+            ],
+        )
+        store._conn.executemany(
+            "INSERT OR REPLACE INTO runs (id, session_id, created_at, data) VALUES (?, ?, ?, ?)",
+            [_row(r, _run_record_to_json(r)) for r in runs],
+        )
+        store._write_transcripts(transcripts)
+    if store is not target:
+        store.close()
+    return {"sessions": len(sessions), "runs": len(runs), "transcripts": len(transcripts)}
+
+
+def _page(records: list[Any], limit: int | None, offset: int) -> list[Any]:
+    # sorted 是稳定排序：同一时间创建的记录保持写入顺序
+    ordered = sorted(records, key=lambda record: record.created_at)
+    return ordered[offset:] if limit is None else ordered[offset : offset + limit]
+
+
+def _window_messages(
+    record: TranscriptRecord,
+    max_messages: int | None,
+    roles: Collection[str] | None,
+) -> TranscriptRecord:
+    if max_messages is None and roles is None:
+        return record
+    messages = record.messages
+    if roles is not None:
+        messages = [message for message in messages if message.get("role") in roles]
+    if max_messages is not None:
+        messages = messages[-max_messages:] if max_messages > 0 else []
+    return replace(record, messages=messages)
+
+
+def _loads(data: str | bytes) -> dict[str, Any]:
+    # 去重模式下的行以 zlib 压缩的 bytes 存储
+    if isinstance(data, bytes):
+        data = zlib.decompress(data)
+    return cast("dict[str, Any]", json.loads(data))
+
+
+def _canonical(message: dict[str, Any]) -> bytes:
+    return json.dumps(
+        message, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def _timestamp(value: datetime) -> float:
+    return value.timestamp()
+
+
+def _dumps(payload: dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _row(record: RunRecord | TranscriptRecord, payload: dict[str, Any]) -> tuple[Any, ...]:
+    return (record.id, record.session_id, _timestamp(record.created_at), _dumps(payload))
+
+
 def _session_record_to_json(record: SessionRecord) -> dict[str, Any]:
     return {
         "id": record.id,
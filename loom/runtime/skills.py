@@ -7,7 +7,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from ..ecosystem.skill import Skill, SkillRegistry
-from ..utils import count_tokens
+from ..utils import TokenCounter, get_tokenizer
 
 
 @dataclass(slots=True)
@@ -70,21 +70,30 @@ class SkillInjection:
 
         return selected[: self.max_skills]
 
-    def render(self, skills: Iterable[Skill]) -> list[str]:
-        """Render selected skills as ``ContextPartitions.skill`` entries."""
+    def render(
+        self,
+        skills: Iterable[Skill],
+        counter: TokenCounter | None = None,
+    ) -> list[str]:
+        """Render selected skills as ``ContextPartitions.skill`` entries.
+
+        ``counter`` measures ``max_tokens``; pass the engine's counter so the
+        budget matches the configured model's tokenizer.
+        """
+        counter = counter or get_tokenizer()
         entries: list[str] = []
         remaining = self.max_tokens
         for skill in skills:
             if remaining <= 0:
                 break
-            rendered = self._render_one(skill, remaining)
+            rendered = self._render_one(skill, remaining, counter)
             if not rendered:
                 continue
             entries.append(rendered)
-            remaining -= count_tokens(rendered)
+            remaining -= counter.count(rendered)
         return entries
 
-    def _render_one(self, skill: Skill, budget_tokens: int) -> str:
+    def _render_one(self, skill: Skill, budget_tokens: int, counter: TokenCounter) -> str:
         header: list[str] = [f"### Skill: {skill.name}"]
         if self.include_metadata and skill.description:
             header.append(f"Description: {skill.description}")
@@ -94,13 +103,13 @@ class SkillInjection:
             header.append(f"Allowed tools: {', '.join(skill.allowed_tools)}")
 
         prefix = "\n".join(header)
-        prefix_tokens = count_tokens(prefix)
+        prefix_tokens = counter.count(prefix)
         content_budget = max(0, budget_tokens - prefix_tokens)
         if content_budget <= 0:
             return prefix
 
         content = skill.content.strip()
-        content = _truncate_to_token_budget(content, content_budget)
+        content = _truncate_to_token_budget(content, content_budget, counter)
         if not content:
             return prefix
         return f"{prefix}\n\n{content}"
@@ -141,15 +150,18 @@ def _extend_names(target: list[str], value: Any) -> None:
                 target.append(item.removeprefix("skill:"))
 
 
-def _truncate_to_token_budget(text: str, budget_tokens: int) -> str:
+def _truncate_to_token_budget(text: str, budget_tokens: int, counter: TokenCounter) -> str:
     if budget_tokens <= 0:
         return ""
-    if count_tokens(text) <= budget_tokens:
+    if counter.count(text) <= budget_tokens:
         return text
     max_chars = max(0, budget_tokens * 4)
     if max_chars <= 1:
         return ""
-    return text[: max_chars - 1].rstrip() + "..."
+    truncated = text[: max_chars - 1].rstrip()
+    while truncated and counter.count(truncated + "...") > budget_tokens:
+        truncated = truncated[: len(truncated) * 4 // 5].rstrip()
+    return truncated + "..." if truncated else ""
 
 
 __all__ = ["SkillInjection"]
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Callable
 from typing import Any
 
 from ..providers.base import ProviderToolParameter, ProviderToolSpec
-from ..safety.hooks import AgentContext, HookDecision
+from ..safety.hooks import AgentContext, HookDecision, HookOutcome
 from ..types import ToolCall, ToolResult
 
 
@@ -26,6 +27,8 @@ class ToolRuntime:
         tool_governance: Any,
         permission_manager: Any,
         veto_authority: Any,
+        max_concurrency: int = 1,
+        speculative: bool = False,
     ) -> None:
         self.emit = emit
         self.current_iteration = current_iteration
@@ -37,15 +40,44 @@ class ToolRuntime:
         self.tool_governance = tool_governance
         self.permission_manager = permission_manager
         self.veto_authority = veto_authority
+        self.max_concurrency = max_concurrency
+        self.speculative = speculative
+        self._speculative: dict[str, tuple[ToolCall, asyncio.Future[ToolResult]]] = {}
+        self._provider_tools_cache: tuple[
+            Any, int | None, list[ProviderToolSpec], list[dict[str, Any]]
+        ]
+        self._provider_tools_cache = (None, -1, [], [])
 
     def parse_tool_calls(self, response: dict[str, Any]) -> list[ToolCall]:
         tool_calls = response.get("tool_calls", [])
         return [call for call in tool_calls if isinstance(call, ToolCall)]
 
     def build_provider_tools(self) -> list[dict[str, Any] | ProviderToolSpec]:
-        return [tool.to_dict() for tool in self.build_provider_tool_specs()]
+        """Provider-facing tool dicts, reused until the registry generation changes.
+
+        The returned dicts are shared across iterations and must be treated as
+        read-only; providers memoize their converted payload by identity.
+        """
+        return list(self._compiled_provider_tools()[3])
 
     def build_provider_tool_specs(self) -> list[ProviderToolSpec]:
+        return list(self._compiled_provider_tools()[2])
+
+    def _compiled_provider_tools(
+        self,
+    ) -> tuple[Any, int | None, list[ProviderToolSpec], list[dict[str, Any]]]:
+        registry = self.tool_registry
+        generation = getattr(registry, "generation", None)
+        cached = self._provider_tools_cache
+        if generation is not None and cached[0] is registry and cached[1] == generation:
+            return cached
+        specs = self._compile_provider_tool_specs()
+        compiled = (registry, generation, specs, [spec.to_dict() for spec in specs])
+        if generation is not None:
+            self._provider_tools_cache = compiled
+        return compiled
+
+    def _compile_provider_tool_specs(self) -> list[ProviderToolSpec]:
         provider_tools: list[ProviderToolSpec] = []
         for tool in self.tool_registry.list():
             provider_tools.append(
@@ -67,55 +99,165 @@ class ToolRuntime:
         return provider_tools
 
     async def execute_tools(self, tool_calls: list[ToolCall]) -> list[ToolResult]:
-        results: list[ToolResult] = []
-        for call in tool_calls:
-            self.emit(
-                "before_tool",
-                tool_name=call.name,
-                arguments=call.arguments,
-                tool_call_id=call.id,
-                iteration=self.current_iteration(),
-            )
-            hook_decision: HookDecision | None = None
-            agent_ctx = AgentContext(
-                goal=self.context_manager.current_goal or "",
-                step_count=self.current_iteration(),
-                tool_name=call.name,
-                tool_arguments=call.arguments,
-            )
-            hook_outcome = self.hook_manager.evaluate(
-                "before_tool_call",
-                {"tool": call.name, "arguments": call.arguments},
-                agent_ctx,
-            )
-            hook_decision = hook_outcome.decision
-            if hook_decision == HookDecision.DENY:
-                result = ToolResult(
-                    tool_call_id=call.id,
-                    content=f"Hook denied: {hook_outcome.message}",
-                    is_error=True,
-                )
-                results.append(result)
-                self.emit(
-                    "tool_result",
-                    tool_name=call.name,
-                    result=result.content,
-                    success=False,
-                    tool_call_id=call.id,
-                )
+        """Execute tool calls, returning results in the original call order.
+
+        With ``max_concurrency > 1`` consecutive parallel-safe calls run
+        concurrently under a semaphore; any other call is a barrier that waits
+        for the running batch and executes alone.  Hooks and governance are
+        still evaluated once per call.  Calls already started by
+        :meth:`speculate` reuse the speculative result.
+        """
+        try:
+            return await self._execute_calls(tool_calls)
+        finally:
+            # 模型最终没有使用的投机结果直接丢弃
+            if self._speculative:
+                self.discard_speculative()
+
+    async def _execute_calls(self, tool_calls: list[ToolCall]) -> list[ToolResult]:
+        if self.max_concurrency <= 1 or len(tool_calls) < 2:
+            return [await self._execute_call(call) for call in tool_calls]
+
+        results: list[ToolResult | None] = [None] * len(tool_calls)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batch: list[int] = []
+
+        async def _run(index: int) -> None:
+            async with semaphore:
+                results[index] = await self._execute_call(tool_calls[index])
+
+        async def _flush() -> None:
+            if not batch:
+                return
+            outcomes = await asyncio.gather(*(_run(i) for i in batch), return_exceptions=True)
+            batch.clear()
+            # 等整批结束后再按调用顺序抛出第一个异常，避免遗留未完成的任务
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+
+        for index, call in enumerate(tool_calls):
+            if self.is_parallel_safe(call):
+                batch.append(index)
                 continue
+            await _flush()
+            results[index] = await self._execute_call(call)
+        await _flush()
+        return [result for result in results if result is not None]
+
+    def is_parallel_safe(self, call: ToolCall) -> bool:
+        """Read-only or concurrency-safe tools that are not destructive."""
+        tool = self.tool_registry.get(call.name)
+        definition = getattr(tool, "definition", None)
+        if definition is None or definition.is_destructive:
+            return False
+        return bool(definition.is_read_only or definition.is_concurrency_safe)
+
+    def is_speculation_safe(self, call: ToolCall) -> bool:
+        """Only side-effect-free tools may start before the model commits to them."""
+        tool = self.tool_registry.get(call.name)
+        definition = getattr(tool, "definition", None)
+        return bool(
+            definition is not None and definition.is_read_only and not definition.is_destructive
+        )
+
+    def speculate(self, call: ToolCall) -> bool:
+        """Start a read-only call while the provider stream is still open.
+
+        The before_tool_call hook and the governance checks run here, before
+        the tool starts; a denied call is not started and is handled by the
+        normal path once ``execute_tools`` reaches it.  Events are emitted
+        only when ``execute_tools`` claims the result.
+        """
+        if (
+            not self.speculative
+            or call.id in self._speculative
+            or not self.is_speculation_safe(call)
+        ):
+            return False
+        hook_outcome = self._evaluate_hook(call)
+        if hook_outcome.decision == HookDecision.DENY:
+            return False
+        self.sync_governance_policy()
+        if self.tool_executor.authorize(call, hook_decision=hook_outcome.decision) is not None:
+            return False
+        task = asyncio.ensure_future(
+            self.tool_executor.execute(call, hook_decision=hook_outcome.decision, authorized=True)
+        )
+        self._speculative[call.id] = (call, task)
+        return True
 
-            self.sync_governance_policy()
-            result = await self.tool_executor.execute(call, hook_decision=hook_decision)
-            results.append(result)
-            self.emit(
-                "tool_result",
-                tool_name=call.name,
-                result=result.content,
-                success=not result.is_error,
+    def discard_speculative(self) -> int:
+        """Drop speculative results that no executed call claimed."""
+        pending, self._speculative = self._speculative, {}
+        for _call, task in pending.values():
+            _drop_task(task)
+        return len(pending)
+
+    def _claim_speculative(self, call: ToolCall) -> asyncio.Future[ToolResult] | None:
+        entry = self._speculative.pop(call.id, None)
+        if entry is None:
+            return None
+        started, task = entry
+        if started.name != call.name or started.arguments != call.arguments:
+            _drop_task(task)
+            return None
+        return task
+
+    async def _execute_call(self, call: ToolCall) -> ToolResult:
+        speculative = self._claim_speculative(call)
+        self.emit(
+            "before_tool",
+            tool_name=call.name,
+            arguments=call.arguments,
+            tool_call_id=call.id,
+            iteration=self.current_iteration(),
+        )
+        if speculative is None:
+            result = await self._run_call(call)
+        else:
+            try:
+                result = await speculative
+            finally:
+                # 被取消时不能遗留投机任务
+                _drop_task(speculative)
+        self.emit(
+            "tool_result",
+            tool_name=call.name,
+            result=result.content,
+            success=not result.is_error,
+            tool_call_id=call.id,
+        )
+        return result
+
+    async def _run_call(self, call: ToolCall) -> ToolResult:
+        """Hook check, governance sync, and execution for a single call."""
+        hook_outcome = self._evaluate_hook(call)
+        hook_decision: HookDecision | None = hook_outcome.decision
+        if hook_decision == HookDecision.DENY:
+            return ToolResult(
                 tool_call_id=call.id,
+                content=f"Hook denied: {hook_outcome.message}",
+                is_error=True,
             )
-        return results
+
+        self.sync_governance_policy()
+        result: ToolResult = await self.tool_executor.execute(call, hook_decision=hook_decision)
+        return result
+
+    def _evaluate_hook(self, call: ToolCall) -> HookOutcome:
+        agent_ctx = AgentContext(
+            goal=self.context_manager.current_goal or "",
+            step_count=self.current_iteration(),
+            tool_name=call.name,
+            tool_arguments=call.arguments,
+        )
+        outcome: HookOutcome = self.hook_manager.evaluate(
+            "before_tool_call",
+            {"tool": call.name, "arguments": call.arguments},
+            agent_ctx,
+        )
+        return outcome
 
     def sync_governance_policy(self) -> None:
         if hasattr(self.governance_policy, "tool_governance") and not getattr(
@@ -136,3 +278,11 @@ class ToolRuntime:
             False,
         ):
             self.governance_policy.veto_authority = self.veto_authority
+
+
+def _drop_task(task: asyncio.Future[Any]) -> None:
+    """Cancel an unfinished task, or mark a finished one's exception as read."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()  # 避免 "exception was never retrieved" 告警
@@ -3,7 +3,7 @@
 治理流水线：Tool Request → Permission Check → Rate Limit → Execute → Observe
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from ..safety.hooks import HookDecision
 from ..types import ToolCall, ToolResult
@@ -12,7 +12,7 @@ from .governance import ToolGovernance
 from .registry import ToolRegistry
 
 if TYPE_CHECKING:
-    from ..runtime.governance import RuntimeGovernancePolicy
+    from ..runtime.governance import GovernanceRequest, RuntimeGovernancePolicy
 
 
 class ToolExecutor:
@@ -33,49 +33,23 @@ class ToolExecutor:
         tool_call: ToolCall,
         *,
         hook_decision: HookDecision | None = None,
+        authorized: bool = False,
     ) -> ToolResult:
-        """Execute a tool call with governance"""
+        """Execute a tool call with governance
+
+        ``authorized`` skips the pre-execution checks for a call that already
+        passed :meth:`authorize` (speculative execution); the result is still
+        recorded with governance and the rate limiter.
+        """
+        if not authorized:
+            denied = self.authorize(tool_call, hook_decision=hook_decision)
+            if denied is not None:
+                return denied
         tool = self.registry.get(tool_call.name)
-
-        if not tool:
-            if self.governance_policy is not None:
-                from ..runtime.governance import GovernanceRequest
-
-                request = GovernanceRequest(
-                    tool_name=tool_call.name,
-                    action="execute",
-                    arguments=tool_call.arguments,
-                    hook_decision=hook_decision,
-                )
-                decision = self.governance_policy.evaluate_tool(request)
-                if not decision.allowed:
-                    return ToolResult(
-                        tool_call_id=tool_call.id,
-                        content=self._denied_content(decision.reason, decision.source),
-                        is_error=True,
-                    )
-
-            error = ToolNotFoundError(f"Tool not found: {tool_call.name}")
-            return ToolResult(tool_call_id=tool_call.id, content=str(error), is_error=True)
+        assert tool is not None  # authorize() 已拒绝未注册的工具
 
         if self.governance_policy is not None:
-            from ..runtime.governance import GovernanceRequest
-
-            request = GovernanceRequest(
-                tool_name=tool_call.name,
-                action="execute",
-                arguments=tool_call.arguments,
-                tool_definition=tool.definition,
-                hook_decision=hook_decision,
-            )
-            decision = self.governance_policy.evaluate_tool(request)
-            if not decision.allowed:
-                return ToolResult(
-                    tool_call_id=tool_call.id,
-                    content=self._denied_content(decision.reason, decision.source),
-                    is_error=True,
-                )
-
+            request = self._governance_request(tool_call, tool, hook_decision)
             try:
                 result = await tool.execute(**tool_call.arguments)
                 self.governance_policy.record_tool_result(request, success=True)
@@ -92,6 +66,49 @@ class ToolExecutor:
                     is_error=True,
                 )
 
+        # Execute
+        try:
+            result = await tool.execute(**tool_call.arguments)
+            self.governance.record_call(tool_call.name)
+            return ToolResult(tool_call_id=tool_call.id, content=str(result), is_error=False)
+        except Exception as e:
+            return ToolResult(
+                tool_call_id=tool_call.id,
+                content=str(ToolExecutionError(f"Error: {str(e)}")),
+                is_error=True,
+            )
+
+    def authorize(
+        self,
+        tool_call: ToolCall,
+        *,
+        hook_decision: HookDecision | None = None,
+    ) -> ToolResult | None:
+        """Run the governance pipeline up to execution.
+
+        Returns the error result for a missing or denied tool, or ``None``
+        when the call may run.
+        """
+        tool = self.registry.get(tool_call.name)
+
+        if self.governance_policy is not None:
+            decision = self.governance_policy.evaluate_tool(
+                self._governance_request(tool_call, tool, hook_decision)
+            )
+            if not decision.allowed:
+                return ToolResult(
+                    tool_call_id=tool_call.id,
+                    content=self._denied_content(decision.reason, decision.source),
+                    is_error=True,
+                )
+
+        if not tool:
+            error = ToolNotFoundError(f"Tool not found: {tool_call.name}")
+            return ToolResult(tool_call_id=tool_call.id, content=str(error), is_error=True)
+
+        if self.governance_policy is not None:
+            return None
+
         # Permission check (with parameter-level validation)
         ok, reason = self.governance.check_permission(
             tool_call.name,
@@ -111,18 +128,23 @@ class ToolExecutor:
             return ToolResult(
                 tool_call_id=tool_call.id, content=f"Rate limit: {reason}", is_error=True
             )
+        return None
 
-        # Execute
-        try:
-            result = await tool.execute(**tool_call.arguments)
-            self.governance.record_call(tool_call.name)
-            return ToolResult(tool_call_id=tool_call.id, content=str(result), is_error=False)
-        except Exception as e:
-            return ToolResult(
-                tool_call_id=tool_call.id,
-                content=str(ToolExecutionError(f"Error: {str(e)}")),
-                is_error=True,
-            )
+    def _governance_request(
+        self,
+        tool_call: ToolCall,
+        tool: Any,
+        hook_decision: HookDecision | None,
+    ) -> "GovernanceRequest":
+        from ..runtime.governance import GovernanceRequest
+
+        return GovernanceRequest(
+            tool_name=tool_call.name,
+            action="execute",
+            arguments=tool_call.arguments,
+            tool_definition=tool.definition if tool else None,
+            hook_decision=hook_decision,
+        )
 
     def _denied_content(self, reason: str, source: str) -> str:
         if source == "veto":
@@ -1,12 +1,23 @@
 """外部知识检索治理链 - RAG as Evidence"""
 
+import hashlib
+import heapq
 import logging
 import threading
 from collections import OrderedDict
-from collections.abc import Callable
+from collections.abc import Callable, Collection
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, cast
+
+from ..memory.ann import IVFIndex
+from ..memory.bm25 import BM25Index, tokenize
+from ..memory.embedding_cache import EmbeddingCache
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +39,21 @@ class KnowledgePipeline:
     支持两种相似度计算方式：
     1. 词法相似度（默认，无需外部依赖）
     2. 语义相似度（使用 embedding，需要提供 embedding_fn）
+
+    同时提供 embedding_fn 与 ann_index 时，静态（非 callable）来源的片段在注册时
+    写入近似最近邻索引，检索时只取索引召回的 ann_candidates 个片段。索引 id 由
+    来源与内容哈希得到，加载已持久化的索引后重复注册不会重新计算 embedding。
+
+    embedding 按批计算：embed_batch_fn（或 embedding_fn.embed_batch）一次处理一轮
+    检索中所有未缓存的文本。内存 LRU 之外可挂 EmbeddingCache 做跨进程持久缓存。
+
+    词法模式使用 BM25 倒排索引：静态来源在首次词法检索时建索引，之后按来源增量
+    更新（重新注册只增删变化的片段）；检索只取 lexical_candidates 个最高分片段，
+    phrase_boost 为命中相邻词对的片段加权。callable 来源的返回结果按轮建临时索引。
+
+    重排对全部候选一次性打分（有 NumPy 时为一次矩阵乘），只为 top_k 做堆选择，
+    直接在召回阶段生成的候选 dict 上写分数。设置 mmr_lambda 后按最大边际相关性
+    选片段：与已选片段相似度超过 mmr_duplicate_threshold 的近重复片段直接丢弃。
     """
 
     def __init__(
@@ -38,27 +64,109 @@ class KnowledgePipeline:
         embedding_cache_max: int = 1000,
         source_cache_max: int = 256,
         max_workers: int | None = None,
+        ann_index: IVFIndex | None = None,
+        ann_candidates: int = 100,
+        embed_batch_fn: Callable[[list[str]], list[list[float]]] | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        lexical_candidates: int = 200,
+        phrase_boost: float = 0.5,
+        mmr_lambda: float | None = None,
+        mmr_duplicate_threshold: float = 0.9,
     ):
         self.sources: dict[str, Any] = {}
         self.embedding_fn = embedding_fn
+        self.embed_batch_fn = embed_batch_fn or getattr(embedding_fn, "embed_batch", None)
+        self.embedding_cache = embedding_cache
         self.rerank_retrieval_weight = rerank_retrieval_weight
         self.rerank_goal_weight = rerank_goal_weight
-        self._embedding_cache: dict[str, list[float]] = {}
+        self._embedding_cache: OrderedDict[str, list[float]] = OrderedDict()
         self._embedding_cache_max = embedding_cache_max
         self._source_cache: OrderedDict[tuple[str, str], list[dict[str, Any]]] = OrderedDict()
         self._source_cache_max = source_cache_max
         self._source_cache_lock = threading.RLock()
         self._max_workers = max_workers
+        self.ann_index = ann_index
+        self.ann_candidates = ann_candidates
+        self._indexed_chunks: dict[int, dict[str, Any]] = {}
+        self._indexed_sources: dict[str, list[int]] = {}
+        self.lexical_candidates = lexical_candidates
+        self.phrase_boost = phrase_boost
+        self.mmr_lambda = mmr_lambda
+        self.mmr_duplicate_threshold = mmr_duplicate_threshold
+        self._lexical_index: BM25Index[int] = BM25Index()
+        self._lexical_chunks: dict[int, dict[str, Any]] = {}
+        self._lexical_sources: dict[str, list[int]] = {}
+        self._lexical_seen: dict[str, Any] = {}
+        self._lexical_lock = threading.RLock()
 
     def register_source(self, source_id: str, source: Any) -> None:
         """Register a knowledge source."""
         self.sources[source_id] = source
+        self._lexical_seen.pop(source_id, None)
+        if self.ann_index is not None:
+            self._index_source(source_id, source)
+
+    def _index_source(self, source_id: str, source: Any) -> None:
+        """Embed a static source's chunks into the ANN index."""
+        assert self.ann_index is not None
+        stale = set(self._indexed_sources.pop(source_id, []))
+        ids: list[int] = []
+        if not callable(source) and self._embeds:
+            chunks = {
+                _chunk_id(source_id, chunk.get("content", "")): chunk
+                for chunk in self._load_chunks(source_id, source, "")
+            }
+            missing = [chunk_id for chunk_id in chunks if chunk_id not in self.ann_index]
+            embeddings = self._embed_many([chunks[i].get("content", "") for i in missing])
+            added = [(i, emb) for i, emb in zip(missing, embeddings, strict=True) if emb]
+            if added:
+                self.ann_index.add_many([i for i, _ in added], [emb for _, emb in added])
+            for chunk_id, chunk in chunks.items():
+                if chunk_id in self.ann_index:
+                    self._indexed_chunks[chunk_id] = chunk
+                    ids.append(chunk_id)
+            if ids:
+                self._indexed_sources[source_id] = ids
+        for chunk_id in stale.difference(ids):
+            self.ann_index.remove(chunk_id)
+            self._indexed_chunks.pop(chunk_id, None)
+
+    def _sync_lexical_index(self) -> None:
+        """Bring the BM25 index in line with the registered static sources."""
+        with self._lexical_lock:
+            for source_id in list(self._lexical_seen):
+                source = self.sources.get(source_id)
+                if source is None or callable(source):
+                    self._reindex_lexical(source_id, [])
+                    del self._lexical_seen[source_id]
+            for source_id, source in self.sources.items():
+                if callable(source) or self._lexical_seen.get(source_id) is source:
+                    continue
+                self._reindex_lexical(source_id, self._load_chunks(source_id, source, ""))
+                self._lexical_seen[source_id] = source
+
+    def _reindex_lexical(self, source_id: str, chunks: list[dict[str, Any]]) -> None:
+        """Diff a source's chunks against the index: only changed chunks are touched."""
+        current: dict[int, dict[str, Any]] = {}
+        for chunk in chunks:
+            current.setdefault(_chunk_id(source_id, chunk.get("content", "")), chunk)
+        for chunk_id in set(self._lexical_sources.pop(source_id, ())).difference(current):
+            self._lexical_index.remove(chunk_id)
+            self._lexical_chunks.pop(chunk_id, None)
+        for chunk_id, chunk in current.items():
+            if chunk_id not in self._lexical_index:
+                self._lexical_index.add(chunk_id, chunk.get("content", ""))
+            self._lexical_chunks[chunk_id] = chunk
+        if current:
+            self._lexical_sources[source_id] = list(current)
 
     def retrieve(self, question: str, goal: str, top_k: int = 5) -> EvidencePack:
         """检索知识并生成证据包"""
-        candidates = self._retrieve_candidates(question)
-        ranked = self._rerank(candidates, goal)
-        top_chunks = ranked[:top_k]
+        if not self._embeds:
+            candidates = self._lexical_candidates(question, goal)
+        else:
+            candidates = self._retrieve_candidates(question)
+        top_chunks = self._rerank(candidates, goal, top_k)
         return EvidencePack(
             question=question,
             sources=self._collect_sources(top_chunks),
@@ -70,33 +178,107 @@ class KnowledgePipeline:
     def _retrieve_candidates(self, question: str) -> list[dict]:
         """召回候选片段"""
         candidates: list[dict] = []
-        for source_id, chunks in self._gather_source_chunks(question):
-            for chunk in chunks:
-                content = chunk.get("content", "")
-                score = self._similarity(question, content)
-                if score <= 0:
-                    continue
+        indexed = self._indexed_candidates(question)
+        skip = self._indexed_sources.keys() if indexed is not None else ()
+        gathered = self._gather_source_chunks(question, skip=skip)
+        if self._embeds:
+            # 一次批量计算本轮所有未缓存的候选 embedding
+            self._embed_many(
+                [
+                    question,
+                    *(chunk.get("content", "") for _, chunks in gathered for chunk in chunks),
+                ]
+            )
+        flat = [(source_id, chunk) for source_id, chunks in gathered for chunk in chunks]
+        scores = self._batch_similarity(question, [chunk.get("content", "") for _, chunk in flat])
+        for (source_id, chunk), score in zip(flat, scores, strict=True):
+            if score <= 0:
+                continue
+
+            candidate = dict(chunk)
+            candidate["source"] = chunk.get("source", source_id)
+            candidate["retrieval_score"] = score
+            candidates.append(candidate)
+        candidates.extend(indexed or [])
+
+        candidates.sort(
+            key=lambda item: item.get("retrieval_score", 0.0),
+            reverse=True,
+        )
+        return candidates
 
+    def _lexical_candidates(self, question: str, goal: str) -> list[dict]:
+        """BM25 recall; candidates carry both the question and the goal score."""
+        self._sync_lexical_index()
+        candidates: list[dict] = []
+        with self._lexical_lock:
+            hits = self._lexical_index.search(
+                question, self.lexical_candidates, phrase_boost=self.phrase_boost
+            )
+            hits = [(chunk_id, score) for chunk_id, score in hits if score > 0]
+            goal_scores = self._lexical_index.score(
+                goal, [chunk_id for chunk_id, _ in hits], phrase_boost=self.phrase_boost
+            )
+            for chunk_id, score in hits:
+                candidate = dict(self._lexical_chunks[chunk_id])
+                candidate["retrieval_score"] = score
+                candidate["goal_score"] = goal_scores[chunk_id]
+                candidates.append(candidate)
+
+        # callable 来源每轮返回不同片段，对本轮结果建临时索引
+        dynamic = [source_id for source_id, source in self.sources.items() if callable(source)]
+        gathered = self._gather_source_chunks(question, skip=self.sources.keys() - set(dynamic))
+        chunks = [
+            (source_id, chunk) for source_id, source_chunks in gathered for chunk in source_chunks
+        ]
+        if chunks:
+            index: BM25Index[int] = BM25Index()
+            index.add_many((i, chunk.get("content", "")) for i, (_, chunk) in enumerate(chunks))
+            scores = index.search(question, self.lexical_candidates, phrase_boost=self.phrase_boost)
+            scores = [(i, score) for i, score in scores if score > 0]
+            goal_scores = index.score(goal, [i for i, _ in scores], phrase_boost=self.phrase_boost)
+            for i, score in scores:
+                source_id, chunk = chunks[i]
                 candidate = dict(chunk)
                 candidate["source"] = chunk.get("source", source_id)
                 candidate["retrieval_score"] = score
+                candidate["goal_score"] = goal_scores[i]
                 candidates.append(candidate)
 
-        candidates.sort(
-            key=lambda item: item.get("retrieval_score", 0.0),
-            reverse=True,
-        )
+        candidates.sort(key=lambda item: item["retrieval_score"], reverse=True)
+        return candidates
+
+    def _indexed_candidates(self, question: str) -> list[dict] | None:
+        """ANN recall over indexed static sources; None when the index can't be used."""
+        if self.ann_index is None or not self._indexed_sources:
+            return None
+        query_embedding = self._get_embedding(question)
+        if not query_embedding:
+            return None
+        candidates: list[dict] = []
+        for chunk_id, cosine in self.ann_index.search(query_embedding, self.ann_candidates):
+            chunk = self._indexed_chunks.get(chunk_id)
+            score = (cosine + 1) / 2
+            if chunk is None or score <= 0:
+                continue
+            candidate = dict(chunk)
+            candidate["retrieval_score"] = score
+            candidates.append(candidate)
         return candidates
 
-    def _gather_source_chunks(self, question: str) -> list[tuple[str, list[dict[str, Any]]]]:
-        if not self.sources:
+    def _gather_source_chunks(
+        self,
+        question: str,
+        skip: Collection[str] = (),
+    ) -> list[tuple[str, list[dict[str, Any]]]]:
+        ordered_sources = [item for item in self.sources.items() if item[0] not in skip]
+        if not ordered_sources:
             return []
-        if len(self.sources) == 1:
-            source_id, source = next(iter(self.sources.items()))
+        if len(ordered_sources) == 1:
+            source_id, source = ordered_sources[0]
             return [(source_id, self._load_chunks_cached(source_id, source, question))]
 
-        workers = self._max_workers or min(8, len(self.sources))
-        ordered_sources = list(self.sources.items())
+        workers = self._max_workers or min(8, len(ordered_sources))
         collected: dict[str, list[dict[str, Any]]] = {}
 
         with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
@@ -133,23 +315,134 @@ class KnowledgePipeline:
                     self._source_cache.popitem(last=False)
         return loaded
 
-    def _rerank(self, candidates: list[dict], goal: str) -> list[dict]:
-        """重排序"""
-        ranked = []
-        for candidate in candidates:
-            goal_score = self._similarity(goal, candidate.get("content", ""))
-            final_score = (
-                candidate.get("retrieval_score", 0.0) * self.rerank_retrieval_weight
-                + goal_score * self.rerank_goal_weight
+    def _rerank(self, candidates: list[dict], goal: str, top_k: int | None = None) -> list[dict]:
+        """重排序：候选 dict 由召回阶段新建，分数直接写回，不再复制"""
+        if not candidates:
+            return []
+        goal_scores: list[float | None] = [c.get("goal_score") for c in candidates]
+        missing = [i for i, score in enumerate(goal_scores) if score is None]
+        if missing:
+            computed = self._batch_similarity(
+                goal, [candidates[i].get("content", "") for i in missing]
+            )
+            for i, score in zip(missing, computed, strict=True):
+                goal_scores[i] = score
+        retrieval_weight, goal_weight = self.rerank_retrieval_weight, self.rerank_goal_weight
+        final = [
+            candidate.get("retrieval_score", 0.0) * retrieval_weight + goal_score * goal_weight
+            for candidate, goal_score in zip(
+                candidates, cast("list[float]", goal_scores), strict=True
             )
-            reranked = dict(candidate)
-            reranked["goal_score"] = goal_score
-            reranked["score"] = final_score
-            ranked.append(reranked)
+        ]
 
-        ranked.sort(key=lambda item: item.get("score", 0.0), reverse=True)
+        k = len(candidates) if top_k is None else min(top_k, len(candidates))
+        if self.mmr_lambda is not None and k > 1:
+            pool = heapq.nlargest(
+                min(len(candidates), k * 4), range(len(final)), key=final.__getitem__
+            )
+            order = self._mmr_select(candidates, final, pool, k)
+        elif k < len(candidates):
+            # heapq.nlargest 与稳定排序等价：同分保持召回顺序
+            order = heapq.nlargest(k, range(len(final)), key=final.__getitem__)
+        else:
+            order = sorted(range(len(final)), key=final.__getitem__, reverse=True)
+
+        ranked = []
+        for i in order:
+            candidate = candidates[i]
+            candidate["goal_score"] = goal_scores[i]
+            candidate["score"] = final[i]
+            ranked.append(candidate)
         return ranked
 
+    def _mmr_select(
+        self,
+        candidates: list[dict],
+        scores: list[float],
+        pool: list[int],
+        k: int,
+    ) -> list[int]:
+        """Maximal marginal relevance over ``pool`` (indices ordered by score)."""
+        assert self.mmr_lambda is not None
+        similarity = self._pairwise_similarity([candidates[i].get("content", "") for i in pool])
+        relevance_weight, diversity_weight = self.mmr_lambda, 1.0 - self.mmr_lambda
+        selected = [0]
+        max_sim = list(similarity[0])
+        remaining = set(range(1, len(pool)))
+        while remaining and len(selected) < k:
+            # 近重复片段不提供新信息，直接丢弃
+            remaining = {j for j in remaining if max_sim[j] < self.mmr_duplicate_threshold}
+            if not remaining:
+                break
+            best = max(
+                remaining,
+                key=lambda j: (
+                    relevance_weight * scores[pool[j]] - diversity_weight * max_sim[j],
+                    -j,
+                ),
+            )
+            remaining.discard(best)
+            selected.append(best)
+            max_sim = [max(a, b) for a, b in zip(max_sim, similarity[best], strict=True)]
+        return [pool[j] for j in selected]
+
+    def _pairwise_similarity(self, contents: list[str]) -> list[list[float]]:
+        """Candidate-to-candidate similarity in ``[0, 1]`` for MMR."""
+        embeddings = self._embed_many(contents) if self._embeds else [None] * len(contents)
+        if all(embeddings) and len({len(e) for e in embeddings if e}) == 1:
+            if np is not None:
+                matrix = np.asarray(embeddings, dtype=np.float32)
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                return cast("list[list[float]]", np.clip(matrix @ matrix.T, 0.0, 1.0).tolist())
+            return [
+                [max(0.0, 2 * self._cosine_similarity(a, b) - 1) for b in embeddings]
+                for a in embeddings
+            ]
+        token_sets = [set(tokenize(content)) for content in contents]
+        return [
+            [len(a & b) / len(a | b) if a or b else 1.0 for b in token_sets] for a in token_sets
+        ]
+
+    def _batch_similarity(self, query: str, contents: list[str]) -> list[float]:
+        """Score ``query`` against every content in one pass (same scale as ``_similarity``)."""
+        if not contents:
+            return []
+        if not self._embeds:
+            return [self._lexical_similarity(query, content) for content in contents]
+        try:
+            query_embedding = self._get_embedding(query)
+            embeddings = self._embed_many(contents) if query_embedding else []
+        except Exception:
+            query_embedding = None
+        if not query_embedding:
+            return [self._lexical_similarity(query, content) for content in contents]
+
+        scores: list[float] = [0.0] * len(contents)
+        rows = [i for i, e in enumerate(embeddings) if e and len(e) == len(query_embedding)]
+        if np is not None and rows:
+            matrix = np.asarray([embeddings[i] for i in rows], dtype=np.float64)
+            query_vector = np.asarray(query_embedding, dtype=np.float64)
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+            cosine = np.divide(
+                matrix @ query_vector, norms, out=np.full(len(rows), -1.0), where=norms > 0
+            )
+            for i, value in zip(rows, ((cosine + 1) / 2).tolist(), strict=True):
+                scores[i] = value
+        else:
+            for i in rows:
+                scores[i] = self._cosine_similarity(
+                    query_embedding, cast("list[float]", embeddings[i])
+                )
+        matched = set(rows)
+        for i, content in enumerate(contents):
+            if i in matched:
+                continue
+            if embeddings[i]:
+                scores[i] = 0.0  # 维度不一致，与 _cosine_similarity 一致
+            else:
+                scores[i] = self._lexical_similarity(query, content)
+        return scores
+
     def _load_chunks(self, source_id: str, source: Any, question: str) -> list[dict]:
         """Normalize source data into chunk dictionaries."""
         data = source(question) if callable(source) else source
@@ -214,7 +507,7 @@ class KnowledgePipeline:
         Returns:
             Similarity score between 0.0 and 1.0
         """
-        if self.embedding_fn:
+        if self._embeds:
             return self._semantic_similarity(left, right)
         else:
             return self._lexical_similarity(left, right)
@@ -245,6 +538,10 @@ class KnowledgePipeline:
             # Fallback to lexical if any error
             return self._lexical_similarity(left, right)
 
+    @property
+    def _embeds(self) -> bool:
+        return self.embedding_fn is not None or self.embed_batch_fn is not None
+
     def _get_embedding(self, text: str) -> list[float] | None:
         """Get embedding for text with caching
 
@@ -254,24 +551,78 @@ class KnowledgePipeline:
         Returns:
             Embedding vector or None if failed
         """
-        if not text or not self.embedding_fn:
-            return None
-
-        # Check cache
-        if text in self._embedding_cache:
-            return self._embedding_cache[text]
-
-        try:
-            embedding = self.embedding_fn(text)
-            if len(self._embedding_cache) >= self._embedding_cache_max:
-                # evict oldest entry
-                oldest = next(iter(self._embedding_cache))
-                del self._embedding_cache[oldest]
-            self._embedding_cache[text] = embedding
-            return embedding
-
-        except Exception:
-            return None
+        return self._embed_many([text])[0]
+
+    def _embed_many(self, texts: list[str]) -> list[list[float] | None]:
+        """Embed texts through the memory LRU, the disk cache, then one batch call."""
+        results: list[list[float] | None] = [None] * len(texts)
+        if not self._embeds:
+            return results
+        missing: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            if not text:
+                continue
+            cached = self._embedding_cache.get(text)
+            if cached is not None:
+                self._embedding_cache.move_to_end(text)
+                results[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
+        if missing and self.embedding_cache is not None:
+            pending = list(missing)
+            for text, stored in zip(pending, self.embedding_cache.get_many(pending), strict=True):
+                if stored is not None:
+                    self._remember_embedding(text, stored)
+                    for i in missing.pop(text):
+                        results[i] = stored
+        if not missing:
+            return results
+
+        pending = list(missing)
+        computed = self._compute_embeddings(pending)
+        fresh: list[tuple[str, list[float]]] = []
+        for text, embedding in zip(pending, computed, strict=True):
+            if not embedding:
+                continue
+            self._remember_embedding(text, embedding)
+            fresh.append((text, embedding))
+            for i in missing[text]:
+                results[i] = embedding
+        if fresh and self.embedding_cache is not None:
+            try:
+                self.embedding_cache.put_many([t for t, _ in fresh], [e for _, e in fresh])
+            except Exception as exc:
+                logger.warning("Persisting embeddings failed: %s", exc)
+        return results
+
+    def _compute_embeddings(self, texts: list[str]) -> list[list[float] | None]:
+        if self.embed_batch_fn is not None:
+            try:
+                batch = list(self.embed_batch_fn(texts))
+                if len(batch) == len(texts):
+                    return batch
+                logger.warning(
+                    "embed_batch returned %d vectors for %d texts", len(batch), len(texts)
+                )
+            except Exception as exc:
+                logger.warning("embed_batch failed: %s", exc)
+            if self.embedding_fn is None:
+                return [None] * len(texts)
+        embeddings: list[list[float] | None] = []
+        for text in texts:
+            try:
+                embeddings.append(self.embedding_fn(text) if self.embedding_fn else None)
+            except Exception:
+                embeddings.append(None)
+        return embeddings
+
+    def _remember_embedding(self, text: str, embedding: list[float]) -> None:
+        if self._embedding_cache_max <= 0:
+            return
+        self._embedding_cache[text] = embedding
+        self._embedding_cache.move_to_end(text)
+        while len(self._embedding_cache) > self._embedding_cache_max:
+            self._embedding_cache.popitem(last=False)
 
     def _cosine_similarity(self, vec1: list[float], vec2: list[float]) -> float:
         """Compute cosine similarity between two vectors
@@ -326,3 +677,9 @@ class KnowledgePipeline:
     def _tokenize(self, text: str) -> set[str]:
         """Tokenize text into lowercase terms."""
         return {token.strip(".,:;!?()[]{}\"'").lower() for token in text.split() if token.strip()}
+
+
+def _chunk_id(source_id: str, content: str) -> int:
+    """Stable 63-bit id for an indexed chunk."""
+    digest = hashlib.blake2b(f"{source_id}\0{content}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
@@ -4,14 +4,20 @@ from .schema import Tool, ToolDefinition
 
 
 class ToolRegistry:
-    """Manage tool registration and lookup"""
+    """Manage tool registration and lookup
+
+    ``generation`` increments on every register/unregister so callers can
+    memoize schemas derived from the registered tool set.
+    """
 
     def __init__(self):
         self.tools: dict[str, Tool] = {}
+        self.generation = 0
 
     def register(self, tool: Tool):
         """Register a tool"""
         self.tools[tool.definition.name] = tool
+        self.generation += 1
 
     def get(self, name: str) -> Tool | None:
         """Get tool by name"""
@@ -27,4 +33,5 @@ class ToolRegistry:
 
     def unregister(self, name: str):
         """Unregister a tool"""
-        self.tools.pop(name, None)
+        if self.tools.pop(name, None) is not None:
+            self.generation += 1
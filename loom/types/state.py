@@ -1,6 +1,6 @@
 """State types for Agent execution"""
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from typing import Any
 
@@ -25,6 +25,14 @@ class EventSurface:
     active_risks: list[dict[str, Any]] = field(default_factory=list)
     recent_event_decisions: list[dict[str, Any]] = field(default_factory=list)
 
+    def fork(self) -> "EventSurface":
+        """Copy with fresh lists; event dicts are shared, not copied."""
+        return EventSurface(
+            pending_events=list(self.pending_events),
+            active_risks=list(self.active_risks),
+            recent_event_decisions=list(self.recent_event_decisions),
+        )
+
 
 @dataclass
 class KnowledgeSurface:
@@ -34,6 +42,14 @@ class KnowledgeSurface:
     evidence_packs: list[dict[str, Any]] = field(default_factory=list)
     citations: list[str] = field(default_factory=list)
 
+    def fork(self) -> "KnowledgeSurface":
+        """Copy with fresh lists; evidence packs are shared, not copied."""
+        return KnowledgeSurface(
+            active_questions=list(self.active_questions),
+            evidence_packs=list(self.evidence_packs),
+            citations=list(self.citations),
+        )
+
 
 @dataclass
 class Dashboard:
@@ -54,3 +70,31 @@ class Dashboard:
     event_surface: EventSurface = field(default_factory=EventSurface)
     knowledge_surface: KnowledgeSurface = field(default_factory=KnowledgeSurface)
     scratchpad: str = ""
+
+    # 渲染版本号：顶层字段赋值自动递增；嵌套列表的原地修改需调用 touch()
+    version: int = field(default=0, compare=False, repr=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name != "version":
+            object.__setattr__(self, "version", getattr(self, "version", 0) + 1)
+
+    def touch(self) -> int:
+        """Mark nested state as changed so cached renders are rebuilt."""
+        self.version += 1
+        return self.version
+
+    def fork(self) -> "Dashboard":
+        """Structural copy for renewals and child contexts.
+
+        Containers are fresh so either side can append or reassign freely;
+        the entries (event dicts, evidence packs, strings) are shared because
+        the dashboard only ever replaces them, never edits them in place.
+        The version is kept so cached renders stay valid for the copy.
+        """
+        return replace(
+            self,
+            plan=list(self.plan),
+            event_surface=self.event_surface.fork(),
+            knowledge_surface=self.knowledge_surface.fork(),
+        )
@@ -16,7 +16,16 @@ from .errors import (
     VetoError,
 )
 from .logging import setup_logger
-from .tokens import count_messages_tokens, count_tokens
+from .tokens import (
+    BPEEstimator,
+    TokenCounter,
+    Tokenizer,
+    calibrate_tokenizers,
+    count_messages_tokens,
+    count_tokens,
+    get_tokenizer,
+    register_tokenizer,
+)
 
 __all__ = [
     "LoomError",
@@ -33,6 +42,12 @@ __all__ = [
     "VetoError",
     "count_tokens",
     "count_messages_tokens",
+    "Tokenizer",
+    "TokenCounter",
+    "BPEEstimator",
+    "get_tokenizer",
+    "register_tokenizer",
+    "calibrate_tokenizers",
     "setup_logger",
     "LoomConfig",
 ]
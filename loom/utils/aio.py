@@ -0,0 +1,51 @@
+"""Helpers for handlers that may be sync or async."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+async def call_maybe_async(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await ``fn`` if it is async; otherwise run it in the default thread pool.
+
+    Running sync handlers in a worker thread keeps slow resolvers (file scans,
+    blocking HTTP clients) from stalling the event loop.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    result = await asyncio.to_thread(fn, *args, **kwargs)
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run an awaitable to completion from synchronous code.
+
+    Only valid where no event loop is running in this thread (plain sync
+    callers, worker threads).  Blocking a running loop until the awaitable
+    finishes would stall or deadlock it, so async code must await the async
+    variant (``aresolve`` / ``aretrieve`` / ``aprefetch``) instead.
+
+    Raises:
+        RuntimeError: called from inside a running event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_as_coroutine(awaitable))
+    if inspect.iscoroutine(awaitable):
+        awaitable.close()  # 避免 "coroutine was never awaited" 告警
+    raise RuntimeError(
+        "run_sync() cannot be called from a running event loop; "
+        "await the async variant instead"
+    )
+
+
+async def _as_coroutine(awaitable: Awaitable[T]) -> T:
+    return await awaitable
@@ -1,22 +1,469 @@
-"""Token counting utilities"""
+"""Token counting utilities
 
+Token 计数按模型家族选择 tokenizer：
 
-def count_tokens(text: str, model: str = "claude-3-5-sonnet-20241022") -> int:
-    """Estimate token count (simplified)
+- ``BPEEstimator``: 随包附带的离线估算器，模拟 BPE 预切分（单词 / 数字 / 标点 /
+  空白 / CJK 字符）并按家族系数计数，不依赖任何第三方词表
+- ``HeuristicTokenizer``: 旧的 ``len(text) // 4`` 启发式，保留用于对比和兼容
+- ``register_tokenizer``: 注册真实 tokenizer（如 tiktoken 包装）覆盖某个家族
+
+``count_tokens`` / ``count_messages_tokens`` 支持 ``loom.types.content`` 中的
+多模态内容块（image / document），并通过按内容哈希的 LRU 缓存复用计数结果。
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import math
+import re
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, Protocol, runtime_checkable
+
+DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
+DEFAULT_FAMILY = "anthropic"
+
+# 预切分：CJK 单字 | 字母串（可带前导空格）| 1-3 位数字 | 空白串 | 标点串
+_CJK = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef"
+_PRETOKEN_RE = re.compile(
+    rf"[{_CJK}]| ?[^\W\d_{_CJK}]+|\d{{1,3}}|\s+|[^\w\s{_CJK}]+",
+)
+
+
+@runtime_checkable
+class Tokenizer(Protocol):
+    """Minimal tokenizer contract: count tokens in plain text."""
+
+    name: str
+
+    def count(self, text: str) -> int: ...
+
+
+class HeuristicTokenizer:
+    """Legacy ~4 characters per token estimate."""
+
+    name = "heuristic"
+
+    def __init__(self, chars_per_token: int = 4):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return len(text) // self.chars_per_token
+
+
+class BPEEstimator:
+    """Offline BPE-style token estimator.
+
+    Splits text the way byte-level BPE pre-tokenizers do, then charges each
+    piece according to per-family coefficients. Coefficients are starting
+    points; tune them against provider-reported usage with
+    ``calibrate_tokenizers``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        short_word_chars: int = 5,
+        chars_per_token: float = 4.0,
+        non_ascii_bytes_per_token: float = 3.0,
+        cjk_tokens_per_char: float = 1.0,
+        punct_chars_per_token: float = 2.0,
+        image_tiles: bool = False,
+        default_image_tokens: int = 1600,
+        page_tokens: int = 1500,
+    ):
+        self.name = name
+        self.short_word_chars = short_word_chars
+        self.chars_per_token = chars_per_token
+        self.non_ascii_bytes_per_token = non_ascii_bytes_per_token
+        self.cjk_tokens_per_char = cjk_tokens_per_char
+        self.punct_chars_per_token = punct_chars_per_token
+        self.image_tiles = image_tiles
+        self.default_image_tokens = default_image_tokens
+        self.page_tokens = page_tokens
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        total = 0.0
+        for piece in _PRETOKEN_RE.findall(text):
+            first = piece[0]
+            if piece.isspace():
+                # 单个空格会并入下一个单词；其余空白串（换行、缩进）计 1
+                if piece != " ":
+                    total += 1
+            elif len(piece) == 1 and _is_cjk(first):
+                total += self.cjk_tokens_per_char
+            elif first.isdigit():
+                total += 1
+            else:
+                word = piece.lstrip(" ")
+                if not word:
+                    continue
+                if word[0].isalpha():
+                    total += self._word_tokens(word)
+                else:
+                    total += math.ceil(len(word) / self.punct_chars_per_token)
+        return max(1, round(total))
+
+    def image_tokens(self, width: int | None, height: int | None) -> int:
+        if not width or not height:
+            return self.default_image_tokens
+        if self.image_tiles:
+            # OpenAI high detail: fit 2048², shortest side 768, 512px tiles
+            scale = min(1.0, 2048 / max(width, height))
+            fitted_w, fitted_h = width * scale, height * scale
+            scale = min(1.0, 768 / min(fitted_w, fitted_h))
+            fitted_w, fitted_h = fitted_w * scale, fitted_h * scale
+            tiles = int(math.ceil(fitted_w / 512) * math.ceil(fitted_h / 512))
+            return 85 + 170 * tiles
+        # Anthropic: long edge resized to 1568, ~750 px² per token
+        scale = min(1.0, 1568 / max(width, height))
+        return min(self.default_image_tokens, math.ceil(width * height * scale * scale / 750))
+
+    def document_tokens(self, pages: int | None) -> int:
+        return max(1, pages or 1) * self.page_tokens
+
+    def _word_tokens(self, word: str) -> float:
+        if word.isascii():
+            extra = len(word) - self.short_word_chars
+            return 1 + max(0, extra) / self.chars_per_token
+        return max(1.0, len(word.encode("utf-8")) / self.non_ascii_bytes_per_token)
+
+
+class TokenCounter:
+    """Tokenizer wrapper that adds content-block support and an LRU count cache."""
+
+    def __init__(self, tokenizer: Tokenizer, cache_size: int = 4096, min_cached_chars: int = 64):
+        self.tokenizer = tokenizer
+        self.cache_size = cache_size
+        self.min_cached_chars = min_cached_chars
+        self._cache: OrderedDict[bytes, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def name(self) -> str:
+        return self.tokenizer.name
+
+    def count(self, text: str) -> int:
+        """Count tokens in text, cached by content hash for longer strings."""
+        if len(text) < self.min_cached_chars or self.cache_size <= 0:
+            return self.tokenizer.count(text)
+
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+        tokens = self.tokenizer.count(text)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_content(self, content: Any) -> int:
+        """Count ``MessageContent``: plain text or a list of content blocks."""
+        if content is None:
+            return 0
+        if isinstance(content, str):
+            return self.count(content)
+        if isinstance(content, list):
+            return sum(self._count_block(block) for block in content)
+        return self.count(str(content))
+
+    def count_message(self, message: Any) -> int:
+        """Count one message's content plus any tool-call payloads."""
+        total = self.count_content(getattr(message, "content", None))
+        for call in getattr(message, "tool_calls", None) or ():
+            total += self.count(str(getattr(call, "name", "")))
+            total += self.count(json.dumps(getattr(call, "arguments", {}), ensure_ascii=False))
+        return total
+
+    def count_messages(self, messages: Iterable[Any]) -> int:
+        return sum(self.count_message(msg) for msg in messages if hasattr(msg, "content"))
+
+    def _count_block(self, block: Any) -> int:
+        if isinstance(block, str):
+            return self.count(block)
+        if isinstance(block, dict):
+            block_type = block.get("type")
+            text = block.get("text")
+            source = block.get("source") or {}
+        else:
+            block_type = getattr(block, "type", None)
+            text = getattr(block, "text", None)
+            source = getattr(block, "source", None) or {}
+
+        if block_type == "image":
+            width, height = _image_dimensions(source)
+            image_tokens = getattr(self.tokenizer, "image_tokens", None)
+            if callable(image_tokens):
+                return int(image_tokens(width, height))
+            return 1600
+        if block_type == "document":
+            pages = _document_pages(source)
+            document_tokens = getattr(self.tokenizer, "document_tokens", None)
+            if callable(document_tokens):
+                return int(document_tokens(pages))
+            return max(1, pages or 1) * 1500
+        return self.count(str(text or ""))
+
+
+# ── Registry ──
+
+_FAMILY_PREFIXES: list[tuple[str, str]] = [
+    ("claude", "anthropic"),
+    ("gpt-", "openai"),
+    ("o1", "openai"),
+    ("o3", "openai"),
+    ("o4", "openai"),
+    ("chatgpt", "openai"),
+    ("text-embedding", "openai"),
+    ("gemini", "gemini"),
+    ("qwen", "qwen"),
+    ("qwq", "qwen"),
+    ("deepseek", "deepseek"),
+    ("minimax", "minimax"),
+    ("abab", "minimax"),
+    ("llama", "ollama"),
+    ("mistral", "ollama"),
+]
+
+_BUILTIN_ESTIMATORS: dict[str, dict[str, Any]] = {
+    "anthropic": {"cjk_tokens_per_char": 1.2},
+    "openai": {"cjk_tokens_per_char": 1.0, "image_tiles": True, "default_image_tokens": 765},
+    "gemini": {"cjk_tokens_per_char": 0.9, "default_image_tokens": 258, "page_tokens": 258},
+    "qwen": {"cjk_tokens_per_char": 0.7},
+    "deepseek": {"cjk_tokens_per_char": 0.6},
+    "minimax": {"cjk_tokens_per_char": 0.8},
+    "ollama": {"chars_per_token": 3.6, "cjk_tokens_per_char": 1.5},
+}
+
+_registry: dict[str, TokenCounter] = {}
+_registry_lock = threading.Lock()
+
+
+def register_tokenizer(
+    family: str,
+    tokenizer: Tokenizer,
+    *,
+    prefixes: Iterable[str] = (),
+    cache_size: int = 4096,
+) -> TokenCounter:
+    """Register a tokenizer for a model family.
 
     Args:
-        text: 文本内容
-        model: 模型名称（预留参数，未来用于不同模型的 token 计算）
+        family: 家族名（如 ``"openai"``），也可以是新家族
+        tokenizer: 实现 ``Tokenizer`` 协议的对象
+        prefixes: 归入该家族的模型名前缀
+        cache_size: LRU 计数缓存容量
+    """
+    counter = TokenCounter(tokenizer, cache_size=cache_size)
+    with _registry_lock:
+        _registry[family] = counter
+        for prefix in prefixes:
+            prefix = prefix.lower()
+            # 重复注册同一前缀时替换旧条目，而不是不断堆叠
+            _FAMILY_PREFIXES[:] = [entry for entry in _FAMILY_PREFIXES if entry[0] != prefix]
+            _FAMILY_PREFIXES.insert(0, (prefix, family))
+    return counter
+
+
+def resolve_family(model: Any = None, provider: str | None = None) -> str:
+    """Resolve a model family from a model name, ``provider:name`` id, or ``Model``."""
+    if model is not None and not isinstance(model, str):
+        provider = provider or getattr(model, "provider", None)
+        model = getattr(model, "name", None)
+    name = (model or "").lower()
+    if ":" in name:
+        prefix, _, rest = name.partition(":")
+        provider = provider or prefix
+        name = rest
+    for prefix, family in _FAMILY_PREFIXES:
+        if name.startswith(prefix):
+            return family
+    if provider and (provider in _registry or provider in _BUILTIN_ESTIMATORS):
+        return provider
+    return DEFAULT_FAMILY
+
+
+def get_tokenizer(model: Any = None, *, family: str | None = None) -> TokenCounter:
+    """Return the shared ``TokenCounter`` for a model or family.
+
+    ``model`` may be a model name, a ``provider:name`` identifier, a ``Model``,
+    or a ``Tokenizer`` instance (wrapped in a private counter).
     """
-    _ = model  # 预留参数，未来用于模型特定的 token 计算
-    # Rough estimation: ~4 chars per token
-    return len(text) // 4
+    if isinstance(model, TokenCounter):
+        return model
+    if model is not None and not isinstance(model, str) and isinstance(model, Tokenizer):
+        return TokenCounter(model)
+    if (
+        family is None
+        and isinstance(model, str)
+        and (model in _registry or model in _BUILTIN_ESTIMATORS)
+    ):
+        family = model
+    resolved = family or resolve_family(model if model is not None else DEFAULT_MODEL)
+    with _registry_lock:
+        counter = _registry.get(resolved)
+        if counter is None:
+            options = _BUILTIN_ESTIMATORS.get(resolved, {})
+            counter = TokenCounter(BPEEstimator(resolved, **options))
+            _registry[resolved] = counter
+        return counter
 
 
-def count_messages_tokens(messages: list) -> int:
+def count_tokens(text: Any, model: Any = DEFAULT_MODEL) -> int:
+    """Count tokens for text or multimodal ``MessageContent``.
+
+    Args:
+        text: 文本内容，或 content block 列表
+        model: 模型名称 / ``Model`` / ``Tokenizer``，用于选择 tokenizer
+    """
+    return get_tokenizer(model).count_content(text)
+
+
+def count_messages_tokens(messages: list, model: Any = DEFAULT_MODEL) -> int:
     """Count tokens in message list"""
-    total = 0
-    for msg in messages:
-        if hasattr(msg, "content"):
-            total += count_tokens(msg.content)
-    return total
+    return get_tokenizer(model).count_messages(messages)
+
+
+# ── Calibration ──
+
+
+@dataclass(slots=True)
+class TokenizerCalibration:
+    """Estimator accuracy against provider-reported input tokens."""
+
+    tokenizer: str
+    samples: int
+    mean_ratio: float
+    mean_abs_pct_error: float
+    max_abs_pct_error: float
+
+
+def calibrate_tokenizers(
+    samples: Iterable[tuple[Any, Any]],
+    tokenizers: dict[str, Any] | None = None,
+) -> dict[str, TokenizerCalibration]:
+    """Compare estimators against provider-reported ``TokenUsage``.
+
+    Args:
+        samples: ``(messages_or_text, usage)`` 对；``usage`` 可以是
+            ``TokenUsage`` 或 ``input_tokens`` 整数
+        tokenizers: 名称 → tokenizer / 模型名；默认比较 heuristic 与所有内置家族
+
+    Returns:
+        每个 tokenizer 的 ``TokenizerCalibration``（ratio = estimate / reported）
+    """
+    if tokenizers is None:
+        tokenizers = {"heuristic": HeuristicTokenizer()}
+        tokenizers.update({family: family for family in _BUILTIN_ESTIMATORS})
+    counters = {
+        name: get_tokenizer(family=value) if isinstance(value, str) else get_tokenizer(value)
+        for name, value in tokenizers.items()
+    }
+
+    pairs: list[tuple[Any, int]] = []
+    for payload, usage in samples:
+        reported = int(getattr(usage, "input_tokens", usage) or 0)
+        if reported > 0:
+            pairs.append((payload, reported))
+
+    results: dict[str, TokenizerCalibration] = {}
+    for name, counter in counters.items():
+        ratios: list[float] = []
+        for payload, reported in pairs:
+            estimate = (
+                counter.count_messages(payload)
+                if isinstance(payload, list) and payload and hasattr(payload[0], "content")
+                else counter.count_content(payload)
+            )
+            ratios.append(estimate / reported)
+        errors = [abs(ratio - 1.0) for ratio in ratios]
+        results[name] = TokenizerCalibration(
+            tokenizer=name,
+            samples=len(ratios),
+            mean_ratio=sum(ratios) / len(ratios) if ratios else 0.0,
+            mean_abs_pct_error=100 * sum(errors) / len(errors) if errors else 0.0,
+            max_abs_pct_error=100 * max(errors) if errors else 0.0,
+        )
+    return results
+
+
+# ── Helpers ──
+
+
+def _is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (
+        0x3040 <= code <= 0x30FF
+        or 0x3400 <= code <= 0x4DBF
+        or 0x4E00 <= code <= 0x9FFF
+        or 0xAC00 <= code <= 0xD7AF
+        or 0xF900 <= code <= 0xFAFF
+        or 0xFF00 <= code <= 0xFFEF
+    )
+
+
+def _decoded_prefix(source: dict[str, Any], size: int) -> bytes:
+    if source.get("type") != "base64":
+        return b""
+    data = str(source.get("data") or "")
+    chunk = data[: (size + 2) // 3 * 4]
+    try:
+        return base64.b64decode(chunk + "=" * (-len(chunk) % 4))
+    except (ValueError, TypeError):
+        return b""
+
+
+def _image_dimensions(source: dict[str, Any]) -> tuple[int | None, int | None]:
+    """Read width/height from base64 PNG or GIF headers without decoding the image."""
+    head = _decoded_prefix(source, 32)
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+        width, height = struct.unpack(">II", head[16:24])
+        return width, height
+    if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+        width, height = struct.unpack("<HH", head[6:10])
+        return width, height
+    return None, None
+
+
+_DOCUMENT_PAGES_CACHE_SIZE = 256
+_document_pages_cache: OrderedDict[bytes, int | None] = OrderedDict()
+_document_pages_lock = threading.Lock()
+
+
+def _document_pages(source: dict[str, Any]) -> int | None:
+    """Count PDF pages, memoized by content hash so each document decodes once."""
+    if source.get("type") != "base64":
+        return None
+    data = str(source.get("data") or "")
+    key = hashlib.blake2b(data.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _document_pages_lock:
+        if key in _document_pages_cache:
+            _document_pages_cache.move_to_end(key)
+            return _document_pages_cache[key]
+    try:
+        raw = base64.b64decode(data)
+    except (ValueError, TypeError):
+        pages = None
+    else:
+        pages = len(re.findall(rb"/Type\s*/Page(?!s)", raw)) or None
+    with _document_pages_lock:
+        _document_pages_cache[key] = pages
+        if len(_document_pages_cache) > _DOCUMENT_PAGES_CACHE_SIZE:
+            _document_pages_cache.popitem(last=False)
+    return pages
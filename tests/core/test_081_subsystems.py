@@ -303,7 +303,7 @@ def test_knowledge_resolver_factories(tmp_path) -> None:
 
     assert static_source.resolve(KnowledgeQuery(text="x", top_k=1)).items[0].source_name == "static"
     assert (
-        directory_source.resolve(KnowledgeQuery(text="x", top_k=1)).items[0].content
+        directory_source.resolve(KnowledgeQuery(text="directory", top_k=1)).items[0].content
         == "Directory evidence"
     )
 
@@ -0,0 +1,104 @@
+"""Test the IVF approximate nearest-neighbour index."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from loom.memory.ann import IVFIndex  # noqa: E402
+from loom.memory.semantic import MemoryEntry, SemanticMemory  # noqa: E402
+from loom.tools.knowledge import KnowledgePipeline  # noqa: E402
+
+
+def _clustered(n: int, dim: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((40, dim))
+    return (centers[rng.integers(0, 40, n)] + 0.2 * rng.standard_normal((n, dim))).astype(
+        np.float32
+    )
+
+
+def _exact(vectors, query, top_k):
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return set(np.argsort(-(normed @ (query / np.linalg.norm(query))))[:top_k].tolist())
+
+
+class TestIVFIndex:
+    def test_exact_below_threshold_and_trains_past_it(self):
+        vectors = _clustered(3_000)
+        index = IVFIndex(exact_threshold=1_000, nprobe=4)
+        index.add_many(range(500), vectors[:500])
+        assert not index.trained
+        assert {i for i, _ in index.search(vectors[7], 10)} == _exact(vectors[:500], vectors[7], 10)
+
+        index.add_many(range(500, 3_000), vectors[500:])
+        assert index.trained
+        recall = np.mean(
+            [
+                len({i for i, _ in index.search(q, 10)} & _exact(vectors, q, 10)) / 10
+                for q in vectors[:50]
+            ]
+        )
+        assert recall >= 0.9
+
+    def test_incremental_delete_replace_and_persist(self, tmp_path):
+        vectors = _clustered(2_000)
+        index = IVFIndex(exact_threshold=500)
+        index.add_many(range(2_000), vectors)
+        for item_id in range(0, 2_000, 2):
+            assert index.remove(item_id)
+        assert len(index) == 1_000
+        assert all(i % 2 for i, _ in index.search(vectors[10], 20, nprobe=64))
+
+        index.add(1, -vectors[1])  # 同 id 替换向量
+        assert index.search(-vectors[1], 1)[0][0] == 1
+
+        index.save(tmp_path / "index.npz")
+        loaded = IVFIndex.load(tmp_path / "index.npz", nprobe=2)
+        assert loaded.nprobe == 2 and len(loaded) == 1_000
+        assert [i for i, _ in loaded.search(vectors[11], 5)] == [
+            i for i, _ in index.search(vectors[11], 5, nprobe=2)
+        ]
+
+
+def test_semantic_memory_restores_persisted_index(tmp_path):
+    vectors = _clustered(600)
+    path = tmp_path / "memory.bin"
+    memory = SemanticMemory(
+        max_size=600, persist_path=str(path), ann_index=IVFIndex(exact_threshold=200)
+    )
+    for i, vector in enumerate(vectors):
+        memory.add(MemoryEntry(content=f"result {i}", embedding=vector.tolist()))
+    memory.compact()
+    assert (tmp_path / "memory.bin.ann.npz").exists()
+
+    restored = SemanticMemory(
+        max_size=600, persist_path=str(path), ann_index=IVFIndex(exact_threshold=200)
+    )
+    assert restored._ann_covered == 600
+    assert len(restored.ann_index) == 600
+    hits = restored.search("", top_k=3, query_embedding=vectors[42].tolist())
+    assert hits[0].content == "result 42"
+
+
+def test_knowledge_pipeline_recalls_static_sources_through_index(tmp_path):
+    vocab = {"runtime": [1.0, 0.0, 0.0], "banana": [0.0, 1.0, 0.0], "agent": [0.9, 0.1, 0.0]}
+    calls = []
+
+    def embed(text):
+        calls.append(text)
+        return next((v for word, v in vocab.items() if word in text.lower()), [0.0, 0.0, 1.0])
+
+    chunks = ["Loom agent runtime internals.", "Bananas are yellow.", "Runtime loop design."]
+    pipeline = KnowledgePipeline(embedding_fn=embed, ann_index=IVFIndex(), ann_candidates=2)
+    pipeline.register_source("wiki", chunks)
+    pack = pipeline.retrieve("runtime", "runtime", top_k=2)
+    assert {chunk["content"] for chunk in pack.chunks} == {chunks[0], chunks[2]}
+
+    pipeline.ann_index.save(tmp_path / "kb.npz")
+    calls.clear()
+    reloaded = KnowledgePipeline(embedding_fn=embed, ann_index=IVFIndex.load(tmp_path / "kb.npz"))
+    reloaded.register_source("wiki", chunks)
+    assert calls == []  # 内容哈希命中已持久化的向量，无需重新 embedding
+
+    reloaded.register_source("wiki", chunks[:1])
+    assert len(reloaded.ann_index) == 1
@@ -2,9 +2,17 @@
 
 import threading
 
+import pytest
+
+from loom.context.accounting import TokenLedger
 from loom.context.compression import ContextCompressor
 from loom.context.manager import ContextManager
 from loom.context.partitions import ContextPartitions
+from loom.context.renewal import ContextRenewer
+from loom.memory import SnapshotStore
+from loom.types import Message
+from loom.utils import count_messages_tokens
+from loom.utils.errors import ContextError
 
 
 class TestContextManager:
@@ -40,6 +48,66 @@ class TestContextManager:
         assert completed.is_set()
 
 
+class TestTokenLedger:
+    """Test incremental token accounting"""
+
+    @staticmethod
+    def _full_count(partitions: ContextPartitions) -> int:
+        return count_messages_tokens(partitions.get_all_messages())
+
+    def test_rho_matches_full_recount_across_mutations(self, tmp_path):
+        cm = ContextManager(max_tokens=1000, debug_token_accounting=True)
+        cm.renewer = ContextRenewer(SnapshotStore(tmp_path))
+        cm.partitions.system.append(Message(role="system", content="system prompt " * 10))
+        for i in range(30):
+            cm.partitions.history.append(Message(role="user", content=f"message {i} " * 20))
+        assert cm.token_count == self._full_count(cm.partitions)
+
+        cm.compress("snip")
+        cm.partitions.history.append(Message(role="assistant", content="done " * 40))
+        assert cm.token_count == self._full_count(cm.partitions)
+
+        cm.partitions.history[-1] = Message(role="assistant", content="x")
+        assert cm.token_count == self._full_count(cm.partitions)
+
+        cm.renew()
+        assert cm.token_count == self._full_count(cm.partitions)
+
+    def test_append_only_counts_new_messages(self, monkeypatch):
+        partitions = ContextPartitions()
+        partitions.history.extend(Message(role="user", content="a" * 40) for _ in range(50))
+        ledger = TokenLedger()
+        ledger.count(partitions)
+
+        counted: list[Message] = []
+        original = ledger.counter.count_message
+
+        def _spy(message):
+            counted.append(message)
+            return original(message)
+
+        monkeypatch.setattr(ledger.counter, "count_message", _spy)
+        partitions.history.append(Message(role="assistant", content="b" * 40))
+        ledger.count(partitions)
+
+        # only the new history message; the unchanged dashboard render is reused
+        assert len(counted) == 1
+
+    def test_debug_mode_detects_drift(self):
+        cm = ContextManager(max_tokens=1000, debug_token_accounting=True)
+        msg = Message(role="user", content="short")
+        cm.partitions.history.append(msg)
+        assert cm.rho >= 0
+
+        # appended messages are treated as immutable; debug mode flags violations
+        msg.content = "a much longer body " * 50
+        with pytest.raises(ContextError):
+            _ = cm.rho
+
+        cm.ledger.invalidate()
+        assert cm.token_count == self._full_count(cm.partitions)
+
+
 class TestContextPartitions:
     """Test ContextPartitions"""
 
@@ -56,6 +124,144 @@ class TestContextPartitions:
         messages = partitions.get_all_messages()
         assert isinstance(messages, list)
 
+    def test_unchanged_dashboard_render_is_reused(self, monkeypatch):
+        partitions = ContextPartitions()
+        partitions.skill = ["### Skill: review"]
+        partitions.history = [Message(role="user", content=f"m{i}") for i in range(200)]
+        first = partitions.get_all_messages()
+
+        rendered: list[str] = []
+        original_dashboard = partitions._render_dashboard
+        original_skills = partitions._render_skills
+        monkeypatch.setattr(
+            partitions,
+            "_render_dashboard",
+            lambda: rendered.append("dashboard") or original_dashboard(),
+        )
+        monkeypatch.setattr(
+            partitions,
+            "_render_skills",
+            lambda: rendered.append("skill") or original_skills(),
+        )
+
+        second = partitions.get_all_messages()
+        assert rendered == []
+        assert second[0] is first[0]
+
+        partitions.working.error_count += 1
+        partitions.skill.append("### Skill: deploy")
+        third = partitions.get_all_messages()
+        assert rendered == ["dashboard", "skill"]
+        assert "Error Count: 1" in third[0].content
+        assert "deploy" in third[1].content
+
+    def test_capability_swap_invalidates_skill_render(self):
+        from loom.ecosystem.activation import Capability, CapabilityRegistry
+
+        registry = CapabilityRegistry()
+        registry.register(Capability(name="review", description="Review code", tools=[]))
+        registry.register(Capability(name="deploy", description="Ship builds", tools=[]))
+        partitions = ContextPartitions()
+        registry.activate("review", context=partitions)
+        assert "review" in partitions.get_all_messages()[-1].content
+
+        # 长度不变的替换也必须重新渲染
+        registry.deactivate("review", context=partitions)
+        registry.activate("deploy", context=partitions)
+        skill_msg = partitions.get_all_messages()[-1].content
+        assert "deploy" in skill_msg and "review" not in skill_msg
+
+    def test_dashboard_manager_mutators_invalidate_render(self):
+        cm = ContextManager(max_tokens=1000)
+        before = cm.partitions.get_all_messages()[0]
+
+        cm.dashboard.add_question("what changed?")
+        after = cm.partitions.get_all_messages()[0]
+
+        assert after is not before
+        assert "what changed?" in after.content
+        cm.dashboard.update_rho(cm.partitions.working.rho)
+        assert cm.partitions.get_all_messages()[0] is after
+
+    def test_fork_shares_messages_and_diverges_independently(self):
+        cm = ContextManager(max_tokens=100_000)
+        cm.partitions.system = [Message(role="system", content="rules")]
+        cm.partitions.history = [Message(role="user", content=f"m{i}") for i in range(50)]
+        cm.dashboard.add_question("open?")
+        rendered = cm.partitions.get_all_messages()
+        tokens = cm.token_count
+
+        child = cm.fork()
+        assert child.partitions.history is not cm.partitions.history
+        assert all(
+            a is b for a, b in zip(child.partitions.history, cm.partitions.history, strict=True)
+        )
+        assert child.partitions.get_all_messages()[1] is rendered[1]  # 复用父级渲染
+        assert child.token_count == tokens
+
+        child.partitions.history.append(Message(role="assistant", content="child only"))
+        child.dashboard.add_question("child question")
+        assert len(cm.partitions.history) == 50
+        assert cm.partitions.working.knowledge_surface.active_questions == ["open?"]
+        assert child.dashboard.dashboard is child.partitions.working
+        assert child.token_count > tokens == cm.token_count
+
+    def test_renew_shares_dashboard_entries_instead_of_deep_copying(self, tmp_path):
+        cm = ContextManager(max_tokens=100_000)
+        cm.renewer = ContextRenewer(SnapshotStore(tmp_path))
+        event = {"summary": "disk full", "urgency": "high"}
+        cm.partitions.working.event_surface.pending_events.append(event)
+        cm.partitions.working.plan = ["step"]
+        old_working = cm.partitions.working
+
+        cm.renew()
+        surface = cm.partitions.working.event_surface
+        assert surface.pending_events[0] is event
+        assert surface.pending_events is not old_working.event_surface.pending_events
+        assert cm.partitions.working.plan == ["step"]
+
+    def test_cache_stable_layout_moves_dashboard_to_the_end(self):
+        cm = ContextManager(max_tokens=100_000, layout="cache_stable")
+        cm.partitions.system = [Message(role="system", content="rules")]
+        cm.partitions.memory = [Message(role="system", content="AGENTS.md")]
+        cm.partitions.skill = ["search"]
+        cm.partitions.history = [
+            Message(role="user", content="q"),
+            Message(role="assistant", content="a"),
+        ]
+
+        first = cm.partitions.get_all_messages()
+        assert [m.content for m in first[:2]] == ["rules", "AGENTS.md"]
+        assert "search" in first[2].content
+        assert first[3:5] == cm.partitions.history
+        assert first[-1].content.startswith("## Dashboard")
+        assert cm.partitions.stable_prefix_length() == 5
+
+        cm.dashboard.update_rho(0.9)
+        cm.partitions.history.append(Message(role="user", content="next"))
+        second = cm.partitions.get_all_messages()
+        # 前缀只追加，不变；易变的 Dashboard 在末尾
+        assert all(a is b for a, b in zip(first[:5], second, strict=False))
+        assert second[-1] is not first[-1]
+        assert cm.partitions.stable_prefix_length() == 6
+
+        prefix_tokens = count_messages_tokens(second[:6])
+        assert cm.stable_prefix_tokens == pytest.approx(prefix_tokens, abs=4)
+        assert cm.stable_prefix_tokens < cm.token_count
+
+    def test_layout_survives_renew_and_fork(self, tmp_path):
+        cm = ContextManager(max_tokens=100_000, layout="cache_stable")
+        cm.renewer = ContextRenewer(SnapshotStore(tmp_path))
+        cm.partitions.system = [Message(role="system", content="rules")]
+
+        assert cm.fork().partitions.layout == "cache_stable"
+        cm.renew()
+        assert cm.partitions.layout == "cache_stable"
+        assert cm.partitions.get_all_messages()[-1].content.startswith("## Dashboard")
+        assert ContextManager().partitions.stable_prefix_length() == 0
+        with pytest.raises(ValueError):
+            ContextPartitions(layout="random")  # type: ignore[arg-type]
+
 
 class TestContextCompressor:
     """Test ContextCompressor"""
@@ -1,5 +1,8 @@
 """Test context extended modules - compression, renewal, event_aggregator, dashboard"""
 
+import json
+import threading
+
 import pytest
 
 from loom.context.compression import CompressionPolicy, ContextCompressor
@@ -7,6 +10,7 @@ from loom.context.dashboard import DashboardManager
 from loom.context.event_aggregator import EventAggregator
 from loom.context.partitions import ContextPartitions
 from loom.context.renewal import ContextRenewer
+from loom.memory import SnapshotStore
 from loom.types import Dashboard, Message
 
 # ── ContextCompressor ──
@@ -153,13 +157,13 @@ class TestContextCompressor:
 
 
 class TestContextRenewer:
-    def test_creation(self):
-        renewer = ContextRenewer()
+    def test_creation(self, tmp_path):
+        renewer = ContextRenewer(SnapshotStore(tmp_path))
         assert renewer.compressor is not None
         assert renewer.persistent is not None
 
-    def test_renew(self):
-        renewer = ContextRenewer()
+    def test_renew(self, tmp_path):
+        renewer = ContextRenewer(SnapshotStore(tmp_path))
         partitions = ContextPartitions()
 
         # Add some data
@@ -194,8 +198,8 @@ class TestContextRenewer:
         assert handoff.sprint == 0
         assert handoff.open_tasks == ["step1", "step2"]
 
-    def test_renew_creates_fresh_working_state(self):
-        renewer = ContextRenewer()
+    def test_renew_creates_fresh_working_state(self, tmp_path):
+        renewer = ContextRenewer(SnapshotStore(tmp_path))
         partitions = ContextPartitions()
         partitions.working.plan = ["step1"]
         partitions.working.event_surface.pending_events = [{"event_id": "e1"}]
@@ -207,6 +211,46 @@ class TestContextRenewer:
         assert partitions.working.plan == ["step1"]
         assert handoff.goal == "goal"
 
+    def test_renew_writes_one_namespaced_snapshot(self, tmp_path):
+        store = SnapshotStore(tmp_path)
+        partitions = ContextPartitions()
+        partitions.working.plan = ["step1"]
+        partitions.working.knowledge_surface.citations = ["doc-1"]
+
+        ContextRenewer(store, namespace="session-a").renew(partitions, "goal a", sprint=2)
+        ContextRenewer(store, namespace="session:b").renew(ContextPartitions(), "goal b")
+        assert store.flush(timeout=5)
+
+        a = json.loads(store.path_for("session-a").read_text())
+        assert a["goal"] == "goal a" and a["sprint"] == 2
+        assert a["plan_state"]["plan"] == ["step1"]
+        assert a["knowledge_state"]["citations"] == ["doc-1"]
+        assert store.load("session:b")["goal"] == "goal b"
+        assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == [
+            "snapshot.json",
+            "snapshot.json",
+        ]
+
+    def test_renew_does_not_wait_for_disk_and_coalesces(self, tmp_path, monkeypatch):
+        store = SnapshotStore(tmp_path)
+        release = threading.Event()
+        original = store._write
+
+        def slow_write(namespace, snapshot):
+            release.wait(5)
+            original(namespace, snapshot)
+
+        monkeypatch.setattr(store, "_write", slow_write)
+        renewer = ContextRenewer(store, namespace="s")
+        for sprint in range(5):
+            renewer.renew(ContextPartitions(), "goal", sprint=sprint)
+
+        assert store.load("s")["sprint"] == 4  # 排队中的快照可读
+        release.set()
+        assert store.flush(timeout=5)
+        assert store.writes <= 2  # 首次写入阻塞期间的后续快照合并为一次
+        assert json.loads(store.path_for("s").read_text())["sprint"] == 4
+
 
 # ── EventAggregator ──
 
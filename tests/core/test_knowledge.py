@@ -105,3 +105,286 @@ class TestKnowledgePipeline:
 
         assert calls["q1"] == 2
         assert calls["q2"] == 1
+
+    def test_embed_batch_embeds_all_uncached_texts_in_one_call(self):
+        """Each retrieval embeds every uncached text in a single batch call."""
+        batches: list[list[str]] = []
+
+        def embed_batch(texts):
+            batches.append(list(texts))
+            return [[1.0, float(len(text))] for text in texts]
+
+        pipeline = KnowledgePipeline(embed_batch_fn=embed_batch)
+        pipeline.register_source("wiki", ["alpha runtime", "beta loop", "gamma"])
+
+        pipeline.retrieve("runtime", "goal")
+        assert batches[0] == ["runtime", "alpha runtime", "beta loop", "gamma"]
+        assert batches[1:] == [["goal"]]
+
+        batches.clear()
+        pipeline.retrieve("runtime", "goal")
+        assert batches == []
+
+    def test_embedding_cache_survives_restart(self, tmp_path):
+        """The disk cache serves embeddings computed by a previous pipeline."""
+        from loom.memory.embedding_cache import EmbeddingCache
+
+        calls = Counter()
+
+        def embed(text):
+            calls[text] += 1
+            return [1.0, 0.5] if "runtime" in text else [0.0, 1.0]
+
+        first = KnowledgePipeline(
+            embedding_fn=embed, embedding_cache=EmbeddingCache(tmp_path, "model-a")
+        )
+        first.register_source("wiki", ["runtime notes", "other"])
+        first.retrieve("runtime", "runtime")
+        first.embedding_cache.close()
+        assert calls["runtime notes"] == 1
+
+        second = KnowledgePipeline(
+            embedding_fn=embed, embedding_cache=EmbeddingCache(tmp_path, "model-a")
+        )
+        second.register_source("wiki", ["runtime notes", "other"])
+        pack = second.retrieve("runtime", "runtime")
+        assert pack.chunks[0]["content"] == "runtime notes"
+        assert calls["runtime notes"] == 1
+        # 不同模型 id 不共享缓存
+        assert len(EmbeddingCache(tmp_path, "model-b")) == 0
+
+    def test_lexical_index_updates_incrementally_on_reregister(self):
+        """Re-registering a static source only re-indexes the chunks that changed."""
+        pipeline = KnowledgePipeline()
+        pipeline.register_source("wiki", ["agent runtime loop", "banana bread recipe"])
+        assert pipeline.retrieve("banana", "recipe").chunks[0]["content"] == "banana bread recipe"
+
+        added = []
+        original_add = pipeline._lexical_index.add
+
+        def add(doc_id, text):
+            added.append(text)
+            original_add(doc_id, text)
+
+        pipeline._lexical_index.add = add
+        pipeline.register_source("wiki", ["agent runtime loop", "sourdough starter"])
+
+        assert pipeline.retrieve("banana", "recipe").chunks == []
+        assert pipeline.retrieve("sourdough", "bread").chunks[0]["content"] == "sourdough starter"
+        assert added == ["sourdough starter"]
+        assert len(pipeline._lexical_index) == 2
+
+        del pipeline.sources["wiki"]
+        assert pipeline.retrieve("agent", "runtime").chunks == []
+        assert len(pipeline._lexical_index) == 0
+
+    def test_rerank_scores_match_pairwise_similarity(self):
+        """Batched goal scoring agrees with per-pair similarity and keeps only top_k."""
+
+        def embed(text):
+            return [float(len(text) % 7) + 1.0, float(text.count("a")), 1.0]
+
+        pipeline = KnowledgePipeline(embedding_fn=embed)
+        contents = [f"alpha {'a' * i} beta {i}" for i in range(12)]
+        candidates = [{"content": c, "retrieval_score": 0.5} for c in contents]
+
+        ranked = pipeline._rerank(candidates, "banana goal", top_k=3)
+        expected = sorted(
+            contents,
+            key=lambda c: 0.35 + 0.3 * pipeline._similarity("banana goal", c),
+            reverse=True,
+        )[:3]
+        assert [item["content"] for item in ranked] == expected
+        assert ranked[0] is next(c for c in candidates if c["content"] == expected[0])
+        for item in ranked:
+            assert (
+                abs(item["goal_score"] - pipeline._similarity("banana goal", item["content"]))
+                < 1e-9
+            )
+
+    def test_mmr_drops_near_duplicate_chunks(self):
+        """MMR mode keeps one copy of duplicated evidence and fills with distinct chunks."""
+        chunks = [
+            "Loom runtime schedules agent tool calls.",
+            "Loom runtime schedules agent tool calls!",
+            "Loom runtime schedules agent tool calls (v2).",
+            "The runtime persists agent checkpoints to disk.",
+        ]
+        plain = KnowledgePipeline()
+        plain.register_source("wiki", chunks)
+        assert [c["content"] for c in plain.retrieve("runtime agent", "tool", 3).chunks] == chunks[
+            :3
+        ]
+
+        diverse = KnowledgePipeline(mmr_lambda=0.7, mmr_duplicate_threshold=0.8)
+        diverse.register_source("wiki", chunks)
+        pack = diverse.retrieve("runtime agent", "tool", 3)
+        assert [c["content"] for c in pack.chunks] == [chunks[0], chunks[3]]
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    from loom.memory.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(tmp_path, "m", max_entries=2)
+    cache.put("a", [1.0, 0.0])
+    cache.put("b", [0.0, 1.0])
+    assert cache.get("a") == [1.0, 0.0]
+    cache.put("c", [0.5, 0.5])
+    cache.close()
+
+    reopened = EmbeddingCache(tmp_path, "m", max_entries=2)
+    assert reopened.get_many(["a", "b", "c"]) == [[1.0, 0.0], None, [0.5, 0.5]]
+
+
+class TestBM25Index:
+    """Test the BM25 lexical index used by the knowledge pipeline."""
+
+    def test_rare_terms_outrank_common_ones(self):
+        from loom.memory.bm25 import BM25Index
+
+        index = BM25Index()
+        index.add_many(
+            [
+                (1, "the agent runs the loop"),
+                (2, "the agent checkpoints the context"),
+                (3, "the scheduler runs jobs"),
+            ]
+        )
+        assert index.idf("checkpoints") > index.idf("agent") > index.idf("the")
+        assert [doc for doc, _ in index.search("agent checkpoints")][:2] == [2, 1]
+        assert all(0 < score < 1 for _, score in index.search("agent checkpoints"))
+        assert index.score("scheduler", [1, 3]) == {1: 0.0, 3: index.search("scheduler")[0][1]}
+
+        index.remove(2)
+        assert index.search("checkpoints") == []
+        assert 2 not in index and len(index) == 2
+
+    def test_phrase_boost_prefers_adjacent_terms(self):
+        from loom.memory.bm25 import BM25Index
+
+        index = BM25Index()
+        index.add(1, "context window budget for the runtime")
+        index.add(2, "the runtime window and the context budget")
+        plain = dict(index.search("context window"))
+        boosted = dict(index.search("context window", phrase_boost=1.0))
+        assert boosted[1] / boosted[2] > plain[1] / plain[2]
+        assert max(boosted.values()) < 1
+
+    def test_tokenizer_normalizes_and_splits_cjk(self):
+        from loom.memory.bm25 import BM25Index, tokenize
+
+        assert tokenize("ＡＧＥＮＴ Runtime, loop!") == ["agent", "runtime", "loop"]
+        assert tokenize("知识检索abc") == ["知识", "识检", "检索", "abc"]
+
+        index = BM25Index()
+        index.add("zh", "智能体运行时负责知识检索")
+        index.add("en", "knowledge retrieval for agents")
+        assert index.search("知识检索")[0][0] == "zh"
+
+
+class TestDirectoryIndex:
+    """Test the incremental directory index behind KnowledgeResolver.from_directory."""
+
+    @staticmethod
+    def _count_reads(monkeypatch):
+        from pathlib import Path
+
+        reads = Counter()
+        original = Path.read_text
+
+        def read_text(self, *args, **kwargs):
+            reads[self.name] += 1
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "read_text", read_text)
+        return reads
+
+    def test_reindexes_only_changed_files_and_ranks_chunks(self, tmp_path, monkeypatch):
+        import os
+
+        from loom.memory.directory import DirectoryIndex
+
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "runtime.md").write_text(
+            "# Loop\n\nThe agent loop drives tool calls.\n\n# Context\n\nContext window budget.",
+            encoding="utf-8",
+        )
+        (docs / "fruit.md").write_text("Bananas are yellow.", encoding="utf-8")
+        reads = self._count_reads(monkeypatch)
+        index = DirectoryIndex(docs, chunk_chars=40)
+
+        hits = index.search("context budget", top_k=2)
+        assert hits[0][0].path == "runtime.md" and hits[0][0].heading == "Context"
+        assert reads == {"runtime.md": 1, "fruit.md": 1}
+
+        assert index.search("bananas")[0][0].content == "Bananas are yellow."
+        assert reads == {"runtime.md": 1, "fruit.md": 1}
+
+        (docs / "fruit.md").write_text("Apples are red, not yellow.", encoding="utf-8")
+        os.utime(docs / "fruit.md", ns=(1, 1))
+        assert index.search("bananas") == []
+        assert reads == {"runtime.md": 1, "fruit.md": 2}
+
+        (docs / "fruit.md").unlink()
+        assert index.refresh() == {"added": 0, "updated": 0, "removed": 1}
+        assert index.search("apples") == []
+
+    def test_persisted_index_skips_unchanged_files_after_restart(self, tmp_path, monkeypatch):
+        from loom._config.knowledge import KnowledgeQuery, KnowledgeResolver
+
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        for i in range(5):
+            (docs / f"note{i}.md").write_text(f"Note {i} about topic{i}.", encoding="utf-8")
+        index_path = tmp_path / "index.json"
+        KnowledgeResolver.from_directory(docs, index_path=index_path).resolve(
+            KnowledgeQuery(text="topic3")
+        )
+
+        reads = self._count_reads(monkeypatch)
+        resolver = KnowledgeResolver.from_directory(docs, index_path=index_path)
+        evidence = resolver.resolve(KnowledgeQuery(text="topic3", top_k=2))
+        assert [item.title for item in evidence.items] == ["note3.md"]
+        assert evidence.items[0].score == evidence.relevance_score > 0
+        assert not any(name.startswith("note") for name in reads)
+
+    def test_watch_thread_picks_up_new_files(self, tmp_path):
+        import time
+
+        from loom.memory.directory import DirectoryIndex
+
+        index = DirectoryIndex(tmp_path, watch_interval=0.01)
+        try:
+            assert index.watching
+            (tmp_path / "late.md").write_text("Late arriving runbook.", encoding="utf-8")
+            deadline = time.monotonic() + 5
+            while not index.search("runbook") and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert index.search("runbook")[0][0].path == "late.md"
+        finally:
+            index.close()
+        assert not index.watching
+
+    def test_directory_source_close_stops_watcher(self, tmp_path):
+        from loom.config import KnowledgeSource
+
+        source = KnowledgeSource.from_directory("docs", tmp_path, watch_interval=0.01)
+        index = source.resolver.index
+        assert index.watching
+        source.close()
+        assert not index.watching
+
+    def test_embeddings_blend_with_lexical_scores(self, tmp_path):
+        from loom.memory.directory import DirectoryIndex
+
+        (tmp_path / "a.md").write_text("Scaling the inference fleet.", encoding="utf-8")
+        (tmp_path / "b.md").write_text("Autoscaling GPU servers.", encoding="utf-8")
+
+        def embed(text):
+            lowered = text.lower()
+            return [1.0, 0.0] if "gpu" in lowered or "fleet" in lowered else [0.0, 1.0]
+
+        index = DirectoryIndex(tmp_path, embedding_fn=embed)
+        # 词法上只有 a.md 命中 "fleet"，语义上 b.md 同样相关
+        assert {chunk.path for chunk, _ in index.search("fleet", top_k=2)} == {"a.md", "b.md"}
@@ -1,8 +1,12 @@
 """Test memory components"""
 
+import json
+import random
 from unittest.mock import MagicMock
 
-from loom.memory.semantic import MemoryEntry, SemanticMemory
+import pytest
+
+from loom.memory.semantic import LOG_MAGIC, MemoryEntry, SemanticMemory
 from loom.memory.session import SessionMemory
 from loom.memory.working import WorkingMemory
 
@@ -53,6 +57,121 @@ class TestSemanticMemory:
         sm.add(MemoryEntry(content="python async framework"))
         assert sm.search("python", top_k=0) == []
 
+    @pytest.mark.parametrize("vectorized", [True, False])
+    def test_semantic_memory_index_matches_brute_force(self, monkeypatch, vectorized):
+        """Indexed search ranks exactly like scoring every entry, across eviction."""
+        import loom.memory.semantic as semantic
+
+        if not vectorized:
+            monkeypatch.setattr(semantic, "np", None)
+        rng = random.Random(7)
+        words = ["alpha", "beta", "gamma", "delta", "tool", "error", "fix", "path"]
+        sm = SemanticMemory(max_size=150)
+        for i in range(400):
+            embedding = None if i % 3 == 0 else [rng.uniform(-1, 1) for _ in range(8)]
+            if i % 50 == 7:
+                embedding = [1.0, 0.0]  # 维度不一致的向量在精确打分中得 0 分
+            content = " ".join(rng.choices(words, k=4))
+            sm.add(MemoryEntry(content=content, embedding=embedding))
+        assert len(sm.entries) == 150
+
+        def _score(entry, query, query_embedding):
+            if query_embedding is not None and entry.embedding is not None:
+                return sm._cosine_similarity(query_embedding, entry.embedding)
+            q, c = sm._tokenize(query), sm._tokenize(entry.content)
+            return len(q & c) / len(q | c) if q and c else 0.0
+
+        for _ in range(20):
+            query = " ".join(rng.choices(words, k=2))
+            for query_embedding in (None, [rng.uniform(-1, 1) for _ in range(8)]):
+                ranked = sorted(
+                    enumerate(sm.entries),
+                    key=lambda item: (-_score(item[1], query, query_embedding), item[0]),
+                )
+                expected = [entry for _, entry in ranked[:10]]
+                got = sm.search(query, top_k=10, query_embedding=query_embedding)
+                # 向量以 float32 存储，只比较分数序列，避免近似并列时的顺序差异
+                assert [_score(e, query, query_embedding) for e in got] == pytest.approx(
+                    [_score(e, query, query_embedding) for e in expected], abs=1e-6
+                )
+                if query_embedding is None:
+                    assert got == expected
+
+    def test_semantic_memory_appends_to_log_and_compacts(self, tmp_path):
+        """Adds append one record each; evicted records are compacted away."""
+        path = tmp_path / "memory.bin"
+        sm = SemanticMemory(max_size=4, persist_path=str(path))
+        sm.add(MemoryEntry(content="first", embedding=[0.5, 0.25], metadata={"tool": "Read"}))
+        size = path.stat().st_size
+        sm.add(MemoryEntry(content="second"))
+        assert path.read_bytes().startswith(LOG_MAGIC)
+        assert path.stat().st_size > size
+
+        for i in range(8):
+            sm.add(MemoryEntry(content=f"later {i}"))
+        # 第 9 条记录超过 2 * max_size 触发压缩，之后继续追加
+        reloaded = SemanticMemory(max_size=4, persist_path=str(path))
+        assert [e.content for e in reloaded.entries] == [e.content for e in sm.entries]
+        assert reloaded._log_records == 5
+
+        with open(path, "ab") as f:
+            f.write(b"\x05\x00\x00")  # 中断写入留下的残缺尾记录
+        recovered = SemanticMemory(max_size=4, persist_path=str(path))
+        assert len(recovered.entries) == 4
+        recovered.add(MemoryEntry(content="after crash"))
+        again = SemanticMemory(max_size=4, persist_path=str(path))
+        assert again.entries[-1].content == "after crash"
+
+    def test_semantic_memory_recovers_records_before_corruption(self, tmp_path, caplog):
+        """A corrupt record keeps the valid prefix and a copy of the original log."""
+        path = tmp_path / "memory.bin"
+        sm = SemanticMemory(persist_path=str(path))
+        for content in ("alpha", "beta", "gamma"):
+            sm.add(MemoryEntry(content=content))
+        data = path.read_bytes()
+        # 把 "beta" 的内容改成非法 UTF-8
+        index = data.index(b"beta")
+        path.write_bytes(data[:index] + b"\xff\xfe\xfd\xfc" + data[index + 4 :])
+
+        with caplog.at_level("WARNING", logger="loom.memory.semantic"):
+            recovered = SemanticMemory(persist_path=str(path))
+        assert [e.content for e in recovered.entries] == ["alpha"]
+        assert "corrupt" in caplog.text
+        assert len(list(tmp_path.glob("memory.bin.corrupt-*"))) == 1
+
+        recovered.add(MemoryEntry(content="delta"))
+        assert [e.content for e in SemanticMemory(persist_path=str(path)).entries] == [
+            "alpha",
+            "delta",
+        ]
+
+    def test_semantic_memory_moves_unreadable_log_aside(self, tmp_path, caplog):
+        path = tmp_path / "memory.bin"
+        path.write_bytes(b"not a log and not json")
+
+        with caplog.at_level("WARNING", logger="loom.memory.semantic"):
+            sm = SemanticMemory(persist_path=str(path))
+        assert sm.entries == []
+        assert "could not be loaded" in caplog.text
+        assert not path.exists()
+        assert len(list(tmp_path.glob("memory.bin.corrupt-*"))) == 1
+
+        sm.add(MemoryEntry(content="fresh"))
+        assert [e.content for e in SemanticMemory(persist_path=str(path)).entries] == ["fresh"]
+
+    def test_semantic_memory_migrates_legacy_json(self, tmp_path):
+        """Old JSON snapshots load and are rewritten in the log format."""
+        path = tmp_path / "memory.json"
+        path.write_text(
+            json.dumps([{"content": "legacy", "embedding": [1.0, 0.0], "metadata": {"a": 1}}])
+        )
+        sm = SemanticMemory(persist_path=str(path))
+        assert sm.entries == [
+            MemoryEntry(content="legacy", embedding=[1.0, 0.0], metadata={"a": 1})
+        ]
+        assert path.read_bytes().startswith(LOG_MAGIC)
+        assert SemanticMemory(persist_path=str(path)).entries == sm.entries
+
 
 class TestSessionMemory:
     """Test SessionMemory"""
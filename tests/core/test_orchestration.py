@@ -11,7 +11,7 @@ from loom.orchestration.events import CoordinationEventBus
 from loom.orchestration.planner import Task, TaskPlanner
 from loom.orchestration.subagent import SubAgentManager
 from loom.runtime import DelegationRequest, DelegationResult
-from loom.types import CoordinationEvent
+from loom.types import CoordinationEvent, Message
 from loom.types.results import SubAgentResult
 
 # ── Task (planner) ──
@@ -415,6 +415,30 @@ class TestSubAgentManager:
         assert result.error == "boom"
         assert result.output == "boom"
 
+    def test_inherited_child_config_is_forked(self):
+        from loom import Agent, KnowledgeSource, Model, Runtime
+        from loom.runtime import ContextPolicy
+
+        context = ContextPolicy.manager(max_tokens=50_000)
+        context.partitions.history.append(Message(role="user", content="parent turn"))
+        knowledge = KnowledgeSource.inline("docs", ["doc"])
+        parent = Agent(
+            model=Model.openai("gpt-test"),
+            instructions="be brief",
+            knowledge=[knowledge],
+            runtime=Runtime(context=context),
+        )
+
+        child = SubAgentManager(parent=parent)._create_child(0, inherit_context=True)
+
+        assert child.config.instructions == "be brief"
+        assert child.config.knowledge == parent.config.knowledge
+        forked = child.config.runtime.context
+        assert forked is not context
+        assert forked.partitions.history[0] is context.partitions.history[0]
+        forked.partitions.history.append(Message(role="assistant", content="child turn"))
+        assert len(context.partitions.history) == 1
+
     @pytest.mark.asyncio
     async def test_spawn_many_runs_goals_sequentially(self):
         class Parent:
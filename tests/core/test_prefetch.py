@@ -0,0 +1,230 @@
+"""Tests for pipelined memory/knowledge prefetch."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from loom.config import KnowledgeEvidence, KnowledgeEvidenceItem, KnowledgeResolver, KnowledgeSource
+from loom.providers.base import CompletionResponse
+from loom.runtime.engine import AgentEngine, EngineConfig
+from loom.tools.schema import Tool, ToolDefinition
+from loom.types import ToolCall
+
+
+class _SlowMemory:
+    def __init__(self, name: str, delay: float, release: threading.Event | None = None) -> None:
+        self.name = name
+        self.delay = delay
+        self.release = release
+        self.queries: list[str] = []
+
+    def is_available(self) -> bool:
+        return True
+
+    def system_prompt(self) -> str:
+        return ""
+
+    def prefetch(self, query: str, *, session_id=None) -> str:
+        self.queries.append(query)
+        if self.release is not None:
+            self.release.wait(1.0)
+        time.sleep(self.delay)
+        return f"{self.name} recalls {query.splitlines()[-1]}"
+
+    def sync_turn(self, *_args, **_kwargs) -> None:
+        return None
+
+
+def _knowledge(delay: float) -> KnowledgeSource:
+    def _resolve(query):
+        time.sleep(delay)
+        return KnowledgeEvidence(
+            query=query,
+            items=[KnowledgeEvidenceItem(source_name="docs", content=f"doc for {query.text}")],
+        )
+
+    return KnowledgeSource.dynamic("docs", KnowledgeResolver.callable(_resolve))
+
+
+def _engine(**config) -> AgentEngine:
+    return AgentEngine(
+        provider=MagicMock(),
+        config=EngineConfig(enable_memory=False, pipelined_prefetch=True, **config),
+    )
+
+
+def _memory_contents(engine: AgentEngine) -> list[str]:
+    return [str(msg.content) for msg in engine.context_manager.partitions.memory]
+
+
+def test_sources_are_fetched_concurrently_with_per_source_timeouts() -> None:
+    engine = _engine(prefetch_timeout=1.0, prefetch_source_timeouts={"slow": 0.05})
+    engine.memory_providers.extend([_SlowMemory("fast", 0.1), _SlowMemory("slow", 0.5)])
+    engine.context_manager._knowledge_sources = [_knowledge(0.1)]
+    engine._refresh_runtime_wiring()
+    prefetch = engine.prefetch_runtime
+
+    started = time.monotonic()
+    assert prefetch.start_run("ship it", None) == 3
+    prefetch.wait()
+    elapsed = time.monotonic() - started
+
+    # fast 与 docs 并发（约 0.1s），而不是串行累加；slow 超过自身 0.05s 超时被丢弃
+    assert elapsed < 0.4
+    assert _memory_contents(engine) == ["[memory:fast] fast recalls ship it"]
+    packs = engine.context_manager.partitions.working.knowledge_surface.evidence_packs
+    assert [pack["content"] for pack in packs] == ["doc for ship it"]
+    assert prefetch.stats.timeouts == {"memory:slow": 1}
+    prefetch.close()
+
+
+def test_late_results_land_in_the_next_apply() -> None:
+    release = threading.Event()
+    engine = _engine(prefetch_timeout=2.0)
+    engine.memory_providers.append(_SlowMemory("late", 0.0, release))
+    engine._refresh_runtime_wiring()
+    prefetch = engine.prefetch_runtime
+
+    prefetch.start_run("goal", "s1")
+    assert prefetch.apply_ready() == 0
+    assert prefetch.pending == 1
+
+    release.set()
+    deadline = time.monotonic() + 1.0
+    while prefetch.pending and time.monotonic() < deadline:
+        prefetch.apply_ready()
+        time.sleep(0.01)
+
+    assert _memory_contents(engine) == ["[memory:late] late recalls goal"]
+    # 同一内容再次召回不会重复追加
+    prefetch.schedule("goal")
+    prefetch.wait()
+    assert _memory_contents(engine) == ["[memory:late] late recalls goal"]
+    prefetch.close()
+
+
+@pytest.mark.asyncio
+async def test_loop_prefetches_next_iteration_during_tool_execution() -> None:
+    memory = _SlowMemory("notes", 0.0)
+    requests = []
+
+    async def _complete(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return CompletionResponse(
+                tool_calls=[ToolCall(id="c1", name="lookup", arguments={"key": "alpha"})]
+            )
+        return CompletionResponse(content="done")
+
+    async def lookup(key: str = "") -> str:
+        await asyncio.sleep(0.05)
+        return key
+
+    provider = MagicMock()
+    provider.complete_request = _complete
+    engine = AgentEngine(
+        provider=provider,
+        config=EngineConfig(enable_memory=False, pipelined_prefetch=True),
+        tools=[Tool(definition=ToolDefinition(name="lookup", description="l"), handler=lookup)],
+        memory_providers=[memory],
+    )
+
+    result = await engine.execute("find alpha")
+
+    assert result["status"] == "success"
+    assert memory.queries[0] == "find alpha"
+    assert memory.queries[1].splitlines()[-1] == "lookup alpha"
+    second_request = "\n".join(str(m["content"]) for m in requests[1].messages)
+    assert "[memory:notes] notes recalls lookup alpha" in second_request
+    assert any(e["type"] == "prefetch.applied" for e in result["events"])
+
+
+def test_new_recall_replaces_the_providers_memory_message() -> None:
+    engine = _engine(prefetch_timeout=1.0)
+    engine.memory_providers.append(_SlowMemory("notes", 0.0))
+    engine._refresh_runtime_wiring()
+    prefetch = engine.prefetch_runtime
+
+    prefetch.start_run("goal", None)
+    prefetch.wait()
+    for query in ("goal\nread a", "goal\nread b", "goal\nread c"):
+        prefetch.schedule(query)
+        prefetch.wait()
+
+    assert _memory_contents(engine) == ["[memory:notes] notes recalls read c"]
+    prefetch.close()
+
+
+def test_unchanged_recall_keeps_the_memory_message() -> None:
+    class _FixedMemory(_SlowMemory):
+        def prefetch(self, query: str, *, session_id=None) -> str:
+            self.queries.append(query)
+            return "user prefers tabs" + "\n" * len(self.queries)
+
+    engine = _engine(prefetch_timeout=1.0)
+    engine.memory_providers.append(_FixedMemory("notes", 0.0))
+    engine._refresh_runtime_wiring()
+    prefetch = engine.prefetch_runtime
+
+    prefetch.start_run("goal", None)
+    assert prefetch.wait() == 1
+    memory = engine.context_manager.partitions.memory
+    message = memory[0]
+    for query in ("goal\nread a", "goal\nread b"):
+        prefetch.schedule(query)
+        assert prefetch.wait() == 0
+
+    # 召回内容不变时 C_memory 原样保留，cache_stable 前缀不失效
+    assert engine.context_manager.partitions.memory is memory
+    assert memory == [message]
+    prefetch.close()
+
+
+def test_lifecycle_stop_shuts_the_worker_pool_down() -> None:
+    engine = _engine(prefetch_timeout=1.0)
+    engine.memory_providers.append(_SlowMemory("notes", 0.0))
+    engine._refresh_runtime_wiring()
+    prefetch = engine.prefetch_runtime
+
+    prefetch.start_run("goal", None)
+    pool = prefetch._executor
+    assert pool is not None
+    engine.run_lifecycle.stop()
+
+    assert prefetch._executor is None
+    assert pool._shutdown
+    prefetch.start_run("goal", None)
+    assert prefetch._executor is not None and prefetch._executor is not pool
+    prefetch.close()
+
+
+@pytest.mark.asyncio
+async def test_aprepare_awaits_prefetch_without_blocking_the_loop() -> None:
+    engine = _engine(prefetch_timeout=2.0, retrieval_deadline=0.2)
+    engine.memory_providers.extend([_SlowMemory("fast", 0.05), _SlowMemory("stuck", 1.0)])
+    engine._refresh_runtime_wiring()
+    ticks = 0
+
+    async def _ticker() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(_ticker())
+    started = time.monotonic()
+    await engine.run_lifecycle.aprepare(
+        goal="ship", instructions="", context=None, session_id=None, history=None
+    )
+    elapsed = time.monotonic() - started
+    ticker.cancel()
+    engine.run_lifecycle.stop()
+
+    # retrieval_deadline 限制首轮等待，等待期间事件循环仍在运行
+    assert elapsed < 0.6
+    assert ticks >= 5
+    assert _memory_contents(engine) == ["[memory:fast] fast recalls ship"]
+    engine.prefetch_runtime.close()
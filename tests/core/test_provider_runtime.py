@@ -60,6 +60,74 @@ def test_provider_runtime_builds_completion_request_metadata() -> None:
     assert request.metadata == {"goal": "ship", "iteration": 2, "tool_count": 0}
 
 
+def test_provider_runtime_reports_partition_cache_breakpoints() -> None:
+    from loom.context import ContextManager
+
+    manager = ContextManager(max_tokens=10_000)
+    manager.current_goal = "ship"
+    manager.partitions.system = [Message(role="system", content="rules")]
+    manager.partitions.history = [
+        Message(role="user", content="q"),
+        Message(role="assistant", content="a"),
+    ]
+    runtime = ProviderRuntime(
+        provider=_Provider(),
+        config=_Config(),
+        context_manager=manager,
+        emit=lambda *_args, **_kwargs: 0,
+        current_iteration=lambda: 1,
+        build_provider_tools=lambda: [],
+    )
+    messages = manager.partitions.get_all_messages()
+    messages.append(Message(role="user", content="ship"))
+
+    request = runtime.build_completion_request(messages)
+
+    # rules, dashboard, q, a, 目标
+    assert request.metadata["cache_breakpoints"] == {"system": 1, "history": 4}
+
+
+def test_provider_runtime_breakpoints_follow_cache_stable_layout() -> None:
+    from loom.context import ContextManager
+
+    manager = ContextManager(max_tokens=10_000, layout="cache_stable")
+    manager.partitions.system = [Message(role="system", content="rules")]
+    manager.partitions.memory = [Message(role="system", content="AGENTS.md")]
+    manager.partitions.history = [Message(role="user", content="q")]
+    runtime = ProviderRuntime(
+        provider=_Provider(),
+        config=_Config(),
+        context_manager=manager,
+        emit=lambda *_args, **_kwargs: 0,
+        current_iteration=lambda: 1,
+        build_provider_tools=lambda: [],
+    )
+
+    request = runtime.build_completion_request(manager.partitions.get_all_messages())
+
+    # rules, AGENTS.md, q, dashboard
+    assert request.metadata["cache_breakpoints"] == {"system": 2, "history": 3}
+
+
+def test_provider_runtime_reuses_converted_history_messages() -> None:
+    runtime = _runtime()
+    history = [Message(role="user", content="hello"), Message(role="assistant", content="hi")]
+
+    first = runtime.to_provider_messages(history)
+    history.append(Message(role="user", content="again"))
+    second = runtime.to_provider_messages(history)
+
+    assert second[0] is first[0]
+    assert second[1] is first[1]
+    assert second[2]["content"] == "again"
+
+    # 被替换的消息（如压缩后的新对象）会重新转换
+    history[0] = Message(role="user", content="summary")
+    third = runtime.to_provider_messages(history)
+    assert third[0]["content"] == "summary"
+    assert third[1] is first[1]
+
+
 @pytest.mark.asyncio
 async def test_provider_runtime_calls_request_native_provider() -> None:
     provider = _Provider()
@@ -501,6 +501,66 @@ class TestProviders:
         assert result.tool_calls[0].id == "toolu_1"
         assert result.tool_calls[0].arguments == {"query": "loom"}
 
+    def test_provider_tool_payload_is_memoized_by_tool_identity(self, monkeypatch):
+        provider = AnthropicProvider(api_key="test", client=SimpleNamespace())
+        tools = [ProviderToolSpec(name="search_docs", description="Search docs").to_dict()]
+        calls: list[int] = []
+        original = provider._build_tools
+
+        def _spy(tool_dicts):
+            calls.append(len(tool_dicts))
+            return original(tool_dicts)
+
+        monkeypatch.setattr(provider, "_build_tools", _spy)
+        messages = [{"role": "user", "content": "find loom docs"}]
+        first = provider._build_request(messages, CompletionParams(tools=list(tools)))
+        second = provider._build_request(messages, CompletionParams(tools=list(tools)))
+        assert calls == [1]
+        assert second["tools"] is first["tools"]
+
+        provider._build_request(
+            messages,
+            CompletionParams(tools=[*tools, ProviderToolSpec(name="fetch").to_dict()]),
+        )
+        assert calls == [1, 2]
+
+    def test_provider_converts_only_new_message_dicts(self, monkeypatch):
+        provider = OpenAIProvider(api_key="test", client=SimpleNamespace())
+        converted: list[str] = []
+        original = provider._convert_message
+
+        def _spy(message):
+            converted.append(message["content"])
+            return original(message)
+
+        monkeypatch.setattr(provider, "_convert_message", _spy)
+        history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+        first = provider._convert_messages(history)
+        history.append({"role": "user", "content": "next"})
+        second = provider._convert_messages(history)
+
+        assert converted == ["hi", "hello", "next"]
+        assert second[0] is first[0]
+        assert second[2] == {"role": "user", "content": "next"}
+
+    def test_provider_reconverts_message_dict_edited_in_place(self):
+        provider = OpenAIProvider(api_key="test", client=SimpleNamespace())
+        message = {"role": "user", "content": "first"}
+        assert provider._convert_messages([message])[0]["content"] == "first"
+
+        message["content"] = "second"
+        assert provider._convert_messages([message])[0]["content"] == "second"
+
+    def test_gemini_system_prefix_does_not_mutate_cached_messages(self):
+        provider = GeminiProvider(api_key="test", client=SimpleNamespace())
+        user = {"role": "user", "content": "question"}
+
+        with_system = provider._convert_messages([{"role": "system", "content": "rules"}, user])
+        without_system = provider._convert_messages([user])
+
+        assert with_system[0]["parts"] == [{"text": "rules\n\nquestion"}]
+        assert without_system[0]["parts"] == [{"text": "question"}]
+
     def test_anthropic_provider_accepts_typed_tool_specs(self):
         provider = AnthropicProvider(api_key="test", client=SimpleNamespace())
         payload = provider._build_request(
@@ -553,6 +613,131 @@ class TestProviders:
 
         assert tool_calls == [ToolCall(id="toolu_1", name="search_docs", arguments={})]
 
+    def test_anthropic_provider_places_cache_breakpoints(self):
+        provider = AnthropicProvider(api_key="test", client=SimpleNamespace())
+        tools = [ProviderToolSpec(name=name).to_dict() for name in ("search", "fetch")]
+        system = {"role": "system", "content": "rules"}
+        dashboard = {"role": "system", "content": "rho 0.42"}
+        history = [
+            {"role": "user", "content": "question"},
+            {"role": "assistant", "content": "answer"},
+        ]
+        params = CompletionParams(tools=list(tools))
+
+        plain = provider._build_request([system, *history], params)
+        volatile = provider._build_request(
+            [system, dashboard, *history], params, cache_breakpoints={"system": 1, "history": 4}
+        )
+        stable = provider._build_request(
+            [system, *history], params, cache_breakpoints={"system": 1, "history": 3}
+        )
+
+        assert plain["system"] == "rules"
+        assert "cache_control" not in plain["tools"][-1]
+        assert volatile["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in plain["tools"][-1]  # 缓存的工具载荷未被修改
+        assert volatile["system"] == [
+            {"type": "text", "text": "rules", "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": "rho 0.42"},
+        ]
+        # system 中有易变内容时不在历史上打断点
+        assert volatile["messages"][-1] == {"role": "assistant", "content": "answer"}
+        assert stable["messages"][-1]["content"] == [
+            {"type": "text", "text": "answer", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert plain["messages"][-1] == {"role": "assistant", "content": "answer"}
+
+    def test_anthropic_provider_keeps_trailing_dashboard_after_history(self):
+        provider = AnthropicProvider(api_key="test", client=SimpleNamespace())
+        messages = [
+            {"role": "system", "content": "rules"},
+            {"role": "user", "content": "question"},
+            {"role": "assistant", "content": "answer"},
+            {"role": "system", "content": "rho 0.42"},
+            {"role": "user", "content": "goal"},
+        ]
+
+        payload = provider._build_request(
+            messages, CompletionParams(), cache_breakpoints={"system": 1, "history": 3}
+        )
+
+        assert payload["system"] == [
+            {"type": "text", "text": "rules", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert payload["messages"][1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert payload["messages"][2:] == [
+            {"role": "user", "content": "rho 0.42"},
+            {"role": "user", "content": "goal"},
+        ]
+
+    def test_anthropic_provider_prompt_caching_can_be_disabled(self):
+        provider = AnthropicProvider(api_key="test", client=SimpleNamespace(), prompt_caching=False)
+        payload = provider._build_request(
+            [{"role": "system", "content": "rules"}, {"role": "user", "content": "q"}],
+            CompletionParams(),
+            cache_breakpoints={"system": 1, "history": 2},
+        )
+        assert payload["system"] == "rules"
+        assert payload["messages"] == [{"role": "user", "content": "q"}]
+
+    @pytest.mark.asyncio
+    async def test_anthropic_provider_reports_cache_usage(self):
+        class FakeStream:
+            def __init__(self, events):
+                self._events = iter(events)
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    return next(self._events)
+                except StopIteration as exc:
+                    raise StopAsyncIteration from exc
+
+        usage = SimpleNamespace(
+            input_tokens=20,
+            output_tokens=1,
+            cache_read_input_tokens=900,
+            cache_creation_input_tokens=80,
+        )
+
+        class FakeMessages:
+            async def create(self, **kwargs):
+                if kwargs.get("stream"):
+                    return FakeStream(
+                        [
+                            SimpleNamespace(
+                                type="message_start", message=SimpleNamespace(usage=usage)
+                            ),
+                            SimpleNamespace(
+                                type="content_block_delta",
+                                delta=SimpleNamespace(type="text_delta", text="hi"),
+                            ),
+                            SimpleNamespace(
+                                type="message_delta", usage=SimpleNamespace(output_tokens=7)
+                            ),
+                        ]
+                    )
+                return SimpleNamespace(content=[], usage=usage)
+
+        provider = AnthropicProvider(
+            api_key="test", client=SimpleNamespace(messages=FakeMessages())
+        )
+        request = CompletionRequest.create([{"role": "user", "content": "hello"}])
+
+        response = await provider.complete_request(request)
+        assert response.usage.input_tokens == 1000
+        assert response.usage.cache_read_tokens == 900
+        assert response.usage.cache_write_tokens == 80
+        assert response.usage.uncached_input_tokens == 100
+        assert response.usage.cache_hit_rate == 0.9
+
+        streamed = await provider.complete_request_streaming(request, lambda _token: None)
+        assert streamed.content == "hi"
+        assert streamed.usage.cache_read_tokens == 900
+        assert streamed.usage.output_tokens == 7
+
     def test_anthropic_provider_missing_dependency(self, monkeypatch):
         """Test Anthropic provider raises a helpful error without SDK."""
         provider = AnthropicProvider(api_key="test")
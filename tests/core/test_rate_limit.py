@@ -0,0 +1,134 @@
+"""Tests for the adaptive concurrency limiter and RPM/TPM buckets."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from loom.providers import (
+    AnthropicProvider,
+    CompletionParams,
+    CompletionRequest,
+    CompletionResponse,
+    LLMProvider,
+    ProviderRateLimiter,
+    RateLimitConfig,
+    TokenBucket,
+    TokenUsage,
+)
+from loom.providers.base import RetryConfig
+from loom.providers.rate_limit import clear_shared_rate_limiters
+from loom.utils.errors import RateLimitError
+
+
+@pytest.fixture(autouse=True)
+def _isolated_limiters():
+    clear_shared_rate_limiters()
+    yield
+    clear_shared_rate_limiters()
+
+
+class _Endpoint(LLMProvider):
+    """Fake endpoint that answers 429 while more than ``capacity`` calls overlap."""
+
+    def __init__(self, capacity: int = 100, delay: float = 0.01) -> None:
+        super().__init__(RetryConfig(max_retries=5, base_delay=0.001, circuit_open_after=100))
+        self.capacity = capacity
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def _complete_request(self, request: CompletionRequest) -> CompletionResponse:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.active > self.capacity:
+                raise RateLimitError("429 Too Many Requests")
+            return CompletionResponse(content="ok", usage=TokenUsage(input_tokens=5))
+        finally:
+            self.active -= 1
+
+
+def _request() -> CompletionRequest:
+    return CompletionRequest.create(
+        [{"role": "user", "content": "hi"}], CompletionParams(temperature=0.0)
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped_and_queue_wait_reported():
+    provider = _Endpoint(delay=0.02)
+    limiter = provider.use_rate_limits(RateLimitConfig(max_concurrency=2))
+
+    await asyncio.gather(*(provider.complete_request(_request()) for _ in range(6)))
+
+    assert provider.peak == 2
+    assert limiter.stats.requests == 6
+    assert limiter.stats.queued >= 4
+    assert limiter.stats.queue_wait_max >= 0.02
+    assert limiter.stats.mean_queue_wait > 0
+    assert limiter.stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_aimd_backs_off_on_429_and_recovers():
+    provider = _Endpoint(capacity=2)
+    limiter = provider.use_rate_limits(RateLimitConfig(max_concurrency=8))
+
+    responses = await asyncio.gather(*(provider.complete_request(_request()) for _ in range(16)))
+
+    assert all(response.content == "ok" for response in responses)
+    assert limiter.stats.throttled > 0
+    assert limiter.limit < 8
+
+    backed_off = limiter.limit
+    for _ in range(20):
+        limiter.on_success()
+    assert backed_off < limiter.limit <= 8
+
+
+def test_aimd_decrease_is_bounded_and_applied_once_per_window():
+    limiter = ProviderRateLimiter(RateLimitConfig(max_concurrency=8, min_concurrency=2))
+    limiter.on_overload(epoch=0)
+    limiter.on_overload(epoch=0)  # 同一窗口内发出的请求
+    assert limiter.limit == 4.0
+    assert limiter.stats.throttled == 2
+
+    limiter.on_overload(epoch=1)
+    limiter.on_overload(epoch=2)
+    assert limiter.limit == 2.0
+
+
+def test_token_bucket_reserves_and_refunds():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    bucket.adjust(-10)  # 实际用量比预估少，退回
+    assert bucket.reserve(1) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = ProviderRateLimiter(RateLimitConfig(max_concurrency=1))
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    limiter.release()
+    assert await asyncio.wait_for(limiter.acquire(), 0.5) < 0.5
+    assert limiter.stats.in_flight == 1
+
+
+def test_providers_on_one_pooled_client_share_a_limiter():
+    first = AnthropicProvider(api_key="k", client=SimpleNamespace())
+    second = AnthropicProvider(api_key="k", client=SimpleNamespace())
+    other = AnthropicProvider(api_key="other", client=SimpleNamespace())
+
+    limiter = first.use_rate_limits(RateLimitConfig(requests_per_minute=600))
+    assert second.use_rate_limits() is limiter
+    assert limiter.requests is not None
+    assert other.use_rate_limits() is not limiter
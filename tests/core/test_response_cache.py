@@ -0,0 +1,171 @@
+"""Tests for provider request coalescing and the response cache."""
+
+import asyncio
+
+import pytest
+
+from loom.providers import (
+    CompletionParams,
+    CompletionRequest,
+    CompletionResponse,
+    DiskResponseStore,
+    LLMProvider,
+    ResponseCache,
+    TokenUsage,
+)
+from loom.providers.base import RetryConfig
+from loom.types import ToolCall
+
+
+class _CountingProvider(LLMProvider):
+    def __init__(self, delay: float = 0.0, fail: bool = False) -> None:
+        super().__init__(RetryConfig(max_retries=1))
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def _complete_request(self, request: CompletionRequest) -> CompletionResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return CompletionResponse(
+            content=f"answer {self.calls}",
+            tool_calls=[ToolCall(id="1", name="search", arguments={"q": "x"})],
+            usage=TokenUsage(input_tokens=10, output_tokens=2),
+        )
+
+
+def _request(text: str = "hi", temperature: float = 0.0, **metadata) -> CompletionRequest:
+    return CompletionRequest.create(
+        [{"role": "user", "content": text}],
+        CompletionParams(model="m", temperature=temperature),
+        metadata=metadata,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_upstream_call():
+    provider = _CountingProvider(delay=0.05)
+    cache = provider.use_response_cache()
+
+    responses = await asyncio.gather(
+        *(provider.complete_request(_request(iteration=i)) for i in range(5))
+    )
+
+    assert provider.calls == 1
+    assert {r.content for r in responses} == {"answer 1"}
+    assert sum(r.usage is not None for r in responses) == 1  # 只有发起方计入用量
+    assert cache.stats.misses == 1 and cache.stats.coalesced == 4
+    responses[1].tool_calls[0].arguments["q"] = "mutated"
+    assert responses[2].tool_calls[0].arguments == {"q": "x"}
+
+
+@pytest.mark.asyncio
+async def test_repeated_requests_hit_until_ttl_and_lru_limits():
+    provider = _CountingProvider()
+    cache = provider.use_response_cache(ResponseCache(max_entries=1))
+
+    await provider.complete_request(_request("a"))
+    hit = await provider.complete_request(_request("a"))
+    await provider.complete_request(_request("b"))
+    await provider.complete_request(_request("a"))
+
+    assert hit.content == "answer 1" and hit.usage is None
+    assert provider.calls == 3
+    assert cache.stats.hits == 1 and cache.stats.evictions == 2
+    assert cache.stats.hit_rate == pytest.approx(0.25)
+
+    expiring = provider.use_response_cache(ResponseCache(ttl=0.0))
+    await provider.complete_request(_request("a"))
+    await provider.complete_request(_request("a"))
+    assert expiring.stats.hits == 0 and provider.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_sampled_and_opted_out_requests_bypass_the_cache():
+    provider = _CountingProvider()
+    cache = provider.use_response_cache()
+
+    for _ in range(2):
+        await provider.complete_request(_request(temperature=0.7))
+        await provider.complete_request(_request(response_cache=False))
+    assert provider.calls == 4
+    assert cache.stats.bypassed == 4 and len(cache) == 0
+
+    sampled = provider.use_response_cache(ResponseCache(cache_sampled=True))
+    await provider.complete_request(_request(temperature=0.7))
+    await provider.complete_request(_request(temperature=0.7))
+    assert sampled.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_waiter_and_are_not_cached():
+    provider = _CountingProvider(delay=0.02, fail=True)
+    cache = provider.use_response_cache()
+
+    results = await asyncio.gather(
+        provider.complete_request(_request()),
+        provider.complete_request(_request()),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, Exception) for result in results)
+    assert provider.calls == 1 and len(cache) == 0
+    provider.fail = False
+    assert (await provider.complete_request(_request())).content == "answer 2"
+
+
+@pytest.mark.asyncio
+async def test_disk_store_serves_a_fresh_cache(tmp_path):
+    first = _CountingProvider()
+    cache = first.use_response_cache(ResponseCache(store=DiskResponseStore(tmp_path)))
+    await first.complete_request(_request())
+    await cache.flush()
+
+    second = _CountingProvider()
+    restored = second.use_response_cache(ResponseCache(store=DiskResponseStore(tmp_path)))
+    response = await second.complete_request(_request())
+
+    assert second.calls == 0
+    assert response.content == "answer 1"
+    assert response.tool_calls == [ToolCall(id="1", name="search", arguments={"q": "x"})]
+    assert restored.stats.disk_hits == 1
+
+
+def test_stats_stay_exact_when_threads_share_the_cache():
+    import threading
+
+    cache = ResponseCache()
+    provider = _CountingProvider()
+    provider.use_response_cache(cache)
+    asyncio.run(provider.complete_request(_request()))
+
+    async def _hammer() -> None:
+        for _ in range(200):
+            await provider.complete_request(_request())
+            await provider.complete_request(_request(temperature=1.0))
+
+    threads = [threading.Thread(target=asyncio.run, args=(_hammer(),)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats.hits == 800
+    assert cache.stats.bypassed == 800
+
+
+def test_model_extension_attaches_the_shared_cache():
+    from loom import Model
+    from loom._agent.providers import _attach_response_cache
+    from loom.providers import default_response_cache
+
+    provider = _CountingProvider()
+    _attach_response_cache(provider, Model.openai("gpt-test"))
+    assert provider.response_cache is None
+
+    model = Model.openai("gpt-test")
+    model.extensions["response_cache"] = True
+    _attach_response_cache(provider, model)
+    assert provider.response_cache is default_response_cache()
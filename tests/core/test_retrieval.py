@@ -0,0 +1,142 @@
+"""Tests for concurrent, deadline-bounded knowledge/memory retrieval."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from loom.config import (
+    KnowledgeEvidence,
+    KnowledgeEvidenceItem,
+    KnowledgeQuery,
+    KnowledgeResolver,
+    KnowledgeSource,
+    MemoryQuery,
+    MemoryRecord,
+    MemoryResolver,
+    MemorySource,
+)
+from loom.runtime.engine import AgentEngine, EngineConfig
+from loom.runtime.retrieval import RetrievalStats, gather_within_deadline
+
+
+def _evidence(query: KnowledgeQuery, content: str) -> KnowledgeEvidence:
+    return KnowledgeEvidence(
+        query=query, items=[KnowledgeEvidenceItem(source_name="x", content=content)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_gather_within_deadline_keeps_order_and_counts_timeouts() -> None:
+    stats = RetrievalStats()
+
+    async def _value(delay: float, value: str) -> str:
+        await asyncio.sleep(delay)
+        return value
+
+    async def _boom() -> str:
+        raise RuntimeError("down")
+
+    started = time.monotonic()
+    results = await gather_within_deadline(
+        [
+            ("knowledge:slow", lambda: _value(1.0, "slow")),
+            ("knowledge:a", lambda: _value(0.05, "a")),
+            ("memory:broken", _boom),
+            ("memory:b", lambda: _value(0.05, "b")),
+        ],
+        deadline=0.2,
+        stats=stats,
+    )
+
+    assert time.monotonic() - started < 0.5
+    assert results == [None, "a", None, "b"]
+    snapshot = stats.snapshot()
+    assert snapshot["knowledge:slow"]["timeouts"] == 1
+    assert snapshot["memory:broken"]["errors"] == 1
+    assert 0.04 < snapshot["knowledge:a"]["last_latency"] < 0.2
+
+
+@pytest.mark.asyncio
+async def test_async_and_sync_resolvers_share_one_interface() -> None:
+    async def _async_handler(query):
+        await asyncio.sleep(0)
+        return _evidence(query, f"async {query.text}")
+
+    def _sync_handler(query):
+        return [MemoryRecord(content=f"sync {query.text}")]
+
+    knowledge = KnowledgeSource.dynamic("docs", KnowledgeResolver.callable(_async_handler))
+    memory = MemorySource(name="notes", resolver=MemoryResolver.callable(_sync_handler))
+
+    query = KnowledgeQuery(text="q", goal="q")
+    assert (await knowledge.aresolve(query)).items[0].content == "async q"
+    # 同步调用方（不在事件循环内，如工作线程）仍可使用 async 处理器
+    assert (await asyncio.to_thread(knowledge.resolve, query)).items[0].content == "async q"
+    assert await memory.aprefetch("q") == "sync q"
+
+
+@pytest.mark.asyncio
+async def test_engine_resolves_sources_concurrently_under_total_deadline() -> None:
+    def _slow_knowledge(name: str, delay: float) -> KnowledgeSource:
+        def _resolve(query):
+            time.sleep(delay)
+            return _evidence(query, f"{name} for {query.text}")
+
+        return KnowledgeSource.dynamic(name, KnowledgeResolver.callable(_resolve))
+
+    async def _recall(query):
+        await asyncio.sleep(0.1)
+        return [MemoryRecord(content=f"remembered {query.text}")]
+
+    engine = AgentEngine(
+        provider=MagicMock(),
+        config=EngineConfig(enable_memory=False, retrieval_deadline=0.3),
+        memory_providers=[MemorySource(name="notes", resolver=MemoryResolver.callable(_recall))],
+    )
+    engine.context_manager._knowledge_sources = [
+        _slow_knowledge("a", 0.1),
+        _slow_knowledge("b", 0.1),
+        _slow_knowledge("stuck", 1.0),
+    ]
+    engine._refresh_runtime_wiring()
+
+    started = time.monotonic()
+    await engine.run_lifecycle.aprepare(
+        goal="ship", instructions="", context=None, session_id=None, history=None
+    )
+    elapsed = time.monotonic() - started
+    engine.run_lifecycle.stop()
+
+    # 三个 0.1s 的来源并发完成，卡住的来源在 0.3s 总时限处被放弃
+    assert elapsed < 0.6
+    packs = engine.context_manager.partitions.working.knowledge_surface.evidence_packs
+    assert sorted(pack["content"] for pack in packs) == ["a for ship", "b for ship"]
+    memory = [str(msg.content) for msg in engine.context_manager.partitions.memory]
+    assert memory == ["[memory:notes] remembered ship"]
+    stats = engine.retrieval_stats.snapshot()
+    assert stats["knowledge:stuck"]["timeouts"] == 1
+    assert stats["memory:notes"]["calls"] == 1
+
+
+def test_sync_resolve_drives_async_handlers_outside_a_loop() -> None:
+    async def _resolve(query):
+        await asyncio.sleep(0)
+        return _evidence(query, f"async {query.text}")
+
+    resolver = KnowledgeResolver.callable(_resolve)
+    evidence = resolver.resolve(KnowledgeQuery(text="ship"))
+    assert [item.content for item in evidence.items] == ["async ship"]
+
+
+@pytest.mark.asyncio
+async def test_sync_resolve_refuses_to_block_a_running_loop() -> None:
+    async def _recall(query):
+        return [MemoryRecord(content="never")]
+
+    resolver = MemoryResolver.callable(_recall)
+    with pytest.raises(RuntimeError, match="running event loop"):
+        resolver.retrieve(MemoryQuery(text="ship"))
+    recall = await resolver.aretrieve(MemoryQuery(text="ship"))
+    assert [record.content for record in recall.records] == ["never"]
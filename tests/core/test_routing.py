@@ -0,0 +1,182 @@
+"""Tests for latency-aware routing and request hedging."""
+
+import asyncio
+
+import pytest
+
+from loom import Model
+from loom.agent import _resolve_provider
+from loom.providers import (
+    BackendStats,
+    CompletionParams,
+    CompletionRequest,
+    CompletionResponse,
+    LLMProvider,
+    RouteBackend,
+    RoutingProvider,
+)
+from loom.providers.base import RetryConfig
+from loom.types.stream import TextDelta
+from loom.utils.errors import ProviderUnavailableError
+
+
+class _Backend(LLMProvider):
+    """Fake backend with a fixed delay that can be told to fail."""
+
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False) -> None:
+        super().__init__(RetryConfig(max_retries=1, circuit_open_after=100))
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+        self.models: list[str | None] = []
+
+    async def _complete_request(self, request: CompletionRequest) -> CompletionResponse:
+        self.calls += 1
+        self.models.append(request.params.model)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise ProviderUnavailableError(f"{self.name} is down")
+        return CompletionResponse(content=self.name)
+
+
+def _request() -> CompletionRequest:
+    return CompletionRequest.create(
+        [{"role": "user", "content": "hi"}], CompletionParams(model="default")
+    )
+
+
+def test_backend_stats_percentiles_and_error_rate():
+    stats = BackendStats(window=10)
+    for latency in range(1, 21):
+        stats.record_success(latency / 100)
+    stats.record_error()
+
+    assert len(stats.latencies) == 10  # 滚动窗口只保留最近的样本
+    assert stats.p50 == pytest.approx(0.16)
+    assert stats.p95 == pytest.approx(0.20)
+    assert stats.error_rate == pytest.approx(0.1)
+    assert stats.consecutive_errors == 1
+
+
+@pytest.mark.asyncio
+async def test_routes_to_fastest_backend_after_exploring():
+    slow, fast = _Backend("slow", delay=0.02), _Backend("fast", delay=0.001)
+    router = RoutingProvider({"slow": slow, "fast": fast}, min_samples=2)
+
+    for _ in range(10):
+        await router.complete_request(_request())
+
+    assert slow.calls == 2  # 只在探测阶段被使用
+    assert fast.calls == 8
+    assert router.ranked()[0].name == "fast"
+
+
+@pytest.mark.asyncio
+async def test_failover_and_unhealthy_backend_is_skipped():
+    down, up = _Backend("down", fail=True), _Backend("up", delay=0.001)
+    router = RoutingProvider([RouteBackend("down", down), RouteBackend("up", up)])
+
+    for _ in range(5):
+        response = await router.complete_request(_request())
+        assert response.content == "up"
+
+    assert down.calls == 3  # max_consecutive_errors 之后不再尝试
+    assert router.stats.failovers == 3
+    assert not router.healthy(router.backends[0])
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_backend_is_probed_after_cooldown():
+    down, up = _Backend("down", fail=True), _Backend("up")
+    router = RoutingProvider({"down": down, "up": up}, max_consecutive_errors=1, cooldown=0.1)
+    await router.complete_request(_request())
+    assert router.ranked()[0].name == "up"
+
+    await asyncio.sleep(0.15)
+    down.fail = False
+    assert (await router.complete_request(_request())).content == "down"
+
+
+@pytest.mark.asyncio
+async def test_all_backends_failing_raises():
+    router = RoutingProvider({"a": _Backend("a", fail=True), "b": _Backend("b", fail=True)})
+    with pytest.raises(ProviderUnavailableError):
+        await router.complete_request(_request())
+
+
+@pytest.mark.asyncio
+async def test_hedge_cuts_tail_latency_and_cancels_loser():
+    stuck, backup = _Backend("stuck", delay=1.0), _Backend("backup", delay=0.01)
+    router = RoutingProvider(
+        [RouteBackend("stuck", stuck), RouteBackend("backup", backup)],
+        min_samples=1,
+        hedge=True,
+        hedge_min_delay=0.02,
+    )
+    router.backends[0].stats.record_success(0.005)  # 历史上 stuck 最快
+    router.backends[1].stats.record_success(0.01)
+
+    response = await asyncio.wait_for(router.complete_request(_request()), 0.5)
+    await asyncio.sleep(0)
+
+    assert response.content == "backup"
+    assert router.stats.hedged == 1
+    assert router.stats.hedge_wins == 1
+    assert stuck.cancelled == 1
+    assert router.backends[0].stats.errors == 0  # 取消不算失败
+    # 落败请求的耗时作为延迟下界计入，stuck 不再被视为最快
+    assert router.backends[0].stats.p95 >= 0.02
+    assert router.backends[0].stats.p50 > router.backends[1].stats.p50
+
+
+@pytest.mark.asyncio
+async def test_hedge_not_sent_when_primary_is_fast():
+    primary, backup = _Backend("primary", delay=0.001), _Backend("backup")
+    router = RoutingProvider(
+        {"primary": primary, "backup": backup}, min_samples=1, hedge=True, hedge_min_delay=0.05
+    )
+    router.backends[1].stats.record_success(0.5)
+
+    await router.complete_request(_request())
+
+    assert router.stats.hedged == 0
+    assert backup.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_backend_model_override_and_stream_events():
+    backend = _Backend("a")
+    router = RoutingProvider([RouteBackend("a", backend, model="a-large")])
+
+    await router.complete_request(_request())
+    events = [event async for event in router.stream_request_events(_request())]
+
+    assert backend.models == ["a-large", "a-large"]
+    assert events == [TextDelta(delta="a")]
+    assert router.stats.routed == {"a": 2}
+
+
+def test_routed_model_resolves_to_routing_provider(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    model = Model.routed(
+        Model.openai("gpt-4o-mini"),
+        Model.ollama("llama3"),
+        hedge=True,
+    )
+
+    provider = _resolve_provider(model)
+
+    assert model.identifier == "routing:gpt-4o-mini"
+    assert isinstance(provider, RoutingProvider)
+    assert provider.hedge is True
+    assert [backend.name for backend in provider.backends] == [
+        "openai:gpt-4o-mini",
+        "ollama:llama3",
+    ]
+    assert provider.backends[1].model == "llama3"
@@ -8,7 +8,8 @@ from loom import (
     Model,
     Runtime,
 )
-from loom.context import ContextManager, ContextPartitions
+from loom.context import ContextManager, ContextPartitions, ContextRenewer
+from loom.memory import SnapshotStore
 from loom.runtime import RuntimeTask
 from loom.types import Message
 
@@ -39,8 +40,9 @@ def test_context_policy_measures_and_snapshots_context() -> None:
     assert snapshot.metadata == {"source": "test"}
 
 
-def test_context_policy_compact_and_renew_wrap_existing_manager() -> None:
+def test_context_policy_compact_and_renew_wrap_existing_manager(tmp_path) -> None:
     manager = ContextManager(max_tokens=10_000)
+    manager.renewer = ContextRenewer(SnapshotStore(tmp_path))
     manager.partitions.working.goal_progress = "Implemented protocol"
     manager.partitions.working.plan = ["wire engine"]
     manager.partitions.history.extend(
@@ -159,6 +159,20 @@ class TestAgentLoop:
             assert result["status"] == "success"
             mock_renewer.renew.assert_called_once()
 
+    def test_renew_uses_injected_renewer(self):
+        """Test L* loop renews through the renewer it was given"""
+        ctx = MagicMock()
+        ctx.working = MagicMock()
+        ctx.working.rho = 0.3
+        renewer = MagicMock()
+        renewer.renew.return_value = (ctx, None)
+        loop = AgentLoop(LoopConfig(max_iterations=20), renewer=renewer)
+
+        delta_fn = MagicMock(side_effect=["renew", "goal_reached"])
+        result = loop.run("goal", ctx, lambda g, c: c, lambda c: "effect", lambda e, c: c, delta_fn)
+        assert result["status"] == "success"
+        renewer.renew.assert_called_once_with(ctx, "goal")
+
 
 # ── HeartbeatConfig & WatchSource ──
 
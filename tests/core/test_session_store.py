@@ -0,0 +1,255 @@
+"""Test session store backends."""
+
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from loom.runtime.session_store import (
+    FileSessionStore,
+    InMemorySessionStore,
+    RunRecord,
+    SessionRecord,
+    SQLiteSessionStore,
+    TranscriptRecord,
+    migrate_file_session_store,
+)
+
+_T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _run(i: int, session_id: str) -> RunRecord:
+    return RunRecord(
+        id=f"run-{i}",
+        session_id=session_id,
+        state="completed",
+        output=f"out {i}",
+        created_at=_T0 + timedelta(seconds=i),
+        updated_at=_T0 + timedelta(seconds=i),
+        metadata={"i": i},
+    )
+
+
+@pytest.mark.parametrize("backend", ["memory", "file", "sqlite"])
+def test_list_runs_pages_in_creation_order(tmp_path, backend):
+    store = {
+        "memory": lambda: InMemorySessionStore(),
+        "file": lambda: FileSessionStore(tmp_path / "s.json"),
+        "sqlite": lambda: SQLiteSessionStore(tmp_path / "s.db"),
+    }[backend]()
+    # 乱序写入，按 created_at 返回
+    for i in [3, 0, 4, 1, 2, 5]:
+        store.save_run(_run(i, "a" if i % 2 == 0 else "b"))
+
+    assert [run.id for run in store.list_runs()] == [f"run-{i}" for i in range(6)]
+    assert [run.id for run in store.list_runs("a", limit=2)] == ["run-0", "run-2"]
+    assert [run.id for run in store.list_runs("a", limit=2, offset=2)] == ["run-4"]
+    assert [run.id for run in store.list_runs(limit=2, offset=3)] == ["run-3", "run-4"]
+
+
+class TestSQLiteSessionStore:
+    def test_records_round_trip_and_upsert(self, tmp_path):
+        store = SQLiteSessionStore(tmp_path / "s.db")
+        store.save_session(SessionRecord(id="s1", metadata={"tenant": "acme"}, created_at=_T0))
+        store.save_run(_run(1, "s1"))
+        store.save_run(RunRecord(id="run-1", session_id="s1", state="failed", created_at=_T0))
+        store.save_transcript(
+            TranscriptRecord(
+                id="run-1",
+                session_id="s1",
+                prompt="问题",
+                messages=[{"role": "user", "content": "问题"}],
+                created_at=_T0,
+            )
+        )
+        store.close()
+
+        reopened = SQLiteSessionStore(tmp_path / "s.db")
+        assert reopened.load_session("s1").metadata == {"tenant": "acme"}
+        assert reopened.load_run("run-1").state == "failed"
+        assert reopened.count_runs("s1") == 1
+        assert reopened.list_transcripts("s1")[0].messages == [{"role": "user", "content": "问题"}]
+
+        reopened.delete_session("s1")
+        assert reopened.load_session("s1") is None
+        assert reopened.count_runs() == reopened.count_transcripts() == 0
+
+    def test_concurrent_writers(self, tmp_path):
+        store = SQLiteSessionStore(tmp_path / "s.db")
+
+        def write(worker: int) -> None:
+            for i in range(50):
+                store.save_run(_run(worker * 100 + i, f"session-{worker}"))
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.count_runs() == 200
+        assert len(store.list_runs("session-2")) == 50
+
+    def test_migrates_json_store(self, tmp_path):
+        source = FileSessionStore(tmp_path / "sessions.json")
+        source.save_session(SessionRecord(id="s1", created_at=_T0))
+        for i in range(3):
+            source.save_run(_run(i, "s1"))
+        source.save_transcript(TranscriptRecord(id="run-0", session_id="s1", prompt="hi"))
+
+        counts = migrate_file_session_store(tmp_path / "sessions.json", tmp_path / "s.db")
+        assert counts == {"sessions": 1, "runs": 3, "transcripts": 1}
+        # 重复迁移是幂等的
+        migrate_file_session_store(tmp_path / "sessions.json", tmp_path / "s.db")
+
+        store = SQLiteSessionStore(tmp_path / "s.db")
+        assert store.list_runs("s1") == source.list_runs("s1")
+        assert store.load_transcript("run-0") == source.load_transcript("run-0")
+        assert json.loads((tmp_path / "sessions.json").read_text())["runs"].keys() == {
+            "run-0",
+            "run-1",
+            "run-2",
+        }
+
+    def test_migrate_missing_source_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            migrate_file_session_store(tmp_path / "missing.json", tmp_path / "s.db")
+        assert not (tmp_path / "missing.json").exists()
+
+
+def _transcript(i: int, session_id: str = "s1") -> TranscriptRecord:
+    return TranscriptRecord(
+        id=f"run-{i}",
+        session_id=session_id,
+        prompt=f"task {i}",
+        messages=[
+            {"role": "user", "content": f"q{i}"},
+            {"role": "tool", "content": f"tool{i}"},
+            {"role": "assistant", "content": f"a{i}"},
+        ],
+        created_at=_T0 + timedelta(seconds=i),
+    )
+
+
+@pytest.mark.parametrize("backend", ["memory", "file", "sqlite"])
+def test_iter_transcripts_windows_newest_runs_and_messages(tmp_path, backend):
+    store = {
+        "memory": lambda: InMemorySessionStore(),
+        "file": lambda: FileSessionStore(tmp_path / "s.json"),
+        "sqlite": lambda: SQLiteSessionStore(tmp_path / "s.db"),
+    }[backend]()
+    for i in [4, 0, 3, 1, 2]:
+        store.save_transcript(_transcript(i))
+    store.save_transcript(_transcript(9, session_id="other"))
+
+    assert [t.id for t in store.iter_transcripts("s1")] == [f"run-{i}" for i in range(5)]
+    recent = list(
+        store.iter_transcripts(
+            "s1", newest_first=True, limit=2, max_messages=1, roles={"user", "assistant"}
+        )
+    )
+    assert [t.id for t in recent] == ["run-4", "run-3"]
+    assert [t.messages for t in recent] == [
+        [{"role": "assistant", "content": "a4"}],
+        [{"role": "assistant", "content": "a3"}],
+    ]
+    assert store.load_transcript("run-4").messages[1]["role"] == "tool"
+
+
+def test_sqlite_iter_transcripts_pages_with_cursor(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "s.db")
+    for i in range(25):
+        store.save_transcript(_transcript(i))
+    ids = [t.id for t in store.iter_transcripts("s1", newest_first=True, page_size=4)]
+    assert ids == [f"run-{i}" for i in reversed(range(25))]
+    assert len(list(store.iter_transcripts("s1", limit=9, page_size=4))) == 9
+
+
+def test_session_restore_reads_only_the_policy_window():
+    from loom import Agent, Model, SessionConfig
+
+    class CountingStore(InMemorySessionStore):
+        def __init__(self) -> None:
+            super().__init__()
+            self.yielded = 0
+
+        def iter_transcripts(self, session_id, **kwargs):
+            for record in super().iter_transcripts(session_id, **kwargs):
+                self.yielded += 1
+                yield record
+
+    store = CountingStore()
+    for i in range(100):
+        store.save_transcript(_transcript(i, session_id="long"))
+
+    agent = Agent(model=Model.openai("gpt-test"), session_store=store)
+    session = agent.session(SessionConfig(id="long"))
+    assert store.yielded == 8  # SessionRestorePolicy.transcript_only() 默认 max_transcripts=8
+    contents = [m["content"] for m in session._transcript_messages]
+    assert contents[:2] == ["q92", "a92"] and contents[-1] == "a99"
+
+
+class TestMessageDedupe:
+    def _chat(self, i: int, session_id: str = "s1") -> TranscriptRecord:
+        history = [{"role": "system", "content": "You are helpful. " * 200}]
+        for turn in range(i + 1):
+            history.append({"role": "user", "content": f"q{turn}"})
+            history.append({"role": "assistant", "content": f"a{turn}", "meta": {"turn": turn}})
+        return TranscriptRecord(
+            id=f"run-{i}",
+            session_id=session_id,
+            prompt=f"q{i}",
+            messages=history,
+            created_at=_T0 + timedelta(seconds=i),
+            updated_at=_T0 + timedelta(seconds=i),
+        )
+
+    def test_round_trip_and_shared_messages_stored_once(self, tmp_path):
+        store = SQLiteSessionStore(tmp_path / "s.db", dedupe_messages=True)
+        chats = [self._chat(i) for i in range(10)]
+        for chat in chats:
+            store.save_transcript(chat)
+
+        assert store.load_transcript("run-9") == chats[9]
+        assert store.list_transcripts("s1") == chats
+        blobs = store._conn.execute("SELECT COUNT(*) FROM message_blobs").fetchone()[0]
+        assert blobs == 1 + 2 * 10  # system prompt + 每轮一问一答
+
+    def test_window_reads_tail_of_references(self, tmp_path):
+        store = SQLiteSessionStore(tmp_path / "s.db", dedupe_messages=True)
+        for i in range(5):
+            store.save_transcript(self._chat(i))
+        [latest] = store.iter_transcripts(
+            "s1", newest_first=True, limit=1, max_messages=3, roles={"user", "assistant"}
+        )
+        assert [m["content"] for m in latest.messages] == ["a3", "q4", "a4"]
+
+    def test_rows_stay_readable_across_modes(self, tmp_path):
+        path = tmp_path / "s.db"
+        plain = SQLiteSessionStore(path)
+        plain.save_transcript(self._chat(0))
+        plain.close()
+        store = SQLiteSessionStore(path, dedupe_messages=True)
+        store.save_transcript(self._chat(1))
+        assert [t.id for t in store.list_transcripts("s1")] == ["run-0", "run-1"]
+        store.close()
+        assert SQLiteSessionStore(path).load_transcript("run-1") == self._chat(1)
+
+    def test_delete_session_prunes_orphan_blobs(self, tmp_path):
+        store = SQLiteSessionStore(tmp_path / "s.db", dedupe_messages=True)
+        store.save_transcript(self._chat(2, session_id="a"))
+        store.save_transcript(self._chat(0, session_id="b"))
+        store.delete_session("a")
+        assert store.load_transcript("run-0") == self._chat(0, session_id="b")
+        blobs = store._conn.execute("SELECT COUNT(*) FROM message_blobs").fetchone()[0]
+        assert blobs == 3
+
+    def test_migration_dedupes(self, tmp_path):
+        source = FileSessionStore(tmp_path / "s.json")
+        for i in range(4):
+            source.save_transcript(self._chat(i))
+        target = SQLiteSessionStore(tmp_path / "s.db", dedupe_messages=True)
+        migrate_file_session_store(tmp_path / "s.json", target)
+        assert target.load_transcript("run-3") == self._chat(3)
+        refs = target._conn.execute("SELECT COUNT(*) FROM transcript_messages").fetchone()[0]
+        assert refs == sum(len(self._chat(i).messages) for i in range(4))
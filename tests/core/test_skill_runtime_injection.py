@@ -136,3 +136,26 @@ async def test_unmatched_skill_does_not_pollute_later_runs_in_same_session() ->
     second_contents = [str(message["content"]) for message in provider.requests[1].messages]
     assert any("Only use this for reviews." in content for content in first_contents)
     assert not any("Only use this for reviews." in content for content in second_contents)
+
+
+def test_skill_budget_is_measured_with_the_engine_token_counter() -> None:
+    from unittest.mock import MagicMock
+
+    from loom.ecosystem.skill import Skill
+    from loom.runtime.engine import AgentEngine, EngineConfig
+    from loom.utils import get_tokenizer
+    from loom.utils.tokens import HeuristicTokenizer
+
+    engine = AgentEngine(
+        provider=MagicMock(),
+        config=EngineConfig(tokenizer=HeuristicTokenizer(chars_per_token=1)),
+    )
+    skill = Skill(name="big", description="", content="x" * 400)
+    policy = SkillInjection.matching(max_tokens=100, include_metadata=False)
+
+    # 每字符 1 token 的分词器下预算只够约 100 个字符；默认估算器会放进更多
+    engine_entry = policy.render([skill], counter=engine.context_runtime.token_counter)[0]
+    default_entry = policy.render([skill])[0]
+    assert engine.context_runtime.token_counter.count(engine_entry) <= 100
+    assert len(engine_entry) < len(default_entry)
+    assert get_tokenizer().count(default_entry) <= 100
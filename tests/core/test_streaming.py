@@ -604,6 +604,101 @@ class TestEngineExecuteStreaming:
         assert len(tool_result_events) >= 1
         assert tool_result_events[0].name == "greet"
 
+    @pytest.mark.asyncio
+    async def test_speculative_read_only_tool_starts_before_stream_ends(self):
+        import asyncio
+
+        from loom.runtime.engine import AgentEngine, EngineConfig
+        from loom.tools.schema import Tool, ToolDefinition
+        from loom.types.stream import TextDelta, ToolCallEvent, ToolResultEvent
+
+        calls: list[str] = []
+        seen_during_stream: list[list[str]] = []
+        turn = [0]
+
+        async def _stream(request):
+            if turn[0] == 0:
+                turn[0] += 1
+                yield ToolCallEvent(id="c1", name="lookup", arguments={"key": "a"})
+                await asyncio.sleep(0.01)
+                seen_during_stream.append(list(calls))
+                yield TextDelta(delta="checking")
+            else:
+                yield TextDelta(delta="done")
+
+        async def lookup_handler(key: str = "") -> str:
+            calls.append(key)
+            return f"value:{key}"
+
+        provider = MagicMock()
+        provider.stream_request_events = _stream
+        engine = AgentEngine(
+            provider=provider,
+            config=EngineConfig(enable_memory=False, speculative_tools=True),
+            tools=[
+                Tool(
+                    definition=ToolDefinition(name="lookup", description="l", is_read_only=True),
+                    handler=lookup_handler,
+                )
+            ],
+        )
+
+        events = [ev async for ev in engine.execute_streaming("look up a")]
+
+        assert seen_during_stream == [["a"]]
+        assert calls == ["a"]
+        results = [e for e in events if isinstance(e, ToolResultEvent)]
+        assert [r.content for r in results] == ["value:a"]
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_discards_speculative_tools(self):
+        import asyncio
+
+        from loom.runtime.engine import AgentEngine, EngineConfig
+        from loom.tools.schema import Tool, ToolDefinition
+        from loom.types.stream import TextDelta, ToolCallEvent
+
+        started = asyncio.Event()
+        cancelled: list[str] = []
+
+        async def _stream(request):
+            yield ToolCallEvent(id="c1", name="lookup", arguments={"key": "a"})
+            yield TextDelta(delta="checking")
+            await asyncio.sleep(10)
+
+        async def lookup_handler(key: str = "") -> str:
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(key)
+                raise
+            return key
+
+        provider = MagicMock()
+        provider.stream_request_events = _stream
+        engine = AgentEngine(
+            provider=provider,
+            config=EngineConfig(enable_memory=False, speculative_tools=True),
+            tools=[
+                Tool(
+                    definition=ToolDefinition(name="lookup", description="l", is_read_only=True),
+                    handler=lookup_handler,
+                )
+            ],
+        )
+
+        events = engine.execute_streaming("look up a")
+        async for ev in events:
+            if isinstance(ev, TextDelta):
+                break
+        await started.wait()
+        await events.aclose()
+        await asyncio.sleep(0)
+
+        assert cancelled == ["a"]
+        assert engine.tool_runtime.discard_speculative() == 0
+
     @pytest.mark.asyncio
     async def test_error_event_on_provider_exception(self):
         from loom.runtime.engine import AgentEngine, EngineConfig
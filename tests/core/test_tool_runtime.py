@@ -142,3 +142,204 @@ async def test_agent_engine_tool_runtime_tracks_reassigned_executor() -> None:
     )
     assert len(results) == 1
     assert results[0].content == "ok"
+
+
+def test_provider_tools_are_reused_until_registry_generation_changes() -> None:
+    async def handler() -> str:
+        return "ok"
+
+    engine = AgentEngine(provider=MagicMock(), config=EngineConfig())
+    engine.tool_registry.register(
+        Tool(definition=ToolDefinition(name="first", description="first"), handler=handler)
+    )
+
+    first = engine.tool_runtime.build_provider_tools()
+    second = engine.tool_runtime.build_provider_tools()
+    assert first == second
+    assert all(a is b for a, b in zip(first, second, strict=True))
+
+    engine.tool_registry.register(
+        Tool(definition=ToolDefinition(name="second", description="second"), handler=handler)
+    )
+    third = engine.tool_runtime.build_provider_tools()
+    assert [tool["name"] for tool in third] == ["first", "second"]
+
+    engine.tool_registry.unregister("first")
+    assert [spec.name for spec in engine.tool_runtime.build_provider_tool_specs()] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_parallel_safe_tools_run_concurrently_in_call_order() -> None:
+    import asyncio
+
+    active = 0
+    peak = 0
+    order: list[str] = []
+
+    def _make(name: str, delay: float, **flags) -> Tool:
+        async def handler() -> str:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(delay)
+            active -= 1
+            order.append(name)
+            return name
+
+        return Tool(
+            definition=ToolDefinition(name=name, description=name, **flags), handler=handler
+        )
+
+    engine = AgentEngine(provider=MagicMock(), config=EngineConfig(max_tool_concurrency=4))
+    for tool in (
+        _make("read_a", 0.03, is_read_only=True),
+        _make("read_b", 0.01, is_read_only=True),
+        _make("fetch", 0.02, is_concurrency_safe=True),
+        _make("write", 0.0),
+        _make("read_c", 0.0, is_read_only=True),
+        _make("purge", 0.0, is_read_only=True, is_destructive=True),
+    ):
+        engine.tool_registry.register(tool)
+
+    calls = [
+        ToolCall(id=str(i), name=name, arguments={})
+        for i, name in enumerate(["read_a", "read_b", "fetch", "write", "read_c"])
+    ]
+    results = await engine.tool_runtime.execute_tools(calls)
+
+    assert [r.tool_call_id for r in results] == ["0", "1", "2", "3", "4"]
+    assert [r.content for r in results] == ["read_a", "read_b", "fetch", "write", "read_c"]
+    assert peak == 3
+    # 非只读工具是屏障：等前一批全部完成后才执行，之后的调用也在其之后
+    assert order[:3] == ["read_b", "fetch", "read_a"]
+    assert order[3:] == ["write", "read_c"]
+    assert not engine.tool_runtime.is_parallel_safe(ToolCall(id="x", name="purge", arguments={}))
+
+
+@pytest.mark.asyncio
+async def test_parallel_mode_keeps_per_call_hook_semantics() -> None:
+    emitted: list[str] = []
+    runtime = _runtime(
+        _HookManager(HookDecision.DENY, "blocked"),
+        emit=lambda event, **kw: emitted.append(f"{event}:{kw['tool_call_id']}"),
+    )
+    runtime.max_concurrency = 4
+    runtime.tool_registry = ToolRegistry()
+    runtime.tool_registry.register(
+        Tool(
+            definition=ToolDefinition(name="search", description="s", is_read_only=True),
+            handler=MagicMock(),
+        )
+    )
+
+    results = await runtime.execute_tools(
+        [
+            ToolCall(id="a", name="search", arguments={}),
+            ToolCall(id="b", name="search", arguments={}),
+        ]
+    )
+
+    assert [r.content for r in results] == ["Hook denied: blocked"] * 2
+    assert sorted(emitted) == ["before_tool:a", "before_tool:b", "tool_result:a", "tool_result:b"]
+
+
+@pytest.mark.asyncio
+async def test_speculative_results_are_claimed_or_discarded() -> None:
+    import asyncio
+
+    runs: list[str] = []
+
+    async def handler(q: str = "") -> str:
+        runs.append(q)
+        await asyncio.sleep(0.01)
+        return q
+
+    engine = AgentEngine(provider=MagicMock(), config=EngineConfig(speculative_tools=True))
+    engine.tool_registry.register(
+        Tool(
+            definition=ToolDefinition(name="find", description="f", is_read_only=True),
+            handler=handler,
+        )
+    )
+    engine.tool_registry.register(
+        Tool(definition=ToolDefinition(name="edit", description="e"), handler=handler)
+    )
+    runtime = engine.tool_runtime
+
+    used = ToolCall(id="1", name="find", arguments={"q": "used"})
+    assert runtime.speculate(used)
+    assert runtime.speculate(ToolCall(id="2", name="find", arguments={"q": "unused"}))
+    assert not runtime.speculate(ToolCall(id="3", name="edit", arguments={"q": "write"}))
+
+    results = await runtime.execute_tools([used])
+
+    assert [r.content for r in results] == ["used"]
+    assert runs.count("used") == 1
+    assert "write" not in runs
+    assert runtime.discard_speculative() == 0
+
+
+@pytest.mark.asyncio
+async def test_speculative_calls_evaluate_hooks_before_starting() -> None:
+    evaluated: list[str] = []
+
+    class _RecordingHooks(_HookManager):
+        def evaluate(self, _event, payload, _ctx):
+            evaluated.append(payload["arguments"]["q"])
+            return _HookOutcome(HookDecision.ALLOW)
+
+    async def handler(q: str = "") -> str:
+        return q
+
+    engine = AgentEngine(provider=MagicMock(), config=EngineConfig(speculative_tools=True))
+    engine.tool_registry.register(
+        Tool(
+            definition=ToolDefinition(name="find", description="f", is_read_only=True),
+            handler=handler,
+        )
+    )
+    runtime = engine.tool_runtime
+    runtime.hook_manager = _RecordingHooks()
+
+    used = ToolCall(id="1", name="find", arguments={"q": "used"})
+    runtime.speculate(used)
+    runtime.speculate(ToolCall(id="2", name="find", arguments={"q": "unused"}))
+    assert evaluated == ["used", "unused"]
+
+    results = await runtime.execute_tools([used])
+
+    assert [r.content for r in results] == ["used"]
+    assert evaluated == ["used", "unused"]  # 认领时不再重复评估
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("denied_by", ["hook", "governance"])
+async def test_denied_speculative_call_never_starts(denied_by) -> None:
+    from loom.runtime.governance import GovernancePolicy
+
+    runs: list[str] = []
+
+    async def handler(q: str = "") -> str:
+        runs.append(q)
+        return q
+
+    engine = AgentEngine(provider=MagicMock(), config=EngineConfig(speculative_tools=True))
+    engine.tool_registry.register(
+        Tool(
+            definition=ToolDefinition(name="find", description="f", is_read_only=True),
+            handler=handler,
+        )
+    )
+    runtime = engine.tool_runtime
+    if denied_by == "hook":
+        runtime.hook_manager = _HookManager(HookDecision.DENY, "blocked")
+    else:
+        engine.tool_executor.governance_policy = GovernancePolicy.deny_all("blocked")
+
+    call = ToolCall(id="1", name="find", arguments={"q": "secret"})
+    assert not runtime.speculate(call)
+    assert runs == []
+    results = await runtime.execute_tools([call])
+
+    assert results[0].is_error and "blocked" in results[0].content
+    assert runs == []
@@ -50,3 +50,88 @@ class TestUtils:
     def test_error_hierarchy_context(self):
         error = ContextOverflowError("overflow")
         assert isinstance(error, ContextError)
+
+
+class TestTokenizers:
+    """Test tokenizer registry and estimators"""
+
+    def test_family_resolution(self):
+        from loom.config import Model
+        from loom.utils.tokens import resolve_family
+
+        assert resolve_family("claude-3-5-sonnet-20241022") == "anthropic"
+        assert resolve_family("gpt-4o-mini") == "openai"
+        assert resolve_family("openai:my-finetune") == "openai"
+        assert resolve_family(Model.ollama("phi3")) == "ollama"
+        assert resolve_family(Model.openai("deepseek-chat")) == "deepseek"
+        assert resolve_family("unknown-model") == "anthropic"
+
+    def test_estimator_charges_cjk_and_code_more_than_len_over_4(self):
+        from loom.utils import count_tokens
+
+        cjk = "这是一个用于测试上下文压缩阈值的中文句子。" * 4
+        code = 'def f(x):\n    return {"a": [1, 2, 3]}\n' * 4
+        assert count_tokens(cjk) > len(cjk) // 4 * 2
+        assert count_tokens(code) > len(code) // 4
+        assert count_tokens(cjk, "qwen-max") < count_tokens(cjk, "claude-3-5-sonnet")
+
+    def test_multimodal_blocks_are_counted(self):
+        import base64
+        import struct
+
+        from loom.types import ImageBlock, TextBlock
+        from loom.utils import count_tokens
+
+        png = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + struct.pack(">II", 512, 512)
+        image = ImageBlock(
+            source={
+                "type": "base64",
+                "media_type": "image/png",
+                "data": base64.b64encode(png).decode(),
+            }
+        )
+        content = [TextBlock(text="What is in this image?"), image]
+
+        assert (
+            count_tokens(content, "claude-3-5-sonnet")
+            == count_tokens("What is in this image?") + (512 * 512 + 749) // 750
+        )
+        assert count_tokens([image], "gpt-4o") == 85 + 170
+        url_image = ImageBlock(source={"type": "url", "url": "https://example.com/x.png"})
+        assert count_tokens([url_image], "gpt-4o") == 765
+
+    def test_counter_cache_and_custom_registration(self):
+        from loom.utils import get_tokenizer, register_tokenizer
+        from loom.utils.tokens import HeuristicTokenizer
+
+        counter = register_tokenizer("test-family", HeuristicTokenizer(), prefixes=["test-llm"])
+        text = "x" * 400
+        assert get_tokenizer("test-llm-1") is counter
+        assert counter.count(text) == 100
+        assert counter.count(text) == 100
+        assert counter.hits == 1 and counter.misses == 1
+
+    def test_reregistering_prefix_replaces_entry(self):
+        from loom.utils import get_tokenizer, register_tokenizer
+        from loom.utils.tokens import _FAMILY_PREFIXES, HeuristicTokenizer
+
+        register_tokenizer("test-family-a", HeuristicTokenizer(), prefixes=["test-rereg"])
+        second = register_tokenizer("test-family-b", HeuristicTokenizer(), prefixes=["test-rereg"])
+        assert [entry for entry in _FAMILY_PREFIXES if entry[0] == "test-rereg"] == [
+            ("test-rereg", "test-family-b")
+        ]
+        assert get_tokenizer("test-rereg-1") is second
+
+    def test_calibration_reports_error_per_tokenizer(self):
+        from loom.providers.base import TokenUsage
+        from loom.types import Message
+        from loom.utils import calibrate_tokenizers
+
+        samples = [
+            ([Message(role="user", content="word " * 100)], TokenUsage(input_tokens=100)),
+            ("中文" * 50, 100),
+        ]
+        report = calibrate_tokenizers(samples)
+
+        assert report["heuristic"].samples == 2
+        assert report["anthropic"].mean_abs_pct_error < report["heuristic"].mean_abs_pct_error
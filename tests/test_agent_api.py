@@ -47,6 +47,7 @@ from loom import (
     SessionStore,
     Shell,
     Skill,
+    SQLiteSessionStore,
     Toolset,
     TranscriptRecord,
     Web,
@@ -772,8 +773,9 @@ async def test_agent_run_accepts_runtime_task():
     assert "mention runtime language" in text
 
 
-def test_continuity_policy_handoff_wraps_context_renewal():
-    from loom.context import ContextPartitions
+def test_continuity_policy_handoff_wraps_context_renewal(tmp_path):
+    from loom.context import ContextPartitions, ContextRenewer
+    from loom.memory import SnapshotStore
     from loom.runtime import ContinuityPolicy
 
     partitions = ContextPartitions()
@@ -785,6 +787,7 @@ def test_continuity_policy_handoff_wraps_context_renewal():
         partitions,
         RuntimeTask(goal="Refactor runtime language"),
         sprint=2,
+        renewer=ContextRenewer(SnapshotStore(tmp_path)),
     )
 
     assert result.context.working.goal_progress == "Implemented signal runtime"
@@ -794,6 +797,32 @@ def test_continuity_policy_handoff_wraps_context_renewal():
     assert result.artifact.open_tasks == ["abstract harness"]
 
 
+@pytest.mark.asyncio
+async def test_runtime_preset_renewal_writes_session_snapshot(tmp_path, monkeypatch):
+    from loom.providers.base import CompletionResponse, LLMProvider
+
+    class MockProvider(LLMProvider):
+        async def _complete_request(self, request):
+            return CompletionResponse(content="ok")
+
+    # 默认快照目录是相对路径 .loom/memory，隔离到临时目录
+    monkeypatch.chdir(tmp_path)
+    agent = Agent(model=Model.openai("gpt-test"), runtime=Runtime.long_running())
+    agent._provider = MockProvider()
+    agent._provider_resolved = True
+    session = agent.session(SessionConfig(id="abc"))
+    await session.run("first")
+
+    manager = session._engine.context_manager
+    assert manager.continuity_policy is not None
+    manager.renew()
+    store = manager.renewer.persistent
+    assert store.flush(timeout=5)
+
+    assert store.path_for("session-abc").exists()
+    assert not store.path_for("default").exists()
+
+
 @pytest.mark.asyncio
 async def test_harness_single_run_uses_runtime_task_contract():
     from loom.runtime import Harness, HarnessContext
@@ -1119,15 +1148,19 @@ async def test_session_store_records_session_and_run():
 
 
 @pytest.mark.asyncio
-async def test_file_session_store_persists_sessions_and_runs(tmp_path):
+@pytest.mark.parametrize(
+    ("store_cls", "filename"),
+    [(FileSessionStore, "sessions.json"), (SQLiteSessionStore, "sessions.db")],
+)
+async def test_file_session_store_persists_sessions_and_runs(tmp_path, store_cls, filename):
     from loom.providers.base import CompletionResponse, LLMProvider
 
     class MockProvider(LLMProvider):
         async def _complete_request(self, request) -> CompletionResponse:
             return CompletionResponse(content="stored on disk")
 
-    path = tmp_path / "sessions.json"
-    store = FileSessionStore(path)
+    path = tmp_path / filename
+    store = store_cls(path)
     agent = Agent(
         model=Model.openai("gpt-test"),
         session_store=store,
@@ -1139,7 +1172,7 @@ async def test_file_session_store_persists_sessions_and_runs(tmp_path):
         SessionConfig(id="disk-session", metadata={"tenant": "acme"}),
     ).run("persist this")
 
-    reloaded = FileSessionStore(path)
+    reloaded = store_cls(path)
     session_record = reloaded.load_session("disk-session")
 
     assert result.output == "stored on disk"